@@ -0,0 +1,274 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : benchmarks/cases.py
+#
+#       Contains the input decks of the benchmark cases. Each case is a
+#       function of the solution order and the (approximate) number of
+#       elements that returns an input deck as a dict of sections (see
+#       processing/sweep.py).
+#
+# ------------------------------------------------------------------------ #
+import numpy as np
+
+
+def get_num_elems_2D(num_elems):
+	'''
+	This function returns the number of elements in each direction of a
+	square 2D mesh with about num_elems elements.
+	'''
+	return max(1, int(round(np.sqrt(num_elems))))
+
+
+def get_scalar_deck(order, num_elems):
+	'''
+	2D scalar advection of a Gaussian on a periodic quadrilateral mesh.
+	'''
+	n = get_num_elems_2D(num_elems)
+	return {
+		"TimeStepping" : {
+			"FinalTime" : 1.,
+			"NumTimeSteps" : 1000,
+			"TimeStepper" : "RK4",
+		},
+		"Numerics" : {
+			"SolutionOrder" : order,
+			"SolutionBasis" : "LagrangeQuad",
+		},
+		"Mesh" : {
+			"ElementShape" : "Quadrilateral",
+			"NumElemsX" : n,
+			"NumElemsY" : n,
+			"xmin" : -5.,
+			"xmax" : 5.,
+			"ymin" : -5.,
+			"ymax" : 5.,
+			"PeriodicBoundariesX" : ["x1", "x2"],
+			"PeriodicBoundariesY" : ["y1", "y2"],
+		},
+		"Physics" : {
+			"Type" : "ConstAdvScalar",
+			"ConvFluxNumerical" : "LaxFriedrichs",
+			"ConstXVelocity" : 1.,
+			"ConstYVelocity" : 1.,
+		},
+		"InitialCondition" : {
+			"Function" : "Gaussian",
+			"x0" : [0., 0.],
+		},
+		"Output" : {
+			"WriteFinalSolution" : False,
+			"AutoPostProcess" : False,
+		},
+	}
+
+
+def get_euler_deck(order, num_elems):
+	'''
+	2D Euler isentropic vortex on a periodic quadrilateral mesh with the
+	positivity-preserving limiter.
+	'''
+	n = get_num_elems_2D(num_elems)
+	return {
+		"TimeStepping" : {
+			"FinalTime" : 1.,
+			"NumTimeSteps" : 1000,
+			"TimeStepper" : "RK4",
+		},
+		"Numerics" : {
+			"SolutionOrder" : order,
+			"SolutionBasis" : "LagrangeQuad",
+			"ApplyLimiters" : ["PositivityPreserving"],
+		},
+		"Mesh" : {
+			"ElementShape" : "Quadrilateral",
+			"NumElemsX" : n,
+			"NumElemsY" : n,
+			"xmin" : -5.,
+			"xmax" : 5.,
+			"ymin" : -5.,
+			"ymax" : 5.,
+			"PeriodicBoundariesX" : ["x1", "x2"],
+			"PeriodicBoundariesY" : ["y1", "y2"],
+		},
+		"Physics" : {
+			"Type" : "Euler",
+			"ConvFluxNumerical" : "Roe",
+			"GasConstant" : 1.,
+		},
+		"InitialCondition" : {
+			"Function" : "IsentropicVortex",
+		},
+		"Output" : {
+			"WriteFinalSolution" : False,
+			"AutoPostProcess" : False,
+		},
+	}
+
+
+def get_navierstokes_deck(order, num_elems):
+	'''
+	2D Navier-Stokes manufactured solution with state boundary conditions
+	on all four boundaries and a manufactured source term.
+	'''
+	n = get_num_elems_2D(num_elems)
+	BC = {
+		"BCType" : "StateAll",
+		"Function" : "ManufacturedSolution",
+	}
+	return {
+		"TimeStepping" : {
+			"FinalTime" : 1e-3,
+			"NumTimeSteps" : 1000,
+			"TimeStepper" : "SSPRK3",
+		},
+		"Numerics" : {
+			"SolutionOrder" : order,
+			"SolutionBasis" : "LagrangeQuad",
+		},
+		"Mesh" : {
+			"ElementShape" : "Quadrilateral",
+			"NumElemsX" : n,
+			"NumElemsY" : n,
+			"xmin" : 0.,
+			"xmax" : 1.,
+			"ymin" : 0.,
+			"ymax" : 1.,
+		},
+		"Physics" : {
+			"Type" : "NavierStokes",
+			"ConvFluxNumerical" : "Roe",
+			"DiffFluxNumerical" : "SIP",
+			"GasConstant" : 1.,
+			"Transport" : "Constant",
+			"Viscosity" : 1e-1,
+			"PrandtlNumber" : 0.71,
+		},
+		"InitialCondition" : {
+			"Function" : "ManufacturedSolution",
+		},
+		"BoundaryConditions" : {
+			"x1" : BC,
+			"x2" : BC,
+			"y1" : BC,
+			"y2" : BC,
+		},
+		"SourceTerms" : {
+			"Source1" : {
+				"Function" : "ManufacturedSource",
+			},
+		},
+		"Output" : {
+			"WriteFinalSolution" : False,
+			"AutoPostProcess" : False,
+		},
+	}
+
+
+def get_chemistry_deck(order, num_elems):
+	'''
+	1D overdriven detonation with an implicit Arrhenius source term (Strang
+	splitting), the WENO limiter (implemented up to order 2 only), and the
+	positivity-preserving limiter.
+	'''
+	xshock = 5.
+	limiters = ["PositivityPreservingChem"]
+	if order <= 2:
+		limiters.insert(0, "WENO")
+	BC = {
+		"BCType" : "StateAll",
+		"Function" : "OverdrivenDetonation",
+		"xshock" : xshock,
+	}
+	return {
+		"TimeStepping" : {
+			"FinalTime" : 1.,
+			"NumTimeSteps" : 1000,
+			"TimeStepper" : "Strang",
+			"OperatorSplittingExplicit" : "SSPRK3",
+			"OperatorSplittingImplicit" : "BDF1",
+		},
+		"Numerics" : {
+			"SolutionOrder" : order,
+			"SolutionBasis" : "LagrangeSeg",
+			"ApplyLimiters" : limiters,
+			"ShockIndicator" : "MinMod",
+			"TVBParameter" : 0.01,
+		},
+		"Mesh" : {
+			"ElementShape" : "Segment",
+			"NumElemsX" : num_elems,
+			"xmin" : 0.,
+			"xmax" : 100.,
+		},
+		"Physics" : {
+			"Type" : "Chemistry",
+			"ConvFluxNumerical" : "LaxFriedrichs",
+			"GasConstant" : 1.,
+			"SpecificHeatRatio" : 1.2,
+			"HeatRelease": 50.,
+		},
+		"InitialCondition" : {
+			"Function" : "OverdrivenDetonation",
+			"xshock" : xshock,
+		},
+		"BoundaryConditions" : {
+			"x1" : BC,
+			"x2" : BC,
+		},
+		"SourceTerms" : {
+			"source1" : {
+				"Function" : "Arrhenius",
+				"A" : 230.75,
+				"b" : 0.,
+				"Tign" : 50.,
+			},
+		},
+		"Output" : {
+			"WriteFinalSolution" : False,
+			"AutoPostProcess" : False,
+		},
+	}
+
+
+# Benchmark cases
+CASES = {
+	"Scalar" : get_scalar_deck,
+	"Euler" : get_euler_deck,
+	"NavierStokes" : get_navierstokes_deck,
+	"Chemistry" : get_chemistry_deck,
+}
+# Cases whose ADER predictor is benchmarked
+ADER_CASES = ["Scalar", "Euler"]
+# Cases whose source solvers are benchmarked (stiff source terms with
+# analytic Jacobians)
+SOURCE_CASES = ["Chemistry"]
+
+
+def get_ader_deck(deck):
+	'''
+	This function converts an input deck to the ADER-DG solver. The given
+	deck is modified.
+	'''
+	deck["TimeStepping"]["TimeStepper"] = "ADER"
+	deck["Numerics"]["Solver"] = "ADERDG"
+	deck["Numerics"]["ApplyLimiters"] = []
+	# The default (absolute) threshold of the predictor iterations is at
+	# the level of round-off errors
+	deck["Numerics"]["PredictorThreshold"] = 1e-12
+
+	return deck
@@ -0,0 +1,312 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : benchmarks/kernels.py
+#
+#       Contains the benchmarked kernels. Each kernel function sets up a
+#       solver from an input deck and returns the function to time and an
+#       optional function that resets the solver before each repeat (e.g.
+#       to restore the initial state). Kernels that do not apply to a case
+#       (e.g. the limiter of a case without limiters) raise
+#       SkipBenchmark.
+#
+# ------------------------------------------------------------------------ #
+import contextlib
+import copy
+import io
+import math
+import time
+
+import numpy as np
+
+import meshing.gmsh as mesh_gmsh
+import numerics.timestepping.source_stepper as source_stepper
+import processing.sweep as sweep
+
+import cases
+
+
+class SkipBenchmark(Exception):
+	'''
+	This exception is raised if a kernel does not apply to a case.
+	'''
+	pass
+
+
+def quiet(fcn, *args, **kwargs):
+	'''
+	This function calls fcn with the console output suppressed.
+	'''
+	with contextlib.redirect_stdout(io.StringIO()):
+		return fcn(*args, **kwargs)
+
+
+def create_solver(driver, deck):
+	'''
+	This function sets up the solver of an input deck without running the
+	simulation. The limiters are applied to the initial state, since the
+	projected initial condition of a coarse mesh may not be physical
+	(e.g. negative densities at a shock).
+
+	Inputs:
+	-------
+		driver: quail driver function (see sweep.load_driver)
+		deck: input deck as a dict of sections
+
+	Outputs:
+	--------
+		solver: solver object
+	'''
+	deck = sweep.get_case_deck(deck, {})
+	solver, physics, mesh = quiet(driver, deck, solve=False)
+	solver.apply_limiter(solver.state_coeffs)
+
+	return solver
+
+
+def time_function(fcn, reset=None, repeats=5, min_time=0.05):
+	'''
+	This function times a function. The number of calls per repeat is
+	chosen such that each repeat takes at least min_time.
+
+	Inputs:
+	-------
+		fcn: function to time
+		reset: [OPTIONAL] function called before each repeat (not timed)
+		repeats: [OPTIONAL] number of repeats
+		min_time: [OPTIONAL] minimum time of each repeat [s]
+
+	Outputs:
+	--------
+		result: dict with the number of calls per repeat, the time per
+			call of each repeat, and the minimum and median time per call
+	'''
+	# Warm-up call, also used to estimate the number of calls
+	if reset is not None:
+		reset()
+	t0 = time.perf_counter()
+	quiet(fcn)
+	t_call = time.perf_counter() - t0
+	num_calls = max(1, int(math.ceil(min_time/max(t_call, 1e-9))))
+
+	times = []
+	with contextlib.redirect_stdout(io.StringIO()):
+		for r in range(repeats):
+			if reset is not None:
+				reset()
+			t0 = time.perf_counter()
+			for i in range(num_calls):
+				fcn()
+			times.append((time.perf_counter() - t0)/num_calls)
+
+	return {"NumCalls": num_calls, "Times": times,
+			"Min": float(np.min(times)), "Median": float(np.median(times))}
+
+
+def bench_setup(driver, deck):
+	'''
+	Setup of the mesh, physics, and solver (including the precomputed
+	helpers and the initial condition).
+	'''
+	deck = sweep.get_case_deck(deck, {})
+	return lambda: driver(deck, solve=False), None
+
+
+def bench_residual(driver, deck):
+	'''
+	Residual evaluation.
+	'''
+	solver = create_solver(driver, deck)
+	U = solver.state_coeffs
+	res = np.zeros_like(U)
+
+	return lambda: solver.get_residual(U, res), None
+
+
+def get_state_reset(solver):
+	'''
+	This function returns a function that restores the current state of a
+	solver.
+	'''
+	U0 = solver.state_coeffs.copy()
+	Up0 = copy.copy(getattr(solver, "state_coeffs_pred", None))
+	params0 = dict(solver.params)
+	physics = solver.physics
+	source_terms0 = list(physics.source_terms)
+
+	def reset():
+		solver.state_coeffs = U0.copy()
+		if Up0 is not None:
+			solver.state_coeffs_pred = Up0.copy()
+		solver.params.update(params0)
+		physics.source_terms = list(source_terms0)
+
+	return reset
+
+
+def bench_time_step(driver, deck):
+	'''
+	Full time step of the stepper of the input deck (including the
+	limiters and, for splitting schemes, the source solver).
+	'''
+	solver = create_solver(driver, deck)
+	stepper = solver.stepper
+	stepper.dt = stepper.get_time_step(stepper, solver)
+
+	return lambda: stepper.take_time_step(solver), get_state_reset(solver)
+
+
+def bench_limiter(driver, deck):
+	'''
+	Application of the limiters of the input deck.
+	'''
+	solver = create_solver(driver, deck)
+	if len(solver.limiters) == 0:
+		raise SkipBenchmark("no limiters")
+
+	return lambda: solver.apply_limiter(solver.state_coeffs), \
+			get_state_reset(solver)
+
+
+def get_bench_source_solver(source_solver_class):
+	'''
+	This function returns the kernel of a source solver (see
+	numerics/timestepping/source_stepper.py). The implicit source terms are
+	integrated over one time step with the flux switches off, as in the
+	middle step of the Strang splitting scheme.
+	'''
+	def bench_source_solver(driver, deck):
+		solver = create_solver(driver, deck)
+		physics = solver.physics
+		if len(physics.implicit_sources) == 0:
+			raise SkipBenchmark("no implicit source terms")
+
+		implicit = source_solver_class(solver.state_coeffs)
+		stepper = solver.stepper
+		implicit.dt = stepper.get_time_step(stepper, solver)
+
+		solver.params["SourceSwitch"] = True
+		solver.params["ConvFluxSwitch"] = False
+		solver.params["DiffFluxSwitch"] = False
+		physics.source_terms = physics.implicit_sources.copy()
+
+		return lambda: implicit.take_time_step(solver), \
+				get_state_reset(solver)
+
+	return bench_source_solver
+
+
+def bench_ader_predictor(driver, deck):
+	'''
+	Space-time predictor of the ADER-DG scheme.
+	'''
+	solver = create_solver(driver, deck)
+	stepper = solver.stepper
+	dt = stepper.get_time_step(stepper, solver)
+	W = solver.state_coeffs
+	Up = solver.state_coeffs_pred
+
+	return lambda: solver.calculate_predictor_step(solver, dt, W, Up), \
+			None
+
+
+# Kernels that are benchmarked for each case, order, and number of elements
+KERNELS = {
+	"Setup" : bench_setup,
+	"Residual" : bench_residual,
+	"TimeStep" : bench_time_step,
+	"Limiter" : bench_limiter,
+	"SourceBDF1" : get_bench_source_solver(
+			source_stepper.SourceSolvers.BDF1),
+	"SourceTrapezoidal" : get_bench_source_solver(
+			source_stepper.SourceSolvers.Trapezoidal),
+	"ADERPredictor" : bench_ader_predictor,
+}
+# Kernels that are benchmarked with the ADER-DG version of a case
+ADER_KERNELS = ["ADERPredictor"]
+# Kernels that are only benchmarked for cases with stiff source terms
+SOURCE_KERNELS = ["SourceBDF1", "SourceTrapezoidal"]
+
+
+def run_case_kernel(driver, kernel, physics, order, num_elems, repeats=5,
+		min_time=0.05):
+	'''
+	This function benchmarks a kernel for a case.
+
+	Inputs:
+	-------
+		driver: quail driver function (see sweep.load_driver)
+		kernel: name of the kernel (see KERNELS)
+		physics: name of the case (see cases.CASES)
+		order: solution order
+		num_elems: (approximate) number of elements
+		repeats: [OPTIONAL] number of repeats
+		min_time: [OPTIONAL] minimum time of each repeat [s]
+
+	Outputs:
+	--------
+		result: dict with the case, the kernel, and the timings (see
+			time_function); if the kernel does not apply to the case or is
+			not implemented for it, "Skipped" gives the reason
+	'''
+	deck = cases.CASES[physics](order, num_elems)
+	result = {"Kernel": kernel, "Physics": physics, "Order": order,
+			"NumElems": num_elems}
+
+	if kernel in ADER_KERNELS:
+		if physics not in cases.ADER_CASES:
+			result["Skipped"] = "no ADER-DG version of the case"
+			return result
+		deck = cases.get_ader_deck(deck)
+	if kernel in SOURCE_KERNELS and physics not in cases.SOURCE_CASES:
+		result["Skipped"] = "no stiff source terms"
+		return result
+
+	try:
+		fcn, reset = KERNELS[kernel](driver, deck)
+		result.update(time_function(fcn, reset, repeats, min_time))
+	except SkipBenchmark as e:
+		result["Skipped"] = str(e)
+	except NotImplementedError:
+		# E.g. a source term without an analytic Jacobian
+		result["Skipped"] = "not implemented"
+
+	return result
+
+
+def run_gmsh_import(fname, repeats=5, min_time=0.05):
+	'''
+	This function benchmarks the import of a Gmsh file.
+
+	Inputs:
+	-------
+		fname: name of the Gmsh file
+		repeats: [OPTIONAL] number of repeats
+		min_time: [OPTIONAL] minimum time of each repeat [s]
+
+	Outputs:
+	--------
+		result: dict with the file, the number of elements, and the
+			timings (see time_function)
+	'''
+	mesh = quiet(mesh_gmsh.import_gmsh_mesh, fname)
+	result = {"Kernel": "GmshImport", "Physics": None, "Order": None,
+			"NumElems": mesh.num_elems, "File": fname}
+	result.update(time_function(lambda: mesh_gmsh.import_gmsh_mesh(fname),
+			None, repeats, min_time))
+
+	return result
@@ -0,0 +1,184 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : benchmarks/results.py
+#
+#       Contains functions to write, read, and compare benchmark results.
+#       Results are stored in JSON files together with the machine and
+#       the git commit they were measured on, so that results of different
+#       commits can be compared.
+#
+# ------------------------------------------------------------------------ #
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+import numpy as np
+import scipy
+
+
+def get_git_info():
+	'''
+	This function returns the git commit of the quail repository and
+	whether the working tree has uncommitted changes.
+
+	Outputs:
+	--------
+		commit: commit hash (None if git is not available)
+		dirty: True if there are uncommitted changes to tracked files
+	'''
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	try:
+		commit = subprocess.check_output(["git", "rev-parse", "HEAD"],
+				cwd=root, stderr=subprocess.DEVNULL).decode().strip()
+		status = subprocess.check_output(["git", "status", "--porcelain",
+				"--untracked-files=no"], cwd=root,
+				stderr=subprocess.DEVNULL).decode().strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None, None
+
+	return commit, len(status) > 0
+
+
+def get_machine_info():
+	'''
+	This function returns the metadata of the machine and the software the
+	benchmarks are run with.
+
+	Outputs:
+	--------
+		info: dict of metadata
+	'''
+	commit, dirty = get_git_info()
+	return {
+		"Date": datetime.datetime.now().isoformat(timespec="seconds"),
+		"Node": platform.node(),
+		"Platform": platform.platform(),
+		"Processor": platform.processor(),
+		"CPUCount": os.cpu_count(),
+		"Python": platform.python_version(),
+		"NumPy": np.__version__,
+		"SciPy": scipy.__version__,
+		"Commit": commit,
+		"Dirty": dirty,
+	}
+
+
+def write_results(file_name, results, settings):
+	'''
+	This function writes benchmark results to a JSON file.
+
+	Inputs:
+	-------
+		file_name: name of the file
+		results: list of results (see kernels.run_case_kernel)
+		settings: dict of benchmark settings (e.g. the number of repeats)
+	'''
+	with open(file_name, "w") as f:
+		json.dump({"Machine": get_machine_info(), "Settings": settings,
+				"Results": results}, f, indent=1)
+
+
+def read_results(file_name):
+	'''
+	This function reads benchmark results from a JSON file.
+
+	Inputs:
+	-------
+		file_name: name of the file
+
+	Outputs:
+	--------
+		data: dict with the machine info, settings, and results
+	'''
+	with open(file_name) as f:
+		return json.load(f)
+
+
+def get_key(result):
+	'''
+	This function returns the key that identifies a benchmark.
+	'''
+	return (result["Kernel"], result["Physics"], result["Order"],
+			result["NumElems"])
+
+
+def compare_results(data_base, data_new):
+	'''
+	This function compares the median times of two sets of results.
+	Benchmarks that are skipped or missing in either set are left out.
+
+	Inputs:
+	-------
+		data_base: baseline results (see read_results)
+		data_new: new results
+
+	Outputs:
+	--------
+		rows: list of (key, baseline time, new time, speedup), where the
+			speedup is the baseline time divided by the new time
+	'''
+	base = {get_key(result): result for result in data_base["Results"]
+			if "Skipped" not in result}
+
+	rows = []
+	for result in data_new["Results"]:
+		key = get_key(result)
+		if "Skipped" in result or key not in base:
+			continue
+		t_base = base[key]["Median"]
+		t_new = result["Median"]
+		rows.append((key, t_base, t_new, t_base/t_new))
+
+	return rows
+
+
+def print_comparison(data_base, data_new):
+	'''
+	This function prints the comparison of two sets of results, followed
+	by the geometric mean of the speedups of each kernel.
+
+	Inputs:
+	-------
+		data_base: baseline results (see read_results)
+		data_new: new results
+	'''
+	rows = compare_results(data_base, data_new)
+
+	for label, data in [("Baseline", data_base), ("New", data_new)]:
+		machine = data["Machine"]
+		print("%-9s %s%s (%s, %s)" % (label + ":", machine["Commit"],
+				" (dirty)" if machine["Dirty"] else "", machine["Node"],
+				machine["Date"]))
+	print("%-18s %-13s %5s %8s %12s %12s %8s" % ("Kernel", "Physics",
+			"Order", "Elems", "Base [s]", "New [s]", "Speedup"))
+	for key, t_base, t_new, speedup in rows:
+		kernel, physics, order, num_elems = key
+		print("%-18s %-13s %5s %8d %12.4e %12.4e %7.2fx" % (kernel,
+				physics if physics is not None else "-",
+				order if order is not None else "-", num_elems, t_base,
+				t_new, speedup))
+
+	kernels = {}
+	for key, t_base, t_new, speedup in rows:
+		kernels.setdefault(key[0], []).append(speedup)
+	print("Geometric mean of the speedups:")
+	for kernel, speedups in kernels.items():
+		print("  %-16s %7.2fx" % (kernel,
+				np.exp(np.mean(np.log(speedups)))))
@@ -0,0 +1,15 @@
+from p2 import *
+
+# Converge the p = 2 solution to steady state with the implicit
+# NewtonKrylov stepper instead of explicit time stepping
+TimeStepping = {
+	"TimeStepper" : "NewtonKrylov",
+	"NumTimeSteps" : 50,
+		# Maximum number of iterations
+	"CFL" : 10.,
+		# Initial CFL number
+	"SteadyTolerance" : 1e-10,
+		# Stop once the residual norm has decreased by this factor
+}
+
+Restart["StartFromFileTime"] = False
@@ -0,0 +1,14 @@
+# Convergence study of convergence_inputs.py, run with
+#   quail convergence_inputs.py --sweep sweep_convergence.py
+# The time step is refined together with the mesh.
+Sweep = {
+	"Parameters" : {
+		"Numerics.SolutionOrder" : [1, 2, 3, 4],
+		("Mesh.NumElemsX", "Mesh.NumElemsY", "TimeStepping.TimeStepSize") :
+				[(2, 2, 0.02), (4, 4, 0.01), (8, 8, 0.005),
+				(16, 16, 0.0025), (32, 32, 0.00125)],
+	},
+	"NumProcesses" : 4,
+	"ErrorVariable" : "Scalar",
+	"ResultsFile" : "convergence_testing/sweep_results.csv",
+}
@@ -25,7 +25,7 @@
 Restart = {
 	"File" : None,
 		# If file name provided (str), then will restart from said data file
-		# (pickle format)
+		# (pickle or checkpoint format)
 	"StartFromFileTime" : True
 		# If True, then will restart from time saved in restart file
 }
@@ -43,6 +43,10 @@ TimeStepping = {
 		# Time step size (2nd priority)
 	"CFL" : None,
 		# CFL number (3rd priority)
+	"AVTimeStepLimit" : False,
+		# If True and CFL is given, the time step is also limited by the
+		# diffusive limit of the artificial viscosity,
+		# CFL*vol^(2/ndims)/max(epsilon), in each element
 	"TimeStepper" : "RK4",
 		# Time stepping scheme
 		# See general.StepperType
@@ -58,6 +62,53 @@ TimeStepping = {
 		# Sets the specific time integration scheme when choosing to solve
 		# an ODE or system of ODEs alone (see physics/zerodimensional
 		# for examples)
+	"SteadyTolerance" : 1e-8,
+		# NewtonKrylov and PMultigrid steppers only: the iterations stop
+		# once the residual norm has decreased by this factor.
+		# NumTimeSteps is the maximum number of iterations and CFL the
+		# initial CFL number; FinalTime is not needed.
+	"CFLMax" : 1e8,
+		# NewtonKrylov stepper and PMultigrid stepper with block-Jacobi
+		# smoothing only: maximum CFL number. The CFL number is increased
+		# as the residual decreases (switched evolution relaxation).
+	"NewtonTolerance" : 1e-8,
+		# Implicit and IMEX steppers (ARK2, ESDIRK2, BDF2) only: relative
+		# tolerance of the Newton iterations of each implicit stage
+	"NewtonMaxIterations" : 10,
+		# Implicit and IMEX steppers only: maximum number of Newton
+		# iterations of each implicit stage
+	"LinearSolverTolerance" : 1e-3,
+		# NewtonKrylov, implicit, and IMEX steppers only: relative
+		# tolerance of the GMRES solve
+	"LinearSolverMaxIterations" : 50,
+		# NewtonKrylov, implicit, and IMEX steppers only: maximum number of
+		# GMRES iterations
+	"Preconditioner" : "BlockJacobi",
+		# NewtonKrylov, implicit, and IMEX steppers only: preconditioner
+		# of the GMRES solve
+		# If None, no preconditioner is used
+		# See general.PreconditionerType
+	"JacobianUpdateInterval" : 1,
+		# NewtonKrylov, implicit, and IMEX steppers only: number of
+		# iterations (time steps) between updates of the Jacobian used by
+		# the preconditioner
+	"JacobianType" : "ForwardDifference",
+		# NewtonKrylov, implicit, and IMEX steppers only: finite
+		# difference approximation of the Jacobian used by the
+		# preconditioner; source terms are differentiated pointwise (see
+		# SourceBase.get_jacobian), with this finite difference type if
+		# they have neither an analytical nor a complex-step Jacobian
+		# See general.JacobianType
+	"MultigridMinOrder" : 0,
+		# PMultigrid stepper and preconditioner only: solution order of
+		# the coarsest level
+	"MultigridSmoother" : "RK",
+		# PMultigrid stepper only: smoother of the levels
+		# See general.MultigridSmootherType
+	"MultigridSweeps" : 2,
+		# PMultigrid stepper and preconditioner only: number of pre- and
+		# post-smoothing sweeps on each level (twice as many on the
+		# coarsest level)
 }
 
 
@@ -120,7 +171,12 @@ Numerics = {
 	"ConvFluxSwitch" : True,
 		# If False, will ignore the convective flux
 		# Useful for debugging
-		# If ConvFluxSwitch is False, can easily test ODE solvers
+		# If ConvFluxSwitch and DiffFluxSwitch are False, can easily test
+		# ODE solvers
+	"DiffFluxSwitch" : True,
+		# If False, will ignore the diffusive flux and artificial viscosity
+		# (DG solver only)
+		# Used by the IMEX steppers to split the residual
 	"SourceSwitch" : True,
 		# If False, will ignore the source terms
 		# Useful for debugging
@@ -135,6 +191,33 @@ Numerics = {
 		# Sets the threshold requirement for the predictor step's
 		# nonlinear solve. Lower values can be chosen which speeds up
 		# the simulations, but at the cost of some error increase.
+	"NumProcesses" : 1,
+		# If greater than 1, the mesh is partitioned and the residual is
+		# evaluated by this many worker processes using shared memory
+		# (DG solver only; requires the fork start method, i.e. Linux or
+		# macOS)
+	"NumThreads" : 1,
+		# If greater than 1, the element residual, interior face
+		# residual, and inverse mass matrix multiplication are evaluated
+		# in chunks by a pool of this many threads (DG solver only)
+	"ThreadChunkSize" : 256,
+		# Maximum number of elements or interior faces per chunk when
+		# NumThreads > 1; smaller chunks reduce the size of the
+		# temporary arrays
+	"Backend" : "NumPy",
+		# Backend of the pointwise physics kernels (Euler analytical flux,
+		# Lax-Friedrichs and Roe fluxes, Arrhenius source, Sutherland
+		# transport). "Numba" evaluates them in fused compiled loops and
+		# requires numba.
+		# See general.BackendType
+	"Precision" : "Double",
+		# Floating-point precision of the state, the precomputed helpers,
+		# and the residual. "Single" halves the memory traffic of the
+		# residual evaluation; "Mixed" evaluates the residual in single
+		# precision but keeps the state and the time step updates in
+		# double precision (DG solver with NumProcesses = 1 and explicit
+		# time steppers only).
+		# See general.PrecisionType
 }
 
 
@@ -164,6 +247,14 @@ Mesh = {
 	"PeriodicBoundariesY" : [],
 		# List of the names of the two periodic boundaries in y-direction
 		# If empty, then no periodicity in y-direction
+	"ElementOrdering" : None,
+		# If not None, elements are renumbered after the mesh is created
+		# (and made periodic) to improve memory locality, and interior
+		# faces are sorted by their left element
+		# Data files keep the new numbering, which is that of the mesh
+		# stored in pickle and setup files; checkpoints also store the
+		# permutation (see meshing.tools.restore_element_ordering)
+		# See general.ElementOrderingType
 }
 
 
@@ -227,6 +318,24 @@ SourceTerms = {
 }
 
 
+''' Ensemble parameters '''
+Ensemble = {
+	"NumMembers" : 1,
+		# If greater than 1, this many independent cases that share the
+		# mesh and numerics are advanced in a single solve; the state
+		# coefficients of all members are stacked along the element axis
+		# See solver.ensemble
+	"Physics" : {},
+		# Physical parameters that differ between members; each value is
+		# a list with one entry per member, e.g.
+		# {"SpecificHeatRatio" : [1.3, 1.4, 1.5]}
+	"InitialCondition" : {},
+		# Initial condition parameters that differ between members
+	"ExactSolution" : {},
+		# Exact solution parameters that differ between members
+}
+
+
 ''' Output parameters '''
 Output = {
 	"Prefix" : "Data",
@@ -238,6 +347,22 @@ Output = {
 		# If True, then a data file will be written for the initial condition
 	"WriteFinalSolution" : True,
 		# If True, then a data file will be written for the final solution
+	"DataFileFormat" : "Pickle",
+		# Format of data files
+		# "Pickle" stores the entire solver object (.pkl)
+		# "Checkpoint" stores only the state coefficients, time, stepper
+		# state, and a description of the mesh and basis (.ckpt)
+		# See general.DataFileFormatType
+	"CompressDataFiles" : False,
+		# If True, data files are compressed (gzip for pickle files, zlib
+		# for checkpoint files); compressed checkpoint arrays cannot be
+		# memory-mapped
+	"AsyncWrite" : False,
+		# If True, data files are written on a background thread so that
+		# the time loop does not wait for compression and disk I/O
+	"AsyncWriteQueueSize" : 2,
+		# Maximum number of snapshots waiting to be written when
+		# AsyncWrite is True; once reached, the time loop waits
 	"AutoPostProcess" : True,
 		# If True, then postprocessing script (if provided) will be
 		# automatically called at the end of the simulation
@@ -249,6 +374,12 @@ Output = {
 	"ProgressBar" : False,
 		# If False, iteration info is printed to console
 		# If True, a progress bar is given instead of iteration info
+	"Profile" : False,
+		# If True, the phases of the solve (residual, fluxes, limiter,
+		# output, etc.) are timed; a summary is printed at the end of the
+		# run and the report is written to <Prefix>_profile.json, with
+		# per-time-step samples also written to <Prefix>_profile.csv
+		# See solver/profiler.py
 	"CustomFunctionFilename" : "custom_user_function"
 		# Name of the user's custom function definitions.
 }
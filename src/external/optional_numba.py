@@ -0,0 +1,46 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/external/optional_numba.py
+#
+#       Contains the decorator for the compiled kernels of the Numba
+#       backend (see general.BackendType). If numba is not available, the
+#       decorator returns the plain Python function.
+#
+# ------------------------------------------------------------------------ #
+try:
+	import numba
+	NUMBA_AVAILABLE = True
+
+	def njit(fcn):
+		'''
+		Compiles a kernel in nopython mode. fastmath is off so that the
+		kernels round like the NumPy backend.
+		'''
+		return numba.njit(cache=True)(fcn)
+
+except ImportError:
+	NUMBA_AVAILABLE = False
+
+	def njit(fcn):
+		'''
+		Defines a mock decorator for numba.njit. This ensures that users
+		do not need to have numba for quail to run successfully; the
+		kernels are then plain (slow) Python loops, which are only used
+		for testing.
+		'''
+		return fcn
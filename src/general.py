@@ -63,6 +63,18 @@ class ShapeType(Enum):
 	Hexahedron = auto()
 	Prism = auto()
 
+class ElementOrderingType(Enum):
+	'''
+	This enum contains the available element reordering strategies. See
+	src/meshing/tools.py for more information.
+	'''
+	ReverseCuthillMcKee = auto()
+		# Reverse Cuthill-McKee ordering of the element adjacency graph
+	Morton = auto()
+		# Morton (Z-order) space-filling curve through element centroids
+	Hilbert = auto()
+		# Hilbert space-filling curve through element centroids
+
 class BasisType(Enum):
 	'''
 	This enum contains the available basis types. See
@@ -94,6 +106,7 @@ class LimiterType(Enum):
 	PositivityPreserving = auto()
 	PositivityPreservingChem = auto()
 	WENO = auto()
+	WENO2D = auto()
 
 class ShockIndicatorType(Enum):
 	'''
@@ -115,6 +128,34 @@ class SolverType(Enum):
 		# ADER-DG solver
 
 
+class BackendType(Enum):
+	'''
+	This enum contains the available backends for the pointwise physics
+	kernels (analytical and numerical fluxes, source terms, and transport
+	properties). See src/external/optional_numba.py for more information.
+	'''
+	NumPy = auto()
+		# Vectorized NumPy expressions
+	Numba = auto()
+		# Fused loops compiled with Numba (requires numba)
+
+
+class PrecisionType(Enum):
+	'''
+	This enum contains the available floating-point precisions of the
+	solver. The precomputed helpers (basis and geometry tables) are
+	computed in double precision and then converted.
+	'''
+	Double = auto()
+		# Everything in float64
+	Single = auto()
+		# State coefficients, helpers, fluxes, and residuals in float32
+	Mixed = auto()
+		# Residual evaluation (helpers, fluxes, and residual
+		# contributions) in float32; state coefficients, inverse mass
+		# matrix multiplication, and time step updates in float64
+
+
 class StepperType(Enum):
 	'''
 	This enum contains the available types of time stepping. See
@@ -136,6 +177,57 @@ class StepperType(Enum):
 		# Simpler scheme for reacting flows
 	ODEIntegrator = auto()
 		# Setup to only call for an ODE integrator (can use any steppers)
+	NewtonKrylov = auto()
+		# Steady-state solver: backward Euler pseudo-time stepping with a
+		# Jacobian-free Newton-Krylov linear solve
+	ARK2 = auto()
+		# Second-order IMEX additive Runge-Kutta: explicit convection,
+		# implicit diffusion and sources
+	ESDIRK2 = auto()
+		# Second-order L-stable singly diagonally implicit Runge-Kutta
+		# (all terms implicit)
+	BDF2 = auto()
+		# Second-order IMEX backward differentiation (SBDF2): extrapolated
+		# explicit convection, implicit diffusion and sources
+	PMultigrid = auto()
+		# Steady-state solver: nonlinear p-multigrid (full approximation
+		# scheme) V-cycles with local pseudo-time step smoothing
+
+class PreconditionerType(Enum):
+	'''
+	This enum contains the available preconditioners for the linear solves
+	of the NewtonKrylov, implicit, and IMEX steppers.
+	'''
+	BlockJacobi = auto()
+		# Inverse of the diagonal (element) blocks of the Jacobian
+	ILU = auto()
+		# Incomplete LU factorization of the full Jacobian
+	PMultigrid = auto()
+		# Linear p-multigrid V-cycle with block-Jacobi smoothing
+
+class MultigridSmootherType(Enum):
+	'''
+	This enum contains the available smoothers of the p-multigrid levels.
+	See src/solver/multigrid.py for more information.
+	'''
+	RK = auto()
+		# Explicit multistage Runge-Kutta with local time steps
+	BlockJacobi = auto()
+		# Linearized backward Euler with the diagonal (element) blocks of
+		# the Jacobian
+
+class JacobianType(Enum):
+	'''
+	This enum contains the available approximations of the residual
+	Jacobian. See src/solver/jacobian.py for more information.
+	'''
+	ForwardDifference = auto()
+		# First-order finite differences (one residual evaluation per
+		# color and state coefficient)
+	CentralDifference = auto()
+		# Second-order finite differences (two residual evaluations per
+		# color and state coefficient)
+
 
 class SourceStepperType(Enum):
 	'''
@@ -215,6 +307,18 @@ class QuadratureType(Enum):
 		# Dunavant quadrature (triangles only)
 
 
+class DataFileFormatType(Enum):
+	'''
+	This enum contains the available data file formats. See
+	src/processing/readwritedatafiles.py for more information.
+	'''
+	Pickle = auto()
+		# Entire solver object is pickled (legacy format)
+	Checkpoint = auto()
+		# Compact, versioned checkpoint containing only the state and
+		# the information needed to restart
+
+
 class NodeType(Enum):
 	'''
 	This enum contains the available solution node location types. only
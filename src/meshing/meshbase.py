@@ -160,6 +160,19 @@ class Mesh():
 		[num_elems, num_nodes_per_elem]
 	elements : list
 		list of Element objects
+	elem_new_to_old_IDs : numpy array
+		maps current element IDs to the element IDs assigned when the
+		mesh was created; None if the elements have not been reordered
+		[num_elems]
+	num_copies : int
+		number of disjoint copies of base_mesh that make up the mesh (see
+		meshing.tools.replicate_mesh)
+	base_mesh : Mesh object
+		mesh that was replicated; None if the mesh is not a replica
+	helpers_cache : dict
+		precomputed solver helpers that can be reused by later solvers on
+		this mesh (e.g. in a parameter sweep); None if not cached. Not
+		written to data files.
 
 	Methods:
 	---------
@@ -192,6 +205,16 @@ class Mesh():
 		self.num_nodes_per_elem = gbasis.get_num_basis_coeff(gorder)
 		self.elem_to_node_IDs = np.zeros(0, dtype=int)
 		self.elements = []
+		self.elem_new_to_old_IDs = None
+		self.num_copies = 1
+		self.base_mesh = None
+		self.helpers_cache = None
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		# Cached helpers are not stored in data files
+		state["helpers_cache"] = None
+		return state
 
 	def set_params(self, gbasis, gorder=1, num_elems=1):
 		'''
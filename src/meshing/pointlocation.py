@@ -0,0 +1,234 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/meshing/pointlocation.py
+#
+#       Contains a spatial index for finding the element (and the
+#       reference coordinates within it) that contains an arbitrary point.
+#
+# ------------------------------------------------------------------------ #
+import numpy as np
+
+from general import ShapeType
+
+import meshing.tools as mesh_tools
+
+
+def get_ref_element_distance(shape_type, xref):
+	'''
+	This function measures how far points lie outside the reference
+	element.
+
+	Inputs:
+	-------
+		shape_type: element shape (ShapeType enum member)
+		xref: coordinates in reference space [npts, ndims]
+
+	Outputs:
+	--------
+		dist: distance outside the reference element in the max norm; zero
+			for points inside [npts]
+	'''
+	if shape_type in [ShapeType.Segment, ShapeType.Quadrilateral,
+			ShapeType.Hexahedron]:
+		# [-1, 1]^ndims
+		dist = np.amax(np.abs(xref), axis=1) - 1.
+	elif shape_type == ShapeType.Triangle:
+		dist = np.amax([-xref[:, 0], -xref[:, 1],
+				xref[:, 0] + xref[:, 1] - 1.], axis=0)
+	elif shape_type == ShapeType.Prism:
+		dist = np.amax([-xref[:, 0], -xref[:, 1],
+				xref[:, 0] + xref[:, 1] - 1., np.abs(xref[:, 2]) - 1.],
+				axis=0)
+	else:
+		raise NotImplementedError
+
+	return np.maximum(dist, 0.)
+
+
+class PointLocator(object):
+	'''
+	This class locates points in a mesh. The bounding boxes of the
+	elements are binned on a uniform grid; the candidate elements of a
+	point are those whose bounding box overlaps its grid cell and contains
+	it. The reference coordinates of the point in each candidate are then
+	computed with mesh_tools.phys_to_ref, and the candidate that contains
+	the point is selected.
+
+	Attributes:
+	-----------
+	mesh: mesh object
+		mesh to search
+	tol: float
+		relative tolerance for a point to be considered inside an element
+	bbox_min: numpy array
+		lower corner of the (padded) element bounding boxes
+		[num_elems, ndims]
+	bbox_max: numpy array
+		upper corner of the (padded) element bounding boxes
+		[num_elems, ndims]
+	grid_min: numpy array
+		lower corner of the grid [ndims]
+	cell_size: numpy array
+		size of the grid cells [ndims]
+	num_cells: numpy array
+		number of grid cells in each direction [ndims]
+	cell_ptr: numpy array
+		start of each cell's elements in cell_elem_IDs [num_cells + 1]
+	cell_elem_IDs: numpy array
+		IDs of the elements overlapping each cell, grouped by cell
+
+	Methods:
+	--------
+	get_candidates
+		finds the candidate elements of each point
+	locate
+		finds the element and reference coordinates of each point
+	'''
+	def __init__(self, mesh, tol=1e-10):
+		self.mesh = mesh
+		self.tol = tol
+
+		# Element bounding boxes, padded since high-order elements may
+		# bulge past their geometric nodes
+		elem_coords = mesh.node_coords[mesh.elem_to_node_IDs]
+		bbox_min = np.amin(elem_coords, axis=1)
+		bbox_max = np.amax(elem_coords, axis=1)
+		pad = 0.1*(bbox_max - bbox_min) if mesh.gorder > 1 else 0.
+		pad = pad + tol*np.amax(bbox_max - bbox_min, axis=1,
+				keepdims=True)
+		self.bbox_min = bbox_min - pad
+		self.bbox_max = bbox_max + pad
+
+		# Uniform grid with about one element per cell
+		ndims = mesh.ndims
+		self.grid_min = np.amin(self.bbox_min, axis=0)
+		extent = np.amax(self.bbox_max, axis=0) - self.grid_min
+		num_cells = max(int(np.ceil(mesh.num_elems**(1./ndims))), 1)
+		self.num_cells = np.full(ndims, num_cells)
+		self.cell_size = extent/num_cells
+
+		# Range of cells overlapped by each element
+		cell_lo = self.get_cell_indices(self.bbox_min)
+		cell_hi = self.get_cell_indices(self.bbox_max)
+		box_shape = cell_hi - cell_lo + 1
+		counts = np.prod(box_shape, axis=1)
+
+		# Enumerate the cells of each element's box
+		elem_IDs = np.repeat(np.arange(mesh.num_elems), counts)
+		local_idx = np.arange(elem_IDs.shape[0]) - np.repeat(
+				np.cumsum(counts) - counts, counts)
+		multi_idx = np.zeros([elem_IDs.shape[0], ndims], dtype=int)
+		for d in range(ndims):
+			multi_idx[:, d] = cell_lo[elem_IDs, d] + local_idx % \
+					box_shape[elem_IDs, d]
+			local_idx //= box_shape[elem_IDs, d]
+		cell_IDs = np.ravel_multi_index(multi_idx.T, self.num_cells)
+
+		# Group by cell (compressed storage)
+		order = np.argsort(cell_IDs, kind="stable")
+		self.cell_elem_IDs = elem_IDs[order]
+		self.cell_ptr = np.zeros(np.prod(self.num_cells) + 1, dtype=int)
+		self.cell_ptr[1:] = np.cumsum(np.bincount(cell_IDs,
+				minlength=np.prod(self.num_cells)))
+
+	def get_cell_indices(self, x):
+		'''
+		This method computes the grid cell indices of points (clipped to
+		the grid).
+
+		Inputs:
+		-------
+			x: coordinates [npts, ndims]
+
+		Outputs:
+		--------
+			idx: cell indices [npts, ndims]
+		'''
+		idx = np.floor((x - self.grid_min)/self.cell_size).astype(int)
+		return np.clip(idx, 0, self.num_cells - 1)
+
+	def get_candidates(self, x):
+		'''
+		This method finds the candidate elements of each point.
+
+		Inputs:
+		-------
+			x: coordinates [npts, ndims]
+
+		Outputs:
+		--------
+			point_IDs: point index of each candidate pair [npairs]
+			elem_IDs: element ID of each candidate pair [npairs]
+		'''
+		cell_IDs = np.ravel_multi_index(self.get_cell_indices(x).T,
+				self.num_cells)
+		start = self.cell_ptr[cell_IDs]
+		counts = self.cell_ptr[cell_IDs + 1] - start
+
+		point_IDs = np.repeat(np.arange(x.shape[0]), counts)
+		local_idx = np.arange(point_IDs.shape[0]) - np.repeat(
+				np.cumsum(counts) - counts, counts)
+		elem_IDs = self.cell_elem_IDs[np.repeat(start, counts) + local_idx]
+
+		# Keep candidates whose bounding box contains the point
+		inside = np.all((x[point_IDs] >= self.bbox_min[elem_IDs]) &
+				(x[point_IDs] <= self.bbox_max[elem_IDs]), axis=1)
+
+		return point_IDs[inside], elem_IDs[inside]
+
+	def locate(self, x):
+		'''
+		This method finds the element that contains each point and the
+		reference coordinates of the point within it. Points on a face
+		shared by two elements are assigned to either one.
+
+		Inputs:
+		-------
+			x: coordinates [npts, ndims]
+
+		Outputs:
+		--------
+			elem_IDs: element ID of each point; -1 if the point lies
+				outside the mesh [npts]
+			xref: coordinates in reference space; NaN if the point lies
+				outside the mesh [npts, ndims]
+		'''
+		mesh = self.mesh
+		x = np.asarray(x, dtype=float).reshape(-1, mesh.ndims)
+		npts = x.shape[0]
+
+		point_IDs, cand_elem_IDs = self.get_candidates(x)
+		cand_xref, converged = mesh_tools.phys_to_ref(mesh, cand_elem_IDs,
+				x[point_IDs])
+		dist = get_ref_element_distance(mesh.gbasis.SHAPE_TYPE, cand_xref)
+		dist[~converged] = np.inf
+
+		# For each point, keep the candidate closest to (or inside) its
+		# reference element
+		order = np.lexsort((dist, point_IDs))
+		first = np.ones(order.shape[0], dtype=bool)
+		first[1:] = point_IDs[order[1:]] != point_IDs[order[:-1]]
+		best = order[first]
+		best = best[dist[best] <= self.tol]
+
+		elem_IDs = np.full(npts, -1)
+		xref = np.full([npts, mesh.ndims], np.nan)
+		elem_IDs[point_IDs[best]] = cand_elem_IDs[best]
+		xref[point_IDs[best]] = cand_xref[best]
+
+		return elem_IDs, xref
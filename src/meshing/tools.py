@@ -21,6 +21,10 @@
 #
 # ------------------------------------------------------------------------ #
 import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+
+from general import ElementOrderingType
 
 import meshing.meshbase as mesh_defs
 import numerics.basis.tools as basis_tools
@@ -59,6 +63,60 @@ def ref_to_phys(mesh, elem_ID, xref):
 	return xphys # [nq, ndims]
 
 
+def phys_to_ref(mesh, elem_IDs, xphys, max_iter=25, tol=1e-12):
+	'''
+	This function converts physical space coordinates to reference space
+	coordinates, i.e. it inverts ref_to_phys, using Newton's method. Each
+	point is mapped into its own element, and all points are iterated
+	together.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		elem_IDs: element ID of each point [npts]
+		xphys: coordinates in physical space [npts, ndims]
+		max_iter: maximum number of Newton iterations
+		tol: convergence tolerance relative to the element size
+
+	Outputs:
+	--------
+		xref: coordinates in reference space [npts, ndims]
+		converged: True for points that converged [npts]
+	'''
+	gbasis = mesh.gbasis
+	elem_IDs = np.asarray(elem_IDs)
+	xphys = np.asarray(xphys, dtype=float).reshape(elem_IDs.shape[0], -1)
+
+	# Element node coordinates [npts, nn, ndims]
+	elem_coords = mesh.node_coords[mesh.elem_to_node_IDs[elem_IDs]]
+	elem_size = np.amax(np.ptp(elem_coords, axis=1), axis=1)
+
+	xref = np.tile(gbasis.CENTROID, (elem_IDs.shape[0], 1))
+	converged = np.zeros(elem_IDs.shape[0], dtype=bool)
+	# Only iterate on points that have not converged yet
+	active = np.arange(elem_IDs.shape[0])
+	for it in range(max_iter + 1):
+		basis_val = gbasis.get_values(xref[active])
+		basis_ref_grad = gbasis.get_grads(xref[active])
+		coords = elem_coords[active]
+
+		# Residual and Jacobian
+		res = xphys[active] - np.einsum('in, ind -> id', basis_val, coords)
+		jac = np.einsum('inj, ind -> idj', basis_ref_grad, coords)
+
+		done = np.amax(np.abs(res), axis=1) <= tol*elem_size[active]
+		converged[active[done]] = True
+		active = active[~done]
+		if active.size == 0 or it == max_iter:
+			break
+
+		dxref = np.linalg.solve(jac[~done], res[~done, :, np.newaxis])
+		# Keep far-away points from diverging
+		xref[active] = np.clip(xref[active] + dxref[:, :, 0], -10., 10.)
+
+	return xref, converged
+
+
 def element_volumes(mesh, solver=None):
 	'''
 	This function calculates total and per-element volumes
@@ -718,3 +776,407 @@ def make_periodic_translational(mesh, x1=None, x2=None, y1=None, y2=None):
 
 	print("\nDONE")
 	print("-------------------------------------------------")
+
+
+def get_rcm_ordering(mesh):
+	'''
+	This function computes a reverse Cuthill-McKee ordering of the
+	elements based on the element adjacency graph formed by the interior
+	faces.
+
+	Inputs:
+	-------
+		mesh: mesh object
+
+	Outputs:
+	--------
+		new_to_old_elem_IDs: maps new to old element IDs [num_elems]
+	'''
+	num_elems = mesh.num_elems
+	elemL_IDs = np.array([face.elemL_ID for face in mesh.interior_faces],
+			dtype=int)
+	elemR_IDs = np.array([face.elemR_ID for face in mesh.interior_faces],
+			dtype=int)
+
+	# Symmetric adjacency matrix
+	rows = np.concatenate([elemL_IDs, elemR_IDs])
+	cols = np.concatenate([elemR_IDs, elemL_IDs])
+	graph = scipy.sparse.csr_matrix((np.ones(rows.shape[0]), (rows, cols)),
+			shape=(num_elems, num_elems))
+
+	new_to_old_elem_IDs = scipy.sparse.csgraph.reverse_cuthill_mckee(graph,
+			symmetric_mode=True)
+
+	return new_to_old_elem_IDs.astype(int) # [num_elems]
+
+
+def get_space_filling_curve_ordering(mesh, ordering_type, num_bits=16):
+	'''
+	This function orders the elements along a space-filling curve through
+	the element centroids.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		ordering_type: ElementOrderingType.Morton or
+			ElementOrderingType.Hilbert
+		num_bits: number of bits used to quantize each coordinate
+
+	Outputs:
+	--------
+		new_to_old_elem_IDs: maps new to old element IDs [num_elems]
+
+	Notes:
+	------
+		The centroid of each element is approximated by the average of
+		its nodes. In 1D, both curves reduce to sorting by x.
+	'''
+	ndims = mesh.ndims
+	n = 2**num_bits
+
+	# Approximate centroids [num_elems, ndims]
+	xc = np.mean(mesh.node_coords[mesh.elem_to_node_IDs], axis=1)
+
+	# Quantize to integer grid
+	xmin = np.amin(xc, axis=0)
+	xrange = np.amax(xc, axis=0) - xmin
+	xrange[xrange == 0.] = 1.
+	ix = np.minimum(((xc - xmin)/xrange*n).astype(np.int64), n - 1)
+
+	if ndims == 1:
+		key = ix[:, 0]
+	elif ordering_type == ElementOrderingType.Morton:
+		# Interleave bits of x and y
+		key = np.zeros(mesh.num_elems, dtype=np.int64)
+		for b in range(num_bits):
+			key |= ((ix[:, 0] >> b) & 1) << (2*b)
+			key |= ((ix[:, 1] >> b) & 1) << (2*b + 1)
+	elif ordering_type == ElementOrderingType.Hilbert:
+		# Distance along Hilbert curve (vectorized xy2d)
+		x = ix[:, 0].copy()
+		y = ix[:, 1].copy()
+		key = np.zeros(mesh.num_elems, dtype=np.int64)
+		s = n//2
+		while s > 0:
+			rx = ((x & s) > 0).astype(np.int64)
+			ry = ((y & s) > 0).astype(np.int64)
+			key += s*s*((3*rx) ^ ry)
+			# Rotate quadrant
+			rotate = ry == 0
+			flip = rotate & (rx == 1)
+			x[flip] = n - 1 - x[flip]
+			y[flip] = n - 1 - y[flip]
+			x[rotate], y[rotate] = y[rotate], x[rotate]
+			s //= 2
+	else:
+		raise NotImplementedError
+
+	new_to_old_elem_IDs = np.argsort(key, kind="stable")
+
+	return new_to_old_elem_IDs # [num_elems]
+
+
+def sort_faces(mesh):
+	'''
+	This function sorts the interior faces by their left (then right)
+	element IDs and the boundary faces in each boundary group by their
+	adjacent element IDs.
+
+	Inputs:
+	-------
+		mesh: mesh object
+
+	Outputs:
+	--------
+		mesh: mesh object (interior and boundary faces reordered)
+	'''
+	# Interior faces
+	elemL_IDs = np.array([face.elemL_ID for face in mesh.interior_faces],
+			dtype=int)
+	elemR_IDs = np.array([face.elemR_ID for face in mesh.interior_faces],
+			dtype=int)
+	idx = np.lexsort((elemR_IDs, elemL_IDs))
+	mesh.interior_faces = [mesh.interior_faces[i] for i in idx]
+
+	# Boundary faces
+	for bgroup in mesh.boundary_groups.values():
+		elem_IDs = np.array([face.elem_ID for face in
+				bgroup.boundary_faces], dtype=int)
+		idx = np.argsort(elem_IDs, kind="stable")
+		bgroup.boundary_faces = [bgroup.boundary_faces[i] for i in idx]
+
+
+def permute_elements(mesh, new_to_old_elem_IDs):
+	'''
+	This function renumbers the elements and updates all maps that refer
+	to element IDs. Faces are then sorted (see sort_faces).
+
+	Inputs:
+	-------
+		mesh: mesh object
+		new_to_old_elem_IDs: maps new to old element IDs [num_elems]
+
+	Outputs:
+	--------
+		mesh: mesh object (modified)
+	'''
+	old_to_new_elem_IDs = np.empty_like(new_to_old_elem_IDs)
+	old_to_new_elem_IDs[new_to_old_elem_IDs] = np.arange(mesh.num_elems)
+
+	# Element-to-node-ID map
+	mesh.elem_to_node_IDs = mesh.elem_to_node_IDs[new_to_old_elem_IDs]
+
+	# Interior faces
+	for int_face in mesh.interior_faces:
+		int_face.elemL_ID = old_to_new_elem_IDs[int_face.elemL_ID]
+		int_face.elemR_ID = old_to_new_elem_IDs[int_face.elemR_ID]
+
+	# Boundary faces
+	for bgroup in mesh.boundary_groups.values():
+		for bface in bgroup.boundary_faces:
+			bface.elem_ID = old_to_new_elem_IDs[bface.elem_ID]
+
+	# Keep track of the original numbering
+	if mesh.elem_new_to_old_IDs is None:
+		mesh.elem_new_to_old_IDs = new_to_old_elem_IDs.copy()
+	else:
+		mesh.elem_new_to_old_IDs = mesh.elem_new_to_old_IDs[
+				new_to_old_elem_IDs]
+
+	sort_faces(mesh)
+
+	# Update elements
+	mesh.create_elements()
+
+
+def reorder_elements(mesh, ordering):
+	'''
+	This function renumbers the elements to improve memory locality of
+	the gather/scatter operations over faces and sorts the faces
+	accordingly.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		ordering: name of ordering type (see general.ElementOrderingType)
+
+	Outputs:
+	--------
+		mesh: mesh object (modified)
+	'''
+	def get_mean_face_distance():
+		if mesh.num_interior_faces == 0:
+			return 0.
+		return np.mean([abs(face.elemL_ID - face.elemR_ID) for face in
+				mesh.interior_faces])
+
+	print("-------------------------------------------------")
+	print("REORDERING ELEMENTS\n")
+	dist_old = get_mean_face_distance()
+
+	ordering_type = ElementOrderingType[ordering]
+	if ordering_type == ElementOrderingType.ReverseCuthillMcKee:
+		new_to_old_elem_IDs = get_rcm_ordering(mesh)
+	elif ordering_type == ElementOrderingType.Morton or \
+			ordering_type == ElementOrderingType.Hilbert:
+		new_to_old_elem_IDs = get_space_filling_curve_ordering(mesh,
+				ordering_type)
+	else:
+		raise NotImplementedError("Element ordering not supported")
+
+	permute_elements(mesh, new_to_old_elem_IDs)
+
+	print("Ordering: %s" % (ordering_type.name))
+	print("Mean element ID distance across interior faces: %g -> %g" % (
+			dist_old, get_mean_face_distance()))
+	print("\nDONE")
+	print("-------------------------------------------------")
+
+
+def restore_element_ordering(mesh, arr):
+	'''
+	This function permutes a per-element array back to the element
+	numbering assigned when the mesh was created. Data files keep the
+	current numbering, so that they stay consistent with the mesh stored
+	with them; this function maps their per-element data (e.g.
+	state_coeffs) to the original numbering, e.g. to compare with a
+	simulation without reordering.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		arr: array whose first axis is indexed by (current) element ID
+			[num_elems, ...]
+
+	Outputs:
+	--------
+		arr_orig: array in the original element numbering
+			[num_elems, ...]
+	'''
+	if mesh.elem_new_to_old_IDs is None:
+		return arr
+
+	arr_orig = np.empty_like(arr)
+	arr_orig[mesh.elem_new_to_old_IDs] = arr
+
+	return arr_orig # [num_elems, ...]
+
+
+def partition_elements(mesh, num_parts):
+	'''
+	This function partitions the elements into contiguous subdomains of
+	(nearly) equal size by cutting a Hilbert curve through the element
+	centroids into pieces.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		num_parts: number of partitions
+
+	Outputs:
+	--------
+		part_IDs: partition ID of each element [num_elems]
+	'''
+	if num_parts > mesh.num_elems:
+		raise ValueError("More partitions than elements")
+
+	new_to_old_elem_IDs = get_space_filling_curve_ordering(mesh,
+			ElementOrderingType.Hilbert)
+
+	part_IDs = np.empty(mesh.num_elems, dtype=int)
+	for part_ID, elem_IDs in enumerate(np.array_split(new_to_old_elem_IDs,
+			num_parts)):
+		part_IDs[elem_IDs] = part_ID
+
+	return part_IDs
+
+
+def get_partition_submesh(mesh, owned_elem_IDs):
+	'''
+	This function creates the submesh of a partition. It contains the
+	owned elements followed by a layer of halo (ghost) elements, i.e. the
+	neighbors of the owned elements across interior faces. Only the faces
+	of owned elements are kept, so the residual of the submesh is exact
+	for the owned elements.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		owned_elem_IDs: IDs of the elements owned by the partition
+
+	Outputs:
+	--------
+		submesh: mesh object of the partition (nodes are shared with mesh)
+		local_to_global_elem_IDs: maps submesh to mesh element IDs; the
+			first len(owned_elem_IDs) entries are the owned elements
+	'''
+	owned_elem_IDs = np.asarray(owned_elem_IDs)
+	is_owned = np.zeros(mesh.num_elems, dtype=bool)
+	is_owned[owned_elem_IDs] = True
+
+	# Interior faces touching at least one owned element
+	int_faces = [int_face for int_face in mesh.interior_faces if
+			is_owned[int_face.elemL_ID] or is_owned[int_face.elemR_ID]]
+
+	# Halo elements
+	neighbor_IDs = np.array([[int_face.elemL_ID, int_face.elemR_ID] for
+			int_face in int_faces], dtype=int).reshape(-1)
+	halo_elem_IDs = np.unique(neighbor_IDs[~is_owned[neighbor_IDs]])
+
+	local_to_global_elem_IDs = np.concatenate([owned_elem_IDs,
+			halo_elem_IDs])
+	global_to_local_elem_IDs = np.full(mesh.num_elems, -1)
+	global_to_local_elem_IDs[local_to_global_elem_IDs] = np.arange(
+			local_to_global_elem_IDs.shape[0])
+
+	submesh = mesh_defs.Mesh(ndims=mesh.ndims, num_nodes=mesh.num_nodes,
+			num_elems=local_to_global_elem_IDs.shape[0], gbasis=mesh.gbasis,
+			gorder=mesh.gorder)
+	submesh.node_coords = mesh.node_coords
+	submesh.elem_to_node_IDs = mesh.elem_to_node_IDs[
+			local_to_global_elem_IDs]
+
+	submesh.num_interior_faces = len(int_faces)
+	submesh.allocate_interior_faces()
+	for int_face, sub_int_face in zip(int_faces, submesh.interior_faces):
+		sub_int_face.elemL_ID = global_to_local_elem_IDs[int_face.elemL_ID]
+		sub_int_face.faceL_ID = int_face.faceL_ID
+		sub_int_face.elemR_ID = global_to_local_elem_IDs[int_face.elemR_ID]
+		sub_int_face.faceR_ID = int_face.faceR_ID
+
+	# Boundary faces of owned elements; groups without any are skipped
+	for bname, bgroup in mesh.boundary_groups.items():
+		bfaces = [bface for bface in bgroup.boundary_faces if
+				is_owned[bface.elem_ID]]
+		if len(bfaces) == 0:
+			continue
+		sub_bgroup = submesh.add_boundary_group(bname)
+		sub_bgroup.num_boundary_faces = len(bfaces)
+		sub_bgroup.allocate_boundary_faces()
+		for bface, sub_bface in zip(bfaces, sub_bgroup.boundary_faces):
+			sub_bface.elem_ID = global_to_local_elem_IDs[bface.elem_ID]
+			sub_bface.face_ID = bface.face_ID
+
+	submesh.create_elements()
+
+	return submesh, local_to_global_elem_IDs
+
+
+def replicate_mesh(mesh, num_copies):
+	'''
+	This function creates a mesh made of disjoint copies of the given mesh,
+	e.g. to advance an ensemble of independent cases at once. Element
+	elem_ID of copy i has ID i*mesh.num_elems + elem_ID. Interior and
+	boundary faces are likewise ordered copy by copy. The copies share the
+	nodes of the given mesh.
+
+	Inputs:
+	-------
+		mesh: mesh object
+		num_copies: number of copies
+
+	Outputs:
+	--------
+		new_mesh: replicated mesh (num_copies*mesh.num_elems elements)
+	'''
+	num_elems = mesh.num_elems
+	offsets = num_elems*np.arange(num_copies)
+
+	new_mesh = mesh_defs.Mesh(ndims=mesh.ndims, num_nodes=mesh.num_nodes,
+			num_elems=num_copies*num_elems, gbasis=mesh.gbasis,
+			gorder=mesh.gorder)
+	new_mesh.node_coords = mesh.node_coords
+	new_mesh.elem_to_node_IDs = np.tile(mesh.elem_to_node_IDs,
+			(num_copies, 1))
+	new_mesh.num_copies = num_copies
+	new_mesh.base_mesh = mesh
+
+	# Interior faces
+	new_mesh.num_interior_faces = num_copies*mesh.num_interior_faces
+	new_mesh.allocate_interior_faces()
+	for i, offset in enumerate(offsets):
+		new_int_faces = new_mesh.interior_faces[
+				i*mesh.num_interior_faces:(i+1)*mesh.num_interior_faces]
+		for int_face, new_int_face in zip(mesh.interior_faces,
+				new_int_faces):
+			new_int_face.elemL_ID = int_face.elemL_ID + offset
+			new_int_face.faceL_ID = int_face.faceL_ID
+			new_int_face.elemR_ID = int_face.elemR_ID + offset
+			new_int_face.faceR_ID = int_face.faceR_ID
+
+	# Boundary faces
+	for bname, bgroup in mesh.boundary_groups.items():
+		new_bgroup = new_mesh.add_boundary_group(bname)
+		new_bgroup.num_boundary_faces = num_copies*bgroup.num_boundary_faces
+		new_bgroup.allocate_boundary_faces()
+		for i, offset in enumerate(offsets):
+			new_bfaces = new_bgroup.boundary_faces[
+					i*bgroup.num_boundary_faces:
+					(i+1)*bgroup.num_boundary_faces]
+			for bface, new_bface in zip(bgroup.boundary_faces, new_bfaces):
+				new_bface.elem_ID = bface.elem_ID + offset
+				new_bface.face_ID = bface.face_ID
+
+	new_mesh.create_elements()
+
+	return new_mesh
@@ -72,6 +72,31 @@ def evaluate_state(Uc, basis_val, skip_interp=False):
 	return Uq # [ne, nq, ns]
 
 
+def evaluate_state_at_points(Uc, basis, elem_IDs, xref):
+	'''
+	This function evaluates the state at arbitrary points, each located
+	in its own element (see meshing/pointlocation.py).
+
+	Inputs:
+	-------
+	    Uc: state coefficients [num_elems, nb, ns]
+	    basis: basis object
+	    elem_IDs: element ID of each point; -1 for points outside the mesh
+	    	[npts]
+	    xref: reference coordinates of each point [npts, ndims]
+
+	Outputs:
+	--------
+	    Uq: values of state; NaN for points outside the mesh [npts, ns]
+	'''
+	found = elem_IDs >= 0
+	Uq = np.full([elem_IDs.shape[0], Uc.shape[-1]], np.nan)
+	basis_val = basis.get_values(xref[found])
+	Uq[found] = np.einsum('in, ink -> ik', basis_val, Uc[elem_IDs[found]])
+
+	return Uq # [npts, ns]
+
+
 def evaluate_gradient(Uc, basis_phys_grad_elems):
 	'''
 	This function evaluates the gradient of the state based on the 
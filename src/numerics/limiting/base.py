@@ -19,6 +19,12 @@
 #
 #       Contains class definition for the limiter abstract base class.
 #
+#       Limiters are applied in two stages. A cheap troubled-cell detector
+#       first flags the elements that may need limiting; the flagged
+#       elements are then gathered into a contiguous subset, limited, and
+#       scattered back. The cost of the expensive limiting stage
+#       therefore scales with the number of troubled elements.
+#
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
 import numpy as np
@@ -43,6 +49,10 @@ class LimiterBase(ABC):
 		checks for compatibility between physics and limiter
 	precompute_helpers
 		precomputes helper arrays
+	get_troubled_elems
+		flags the elements that may need limiting
+	limit_elems
+		applies limiter to a subset of elements
 	limit_solution
 		applies limiter to global solution
 	'''
@@ -84,10 +94,48 @@ class LimiterBase(ABC):
 		'''
 		pass
 
+	def get_troubled_elems(self, solver, Uc):
+		'''
+		This method flags the elements that may need limiting. It should
+		be cheap compared to limit_elems and must not miss any element
+		that limit_elems would modify. By default, all elements are
+		flagged.
+
+		Inputs:
+		-------
+			solver: solver object
+			Uc: state coefficients of global solution
+				[num_elems, nb, ns]
+
+		Outputs:
+		--------
+			elem_IDs: IDs of the flagged elements [nt]
+		'''
+		return np.arange(Uc.shape[0])
+
 	@abstractmethod
+	def limit_elems(self, solver, Uc, elem_IDs):
+		'''
+		This method limits the solution in a subset of elements
+
+		Inputs:
+		-------
+			solver: solver object
+			Uc: state coefficients of the subset [nt, nb, ns]
+			elem_IDs: IDs of the elements of the subset [nt]
+
+		Outputs:
+		--------
+			Uc: limited state coefficients of the subset [nt, nb, ns]
+		'''
+		pass
+
 	def limit_solution(self, solver, Uc):
 		'''
-		This method limits the global solution
+		This method limits the global solution. The troubled elements
+		are compacted into a contiguous subset that is limited and then
+		scattered back. In ensemble mode, the per-member physical
+		parameters are gathered for the subset as well.
 
 		Inputs:
 		-------
@@ -100,4 +148,19 @@ class LimiterBase(ABC):
 			Uc: state coefficients of global solution
 				[num_elems, nb, ns] (modified)
 		'''
-		pass
+		elem_IDs = self.get_troubled_elems(solver, Uc)
+		if elem_IDs.shape[0] > 0:
+			# Per-member physical parameters of the subset (ensemble mode)
+			ensemble = solver.ensemble
+			if ensemble is not None:
+				ensemble.set_member_params(solver.physics,
+						ensemble.get_param_arrays(
+						ensemble.member_IDs_elems[elem_IDs]))
+
+			Uc[elem_IDs] = self.limit_elems(solver, Uc[elem_IDs], elem_IDs)
+
+			if ensemble is not None:
+				ensemble.set_member_params(solver.physics,
+						ensemble.param_arrays_elems)
+
+		return Uc
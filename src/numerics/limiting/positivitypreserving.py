@@ -21,6 +21,7 @@
 #
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
+import itertools
 import numpy as np
 
 import errors
@@ -33,6 +34,9 @@ import numerics.limiting.base as base
 
 
 POS_TOL = 1.e-10
+# Safety margin of the troubled-cell detector in units of machine epsilon
+# (covers the round-off errors of evaluating the state at the points)
+DETECTOR_TOL = 1.e3
 
 
 def trunc(a, decimals=8):
@@ -82,6 +86,16 @@ class PositivityPreserving(base.LimiterBase):
 		quadrature points for element
 	djac_elems: numpy array
 		stores Jacobian determinants for each element
+	lebesgue_const: float
+		maximum over the element and face points of the sum of the
+		absolute values of the basis functions
+	unity_coeffs: numpy array
+		coefficients of the constant function 1 in the basis
+	mean_wts_elems: numpy array
+		weights that give the element averages of the state from its
+		coefficients
+	box_vertices: numpy array
+		vertices of the box [-1, 1]^ns of states
 	'''
 	COMPATIBLE_PHYSICS_TYPES = general.PhysicsType.Euler
 
@@ -93,6 +107,10 @@ class PositivityPreserving(base.LimiterBase):
 		self.basis_val_elem_faces = np.zeros(0)
 		self.quad_wts_elem = np.zeros(0)
 		self.djac_elems = np.zeros(0)
+		self.lebesgue_const = 1.
+		self.unity_coeffs = np.zeros(0)
+		self.mean_wts_elems = np.zeros(0)
+		self.box_vertices = np.zeros(0)
 
 	def precompute_helpers(self, solver):
 		# Unpack
@@ -116,24 +134,98 @@ class PositivityPreserving(base.LimiterBase):
 		# Element quadrature weights
 		self.quad_wts_elem = elem_helpers.quad_wts
 
-	def limit_solution(self, solver, Uc):
+		# Helpers of the troubled-cell detector (see get_state_bounds)
+		basis_val = self.basis_val_elem_faces
+		self.lebesgue_const = np.amax(np.sum(np.abs(basis_val), axis=1))
+		self.unity_coeffs = np.linalg.lstsq(basis_val,
+				np.ones(basis_val.shape[0]), rcond=None)[0]
+		self.mean_wts_elems = np.einsum('jm, ijm, jn, i -> in',
+				self.quad_wts_elem, self.djac_elems, elem_helpers.basis_val,
+				1./self.elem_vols)
+		ns = solver.physics.NUM_STATE_VARS
+		self.box_vertices = np.array(list(itertools.product([-1., 1.],
+				repeat=ns)))
+
+	def get_state_bounds(self, Uc):
+		'''
+		This method bounds the state at the element and face points
+		without evaluating it there. With the coefficients a_j of the
+		constant function 1, U(x) - U_bar = sum_j (Uc_j - a_j*U_bar)
+		phi_j(x), so |U(x) - U_bar| <= lebesgue_const*max_j |Uc_j -
+		a_j*U_bar|.
+
+		Inputs:
+		-------
+			Uc: state coefficients [ne, nb, ns]
+
+		Outputs:
+		--------
+			U_bar: element averages of the state [ne, ns]
+			dU: bounds on |U - U_bar| at the points [ne, ns]
+		'''
+		U_bar = np.einsum('ij, ijk -> ik', self.mean_wts_elems, Uc)
+		dU = self.lebesgue_const*np.amax(np.abs(Uc - U_bar[:, np.newaxis,
+				:]*self.unity_coeffs[:, np.newaxis]), axis=1)
+		# Safety margin for round-off errors
+		dU += DETECTOR_TOL*np.finfo(Uc.dtype).eps*self.lebesgue_const* \
+				np.amax(np.abs(Uc), axis=1)
+
+		return U_bar, dU
+
+	def check_state_bounds(self, physics, U_bar, dU):
+		'''
+		This method checks whether the states in the box U_bar +- dU may
+		need limiting.
+
+		Inputs:
+		-------
+			physics: physics object
+			U_bar: element averages of the state [ne, ns]
+			dU: bounds on |U - U_bar| (see get_state_bounds) [ne, ns]
+
+		Outputs:
+		--------
+			troubled: True for elements that may need limiting [ne]
+		'''
+		# The density is limited if |rho_bar - rho| > rho_bar - POS_TOL
+		irho = physics.get_state_index(self.var_name1)
+		troubled = dU[:, irho] >= U_bar[:, irho] - POS_TOL
+
+		# The pressure is limited if it is negative. For positive
+		# densities, the pressure is a concave function of the state, so
+		# its minimum over the box is attained at a vertex.
+		U_box = U_bar[:, np.newaxis, :] + self.box_vertices*dU[:,
+				np.newaxis, :]
+		with np.errstate(divide='ignore', invalid='ignore'):
+			p_box = physics.compute_variable(self.var_name2, U_box)
+		troubled |= ~(np.amin(p_box[:, :, 0], axis=1) > 0.)
+
+		return troubled
+
+	def get_troubled_elems(self, solver, Uc):
+		U_bar, dU = self.get_state_bounds(Uc)
+		troubled = self.check_state_bounds(solver.physics, U_bar, dU)
+
+		return np.where(troubled)[0]
+
+	def limit_elems(self, solver, Uc, elem_IDs):
 		# Unpack
 		physics = solver.physics
 		elem_helpers = solver.elem_helpers
 		int_face_helpers = solver.int_face_helpers
 		basis = solver.basis
 
-		djac = self.djac_elems
+		djac = self.djac_elems[elem_IDs]
+		elem_vols = self.elem_vols[elem_IDs]
 
 		# Interpolate state at quadrature points over element and on faces
 		U_elem_faces = helpers.evaluate_state(Uc, self.basis_val_elem_faces,
 				skip_interp=basis.skip_interp)
 		nq_elem = self.quad_wts_elem.shape[0]
 		U_elem = U_elem_faces[:, :nq_elem, :]
-		ne = self.elem_vols.shape[0]
 		# Average value of state
 		U_bar = helpers.get_element_mean(U_elem, self.quad_wts_elem, djac,
-				self.elem_vols)
+				elem_vols)
 
 		# Density and pressure from averaged state
 		rho_bar = physics.compute_variable(self.var_name1, U_bar)
@@ -229,15 +321,24 @@ class PositivityPreservingChem(PositivityPreserving):
 		super().__init__(physics_type)
 		self.var_name3 = "Mixture"
 
+	def check_state_bounds(self, physics, U_bar, dU):
+		troubled = super().check_state_bounds(physics, U_bar, dU)
+
+		# The mixture is limited if |rhoY_bar - rhoY + POS_TOL| > rhoY_bar
+		irhoY = physics.get_state_index(self.var_name3)
+		troubled |= dU[:, irhoY] + POS_TOL >= U_bar[:, irhoY]
+
+		return troubled
 
-	def limit_solution(self, solver, Uc):
+	def limit_elems(self, solver, Uc, elem_IDs):
 		# Unpack
 		physics = solver.physics
 		elem_helpers = solver.elem_helpers
 		int_face_helpers = solver.int_face_helpers
 		basis = solver.basis
 
-		djac = self.djac_elems
+		djac = self.djac_elems[elem_IDs]
+		elem_vols = self.elem_vols[elem_IDs]
 
 		# Interpolate state at quadrature points over element and on faces
 		U_elem_faces = helpers.evaluate_state(Uc, self.basis_val_elem_faces,
@@ -247,8 +348,7 @@ class PositivityPreservingChem(PositivityPreserving):
 
 		# Average value of state
 		U_bar = helpers.get_element_mean(U_elem, self.quad_wts_elem, djac,
-				self.elem_vols)
-		ne = self.elem_vols.shape[0]
+				elem_vols)
 		# Density and pressure from averaged state
 		rho_bar = physics.compute_variable(self.var_name1, U_bar)
 		p_bar = physics.compute_variable(self.var_name2, U_bar)
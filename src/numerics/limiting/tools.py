@@ -27,6 +27,10 @@ import numerics.limiting.positivitypreserving as pp_limiter
 import numerics.limiting.wenolimiter as weno_limiter
 import numerics.helpers.helpers as helpers
 
+# Factor applied to the differences of the averages in the minmod function
+# on multidimensional meshes (see minmod_shock_indicator_faces)
+MINMOD_NU = 1.5
+
 
 def set_limiter(limiter_type, physics_type):
 	'''
@@ -51,6 +55,8 @@ def set_limiter(limiter_type, physics_type):
 		limiter_class = pp_limiter.PositivityPreservingChem
 	elif general.LimiterType[limiter_type] is general.LimiterType.WENO:
 		limiter_class = weno_limiter.WENO
+	elif general.LimiterType[limiter_type] is general.LimiterType.WENO2D:
+		limiter_class = weno_limiter.WENO2D
 	else:
 		raise NotImplementedError
 
@@ -88,6 +94,10 @@ def minmod_shock_indicator(limiter, solver, Uc):
 	--------
 		shock_elems: array with IDs of elements flagged for limiting
 	'''
+	# Multidimensional meshes are handled face by face
+	if solver.mesh.ndims > 1:
+		return minmod_shock_indicator_faces(limiter, solver, Uc)
+
 	# Unpack
 	physics = solver.physics
 	mesh = solver.mesh
@@ -186,6 +196,55 @@ def minmod_shock_indicator(limiter, solver, Uc):
 	return shock_elems
 
 
+def minmod_shock_indicator_faces(limiter, solver, Uc):
+	'''
+	TVB modified Minmod calculation used to detect shocks on
+	multidimensional meshes. For each face, the deviation of the face
+	average from the element average is compared with the difference
+	between the averages of the neighbor across the face and the element
+	(see Cockburn and Shu, Journal of Computational Physics, 141:199-224,
+	1998). Boundary faces are not checked. The limiter must provide
+	neighbor_IDs, has_neighbor, mean_wts_elems, face_mean_basis, and
+	elem_vols (see WENO2D).
+
+	Inputs:
+	-------
+		limiter: limiter object
+		solver: solver object
+		Uc: state coefficients [ne, nb, ns]
+
+	Outputs:
+	--------
+		shock_elems: array with IDs of elements flagged for limiting
+	'''
+	# Element averages [ne, ns] and face averages [ne, nf, ns]
+	U_bar = np.einsum('ij, ijk -> ik', limiter.mean_wts_elems, Uc)
+	U_face = np.einsum('fj, ijk -> ifk', limiter.face_mean_basis, Uc)
+
+	# Store the polynomial coeff and average values
+	limiter.U_elem = Uc
+	limiter.U_bar = U_bar
+
+	U_tilde = U_face - U_bar[:, np.newaxis, :]
+	delta_u_bar = U_bar[limiter.neighbor_IDs] - U_bar[:, np.newaxis, :]
+
+	# Minmod of U_tilde and MINMOD_NU*delta_u_bar
+	u_tilde_mod = np.where(np.sign(U_tilde) == np.sign(delta_u_bar),
+			np.sign(U_tilde)*np.minimum(np.abs(U_tilde),
+			MINMOD_NU*np.abs(delta_u_bar)), 0.)
+
+	# TVB modification (the squared mesh size is the element area)
+	tvb = np.abs(U_tilde) <= limiter.tvb_param*limiter.elem_vols[:,
+			np.newaxis, np.newaxis]
+	u_tilde_mod[tvb] = U_tilde[tvb]
+
+	check = np.abs(u_tilde_mod - U_tilde)[:, :, 0] > 1.e-12
+	shock_elems = np.where(np.any(check & limiter.has_neighbor,
+			axis=1))[0]
+
+	return shock_elems
+
+
 def minmod(a):
 	'''
 	Calculates the minmod function for the minmod shock indicator function
@@ -21,6 +21,7 @@
 #
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
+import itertools
 import numpy as np
 import copy
 import errors
@@ -32,6 +33,12 @@ import numerics.helpers.helpers as helpers
 import numerics.limiting.base as base
 import numerics.limiting.tools as limiter_tools
 
+# Linear weight of each neighbor in WENO2D; the element itself gets the
+# remainder
+NEIGHBOR_LINEAR_WT = 0.001
+# Small number added to the smoothness indicators in WENO2D to avoid
+# division by zero
+SMOOTHNESS_EPS = 1.e-6
 
 class WENO(base.LimiterBase):
 	'''
@@ -92,6 +99,10 @@ class WENO(base.LimiterBase):
 		nb = basis.nb
 		nq = elem_helpers.quad_pts.shape[0]
 
+		# Multidimensional meshes are handled by WENO2D
+		if ndims != 1:
+			raise errors.IncompatibleError
+
 		self.elem_vols, _ = mesh_tools.element_volumes(solver.mesh, solver)
 		self.basis_phys_hessian_elems = np.zeros([num_elems, nq, nb, ndims])
 
@@ -138,7 +149,7 @@ class WENO(base.LimiterBase):
 					ijac_elems[elem_ID])
 
 	def get_nonlinearwts(self, order, p, gamma, basis_phys_grad, quad_wts, 
-			vols, djacs):
+			vols, djacs, basis_phys_hessian):
 		'''
 		This method calculates the smoothness indicator. (Eq. 3.10 in [1])
 
@@ -148,9 +159,12 @@ class WENO(base.LimiterBase):
 			p: polynomial coeffs of of element being smoothed [ne, nb, ns]
 			gamma: weighting constants in weno scheme (See Eq. 3.11 in [1])
 			basis_phys_grad: evaluated gradient of the basis function in 
-            		physical space [nq, nb, ndims]
+            		physical space [ne, nq, nb, ndims]
             quad_wts: quadrature weights [nq, 1]  
             vol: element volumes [ne, 1]
+            djacs: Jacobian determinants [ne, nq, 1]
+            basis_phys_hessian: evaluated hessian of the basis function in
+            		physical space [ne, nq, nb, ndims]
 
 		Outputs:
 		--------
@@ -168,65 +182,59 @@ class WENO(base.LimiterBase):
 		# s = 2 corresponds to the second der. and order 2
 		if order == 2:
 			s = 2
-		 	#Unpack hessian 
-			basis_phys_hessian = self.basis_phys_hessian_elems
 			hess_p = np.einsum('ikjl, ijn -> ikn', basis_phys_hessian, p)**2
 			beta += np.einsum('i, ikn, ikb -> in', vols**(2*s-1), hess_p, 
 					quad_wts*djacs)
 
 		return gamma / (eps + beta)**2 # weno_wts [ne]
 
-	def limit_solution(self, solver, Uc):
+	def get_troubled_elems(self, solver, Uc):
+		# Currently only implemented up to  P2
+		if solver.order > 2:
+			raise NotImplementedError
+
+		# Determine which elements require limiting; the shock indicator
+		# also stores the neighbor coefficients and averages
+		return self.shock_indicator(self, solver, Uc)
+
+	def limit_elems(self, solver, Uc, elem_IDs):
 		# Unpack	
 		ns = solver.physics.NUM_STATE_VARS	
 		physics = solver.physics
-		mesh = solver.mesh
 		elem_helpers = solver.elem_helpers
-		int_face_helpers = solver.int_face_helpers
 
-		vols = self.elem_vols
-		basis_phys_grads = elem_helpers.basis_phys_grad_elems
+		vols = self.elem_vols[elem_IDs]
+		basis_phys_grads = elem_helpers.basis_phys_grad_elems[elem_IDs]
+		basis_phys_hessians = self.basis_phys_hessian_elems[elem_IDs]
 		quad_wts = elem_helpers.quad_wts
-		elemP_IDs = self.elemP_IDs
-		elemM_IDs = self.elemM_IDs
-		djacs = self.djac_elems
-		djacP = self.djac_elems[elemP_IDs]
-		djacM = self.djac_elems[elemM_IDs]
-		
-
-		# Interpolate state at quadrature points over element and on faces
-		U_elem_faces = helpers.evaluate_state(Uc, self.basis_val_elem_faces, 
-				skip_interp=solver.basis.skip_interp)
-
-		nq_elem = self.quad_wts_elem.shape[0]
-		U_elem = U_elem_faces[:, :nq_elem, :]
-		U_face = U_elem_faces[:, nq_elem:, :]
-
-		# Average value of states
-		U_bar = helpers.get_element_mean(U_elem, self.quad_wts_elem, djacs, 
-				vols)
-
-		# Calculate the eigenvectors if available (they are pre-allocated in 
-		# precompute_helpers)
+		djacs = self.djac_elems[elem_IDs]
+		djacP = self.djac_elems[self.elemP_IDs[elem_IDs]]
+		djacM = self.djac_elems[self.elemM_IDs[elem_IDs]]
+
+		# Calculate the eigenvectors if available (the default ones are
+		# pre-allocated in precompute_helpers)
 		get_eigenvector_function = getattr(physics, 
 				"get_conv_eigenvectors", None)
 		if callable(get_eigenvector_function):
-			self.right_eigen, self.left_eigen = \
-					physics.get_conv_eigenvectors(U_bar)
-
-		Vc = np.einsum('elij, elj -> eli', self.left_eigen, Uc)
-
-		# Determine if the elements requires limiting
-		shock_indicated = self.shock_indicator(self, solver, Uc)
+			right_eigen, left_eigen = physics.get_conv_eigenvectors(
+					self.U_bar[elem_IDs])
+		else:
+			right_eigen = self.right_eigen[elem_IDs]
+			left_eigen = self.left_eigen[elem_IDs]
 
 		# Unpack limiter info from shock indicator
-		p0 = np.einsum('ebij, elj -> eli', self.left_eigen, self.Um_elem)
-		p1 = np.einsum('ebij, elj -> eli', self.left_eigen, self.U_elem)
-		p2 = np.einsum('ebij, elj -> eli', self.left_eigen, self.Up_elem)
-
-		p0_bar = np.einsum('ebij, elj -> eli', self.left_eigen, self.Um_bar)
-		p1_bar = np.einsum('ebij, elj -> eli', self.left_eigen, self.U_bar)
-		p2_bar = np.einsum('ebij, elj -> eli', self.left_eigen, self.Up_bar)
+		p0 = np.einsum('ebij, elj -> eli', left_eigen, 
+				self.Um_elem[elem_IDs])
+		p1 = np.einsum('ebij, elj -> eli', left_eigen, Uc)
+		p2 = np.einsum('ebij, elj -> eli', left_eigen, 
+				self.Up_elem[elem_IDs])
+
+		p0_bar = np.einsum('ebij, elj -> eli', left_eigen, 
+				self.Um_bar[elem_IDs])
+		p1_bar = np.einsum('ebij, elj -> eli', left_eigen, 
+				self.U_bar[elem_IDs])
+		p2_bar = np.einsum('ebij, elj -> eli', left_eigen, 
+				self.Up_bar[elem_IDs])
 
 		# Check basis type and adjust coefficients to  maintain element 
 		# p1's average value.
@@ -239,35 +247,284 @@ class WENO(base.LimiterBase):
 			p0_tilde = p0 - p0_bar + p1_bar
 			p2_tilde = p2 - p2_bar + p1_bar
 
-		# Currently only implemented up to  P2
-		if solver.order > 2:
-			raise NotImplementedError
-
 		# Allocate weno_wts
 		weno_wts = np.zeros([Uc.shape[0], 3, ns])
 
 		# Calculate non-linear weights
 		weno_wts[:, 0, :] = self.get_nonlinearwts(solver.order, 
-				p0_tilde, 0.001, basis_phys_grads, quad_wts, vols, djacM)
+				p0_tilde, 0.001, basis_phys_grads, quad_wts, vols, djacM,
+				basis_phys_hessians)
 		weno_wts[:, 1, :] = self.get_nonlinearwts(solver.order, p1, 0.998, 
-				basis_phys_grads, quad_wts, vols, djacs)
+				basis_phys_grads, quad_wts, vols, djacs,
+				basis_phys_hessians)
 		weno_wts[:, 2, :] = self.get_nonlinearwts(solver.order, 
-				p2_tilde, 0.001, basis_phys_grads, quad_wts, vols, djacP)
+				p2_tilde, 0.001, basis_phys_grads, quad_wts, vols, djacP,
+				basis_phys_hessians)
 		# Normalize the weights
 		normal_wts = weno_wts / np.sum(weno_wts, 
 				axis=1).reshape([Uc.shape[0], 1, ns])
 
-		# Update state_coeffs for indicated elements
-		Vc[shock_indicated] = \
-				np.einsum('ik, ijk -> ijk', normal_wts[shock_indicated, 0], 
-				p0_tilde[shock_indicated]) + \
-				np.einsum('ik, ijk -> ijk', normal_wts[shock_indicated, 1],
-				p1[shock_indicated]) + \
-				np.einsum('ik, ijk -> ijk', normal_wts[shock_indicated, 2],
-				p2_tilde[shock_indicated])
+		# Reconstruct the characteristic variables
+		Vc = np.einsum('ik, ijk -> ijk', normal_wts[:, 0], p0_tilde) + \
+				np.einsum('ik, ijk -> ijk', normal_wts[:, 1], p1) + \
+				np.einsum('ik, ijk -> ijk', normal_wts[:, 2], p2_tilde)
 
 		# Transform characteristic variables back to physical.
-		Uc[shock_indicated] = np.einsum('ebij, elj -> eli', 
-				self.right_eigen[shock_indicated], Vc[shock_indicated])
+		Uc = np.einsum('ebij, elj -> eli', right_eigen, Vc)
+
+		return Uc # [nt, nb, ns]
+
+
+class WENO2D(base.LimiterBase):
+	'''
+	This class corresponds to the WENO limiter for triangular and
+	quadrilateral meshes. It inherits from the LimiterBase class. See
+	LimiterBase for detailed comments of attributes and methods. See the
+	following references:
+
+		[1] X. Zhong, C. Shu, "A simple weighted essentially nonoscillatory
+			limiter for Runge-Kutta discontinuous Galerkin methods,"
+			Journal of Computational Physics. Vol. 232 pg. 397-415. 2013.
+		[2] J. Zhu, X. Zhong, C. Shu, J. Qiu, "Runge-Kutta discontinuous
+			Galerkin method with a simple and compact Hermite WENO limiter
+			on unstructured meshes," Communications in Computational
+			Physics. Vol. 21 pg. 623-649. 2017.
+
+	The polynomial of each face neighbor is extended to the element by an
+	L2 projection, and its average is modified to that of the element.
+	The element polynomial is replaced by a nonlinear combination of
+	its own polynomial and the extended ones. For systems, the
+	reconstruction is done in the characteristic variables of the
+	direction of each face, and the results are averaged with weights
+	proportional to the face lengths. The stencils, extension operators,
+	smoothness-indicator matrices, and linear weights are computed once
+	in precompute_helpers. Periodic meshes are supported.
+
+	Attributes:
+	-----------
+	elem_vols: numpy array
+		element volumes [ne]
+	neighbor_IDs: numpy array
+		IDs of the face neighbors; the element itself on boundary faces
+		[ne, nf]
+	has_neighbor: numpy array
+		False on boundary faces [ne, nf]
+	extension_ops: numpy array
+		maps the coefficients of each neighbor to the coefficients of its
+		polynomial extended to the element [ne, nf, nb, nb]
+	smoothness_mats: numpy array
+		matrices of the smoothness indicators (Eq. 3.10 in [1])
+		[ne, nb, nb]
+	linear_wts: numpy array
+		linear weights of the element and its neighbors [ne, nf+1]
+	mean_wts_elems: numpy array
+		map the coefficients to the element averages [ne, nb]
+	unity_coeffs: numpy array
+		coefficients of the constant function 1 [nb]
+	face_mean_basis: numpy array
+		map the coefficients to the face averages [nf, nb]
+	face_normals: numpy array
+		unit normals of the faces, i.e. the characteristic directions
+		[ne, nf, ndims]
+	face_wts: numpy array
+		weights of the characteristic directions [ne, nf]
+	'''
+	COMPATIBLE_PHYSICS_TYPES = [general.PhysicsType.Euler,
+			general.PhysicsType.NavierStokes,
+			general.PhysicsType.ConstAdvScalar]
+
+	def __init__(self, physics_type):
+		super().__init__(physics_type)
+		self.elem_vols = np.zeros(0)
+		self.neighbor_IDs = np.zeros(0, dtype=int)
+		self.has_neighbor = np.zeros(0, dtype=bool)
+		self.extension_ops = np.zeros(0)
+		self.smoothness_mats = np.zeros(0)
+		self.linear_wts = np.zeros(0)
+		self.mean_wts_elems = np.zeros(0)
+		self.unity_coeffs = np.zeros(0)
+		self.face_mean_basis = np.zeros(0)
+		self.face_normals = np.zeros(0)
+		self.face_wts = np.zeros(0)
+
+	def precompute_helpers(self, solver):
+		# Unpack
+		mesh = solver.mesh
+		basis = solver.basis
+		elem_helpers = solver.elem_helpers
+		int_face_helpers = solver.int_face_helpers
+
+		ndims = mesh.ndims
+		num_elems = mesh.num_elems
+		nfaces = mesh.gbasis.NFACES
+		nb = basis.nb
+
+		if ndims != 2:
+			raise errors.IncompatibleError
+
+		self.elem_vols, _ = mesh_tools.element_volumes(mesh, solver)
+		basis_val = elem_helpers.basis_val
+		nq = basis_val.shape[0]
+		# Quadrature weights times Jacobian determinants [ne, nq]
+		wts = elem_helpers.quad_wts[:, 0]*elem_helpers.djac_elems[:, :, 0]
+		iMM = elem_helpers.iMM_elems
+
+		# Element averages and the constant function
+		self.mean_wts_elems = np.einsum('ij, jn, i -> in', wts, basis_val,
+				1./self.elem_vols)
+		self.unity_coeffs = np.linalg.lstsq(basis_val, np.ones(nq),
+				rcond=None)[0]
+
+		# Face averages
+		face_quad_wts = int_face_helpers.quad_wts[:, 0]
+		self.face_mean_basis = np.einsum('q, fqn -> fn', face_quad_wts,
+				int_face_helpers.faces_to_basisL)/np.sum(face_quad_wts)
+
+		''' Stencils '''
+		neighbor_IDs = np.array([elem.face_to_neighbors for elem in
+				mesh.elements], dtype=int)
+		self.has_neighbor = neighbor_IDs >= 0
+		self.neighbor_IDs = np.where(self.has_neighbor, neighbor_IDs,
+				np.arange(num_elems)[:, np.newaxis])
+
+		# Shift from each element to its neighbors, which is nonzero
+		# across periodic boundaries
+		shifts = np.zeros([num_elems, nfaces, ndims])
+		for int_face in mesh.interior_faces:
+			xL = self.get_face_center(mesh, int_face.elemL_ID,
+					int_face.faceL_ID)
+			xR = self.get_face_center(mesh, int_face.elemR_ID,
+					int_face.faceR_ID)
+			shifts[int_face.elemL_ID, int_face.faceL_ID] = xR - xL
+			shifts[int_face.elemR_ID, int_face.faceR_ID] = xL - xR
+
+		# Linear weights; boundary faces do not contribute
+		self.linear_wts = np.zeros([num_elems, nfaces + 1])
+		self.linear_wts[:, 1:] = np.where(self.has_neighbor,
+				NEIGHBOR_LINEAR_WT, 0.)
+		self.linear_wts[:, 0] = 1. - np.sum(self.linear_wts[:, 1:], axis=1)
+
+		''' Extension operators '''
+		# Element quadrature points in the reference space of the
+		# neighbors
+		x = elem_helpers.x_elems[:, np.newaxis] + shifts[:, :,
+				np.newaxis]
+		elem_IDs = np.repeat(self.neighbor_IDs.reshape(-1), nq)
+		xref, _ = mesh_tools.phys_to_ref(mesh, elem_IDs,
+				x.reshape(-1, ndims))
+		basis_val_nbrs = basis.get_values(xref).reshape(num_elems, nfaces,
+				nq, nb)
+		# L2 projection of the neighbor polynomials onto the element
+		self.extension_ops = np.matmul(iMM[:, np.newaxis], np.einsum(
+				'qj, iq, ifqk -> ifjk', basis_val, wts, basis_val_nbrs))
+
+		''' Smoothness indicators '''
+		# Operators that map the coefficients to those of the derivatives
+		# [ne, ndims, nb, nb]
+		deriv_ops = np.matmul(iMM[:, np.newaxis], np.einsum(
+				'qj, iq, iqkd -> idjk', basis_val, wts,
+				elem_helpers.basis_phys_grad_elems))
+
+		# Sum over the derivatives D of orders s = 1, ..., p of
+		# vol^(s-1)*int (D u)^2 (Eq. 3.10 in [1] in 2D)
+		self.smoothness_mats = np.zeros([num_elems, nb, nb])
+		for s in range(1, basis.order + 1):
+			for dirs in itertools.combinations_with_replacement(
+					range(ndims), s):
+				op = deriv_ops[:, dirs[0]]
+				for d in dirs[1:]:
+					op = np.matmul(deriv_ops[:, d], op)
+				# Derivative at the quadrature points [ne, nq, nb]
+				deriv_val = np.einsum('qj, ijk -> iqk', basis_val, op)
+				self.smoothness_mats += np.einsum('i, iqj, iq, iqk -> ijk',
+						self.elem_vols**(s - 1), deriv_val, wts, deriv_val)
+
+		''' Characteristic directions '''
+		normals = np.einsum('q, ifqd -> ifd', elem_helpers.face_quad_wts[:,
+				0], elem_helpers.normals_elems)
+		face_lengths = np.linalg.norm(normals, axis=2)
+		self.face_normals = normals/face_lengths[:, :, np.newaxis]
+		self.face_wts = face_lengths/np.sum(face_lengths, axis=1,
+				keepdims=True)
+
+	def get_face_center(self, mesh, elem_ID, face_ID):
+		'''
+		This method computes the average of the principal nodes of a face.
+
+		Inputs:
+		-------
+			mesh: mesh object
+			elem_ID: element ID
+			face_ID: local face ID
+
+		Outputs:
+		--------
+			x: coordinates of the center [ndims]
+		'''
+		gbasis = mesh.gbasis
+		fnodes = gbasis.get_local_face_principal_node_nums(mesh.gorder,
+				face_ID)
+		node_IDs = mesh.elem_to_node_IDs[elem_ID, fnodes]
 
-		return Uc # [ne, nq, ns]
+		return np.mean(mesh.node_coords[node_IDs], axis=0) # [ndims]
+
+	def get_troubled_elems(self, solver, Uc):
+		# Determine which elements require limiting; the shock indicator
+		# also stores the global coefficients and averages
+		return self.shock_indicator(self, solver, Uc)
+
+	def limit_elems(self, solver, Uc, elem_IDs):
+		# Unpack
+		physics = solver.physics
+		nt, nb, ns = Uc.shape
+		nfaces = self.neighbor_IDs.shape[1]
+
+		mean_wts = self.mean_wts_elems[elem_IDs]
+		U_bar = self.U_bar[elem_IDs]
+
+		# Polynomials of the element and the extended polynomials of its
+		# neighbors [nt, nf+1, nb, ns]
+		P = np.empty([nt, nfaces + 1, nb, ns], dtype=Uc.dtype)
+		P[:, 0] = Uc
+		P[:, 1:] = np.matmul(self.extension_ops[elem_IDs],
+				self.U_elem[self.neighbor_IDs[elem_IDs]])
+
+		# Modify the averages of the extended polynomials to that of the
+		# element
+		P_bar = np.einsum('ij, izjk -> izk', mean_wts, P)
+		P += np.einsum('izk, j -> izjk', U_bar[:, np.newaxis] - P_bar,
+				self.unity_coeffs)
+
+		# Calculate the eigenvectors of each direction if available;
+		# otherwise, the reconstruction is done once in the conservative
+		# variables
+		get_eigenvector_function = getattr(physics,
+				"get_conv_eigenvectors", None)
+		if callable(get_eigenvector_function):
+			right_eigen, left_eigen = physics.get_conv_eigenvectors(
+					np.repeat(U_bar, nfaces, axis=0)[:, np.newaxis],
+					self.face_normals[elem_IDs].reshape(nt*nfaces, 1, -1))
+			right_eigen = right_eigen.reshape(nt, nfaces, ns, ns)
+			left_eigen = left_eigen.reshape(nt, nfaces, ns, ns)
+			dir_wts = self.face_wts[elem_IDs]
+		else:
+			right_eigen = np.broadcast_to(np.eye(ns), (nt, 1, ns, ns))
+			left_eigen = right_eigen
+			dir_wts = np.ones([nt, 1])
+
+		# Characteristic variables [nt, ndir, nf+1, nb, ns]
+		V = np.einsum('idkl, izjl -> idzjk', left_eigen, P)
+
+		# Nonlinear weights (Eqs. 3.9-3.11 in [1]) [nt, ndir, nf+1, ns]
+		beta = np.einsum('ijl, idzjk, idzlk -> idzk',
+				self.smoothness_mats[elem_IDs], V, V)
+		weno_wts = self.linear_wts[elem_IDs][:, np.newaxis, :,
+				np.newaxis]/(SMOOTHNESS_EPS + beta)**2
+		weno_wts /= np.sum(weno_wts, axis=2, keepdims=True)
+
+		# Reconstruct the characteristic variables and transform back to
+		# physical
+		Vc = np.einsum('idzk, idzjk -> idjk', weno_wts, V)
+		Uc = np.einsum('id, idkl, idjl -> ijk', dir_wts, right_eigen, Vc)
+
+		return Uc # [nt, nb, ns]
@@ -22,16 +22,21 @@
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
 import numpy as np
+from scipy import sparse
 from scipy.optimize import fsolve, root
+from scipy.sparse import linalg as sparse_linalg
 
-from general import StepperType, SourceStepperType
+import errors
+from general import StepperType, SourceStepperType, PreconditionerType, \
+		JacobianType, MultigridSmootherType
 
 import numerics.basis.tools as basis_tools
 import numerics.helpers.helpers as helpers
 import numerics.timestepping.tools as stepper_tools
 import numerics.timestepping.source_stepper as source_stepper
 
-
+import solver.jacobian as solver_jacobian
+import solver.multigrid as solver_multigrid
 import solver.tools as solver_tools
 
 
@@ -49,6 +54,18 @@ class StepperBase(ABC):
 		- Arbitrary DERivatives in space and time (ADER)
 			-> used in tandem with ADERDG solver
 
+		Implicit and Implicit-Explicit (IMEX) Schemes:
+		----------------------------------------------
+		- 2nd-order additive Runge Kutta (ARK2)
+		- 2nd-order L-stable singly diagonally implicit Runge Kutta
+		  (ESDIRK2)
+		- 2nd-order semi-implicit backward differentiation (BDF2)
+
+		Steady-State Schemes:
+		---------------------
+		- Backward Euler pseudo-time stepping with Jacobian-free
+		  Newton-Krylov linear solves (NewtonKrylov)
+
 		Operator Splitting Type Schemes:
 		--------------------------------
 		- Strang Splitting (Strang)
@@ -77,6 +94,9 @@ class StepperBase(ABC):
 		timesteps, etc...)
 	balance_const: numpy array (shaped like res)
 		balancing constant array used only with the Simpler splitting scheme
+	converged: bool
+		True once a steady-state stepper has reached a steady state; the
+		time loop then stops
 
 	Abstract Methods:
 	-----------------
@@ -99,6 +119,7 @@ class StepperBase(ABC):
 		self.num_time_steps = 0
 		self.get_time_step = None
 		self.balance_const = None # kept as None unless set by Simpler scheme
+		self.converged = False
 
 	def __repr__(self):
 		return '{self.__class__.__name__}(TimeStep={self.dt})'.format( \
@@ -360,7 +381,8 @@ class ADER(StepperBase):
 		res = self.res
 
 		# Prediction step
-		Up = solver.calculate_predictor_step(solver, self.dt, W, Up)
+		with solver.profiler.phase("ADERPredictor"):
+			Up = solver.calculate_predictor_step(solver, self.dt, W, Up)
 		# Correction step
 		res = solver.get_residual(Up, res)
 
@@ -435,11 +457,13 @@ class Strang(StepperBase, source_stepper.SourceSolvers):
 
 		# First: take the half-step for the inviscid flux only
 		solver.params["ConvFluxSwitch"] = True
+		solver.params["DiffFluxSwitch"] = True
 		physics.source_terms = physics.explicit_sources.copy()
 		explicit.take_time_step(solver)
 
 		# Second: take the implicit full step for the source term.
 		solver.params["ConvFluxSwitch"] = False
+		solver.params["DiffFluxSwitch"] = False
 		physics.source_terms = physics.implicit_sources.copy()
 		implicit.take_time_step(solver)
 
@@ -447,6 +471,7 @@ class Strang(StepperBase, source_stepper.SourceSolvers):
 		physics.source_terms = physics.explicit_sources.copy()
 
 		solver.params["ConvFluxSwitch"] = True
+		solver.params["DiffFluxSwitch"] = True
 		R = explicit.take_time_step(solver)
 
 		return R # [num_elems, nb, ns]
@@ -493,11 +518,13 @@ class Simpler(Strang):
 
 		# Second: take the implicit full step for the source term.
 		solver.params["ConvFluxSwitch"] = False
+		solver.params["DiffFluxSwitch"] = False
 		physics.source_terms = physics.implicit_sources.copy()
 		implicit.take_time_step(solver)
 
 		# Third: take the second half-step for the inviscid flux only.
 		solver.params["ConvFluxSwitch"] = True
+		solver.params["DiffFluxSwitch"] = True
 		physics.source_terms = physics.explicit_sources.copy()
 		self.balance_const = balance_const
 		R3 = explicit.take_time_step(solver)
@@ -564,4 +591,765 @@ class ODEIntegrator(StepperBase, source_stepper.SourceSolvers):
 		self.ode_integrator.dt = self.dt
 		R = self.ode_integrator.take_time_step(solver)
 
-		return R
\ No newline at end of file
+		return R
+
+
+class ImplicitStepperBase(StepperBase):
+	'''
+	This is an abstract base class for steppers that solve linear systems
+	of the form
+
+		(M/dt - dR/dU) dU = b,
+
+	where M is the mass matrix, R is a residual, and dt is a (possibly
+	element-local) time step, with preconditioned GMRES. The
+	Jacobian-vector products are finite differences of the residual, so
+	the Jacobian itself is only needed by the preconditioner (see
+	general.PreconditionerType and solver/jacobian.py). It inherits
+	attributes from StepperBase. See StepperBase for detailed comments of
+	methods and attributes.
+
+	Additional methods and attributes are commented below.
+
+	Attributes:
+	-----------
+	mass_elems: numpy array
+		element mass matrices with the ordering of the Jacobian blocks
+		[num_elems, nb*ns, nb*ns]
+	jac: numpy array or scipy sparse matrix
+		Jacobian used by the preconditioner (diagonal blocks
+		[num_elems, nb*ns, nb*ns] or block sparse matrix)
+	num_linear_iterations: int
+		total number of GMRES iterations
+	multigrid: solver_multigrid.PMultigrid
+		p-multigrid hierarchy of the PMultigrid preconditioner
+	'''
+	def __init__(self, U):
+		super().__init__(U)
+		self.mass_elems = None
+		self.jac = None
+		self.num_linear_iterations = 0
+		self.multigrid = None
+
+	def get_linearized_residual(self, solver, U, res):
+		'''
+		Evaluates the residual R of the linear system, with the same
+		signature as solver.get_residual (used by the PMultigrid
+		preconditioner on each level).
+		'''
+		return solver.get_residual(U, res)
+
+	def get_preconditioner(self, solver, dt):
+		'''
+		Creates the preconditioner of the linear system.
+
+		Inputs:
+		-------
+			solver: solver object
+			dt: time step (scalar or [num_elems])
+
+		Outputs:
+		--------
+			precond: scipy LinearOperator that approximates the inverse of
+				the linear system matrix (None if no preconditioner)
+		'''
+		precond_type = solver.params["Preconditioner"]
+		if precond_type is None:
+			return None
+
+		mass_dt = self.mass_elems/np.reshape(dt, (-1, 1, 1))
+		num_elems, n, _ = mass_dt.shape
+		shape = (num_elems*n, num_elems*n)
+		if PreconditionerType[precond_type] == \
+				PreconditionerType.BlockJacobi:
+			inv_blocks = np.linalg.inv(mass_dt - self.jac)
+			def apply(v):
+				return np.einsum('eij, ej -> ei', inv_blocks,
+						v.reshape(num_elems, n)).reshape(-1)
+		elif PreconditionerType[precond_type] == PreconditionerType.ILU:
+			mass_dt = sparse.bsr_matrix((mass_dt, np.arange(num_elems),
+					np.arange(num_elems + 1)), shape=shape)
+			ilu = sparse_linalg.spilu((mass_dt - self.jac).tocsc())
+			apply = ilu.solve
+		elif PreconditionerType[precond_type] == \
+				PreconditionerType.PMultigrid:
+			multigrid = self.multigrid
+			num_sweeps = solver.params["MultigridSweeps"]
+			inv_blocks = [multigrid.get_block_inverses(k, dt) for k in
+					range(multigrid.num_levels)]
+			def apply(v):
+				return multigrid.apply_linear(v.reshape(
+						multigrid.states[0].shape), dt, num_sweeps,
+						inv_blocks).reshape(-1)
+		else:
+			raise NotImplementedError("Preconditioner not supported")
+
+		return sparse_linalg.LinearOperator(shape, matvec=apply,
+				dtype=float)
+
+	def update_jacobian(self, solver, U, res):
+		'''
+		Updates the Jacobian used by the preconditioner.
+
+		Inputs:
+		-------
+			solver: solver object
+			U: solution array [num_elems, nb, ns]
+			res: residual at U [num_elems, nb, ns]; if None, it is
+				evaluated
+
+		Outputs:
+		--------
+			self.jac: Jacobian (modified)
+			self.multigrid: p-multigrid hierarchy (modified)
+		'''
+		precond_type = solver.params["Preconditioner"]
+		if precond_type is None:
+			return
+		jacobian_type = JacobianType[solver.params["JacobianType"]]
+		if PreconditionerType[precond_type] == \
+				PreconditionerType.BlockJacobi:
+			self.jac = solver_jacobian.compute_block_diagonal(solver, U,
+					res, jacobian_type)
+		elif PreconditionerType[precond_type] == \
+				PreconditionerType.PMultigrid:
+			self.jac = solver_jacobian.compute_block_diagonal(solver, U,
+					res, jacobian_type)
+			if self.multigrid is None:
+				self.multigrid = solver_multigrid.PMultigrid(solver,
+						solver.params["MultigridMinOrder"])
+				self.multigrid.get_residual = self.get_linearized_residual
+			self.multigrid.update_jacobians(U, jacobian_type, self.jac)
+		else:
+			self.jac = solver_jacobian.compute_jacobian(solver, U, res,
+					jacobian_type)
+
+	def solve_linear_system(self, solver, U, res, rhs, mass_dt,
+			get_residual, precond):
+		'''
+		Solves the linear system (M/dt - dR/dU) dU = rhs with GMRES. The
+		Jacobian-vector products are finite differences of the residual
+		about U.
+
+		Inputs:
+		-------
+			solver: solver object
+			U: solution array [num_elems, nb, ns]
+			res: residual at U [num_elems, nb, ns]
+			rhs: right-hand side [num_elems, nb, ns]
+			mass_dt: mass matrices divided by the time steps
+				[num_elems, nb*ns, nb*ns]
+			get_residual: function that evaluates the residual R, with the
+				same signature as solver.get_residual
+			precond: preconditioner (see get_preconditioner)
+
+		Outputs:
+		--------
+			dU: solution of the linear system [num_elems, nb, ns]
+		'''
+		params = solver.params
+		num_elems, n, _ = mass_dt.shape
+
+		# Jacobian-free matrix-vector product
+		U_norm = np.linalg.norm(U)
+		res_p = np.zeros_like(U)
+		def matvec(v):
+			v_norm = np.linalg.norm(v)
+			if v_norm == 0.:
+				return np.zeros_like(v)
+			eps = np.sqrt(np.finfo(float).eps*(1. + U_norm))/v_norm
+			with solver.perturbed_residuals():
+				get_residual(U + eps*v.reshape(U.shape), res_p)
+			v = v.reshape(num_elems, n)
+			return (np.einsum('eij, ej -> ei', mass_dt, v) -
+					(res_p - res).reshape(num_elems, n)/eps).reshape(-1)
+
+		def count_iterations(pr_norm):
+			self.num_linear_iterations += 1
+
+		A = sparse_linalg.LinearOperator((U.size, U.size), matvec=matvec)
+		dU, info = sparse_linalg.gmres(A, rhs.reshape(-1),
+				rtol=params["LinearSolverTolerance"], atol=0.,
+				restart=params["LinearSolverMaxIterations"], maxiter=1,
+				M=precond, callback=count_iterations,
+				callback_type="pr_norm")
+
+		return dU.reshape(U.shape)
+
+
+class NewtonKrylov(ImplicitStepperBase):
+	'''
+	NewtonKrylov inherits attributes from ImplicitStepperBase. See
+	ImplicitStepperBase for detailed comments of methods and attributes.
+	It drives the solution to a steady state with backward Euler
+	pseudo-time steps,
+
+		(M/dtau - dR/dU) dU = R(U),
+
+	where M is the mass matrix, R is the residual, and dtau is a local
+	(element) pseudo-time step given by the CFL number. Each step is one
+	Newton iteration whose linear system is solved with GMRES. The CFL
+	number is updated with switched evolution relaxation (SER),
+
+		CFL_{n+1} = min(CFL_n*|R_n|/|R_{n+1}|, CFLMax).
+
+	A step that gives a non-physical state or a non-finite residual is
+	rejected and the CFL number is reduced tenfold. The iterations stop
+	once the residual norm has decreased by the factor SteadyTolerance.
+
+	Additional methods and attributes are commented below.
+
+	Attributes:
+	-----------
+	cfl: float
+		current CFL number
+	dt_elems: numpy array
+		pseudo-time step of each element [num_elems]
+	res_norm0: float
+		initial residual norm
+	res_norm: float
+		current residual norm
+	num_iterations: int
+		number of accepted iterations
+	'''
+	STEPPER_TYPE = StepperType.NewtonKrylov
+
+	def __init__(self, U):
+		super().__init__(U)
+		self.cfl = None
+		self.dt_elems = None
+		self.res_norm0 = None
+		self.res_norm = None
+		self.num_iterations = 0
+
+	def take_time_step(self, solver):
+		params = solver.params
+		U = solver.state_coeffs
+
+		if self.res_norm is None:
+			# Initial residual
+			self.res = solver.get_residual(U, self.res).copy()
+			self.res_norm0 = self.res_norm = np.linalg.norm(
+					self.res.reshape(-1), ord=1)
+			self.mass_elems = solver_jacobian.get_mass_matrix_blocks(solver)
+		res = self.res
+		if self.res_norm <= params["SteadyTolerance"]*self.res_norm0:
+			self.converged = True
+			return res
+
+		if self.num_iterations % params["JacobianUpdateInterval"] == 0 \
+				or self.jac is None:
+			self.update_jacobian(solver, U, res)
+
+		# Mass matrices divided by the pseudo-time steps
+		mass_dt = self.mass_elems/self.dt_elems[:, np.newaxis, np.newaxis]
+
+		dU = self.solve_linear_system(solver, U, res, res, mass_dt,
+				solver.get_residual, self.get_preconditioner(solver,
+				self.dt_elems))
+
+		# Check the new state
+		U_new = U + dU
+		solver.apply_limiter(U_new)
+		res_new = solver.get_residual(U_new, np.zeros_like(U))
+		res_norm = np.linalg.norm(res_new.reshape(-1), ord=1)
+		try:
+			stepper_tools.get_elem_time_steps(solver, U_new, self.cfl)
+			physical = np.isfinite(res_norm)
+		except errors.NotPhysicalError:
+			physical = False
+		if not physical:
+			# Reject the step and retry with a smaller CFL number
+			self.cfl *= 0.1
+			return res
+
+		U[:] = U_new
+		self.res = res_new
+		self.num_iterations += 1
+
+		# Switched evolution relaxation
+		self.cfl = min(self.cfl*self.res_norm/res_norm, params["CFLMax"])
+		self.res_norm = res_norm
+		self.converged = res_norm <= params["SteadyTolerance"]* \
+				self.res_norm0
+
+		return res_new # [num_elems, nb, ns]
+
+
+class PMultigrid(StepperBase):
+	'''
+	PMultigrid inherits attributes from StepperBase. See StepperBase for
+	detailed comments of methods and attributes. It drives the solution
+	to a steady state with nonlinear p-multigrid V-cycles (full
+	approximation scheme) on the levels p, p - 1, ..., MultigridMinOrder
+	(see solver/multigrid.py). Each level is smoothed with local
+	pseudo-time steps, either with an explicit multistage scheme or with
+	linearized backward Euler steps using the diagonal Jacobian blocks
+	(see general.MultigridSmootherType). Each step is one V-cycle. With
+	block-Jacobi smoothing, the CFL number is updated with switched
+	evolution relaxation (see NewtonKrylov). The iterations stop once the
+	residual norm has decreased by the factor SteadyTolerance.
+
+	Reference:
+
+	Fidkowski, K. J., Oliver, T. A., Lu, J., Darmofal, D. L. "p-Multigrid
+	solution of high-order discontinuous Galerkin discretizations of the
+	compressible Navier-Stokes equations". Journal of Computational
+	Physics. Vol. 207, Num. 1, 2005.
+
+	Additional methods and attributes are commented below.
+
+	Attributes:
+	-----------
+	cfl: float
+		current CFL number
+	dt_elems: numpy array
+		pseudo-time step of each element on the finest level [num_elems]
+	res_norm0: float
+		initial residual norm
+	res_norm: float
+		current residual norm
+	num_iterations: int
+		number of V-cycles
+	multigrid: solver_multigrid.PMultigrid
+		p-multigrid hierarchy
+	'''
+	STEPPER_TYPE = StepperType.PMultigrid
+
+	def __init__(self, U):
+		super().__init__(U)
+		self.cfl = None
+		self.dt_elems = None
+		self.res_norm0 = None
+		self.res_norm = None
+		self.num_iterations = 0
+		self.multigrid = None
+
+	def take_time_step(self, solver):
+		params = solver.params
+		U = solver.state_coeffs
+
+		if self.multigrid is None:
+			self.multigrid = solver_multigrid.PMultigrid(solver,
+					params["MultigridMinOrder"])
+		if self.res_norm is None:
+			# Initial residual
+			self.res = solver.get_residual(U, self.res).copy()
+			self.res_norm0 = self.res_norm = np.linalg.norm(
+					self.res.reshape(-1), ord=1)
+		if self.res_norm <= params["SteadyTolerance"]*self.res_norm0:
+			self.converged = True
+			return self.res
+
+		smoother = MultigridSmootherType[params["MultigridSmoother"]]
+		update_jacobians = self.num_iterations % \
+				params["JacobianUpdateInterval"] == 0
+		self.multigrid.fas_cycle(U, self.cfl, smoother,
+				params["MultigridSweeps"],
+				JacobianType[params["JacobianType"]], update_jacobians)
+		solver.apply_limiter(U)
+
+		self.res = solver.get_residual(U, self.res)
+		res_norm = np.linalg.norm(self.res.reshape(-1), ord=1)
+		if not np.isfinite(res_norm):
+			raise errors.NotPhysicalError
+		self.num_iterations += 1
+
+		if smoother == MultigridSmootherType.BlockJacobi:
+			# Switched evolution relaxation
+			self.cfl = min(self.cfl*self.res_norm/res_norm,
+					params["CFLMax"])
+		self.res_norm = res_norm
+		self.converged = res_norm <= params["SteadyTolerance"]* \
+				self.res_norm0
+
+		return self.res # [num_elems, nb, ns]
+
+
+class IMEXStepperBase(ImplicitStepperBase):
+	'''
+	This is an abstract base class for time-accurate implicit-explicit
+	(IMEX) steppers. The residual is split as R = R_E + R_I, where the
+	explicit part R_E contains the convective flux and the explicit
+	source terms and the implicit part R_I contains the diffusive flux,
+	the artificial viscosity, and the implicit source terms (see
+	source_treatment in SourceBase). Each implicit stage solves
+
+		M (U - U_c) = a*dt*R_I(U)
+
+	for U with Newton iterations, where U_c contains the known terms of
+	the stage. The linear systems are solved with GMRES (see
+	ImplicitStepperBase), preconditioned with the Jacobian of R_I, which
+	uses the pointwise source term Jacobians where available. If
+	FULLY_IMPLICIT is True, all terms are implicit. It inherits attributes
+	from ImplicitStepperBase. See ImplicitStepperBase for detailed
+	comments of methods and attributes.
+
+	Additional methods and attributes are commented below.
+
+	Attributes:
+	-----------
+	source_terms: list
+		all source terms of the physics object
+	precond: scipy LinearOperator
+		preconditioner of the current Jacobian and stage coefficient
+	precond_a_dt: float
+		stage coefficient times time step of precond
+	num_steps: int
+		number of time steps taken
+	num_newton_iterations: int
+		total number of Newton iterations
+	'''
+	FULLY_IMPLICIT = False
+
+	def __init__(self, U):
+		super().__init__(U)
+		self.source_terms = None
+		self.precond = None
+		self.precond_a_dt = None
+		self.num_steps = 0
+		self.num_newton_iterations = 0
+
+	def __getstate__(self):
+		# The preconditioner cannot be pickled (e.g. when the solver is
+		# written to a data file); it is recreated when needed
+		state = self.__dict__.copy()
+		state["precond"] = None
+
+		return state
+
+	def set_residual_terms(self, solver, implicit):
+		'''
+		Selects the terms of the residual that are evaluated by
+		solver.get_residual. The lists of source terms are modified in
+		place so that copies of the physics object (e.g. for threaded
+		residual evaluation) are updated as well.
+
+		Inputs:
+		-------
+			solver: solver object
+			implicit: if True, select the implicit terms; otherwise the
+				explicit terms
+
+		Outputs:
+		--------
+			solver.params: ConvFluxSwitch and DiffFluxSwitch (modified)
+			solver.physics.source_terms: source terms (modified)
+		'''
+		if self.FULLY_IMPLICIT:
+			return
+		physics = solver.physics
+		if self.source_terms is None:
+			self.source_terms = list(physics.source_terms)
+
+		solver.params["ConvFluxSwitch"] = not implicit
+		solver.params["DiffFluxSwitch"] = implicit
+		if implicit:
+			physics.source_terms[:] = physics.implicit_sources
+		else:
+			physics.source_terms[:] = physics.explicit_sources
+
+	def reset_residual_terms(self, solver):
+		'''
+		Selects all terms of the residual again (see set_residual_terms).
+
+		Inputs:
+		-------
+			solver: solver object
+
+		Outputs:
+		--------
+			solver.params: ConvFluxSwitch and DiffFluxSwitch (modified)
+			solver.physics.source_terms: source terms (modified)
+		'''
+		if self.FULLY_IMPLICIT:
+			return
+		solver.params["ConvFluxSwitch"] = True
+		solver.params["DiffFluxSwitch"] = True
+		solver.physics.source_terms[:] = self.source_terms
+
+	def get_split_residual(self, solver, U, res, implicit):
+		'''
+		Evaluates the explicit or implicit part of the residual.
+
+		Inputs:
+		-------
+			solver: solver object
+			U: solution array [num_elems, nb, ns]
+			res: residual array [num_elems, nb, ns]
+			implicit: if True, evaluate the implicit part; otherwise the
+				explicit part
+
+		Outputs:
+		--------
+			res: explicit or implicit part of the residual
+				[num_elems, nb, ns]
+		'''
+		if self.FULLY_IMPLICIT and not implicit:
+			res[:] = 0.
+			return res
+		try:
+			self.set_residual_terms(solver, implicit)
+			res = solver.get_residual(U, res)
+		finally:
+			self.reset_residual_terms(solver)
+
+		return res
+
+	def get_linearized_residual(self, solver, U, res):
+		'''
+		Evaluates the implicit part of the residual (see
+		get_split_residual).
+		'''
+		return self.get_split_residual(solver, U, res, True)
+
+	def begin_time_step(self, solver):
+		'''
+		Prepares a time step: computes the mass matrices on the first
+		call and updates the Jacobian of the implicit part of the residual
+		every JacobianUpdateInterval time steps.
+
+		Inputs:
+		-------
+			solver: solver object
+
+		Outputs:
+		--------
+			self.mass_elems: mass matrices (modified)
+			self.jac: Jacobian (modified)
+		'''
+		if self.mass_elems is None:
+			self.mass_elems = solver_jacobian.get_mass_matrix_blocks(solver)
+
+		if self.num_steps % solver.params["JacobianUpdateInterval"] == 0 \
+				or self.jac is None:
+			try:
+				self.set_residual_terms(solver, True)
+				self.update_jacobian(solver, solver.state_coeffs, None)
+			finally:
+				self.reset_residual_terms(solver)
+			self.precond = None
+
+	def solve_implicit_stage(self, solver, U_c, a_dt):
+		'''
+		Solves M (U - U_c) = a_dt*R_I(U) for U with Newton iterations,
+		starting from U_c.
+
+		Inputs:
+		-------
+			solver: solver object
+			U_c: known part of the stage [num_elems, nb, ns]
+			a_dt: diagonal coefficient of the stage times the time step
+
+		Outputs:
+		--------
+			U: stage solution [num_elems, nb, ns]
+			res: implicit part of the residual at U [num_elems, nb, ns]
+		'''
+		params = solver.params
+		num_elems, nb, ns = U_c.shape
+		n = nb*ns
+
+		mass_dt = self.mass_elems/a_dt
+		if self.precond is None or self.precond_a_dt != a_dt:
+			self.precond = self.get_preconditioner(solver, a_dt)
+			self.precond_a_dt = a_dt
+
+		def get_residual(U, res):
+			return self.get_linearized_residual(solver, U, res)
+
+		def mult_mass_dt(U):
+			return np.einsum('eij, ej -> ei', mass_dt,
+					U.reshape(num_elems, n)).reshape(U.shape)
+
+		U = U_c.copy()
+		res = np.zeros_like(U)
+		for i in range(params["NewtonMaxIterations"] + 1):
+			res = get_residual(U, res)
+			# Residual of the nonlinear system (divided by a_dt)
+			rhs = res - mult_mass_dt(U - U_c)
+			if i == 0:
+				tol = params["NewtonTolerance"]*(np.linalg.norm(
+						mult_mass_dt(U_c)) + np.linalg.norm(res))
+			if np.linalg.norm(rhs) <= tol:
+				return U, res
+			if i == params["NewtonMaxIterations"]:
+				break
+
+			U += self.solve_linear_system(solver, U, res, rhs, mass_dt,
+					get_residual, self.precond)
+			self.num_newton_iterations += 1
+
+		raise RuntimeError("Newton iterations of the implicit stage " +
+				"did not converge; reduce the time step or increase " +
+				"NewtonMaxIterations")
+
+
+class ARK2(IMEXStepperBase):
+	'''
+	Second-order additive Runge-Kutta (ARK2) method inherits attributes
+	from IMEXStepperBase. See IMEXStepperBase for detailed comments of
+	methods and attributes. The implicit part is an L-stable explicit
+	first stage, singly diagonally implicit Runge-Kutta (ESDIRK) scheme
+	and both parts share the weights b and the abscissae c. The stage
+	values are
+
+		U_i = U^n + dt M^{-1} sum_{j <= i} (A_E[i, j] R_E(U_j) +
+				A_I[i, j] R_I(U_j)),
+
+	with A_E[i, i] = 0, and
+
+		U^{n+1} = U^n + dt M^{-1} sum_i b[i] (R_E(U_i) + R_I(U_i)).
+
+	Reference:
+
+	Giraldo, F. X., Kelly, J. F., Constantinescu, E. M. "Implicit-Explicit
+	Formulations of a Three-Dimensional Nonhydrostatic Unified Model of
+	the Atmosphere (NUMA)". SIAM Journal on Scientific Computing. Vol. 35,
+	Num. 5, 2013.
+
+	Additional methods and attributes are commented below.
+
+	Constants:
+	----------
+	A_E: explicit Butcher tableau [num_stages, num_stages]
+	A_I: implicit Butcher tableau [num_stages, num_stages]
+	b: weights [num_stages]
+	c: abscissae [num_stages]
+	'''
+	STEPPER_TYPE = StepperType.ARK2
+
+	gamma = 1. - 1./np.sqrt(2.)
+	delta = 1./(2.*np.sqrt(2.))
+	alpha = (3. + 2.*np.sqrt(2.))/6.
+	A_E = np.array([[0., 0., 0.], [2.*gamma, 0., 0.],
+			[1. - alpha, alpha, 0.]])
+	A_I = np.array([[0., 0., 0.], [gamma, gamma, 0.],
+			[delta, delta, gamma]])
+	b = np.array([delta, delta, gamma])
+	c = np.array([0., 2.*gamma, 1.])
+
+	def take_time_step(self, solver):
+		mesh = solver.mesh
+		U = solver.state_coeffs
+		time = solver.time
+		dt = self.dt
+		num_stages = self.b.shape[0]
+
+		self.begin_time_step(solver)
+
+		res_E = []
+		res_I = []
+		for i in range(num_stages):
+			solver.time = time + self.c[i]*dt
+			if i == 0:
+				# Explicit first stage
+				Ui = U
+				res_I.append(self.get_split_residual(solver, Ui,
+						np.zeros_like(U), True))
+			else:
+				# Known part of the stage
+				res_c = np.zeros_like(U)
+				for j in range(i):
+					res_c += self.A_E[i, j]*res_E[j] + \
+							self.A_I[i, j]*res_I[j]
+				U_c = U + solver_tools.mult_inv_mass_matrix(mesh, solver,
+						dt, res_c)
+				Ui, res = self.solve_implicit_stage(solver, U_c,
+						self.A_I[i, i]*dt)
+				solver.apply_limiter(Ui)
+				res_I.append(res.copy())
+			res_E.append(self.get_split_residual(solver, Ui,
+					np.zeros_like(U), False))
+
+		res = np.zeros_like(U)
+		for i in range(num_stages):
+			res += self.b[i]*(res_E[i] + res_I[i])
+		U += solver_tools.mult_inv_mass_matrix(mesh, solver, dt, res)
+		solver.apply_limiter(U)
+		self.num_steps += 1
+
+		return res # [num_elems, nb, ns]
+
+
+class ESDIRK2(ARK2):
+	'''
+	Second-order L-stable explicit first stage, singly diagonally implicit
+	Runge-Kutta (ESDIRK2) method. It is the implicit part of ARK2 applied
+	to the full residual (all terms implicit). See ARK2 for detailed
+	comments of methods and attributes.
+	'''
+	STEPPER_TYPE = StepperType.ESDIRK2
+	FULLY_IMPLICIT = True
+
+
+class BDF2(IMEXStepperBase):
+	'''
+	Second-order IMEX backward differentiation (semi-implicit BDF2, or
+	SBDF2) method inherits attributes from IMEXStepperBase. See
+	IMEXStepperBase for detailed comments of methods and attributes. The
+	explicit part is extrapolated from the two previous time steps. With
+	w = dt^n/dt^{n-1},
+
+		M ((1 + 2w)/(1 + w) U^{n+1} - (1 + w) U^n + w^2/(1 + w) U^{n-1})
+			= dt ((1 + w) R_E(U^n) - w R_E(U^{n-1}) + R_I(U^{n+1})).
+
+	The first time step is IMEX backward Euler.
+
+	Reference:
+
+	Ascher, U. M., Ruuth, S. J., Wetton, B. T. R. "Implicit-Explicit
+	Methods for Time-Dependent Partial Differential Equations". SIAM
+	Journal on Numerical Analysis. Vol. 32, Num. 3, 1995.
+
+	Additional methods and attributes are commented below.
+
+	Attributes:
+	-----------
+	U_old: numpy array
+		solution at the previous time step [num_elems, nb, ns]
+	res_E_old: numpy array
+		explicit part of the residual at the previous time step
+		[num_elems, nb, ns]
+	dt_old: float
+		previous time step size
+	'''
+	STEPPER_TYPE = StepperType.BDF2
+
+	def __init__(self, U):
+		super().__init__(U)
+		self.U_old = None
+		self.res_E_old = None
+		self.dt_old = None
+
+	def take_time_step(self, solver):
+		mesh = solver.mesh
+		U = solver.state_coeffs
+		dt = self.dt
+
+		self.begin_time_step(solver)
+
+		res_E = self.get_split_residual(solver, U, np.zeros_like(U), False)
+		if self.U_old is None:
+			# IMEX backward Euler
+			a0 = 1.
+			U_c = U + solver_tools.mult_inv_mass_matrix(mesh, solver, dt,
+					res_E)
+		else:
+			w = dt/self.dt_old
+			a0 = (1. + 2.*w)/(1. + w)
+			U_c = ((1. + w)*U - w**2/(1. + w)*self.U_old +
+					solver_tools.mult_inv_mass_matrix(mesh, solver, dt,
+					(1. + w)*res_E - w*self.res_E_old))/a0
+
+		self.U_old = U.copy()
+		self.res_E_old = res_E
+		self.dt_old = dt
+
+		solver.time += dt
+		U_new, res_I = self.solve_implicit_stage(solver, U_c, dt/a0)
+		U[:] = U_new
+		solver.apply_limiter(U)
+		self.num_steps += 1
+
+		return res_E + res_I # [num_elems, nb, ns]
@@ -68,6 +68,16 @@ def set_stepper(params, U):
 	elif StepperType[time_stepper] == StepperType.ODEIntegrator:
 		stepper = stepper_defs.ODEIntegrator(U)
 		stepper.set_ode_integrator(params["ODEScheme"], U)
+	elif StepperType[time_stepper] == StepperType.NewtonKrylov:
+		stepper = stepper_defs.NewtonKrylov(U)
+	elif StepperType[time_stepper] == StepperType.ARK2:
+		stepper = stepper_defs.ARK2(U)
+	elif StepperType[time_stepper] == StepperType.ESDIRK2:
+		stepper = stepper_defs.ESDIRK2(U)
+	elif StepperType[time_stepper] == StepperType.BDF2:
+		stepper = stepper_defs.BDF2(U)
+	elif StepperType[time_stepper] == StepperType.PMultigrid:
+		stepper = stepper_defs.PMultigrid(U)
 	else:
 		raise NotImplementedError("Time scheme not supported")
 	return stepper
@@ -116,6 +126,17 @@ def set_time_stepping_approach(stepper, params):
 	tfinal = params["FinalTime"]
 	stepper.tfinal = tfinal
 
+	if stepper.STEPPER_TYPE in [StepperType.NewtonKrylov,
+			StepperType.PMultigrid]:
+		# Steady state: NumTimeSteps is the maximum number of iterations
+		if num_time_steps is None:
+			raise ValueError("NumTimeSteps (maximum number of " +
+					"iterations) is required for the " +
+					stepper.STEPPER_TYPE.name + " stepper")
+		stepper.get_time_step = get_pseudo_time_step
+		stepper.num_time_steps = num_time_steps
+		return
+
 	'''
 	Hierarchy for cases goes:
 		1. number of time steps and tfinal
@@ -232,6 +253,25 @@ def get_dt_from_cfl(stepper, solver):
 	# take minimum to set appropriate dt
 	dt = np.min(dt_elems)
 
+	# Diffusive limit of the artificial viscosity. The shock sensor of
+	# the last residual evaluation is reused; it is only evaluated here
+	# before the first one.
+	if solver.params["AVTimeStepLimit"] and \
+			solver.params["ArtificialViscosity"] and \
+			solver.params["DiffFluxSwitch"]:
+		eps_elems = solver.av_elems
+		if eps_elems is None:
+			grad_Uq = np.einsum('ijnl, ink -> ijkl',
+					elem_helpers.basis_phys_grad_elems, U)
+			epsilon = solver_tools.calculate_artificial_viscosity(physics,
+					elem_helpers, Uq, grad_Uq, solver.params["AVParameter"],
+					solver.order)
+			eps_elems = np.max(epsilon.reshape(epsilon.shape[0], -1),
+					axis=1)
+		with np.errstate(divide='ignore'):
+			dt_av = cfl*vol_elems**(2./ndims)/eps_elems
+		dt = min(dt, np.min(dt_av))
+
 	# logic to ensure final time step yields FinalTime
 	if time + dt < tfinal:
 		stepper.num_time_steps += 1
@@ -264,3 +304,57 @@ def get_dt_from_timestepsize_and_numtimesteps(stepper, solver):
 		return dt
 	else:
 		return tfinal - time
+
+
+def get_elem_time_steps(solver, U, cfl):
+	'''
+	Calculates the time step of each element for a given CFL number.
+
+	Inputs:
+	-------
+		solver: solver object (e.g., DG, ADERDG, etc...)
+		U: solution array [num_elems, nb, ns]
+		cfl: CFL number
+
+	Outputs:
+	--------
+		dt_elems: time step of each element [num_elems]
+	'''
+	ndims = solver.mesh.ndims
+	vol_elems = solver.elem_helpers.vol_elems
+
+	# Interpolate state at quad points
+	Uq = helpers.evaluate_state(U, solver.elem_helpers.basis_val,
+			skip_interp=solver.basis.skip_interp) # [ne, nq, ns]
+	# Max wavespeed of each element
+	a = solver.physics.compute_variable("MaxWaveSpeed", Uq,
+			flag_non_physical=True)
+	a_elems = np.max(a.reshape(a.shape[0], -1), axis=1)
+
+	return cfl*vol_elems**(1./ndims)/a_elems
+
+
+def get_pseudo_time_step(stepper, solver):
+	'''
+	Calculates the local pseudo-time steps of the steady steppers
+	(NewtonKrylov and PMultigrid) from their current CFL number
+	(initially params["CFL"], or 1 if not given).
+
+	Inputs:
+	-------
+		stepper: NewtonKrylov or PMultigrid stepper object
+		solver: solver object (e.g., DG, ADERDG, etc...)
+
+	Outputs:
+	--------
+		dt: smallest pseudo-time step, for output
+		stepper.dt_elems: pseudo-time step of each element (modified)
+	'''
+	if stepper.cfl is None:
+		cfl = solver.params["CFL"]
+		stepper.cfl = 1. if cfl is None else cfl
+
+	stepper.dt_elems = get_elem_time_steps(solver, solver.state_coeffs,
+			stepper.cfl)
+
+	return np.min(stepper.dt_elems)
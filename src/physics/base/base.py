@@ -21,10 +21,14 @@
 #
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import contextlib
 from enum import Enum, auto
 import numpy as np
 
 import errors
+from external.optional_numba import NUMBA_AVAILABLE
+from general import BackendType
 
 import physics.base.functions as base_fcns
 from physics.base.functions import BCType as base_BC_type
@@ -130,6 +134,11 @@ class PhysicsBase(ABC):
 	    holds information about the convective flux function
 	diff_flux_fcn: Function object
 		holds information about the diffusive flux function
+	primitive_cache: OrderedDict
+		primitive variables of the most recently used state arrays (see
+		cache_primitive_variables); None if caching is off
+	backend: BackendType enum member
+		backend of the pointwise kernels (see set_backend)
 		
 	Inner Classes:
 	--------------
@@ -162,6 +171,8 @@ class PhysicsBase(ABC):
 		instantiates and stores the source term objects
 	set_conv_num_flux
 		instantiates and stores the convective numerical flux object
+	set_backend
+		sets the backend of the pointwise kernels
 	get_state_index
 		gets the index corresponding to a given state variable
 	get_state_slice
@@ -184,7 +195,18 @@ class PhysicsBase(ABC):
 		wrapper to compute a given variable (state or additional)
 	compute_additional_variable
 		computes a given additional variable
+	compute_primitive_variables
+		computes the primitive variables shared by the flux and wave speed
+		evaluations
+	get_primitive_variables
+		gets the (cached) primitive variables of a state array
+	cache_primitive_variables
+		context manager in which the primitive variables of each state
+		array are computed only once
 	'''
+	# Number of state arrays whose primitive variables are cached
+	PRIMITIVE_CACHE_SIZE = 4
+
 	@property
 	@abstractmethod
 	def NUM_STATE_VARS(self):
@@ -237,6 +259,8 @@ class PhysicsBase(ABC):
 		self.source_terms = []
 		self.conv_flux_fcn = None
 		self.diff_flux_fcn = None
+		self.primitive_cache = None
+		self.backend = BackendType.NumPy
 
 		# Set indices and slices corresponding to the state variables
 		set_state_indices_slices(self)
@@ -470,6 +494,27 @@ class PhysicsBase(ABC):
 			# Instantiate class and store
 			self.diff_flux_fcn = diff_num_flux_class(**kwargs)
 
+	def set_backend(self, backend_type):
+		'''
+		This method sets the backend of the pointwise kernels. With the
+		Numba backend, the physics classes and functions that provide
+		compiled kernels (see e.g. physics/euler/kernels.py) use them;
+		all others are evaluated with NumPy.
+
+		Inputs:
+		-------
+			backend_type: backend (name of member of BackendType enum)
+
+		Outputs:
+		--------
+			self.backend: backend stored
+		'''
+		backend = BackendType[backend_type]
+		if backend is BackendType.Numba and not NUMBA_AVAILABLE:
+			raise errors.IncompatibleError("The Numba backend requires "
+					"numba")
+		self.backend = backend
+
 	def get_state_index(self, var_name):
 		'''
 		This method gets the index corresponding to a given state variable.
@@ -745,3 +790,80 @@ class PhysicsBase(ABC):
 			varq: values of the given variable [nq, 1]
 		'''
 		pass
+
+	def compute_primitive_variables(self, Uq):
+		'''
+		This method computes the primitive variables that are shared by
+		the analytical flux, numerical flux, wave speed, and time step
+		evaluations (e.g. velocity and pressure). It is only implemented
+		for physics that use get_primitive_variables.
+
+		Inputs:
+		-------
+			Uq: values of the state variables (typically at the quadrature
+				points) [ne, nq, ns]
+
+		Outputs:
+		--------
+			prims: dict whose keys are the names of the primitive
+				variables and whose values are the corresponding values
+				[ne, nq, ...]
+		'''
+		raise NotImplementedError
+
+	def get_primitive_variables(self, Uq):
+		'''
+		This method gets the primitive variables of a state array (see
+		compute_primitive_variables). Inside cache_primitive_variables, the
+		primitive variables of the PRIMITIVE_CACHE_SIZE most recently used
+		state arrays are kept, so that repeated calls with the same array
+		(e.g. for the flux and the maximum wave speed) do not recompute
+		them. Entries are identified by the array itself, so the same
+		array must not be modified in place inside the context.
+
+		Inputs:
+		-------
+			Uq: values of the state variables (typically at the quadrature
+				points) [ne, nq, ns]
+
+		Outputs:
+		--------
+			prims: dict of primitive variables; consumers may add derived
+				variables (e.g. the sound speed) to it
+		'''
+		cache = self.primitive_cache
+		if cache is None:
+			return self.compute_primitive_variables(Uq)
+
+		# The entry holds a reference to the array, so its id cannot be
+		# reused by another array while it is cached
+		entry = cache.get(id(Uq))
+		if entry is not None and entry[0] is Uq:
+			return entry[1]
+
+		prims = self.compute_primitive_variables(Uq)
+		cache[id(Uq)] = (Uq, prims)
+		if len(cache) > self.PRIMITIVE_CACHE_SIZE:
+			cache.popitem(last=False)
+
+		return prims
+
+	@contextlib.contextmanager
+	def cache_primitive_variables(self):
+		'''
+		This method returns a context manager inside which the primitive
+		variables of each state array are cached (see
+		get_primitive_variables). The cache is cleared when the outermost
+		context is exited. Each physics object has its own cache, so
+		threads must use separate physics objects (see solver.threaded).
+		'''
+		if self.primitive_cache is not None:
+			# Nested context
+			yield
+			return
+
+		self.primitive_cache = OrderedDict()
+		try:
+			yield
+		finally:
+			self.primitive_cache = None
@@ -26,6 +26,11 @@ from abc import ABC, abstractmethod
 import numpy as np
 
 
+# Size of the imaginary perturbation of the complex-step Jacobians (see
+# SourceBase.get_complex_step_jacobian)
+COMPLEX_STEP_SIZE = 1.e-30
+
+
 class FcnBase(ABC):
 	'''
 	This is an abstract base class for evaluating a given analytical
@@ -88,7 +93,8 @@ class BCBase(ABC):
 		pass
 
 	@abstractmethod
-	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None):
+	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None,
+			conv_flux=True, diff_flux=True):
 		'''
 		This method computes the flux at a boundary face.
 
@@ -101,6 +107,9 @@ class BCBase(ABC):
 			x: coordinates in physical space [nq, ndims]
 			t: time
 			gUq: Gradient of the state [nq, ndims, ns]
+			conv_flux: [OPTIONAL] if False, the convective flux is
+				ignored
+			diff_flux: [OPTIONAL] if False, the diffusive flux is ignored
 
 		Outputs:
 		--------
@@ -118,12 +127,16 @@ class BCWeakRiemann(BCBase):
 	This class computes the boundary flux via the numerical flux, which
 	depends on the interior and exterior states, i.e. Fnum(UqI, UqB, n).
 	'''
-	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None):
+	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None,
+			conv_flux=True, diff_flux=True):
 		UqB = self.get_boundary_state(physics, UqI, normals, x, t)
-		F = physics.get_conv_flux_numerical(UqI, UqB, normals)
+		if conv_flux:
+			F = physics.get_conv_flux_numerical(UqI, UqB, normals)
+		else:
+			F = np.zeros_like(UqI)
 
 		# Compute diffusive boundary fluxes if needed
-		if physics.diff_flux_fcn:
+		if physics.diff_flux_fcn and diff_flux:
 			Fv, FvB = physics.get_diff_boundary_flux_numerical(UqI, UqB, 
 					gUq, normals) # [nf, nq, ns]
 			F -= Fv
@@ -141,12 +154,16 @@ class BCWeakPrescribed(BCBase):
 	This class computes the boundary flux via the analytical flux based on
 	only the exterior state, i.e. F(UqB, n).
 	'''
-	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None):
+	def get_boundary_flux(self, physics, UqI, normals, x, t, gUq=None,
+			conv_flux=True, diff_flux=True):
 		UqB = self.get_boundary_state(physics, UqI, normals, x, t)
-		F,_ = physics.get_conv_flux_projected(UqB, normals)
+		if conv_flux:
+			F,_ = physics.get_conv_flux_projected(UqB, normals)
+		else:
+			F = np.zeros_like(UqI)
 		
 		# Compute diffusive boundary fluxes if needed
-		if physics.diff_flux_fcn:
+		if physics.diff_flux_fcn and diff_flux:
 			Fv, FvB = physics.get_diff_boundary_flux_numerical(UqI, UqB, 
 					gUq, normals) # [nf, nq, ns]
 			F -= Fv
@@ -159,6 +176,13 @@ class SourceBase(ABC):
 	'''
 	This is an abstract base class for evaluating source terms.
 
+	Attributes:
+	-----------
+	COMPLEX_SAFE: bool
+		True if get_source gives correct results for complex states, in
+		which case the default Jacobian uses the complex step instead of
+		finite differences
+
 	Abstract Methods:
 	-----------------
 	get_source
@@ -168,7 +192,15 @@ class SourceBase(ABC):
 	--------
 	get_jacobian
 		computes the Jacobian of the source term
+	get_complex_step_jacobian
+		computes the Jacobian of the source term with the complex step
+	get_forward_difference_jacobian
+		computes the Jacobian of the source term with forward differences
+	get_central_difference_jacobian
+		computes the Jacobian of the source term with central differences
 	'''
+	COMPLEX_SAFE = False
+
 	def __init__(self, kwargs=None):
 		# By default set the source treatment to implicit but
 		# allow users to specify explicit if desired.
@@ -198,21 +230,128 @@ class SourceBase(ABC):
 
 	def get_jacobian(self, physics, Uq, x, t):
 		'''
-		This method evaluates the Jacobian of the source term.
+		This method evaluates the Jacobian of the source term. Unless
+		overridden with an analytical Jacobian, it is computed with the
+		complex step (if COMPLEX_SAFE) or with forward differences.
 
 		Inputs:
 		-------
 			physics: physics object
 			Uq: values of the state variables (typically at the
-				quadrature points) [nq, ns]
-			x: coordinates in physical space [nq, ndims]
+				quadrature points) [ne, nq, ns]
+			x: coordinates in physical space [ne, nq, ndims]
+			t: time
+
+		Outputs:
+		--------
+			jac: values of source term Jacobian [ne, nq, ns, ns]
+		'''
+		if self.COMPLEX_SAFE:
+			return self.get_complex_step_jacobian(physics, Uq, x, t)
+		else:
+			return self.get_forward_difference_jacobian(physics, Uq, x, t)
+
+	def get_complex_step_jacobian(self, physics, Uq, x, t):
+		'''
+		This method computes the Jacobian of the source term with the
+		complex step, dS/dU_k = Im(S(U + i*h*e_k))/h, which is exact to
+		round-off since there is no subtractive cancellation. Each state
+		variable is perturbed at all points at once, so the source term is
+		evaluated ns times.
+
+		Inputs:
+		-------
+			physics: physics object
+			Uq: values of the state variables (typically at the
+				quadrature points) [ne, nq, ns]
+			x: coordinates in physical space [ne, nq, ndims]
 			t: time
 
 		Outputs:
 		--------
-			jac: values of source term Jacobian [nq, ns, ns]
+			jac: values of source term Jacobian [ne, nq, ns, ns]
 		'''
-		raise NotImplementedError
+		ns = Uq.shape[-1]
+		h = COMPLEX_STEP_SIZE
+		jac = np.zeros(Uq.shape + (ns,))
+
+		Uq_complex = Uq.astype(complex)
+		for k in range(ns):
+			Uq_complex[:, :, k] += 1j*h
+			Sq = self.get_source(physics, Uq_complex, x, t)
+			jac[:, :, :, k] = np.imag(Sq)/h
+			Uq_complex[:, :, k] = Uq[:, :, k]
+
+		return jac # [ne, nq, ns, ns]
+
+	def get_forward_difference_jacobian(self, physics, Uq, x, t):
+		'''
+		This method computes the Jacobian of the source term with
+		first-order finite differences. Each state variable is perturbed at
+		all points at once, so the source term is evaluated ns + 1 times.
+
+		Inputs:
+		-------
+			physics: physics object
+			Uq: values of the state variables (typically at the
+				quadrature points) [ne, nq, ns]
+			x: coordinates in physical space [ne, nq, ndims]
+			t: time
+
+		Outputs:
+		--------
+			jac: values of source term Jacobian [ne, nq, ns, ns]
+		'''
+		ns = Uq.shape[-1]
+		jac = np.zeros(Uq.shape + (ns,))
+		# Same perturbation sizes as for the residual Jacobian (see
+		# solver/jacobian.py)
+		eps = np.sqrt(np.finfo(float).eps)*(1. + np.abs(Uq))
+
+		Sq = self.get_source(physics, Uq, x, t).copy()
+		Uq_pert = Uq.copy()
+		for k in range(ns):
+			Uq_pert[:, :, k] += eps[:, :, k]
+			dSq = self.get_source(physics, Uq_pert, x, t) - Sq
+			jac[:, :, :, k] = dSq/eps[:, :, k:k+1]
+			Uq_pert[:, :, k] = Uq[:, :, k]
+
+		return jac # [ne, nq, ns, ns]
+
+	def get_central_difference_jacobian(self, physics, Uq, x, t):
+		'''
+		This method computes the Jacobian of the source term with
+		second-order finite differences. Each state variable is perturbed
+		at all points at once, so the source term is evaluated 2*ns times.
+
+		Inputs:
+		-------
+			physics: physics object
+			Uq: values of the state variables (typically at the
+				quadrature points) [ne, nq, ns]
+			x: coordinates in physical space [ne, nq, ndims]
+			t: time
+
+		Outputs:
+		--------
+			jac: values of source term Jacobian [ne, nq, ns, ns]
+		'''
+		ns = Uq.shape[-1]
+		jac = np.zeros(Uq.shape + (ns,))
+		# Same perturbation sizes as for the residual Jacobian (see
+		# solver/jacobian.py)
+		eps = np.sqrt(np.finfo(float).eps)*(1. + np.abs(Uq))
+
+		Uq_pert = Uq.copy()
+		for k in range(ns):
+			Uq_pert[:, :, k] = Uq[:, :, k] + eps[:, :, k]
+			Sq_plus = self.get_source(physics, Uq_pert, x, t).copy()
+			Uq_pert[:, :, k] = Uq[:, :, k] - eps[:, :, k]
+			Sq_minus = self.get_source(physics, Uq_pert, x, t)
+			jac[:, :, :, k] = (Sq_plus - Sq_minus)/(2.*eps[:, :, k:k+1])
+			Uq_pert[:, :, k] = Uq[:, :, k]
+
+		return jac # [ne, nq, ns, ns]
 
 
 class ConvNumFluxBase(ABC):
@@ -296,6 +435,8 @@ class DiffNumFluxBase(ABC):
 	--------
 	alloc_helpers
 		allocates helper arrays
+	precompute_helpers
+		precomputes helpers that only depend on the mesh and order
 	'''
 	def __init__(self, Uq=None):
 		'''
@@ -329,6 +470,19 @@ class DiffNumFluxBase(ABC):
 		'''
 		self.__init__(Uq)
 
+	def precompute_helpers(self, solver):
+		'''
+		This method precomputes the helpers of the numerical flux that
+		only depend on the mesh and the solution order. They are stored
+		with the face helpers of the solver, so that they are computed
+		once instead of at every residual evaluation.
+
+		Inputs:
+		-------
+			solver: solver object
+		'''
+		pass
+
 	@abstractmethod
 	def compute_flux(self, physics, UqL, UqR, normals):
 		'''
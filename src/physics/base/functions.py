@@ -218,11 +218,13 @@ class SIP(DiffNumFluxBase):
 	This class corresponds to the Symmetric Interior Penalty Method (SIP)
 	for the NavierStokes class. It is a diffusion flux method.
 	'''
-	def compute_iface_helpers(self, solver):
+	def precompute_helpers(self, solver):
 		'''
-		Helper function that computes additional terms for the diff flux
-		These include the penalty terms and vol/area ratios for the 
-		left and right states
+		Precomputes the penalty term and the vol/area ratios of the
+		interior and boundary faces, which only depend on the mesh and
+		the solution order. They are stored with the face helpers, which
+		are recomputed when the mesh or the order changes (see
+		DG.precompute_matrix_helpers).
 
 		Inputs:
 		-------
@@ -230,32 +232,69 @@ class SIP(DiffNumFluxBase):
 
 		Outputs:
 		--------
-			self.eta: penalty term
-			self.hL: volume to face length ratio [nfL]
-			self.hR: volume to face length ratio [nfR]
+			solver.int_face_helpers.ip_eta: penalty term
+			solver.int_face_helpers.hL: volume to face length ratio [nfL]
+			solver.int_face_helpers.hR: volume to face length ratio [nfR]
+			solver.bface_helpers.ip_eta: penalty term
+			solver.bface_helpers.h_bgroups: volume to face length ratio
+				for each boundary group [nbf]
 		'''
 		# Unpack
 		elem_helpers = solver.elem_helpers
 		int_face_helpers = solver.int_face_helpers
+		bface_helpers = solver.bface_helpers
 
 		face_lengths = int_face_helpers.face_lengths
 		vol_elems = elem_helpers.vol_elems
 
 		# Calculate the penalty term
-		self.eta = self.get_ip_eta(solver.mesh, solver.order)
+		eta = self.get_ip_eta(solver.mesh, solver.order)
+		int_face_helpers.ip_eta = eta
+		bface_helpers.ip_eta = eta
 
 		# Calculate ratio of volume/area for each L/R face
-		self.hL = vol_elems[int_face_helpers.elemL_IDs] / \
-				face_lengths[int_face_helpers.elemL_IDs, -1]
+		int_face_helpers.hL = vol_elems[int_face_helpers.elemL_IDs] / \
+				face_lengths[:, -1]
+
+		int_face_helpers.hR = vol_elems[int_face_helpers.elemR_IDs] / \
+				face_lengths[:, -1]
+
+		# Calculate ratio of volume/area for each boundary face
+		bface_helpers.h_bgroups = []
+		for elem_IDs, face_lengths in zip(bface_helpers.elem_IDs,
+				bface_helpers.face_lengths_bgroups):
+			bface_helpers.h_bgroups.append(vol_elems[elem_IDs] /
+					face_lengths[:, -1])
 
-		self.hR = vol_elems[int_face_helpers.elemR_IDs] / \
-				face_lengths[int_face_helpers.elemR_IDs - 1, -1]
+	def compute_iface_helpers(self, solver):
+		'''
+		Helper function that sets additional terms for the diff flux
+		These include the penalty terms and vol/area ratios for the 
+		left and right states (see precompute_helpers)
+
+		Inputs:
+		-------
+			solver: solver object
+
+		Outputs:
+		--------
+			self.eta: penalty term
+			self.hL: volume to face length ratio [nfL]
+			self.hR: volume to face length ratio [nfR]
+		'''
+		int_face_helpers = solver.int_face_helpers
+		if int_face_helpers.ip_eta is None:
+			self.precompute_helpers(solver)
+
+		self.eta = int_face_helpers.ip_eta
+		self.hL = int_face_helpers.hL
+		self.hR = int_face_helpers.hR
 
 	def compute_bface_helpers(self, solver, bgroup_num):
 		'''
-		Helper function that computes additional terms for the diff flux
+		Helper function that sets additional terms for the diff flux
 		These include the penalty terms and vol/area ratios for the 
-		boundary states
+		boundary states (see precompute_helpers)
 
 		Inputs:
 		-------
@@ -267,20 +306,12 @@ class SIP(DiffNumFluxBase):
 			self.eta: penalty term
 			self.h: volume to face length ratio [nf]
 		'''
-		# Unpack
 		bface_helpers = solver.bface_helpers
-		elem_helpers = solver.elem_helpers
-		elem_IDs = bface_helpers.elem_IDs[bgroup_num]
-
-		vol_elems = elem_helpers.vol_elems
-		face_lengths_bgroups = bface_helpers.face_lengths_bgroups
-		face_lengths = face_lengths_bgroups[bgroup_num]
+		if bface_helpers.ip_eta is None:
+			self.precompute_helpers(solver)
 
-		# Calculate the penalty term
-		self.eta = self.get_ip_eta(solver.mesh, solver.order)
-
-		# Calculate ratio of volume/area for each L/R face
-		self.h = vol_elems[elem_IDs] / face_lengths[-1]
+		self.eta = bface_helpers.ip_eta
+		self.h = bface_helpers.h_bgroups[bgroup_num]
 
 	def get_ip_eta(self, mesh, order):
 		'''
@@ -72,8 +72,8 @@ class Chemistry(base.PhysicsBase):
 	'''
 	PHYSICS_TYPE = general.PhysicsType.Chemistry
 
-	def __init__(self, mesh):
-		super().__init__(mesh)
+	def __init__(self):
+		super().__init__()
 		self.R = 0.
 		self.gamma = 0.
 		self.qo = 0.
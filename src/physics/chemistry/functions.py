@@ -26,6 +26,8 @@ from enum import Enum, auto
 import numpy as np
 from scipy.optimize import fsolve, root
 
+from general import BackendType
+import physics.chemistry.kernels as chemistry_kernels
 from physics.base.data import (FcnBase, BCWeakRiemann, BCWeakPrescribed,
         SourceBase, ConvNumFluxBase)
 
@@ -191,9 +193,12 @@ class OverdrivenDetonation(FcnBase):
 		qo = physics.qo
 		R = physics.R
 
-		# Source term constants
-		Ta = physics.source_terms[0].Tign
-		A = physics.source_terms[0].A
+		# Source term constants (operator splitting schemes only keep the
+		# sources of the current substep in physics.source_terms)
+		source_terms = physics.source_terms + \
+				getattr(physics, "implicit_sources", [])
+		Ta = source_terms[0].Tign
+		A = source_terms[0].A
 
 		# Normalized Pre-shock state 
 		rho1 = 1.
@@ -333,6 +338,12 @@ class Arrhenius(SourceBase):
 		b = self.b
 		Tign = self.Tign
 
+		if physics.backend is BackendType.Numba:
+			S = np.empty_like(Uq)
+			chemistry_kernels.get_arrhenius_source(Uq, physics.gamma,
+					physics.R, physics.qo, A, b, Tign, S)
+			return S
+
 		irho, irhou, irhoE, irhoY = physics.get_state_indices()
 
 		# Get temperature and calculate arrhenius rate constant
@@ -0,0 +1,68 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/physics/chemistry/kernels.py
+#
+#       Contains the kernels of the Numba backend (see
+#       general.BackendType) for the 1D Euler equations with a mass
+#       fraction transport equation. The state variables are ordered as
+#       [rho, rho*u, rho*E, rho*Y]. See physics/euler/kernels.py.
+#
+# ------------------------------------------------------------------------ #
+import math
+
+from external.optional_numba import njit
+
+
+@njit
+def get_arrhenius_source(Uq, gamma, R, qo, A, b, Tign, S):
+	'''
+	This kernel computes the Arrhenius source term (see Arrhenius).
+
+	Inputs:
+	-------
+		Uq: values of the state variables [ne, nq, ns]
+		gamma: specific heat ratio
+		R: mass-specific gas constant
+		qo: heat release
+		A: pre-exponential factor
+		b: temperature exponent
+		Tign: activation temperature
+
+	Outputs:
+	--------
+		S: source term [ne, nq, ns]
+	'''
+	ne, nq, ns = Uq.shape
+	irhoE = ns - 2
+	irhoY = ns - 1
+
+	for i in range(ne):
+		for j in range(nq):
+			rho = Uq[i, j, 0]
+			mom2 = 0.
+			for d in range(1, irhoE):
+				mom2 += Uq[i, j, d]*Uq[i, j, d]
+			p = (gamma - 1.)*(Uq[i, j, irhoE] - 0.5*mom2/rho
+					- qo*Uq[i, j, irhoY])
+			T = p/(rho*R)
+			K = A*T**b*math.exp(-Tign/T)
+
+			for k in range(ns):
+				S[i, j, k] = 0.
+			S[i, j, irhoY] = -K*Uq[i, j, irhoY]
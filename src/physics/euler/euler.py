@@ -33,6 +33,7 @@ from physics.base.functions import ConvNumFluxType as base_conv_num_flux_type
 from physics.base.functions import FcnType as base_fcn_type
 
 import physics.euler.functions as euler_fcns
+import physics.euler.kernels as euler_kernels
 from physics.euler.functions import BCType as euler_BC_type
 from physics.euler.functions import ConvNumFluxType as \
 		euler_conv_num_flux_type
@@ -103,6 +104,70 @@ class Euler(base.PhysicsBase):
 		XVelocity = "u"
 		YVelocity = "v"
 
+	def compute_primitive_variables(self, Uq):
+		# Unpack
+		srho = self.get_state_slice("Density")
+		srhoE = self.get_state_slice("Energy")
+		smom = self.get_momentum_slice()
+		rho = Uq[:, :, srho]
+		rhoE = Uq[:, :, srhoE]
+		mom = Uq[:, :, smom]
+
+		# Get velocity and squared velocity magnitude
+		vel = mom/rho
+		vel2 = np.sum(vel*vel, axis=2, keepdims=True)
+
+		# Calculate pressure using the Ideal Gas Law
+		p = (self.gamma - 1.)*(rhoE - 0.5*np.sum(mom*mom, axis=2,
+				keepdims=True)/rho)
+
+		return {"rho": rho, "vel": vel, "vel2": vel2, "p": p}
+
+	def get_sound_speed(self, prims):
+		'''
+		This method computes the speed of sound from the primitive
+		variables and stores it with them, so that it is only computed once
+		per state array (see get_primitive_variables).
+
+		Inputs:
+		-------
+			prims: primitive variables (see compute_primitive_variables)
+
+		Outputs:
+		--------
+			c: speed of sound [ne, nq, 1]
+		'''
+		if "c" not in prims:
+			prims["c"] = np.sqrt(self.gamma*prims["p"]/prims["rho"])
+
+		return prims["c"]
+
+	def get_conv_flux_interior_compiled(self, Uq):
+		'''
+		This method computes the convective analytical flux with the
+		kernel of the Numba backend (see euler_kernels).
+
+		Inputs:
+		-------
+			Uq: values of the state variables (typically at the quadrature
+				points) [n, nq, ns]
+
+		Outputs:
+		--------
+			F: analytical flux [n, nq, ns, ndims]
+			tuple of the squared velocity components, density, and
+				pressure (see get_conv_flux_interior) [n, nq]
+		'''
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+		vel2 = np.empty(Uq.shape[:2] + (self.NDIMS,), dtype=Uq.dtype)
+		p = np.empty(Uq.shape[:2], dtype=Uq.dtype)
+		euler_kernels.get_conv_flux_interior(Uq, self.gamma, F, vel2, p)
+
+		rho = Uq[:, :, self.get_state_index("Density")]
+		vel2 = tuple(vel2[:, :, d] for d in range(self.NDIMS))
+
+		return F, vel2 + (rho, p)
+
 	def compute_additional_variable(self, var_name, Uq, flag_non_physical):
 		''' Extract state variables '''
 		srho = self.get_state_slice("Density")
@@ -121,10 +186,12 @@ class Euler(base.PhysicsBase):
 			if np.any(rho < 0.):
 				raise errors.NotPhysicalError
 
+		''' Primitive variables (shared with the flux evaluations) '''
+		prims = self.get_primitive_variables(Uq)
+
 		''' Nested functions for common quantities '''
 		def get_pressure():
-			varq = (gamma - 1.)*(rhoE - 0.5*np.sum(mom*mom, axis=2,
-					keepdims=True)/rho)
+			varq = prims["p"]
 			if flag_non_physical:
 				if np.any(varq < 0.):
 					raise errors.NotPhysicalError
@@ -135,8 +202,9 @@ class Euler(base.PhysicsBase):
 		''' Compute '''
 		vname = self.AdditionalVariables[var_name].name
 
+		# Cached arrays are copied since callers may modify the result
 		if vname is self.AdditionalVariables["Pressure"].name:
-			varq = get_pressure()
+			varq = get_pressure().copy()
 		elif vname is self.AdditionalVariables["Temperature"].name:
 			varq = get_temperature()
 		elif vname is self.AdditionalVariables["Entropy"].name:
@@ -148,17 +216,18 @@ class Euler(base.PhysicsBase):
 		elif vname is self.AdditionalVariables["TotalEnthalpy"].name:
 			varq = (rhoE + get_pressure())/rho
 		elif vname is self.AdditionalVariables["SoundSpeed"].name:
-			varq = np.sqrt(gamma*get_pressure()/rho)
+			get_pressure()
+			varq = self.get_sound_speed(prims).copy()
 		elif vname is self.AdditionalVariables["MaxWaveSpeed"].name:
 			# |u| + c
-			varq = np.linalg.norm(mom, axis=2, keepdims=True)/rho + np.sqrt(
-					gamma*get_pressure()/rho)
+			get_pressure()
+			varq = np.sqrt(prims["vel2"]) + self.get_sound_speed(prims)
 		elif vname is self.AdditionalVariables["Velocity"].name:
-			varq = np.linalg.norm(mom, axis=2, keepdims=True)/rho 
+			varq = np.sqrt(prims["vel2"])
 		elif vname is self.AdditionalVariables["XVelocity"].name:
-			varq = mom[:, :, [0]]/rho
+			varq = prims["vel"][:, :, [0]]
 		elif vname is self.AdditionalVariables["YVelocity"].name:
-			varq = mom[:, :, [1]]/rho
+			varq = prims["vel"][:, :, [1]]
 		else:
 			raise NotImplementedError
 
@@ -236,6 +305,8 @@ class Euler1D(Euler):
 			base_conv_num_flux_type.LaxFriedrichs :
 					euler_fcns.LaxFriedrichs1D,
 			euler_conv_num_flux_type.Roe : euler_fcns.Roe1D,
+			euler_conv_num_flux_type.RoeEntropyFix :
+					euler_fcns.RoeEntropyFix1D,
 		})
 
 	class StateVariables(Enum):
@@ -264,6 +335,9 @@ class Euler1D(Euler):
 		return smom
 
 	def get_conv_flux_interior(self, Uq):
+		if self.backend is general.BackendType.Numba:
+			return self.get_conv_flux_interior_compiled(Uq)
+
 		# Get indices of state variables
 		irho, irhou, irhoE = self.get_state_indices()
 
@@ -271,18 +345,17 @@ class Euler1D(Euler):
 		rhou = Uq[:, :, irhou] # [n, nq]
 		rhoE = Uq[:, :, irhoE] # [n, nq]
 
-		# Get velocity
-		u = rhou / rho
-		# Get squared velocitiy
-		u2 = u**2
-
-		# Calculate pressure using the Ideal Gas Law
-		p = (self.gamma - 1.)*(rhoE - 0.5 * rho * u2) # [n, nq]
+		# Get velocity, squared velocity, and pressure (Ideal Gas Law)
+		prims = self.get_primitive_variables(Uq)
+		u = prims["vel"][:, :, 0]  # [n, nq]
+		u2 = prims["vel2"][:, :, 0] # [n, nq]
+		p = prims["p"][:, :, 0]     # [n, nq]
 		# Get total enthalpy
 		H = rhoE + p
 
 		# Assemble flux matrix
-		F = np.empty(Uq.shape + (self.NDIMS,)) # [n, nq, ns, ndims]
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+			# [n, nq, ns, ndims]
 		F[:, :, irho, 0] = rhou         # Flux of mass
 		F[:, :, irhou, 0] = rho * u2 + p # Flux of momentum
 		F[:, :, irhoE, 0] = H * u        # Flux of energy
@@ -404,6 +477,8 @@ class Euler2D(Euler):
 			base_conv_num_flux_type.LaxFriedrichs :
 				euler_fcns.LaxFriedrichs2D,
 			euler_conv_num_flux_type.Roe : euler_fcns.Roe2D,
+			euler_conv_num_flux_type.RoeEntropyFix :
+				euler_fcns.RoeEntropyFix2D,
 		})
 
 	class StateVariables(Enum):
@@ -428,32 +503,34 @@ class Euler2D(Euler):
 		return smom
 
 	def get_conv_flux_interior(self, Uq):
+		if self.backend is general.BackendType.Numba:
+			return self.get_conv_flux_interior_compiled(Uq)
+
 		# Get indices/slices of state variables
 		irho, irhou, irhov, irhoE = self.get_state_indices()
 		smom = self.get_momentum_slice()
 
 		rho  = Uq[:, :, irho]  # [n, nq]
-		rhou = Uq[:, :, irhou] # [n, nq]
-		rhov = Uq[:, :, irhov] # [n, nq]
 		rhoE = Uq[:, :, irhoE] # [n, nq]
 		mom  = Uq[:, :, smom]  # [n, nq, ndims]
 
-		# Get velocity in each dimension
-		u = rhou / rho
-		v = rhov / rho
+		# Get velocity in each dimension and pressure (Ideal Gas Law)
+		prims = self.get_primitive_variables(Uq)
+		u = prims["vel"][:, :, 0] # [n, nq]
+		v = prims["vel"][:, :, 1] # [n, nq]
+		p = prims["p"][:, :, 0]   # [n, nq]
 		# Get squared velocities
 		u2 = u**2
 		v2 = v**2
 
-		# Calculate pressure using the Ideal Gas Law
-		p = (self.gamma - 1.)*(rhoE - 0.5 * rho * (u2 + v2)) # [n, nq]
 		# Get off-diagonal momentum
 		rhouv = rho * u * v
 		# Get total enthalpy
 		H = rhoE + p
 
 		# Assemble flux matrix
-		F = np.empty(Uq.shape + (self.NDIMS,)) # [n, nq, ns, ndims]
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+			# [n, nq, ns, ndims]
 		F[:,:,irho,  :] = mom          # Flux of mass in all directions
 		F[:,:,irhou, 0] = rho * u2 + p # x-flux of x-momentum
 		F[:,:,irhov, 0] = rhouv        # x-flux of y-momentum
@@ -463,3 +540,92 @@ class Euler2D(Euler):
 		F[:,:,irhoE, 1] = H * v        # y-flux of energy
 
 		return F, (u2, v2, rho, p)
+
+	def get_conv_eigenvectors(self, U_bar, n_hat):
+		'''
+		This function defines the eigenvectors of the convective flux
+		Jacobian projected in a given direction for the 2D Euler
+		equations. This is used with the WENO2D limiter to transform the
+		system of equations from physical space to characteristic space.
+
+		Inputs:
+		-------
+			U_bar: Average state [ne, 1, ns]
+			n_hat: unit vector of the direction [ne, 1, ndims]
+
+		Outputs:
+		--------
+			right_eigen: Right eigenvector matrix [ne, 1, ns, ns]
+			left_eigen: Left eigenvector matrix [ne, 1, ns, ns]
+		'''
+		# Unpack
+		ne = U_bar.shape[0]
+		ns = self.NUM_STATE_VARS
+		irho, irhou, irhov, irhoE = self.get_state_indices()
+
+		rho = U_bar[:, :, irho]
+		u = U_bar[:, :, irhou] / rho
+		v = U_bar[:, :, irhov] / rho
+		rhoE = U_bar[:, :, irhoE]
+		nx = n_hat[:, :, 0]
+		ny = n_hat[:, :, 1]
+
+		# Normal and tangential velocities
+		un = u*nx + v*ny
+		ut = v*nx - u*ny
+		# Squared velocity
+		q2 = u**2 + v**2
+		# Pressure, total specific enthalpy, and sound speed
+		p = (self.gamma - 1.)*(rhoE - 0.5*rho*q2)
+		H = (rhoE + p) / rho
+		a = np.sqrt(self.gamma * p / rho)
+
+		b1 = (self.gamma - 1.) / (a * a)
+		b2 = 0.5 * q2 * b1
+
+		# Allocate the right and left eigenvectors
+		right_eigen = np.zeros([ne, 1, ns, ns])
+		left_eigen = np.zeros([ne, 1, ns, ns])
+
+		# Right eigenvectors (columns): acoustic (u_n - a), entropy,
+		# shear, and acoustic (u_n + a) waves
+		right_eigen[:, :, irho, 0] = 1.
+		right_eigen[:, :, irhou, 0] = u - a*nx
+		right_eigen[:, :, irhov, 0] = v - a*ny
+		right_eigen[:, :, irhoE, 0] = H - un*a
+
+		right_eigen[:, :, irho, 1] = 1.
+		right_eigen[:, :, irhou, 1] = u
+		right_eigen[:, :, irhov, 1] = v
+		right_eigen[:, :, irhoE, 1] = 0.5 * q2
+
+		right_eigen[:, :, irhou, 2] = -ny
+		right_eigen[:, :, irhov, 2] = nx
+		right_eigen[:, :, irhoE, 2] = ut
+
+		right_eigen[:, :, irho, 3] = 1.
+		right_eigen[:, :, irhou, 3] = u + a*nx
+		right_eigen[:, :, irhov, 3] = v + a*ny
+		right_eigen[:, :, irhoE, 3] = H + un*a
+
+		# Left eigenvectors (rows)
+		left_eigen[:, :, 0, irho] = 0.5 * (b2 + un/a)
+		left_eigen[:, :, 0, irhou] = -0.5 * (b1*u + nx/a)
+		left_eigen[:, :, 0, irhov] = -0.5 * (b1*v + ny/a)
+		left_eigen[:, :, 0, irhoE] = 0.5 * b1
+
+		left_eigen[:, :, 1, irho] = 1. - b2
+		left_eigen[:, :, 1, irhou] = b1 * u
+		left_eigen[:, :, 1, irhov] = b1 * v
+		left_eigen[:, :, 1, irhoE] = -b1
+
+		left_eigen[:, :, 2, irho] = -ut
+		left_eigen[:, :, 2, irhou] = -ny
+		left_eigen[:, :, 2, irhov] = nx
+
+		left_eigen[:, :, 3, irho] = 0.5 * (b2 - un/a)
+		left_eigen[:, :, 3, irhou] = -0.5 * (b1*u - nx/a)
+		left_eigen[:, :, 3, irhov] = -0.5 * (b1*v - ny/a)
+		left_eigen[:, :, 3, irhoE] = 0.5 * b1
+
+		return right_eigen, left_eigen # [ne, 1, ns, ns]
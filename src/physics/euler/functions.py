@@ -27,6 +27,7 @@ from scipy.optimize import fsolve, root
 
 import errors
 import general
+import physics.euler.kernels as euler_kernels
 
 from physics.base.data import (FcnBase, BCWeakRiemann, BCWeakPrescribed,
         SourceBase, ConvNumFluxBase)
@@ -72,6 +73,7 @@ class ConvNumFluxType(Enum):
 	numerical fluxes are specific to the available Euler equation sets.
 	'''
 	Roe = auto()
+	RoeEntropyFix = auto()
 
 
 '''
@@ -857,6 +859,8 @@ class TaylorGreenSource(SourceBase):
 		Eulerian formulation", PhD Thesis, North Carolina State University,
 		2017.
 	'''
+	COMPLEX_SAFE = True
+
 	def get_source(self, physics, Uq, x, t):
 		gamma = physics.gamma
 
@@ -881,6 +885,8 @@ class GravitySource(SourceBase):
 		with source terms, Journal of Computational Physics 230 
 		(2011) 1238–1248.
 	'''
+	COMPLEX_SAFE = True
+
 	def __init__(self, gravity=0., **kwargs):
 		super().__init__(kwargs)
 		'''
@@ -924,6 +930,24 @@ and methods. Information specific to the corresponding child classes can
 be found below. These classes should correspond to the ConvNumFluxType 
 or DiffNumFluxType enum members above.
 '''
+def get_broadcast_normals(UqL, normals):
+	'''
+	This function broadcasts the normals to the points of the states, as
+	required by the kernels of the Numba backend (e.g. a single normal
+	per face for the space-time points of ADER-DG in 1D).
+
+	Inputs:
+	-------
+		UqL: left states [nf, nq, ns]
+		normals: normals [nf, nq, ndims] (or broadcastable to it)
+
+	Outputs:
+	--------
+		normals: normals [nf, nq, ndims]
+	'''
+	return np.broadcast_to(normals, UqL.shape[:2] + normals.shape[2:])
+
+
 class LaxFriedrichs1D(ConvNumFluxBase):
 	'''
 	This class corresponds to the local Lax-Friedrichs flux function for the
@@ -931,6 +955,12 @@ class LaxFriedrichs1D(ConvNumFluxBase):
 	the Lax-Friedrichs flux found in base.
 	'''
 	def compute_flux(self, physics, UqL, UqR, normals):
+		if physics.backend is general.BackendType.Numba:
+			F = np.empty_like(UqL)
+			euler_kernels.get_lax_friedrichs_flux(UqL, UqR,
+					get_broadcast_normals(UqL, normals), physics.gamma, F)
+			return F
+
 		# Normalize the normal vectors
 		n_mag = np.linalg.norm(normals, axis=2, keepdims=True)
 		n_hat = normals/n_mag
@@ -945,8 +975,8 @@ class LaxFriedrichs1D(ConvNumFluxBase):
 		dUq = UqR - UqL
 
 		# Max wave speeds at each point
-		aL = np.empty(pL.shape + (1,))
-		aR = np.empty(pR.shape + (1,))
+		aL = np.empty(pL.shape + (1,), dtype=pL.dtype)
+		aR = np.empty(pR.shape + (1,), dtype=pR.dtype)
 		aL[:, :, 0] = np.sqrt(u2L) + np.sqrt(physics.gamma * pL / rhoL)
 		aR[:, :, 0] = np.sqrt(u2R) + np.sqrt(physics.gamma * pR / rhoR)
 		idx = aR > aL
@@ -963,6 +993,12 @@ class LaxFriedrichs2D(ConvNumFluxBase):
 	the Lax-Friedrichs flux found in base.
 	'''
 	def compute_flux(self, physics, UqL, UqR, normals):
+		if physics.backend is general.BackendType.Numba:
+			F = np.empty_like(UqL)
+			euler_kernels.get_lax_friedrichs_flux(UqL, UqR,
+					get_broadcast_normals(UqL, normals), physics.gamma, F)
+			return F
+
 		# Normalize the normal vectors
 		n_mag = np.linalg.norm(normals, axis=2, keepdims=True)
 		n_hat = normals/n_mag
@@ -979,8 +1015,8 @@ class LaxFriedrichs2D(ConvNumFluxBase):
 		dUq = UqR - UqL
 
 		# Max wave speeds at each point
-		aL = np.empty(pL.shape + (1,))
-		aR = np.empty(pR.shape + (1,))
+		aL = np.empty(pL.shape + (1,), dtype=pL.dtype)
+		aR = np.empty(pR.shape + (1,), dtype=pR.dtype)
 		aL[:, :, 0] = np.sqrt(u2L + v2L) + np.sqrt(physics.gamma * pL / rhoL)
 		aR[:, :, 0] = np.sqrt(u2R + v2R) + np.sqrt(physics.gamma * pR / rhoR)
 		idx = aR > aL
@@ -1000,21 +1036,22 @@ class Roe1D(ConvNumFluxBase):
 		methods: algorithms, analysis, and applications," Springer Science
 		& Business Media, 2007.
 
+	The dissipation term |A| dU is evaluated in closed form, i.e. without
+	forming the right eigenvector matrix, and all intermediate quantities
+	are computed in place in helper arrays that are reused between calls.
+	Only the returned flux is allocated.
+
 	Attributes:
 	-----------
-	UqL: numpy array
-		helper array for left state [nf, nq, ns]
-	UqR: numpy array
-		helper array for right state [nf, nq, ns]
-	vel: numpy array
-		helper array for velocity [nf, nq, ndims]
-	alphas: numpy array
-		helper array: left eigenvectors multipled by dU [nf, nq, ns]
-	evals: numpy array
-		helper array for eigenvalues [nf, nq, ns]
-	R: numpy array
-		helper array for right eigenvectors [nf, nq, ns, ns]
+	workspaces: dict
+		helper arrays (see get_workspace) for each shape and
+		floating-point type of the states (e.g. the interior faces and
+		each boundary group); allocated at first use
 	'''
+	# Harten's entropy fix: eigenvalues with magnitude smaller than
+	# ENTROPY_FIX*c are smoothed; no fix if None
+	ENTROPY_FIX = None
+
 	def __init__(self, Uq=None):
 		'''
 		This method initializes the attributes.
@@ -1022,288 +1059,457 @@ class Roe1D(ConvNumFluxBase):
 		Inputs:
 		-------
 			Uq: values of the state variables (typically at the quadrature
-				points) [nf, nq, ns]; used to allocate helper arrays; if None,
-				then empty arrays allocated
+				points) [nf, nq, ns]; unused since the helper arrays are
+				allocated at first use (see get_workspace)
 
 		Outputs:
 		--------
 		    self: attributes initialized
 		'''
-		if Uq is not None:
-			n = Uq.shape[0]
-			nq = Uq.shape[1]
-			ns = Uq.shape[-1]
-			ndims = ns - 2
-		else:
-			n = nq = ns = ndims = 0
+		self.workspaces = {}
+
+	def get_workspace(self, shape, dtype=np.float64):
+		'''
+		This method returns the helper arrays for states of a given shape
+		and floating-point type, allocating them if needed.
 
-		self.UqL = np.zeros_like(Uq)
-		self.UqR = np.zeros_like(Uq)
-		self.vel = np.zeros([n, nq, ndims])
-		self.alphas = np.zeros_like(Uq)
-		self.evals = np.zeros_like(Uq)
-		self.R = np.zeros([n, nq, ns, ns])
+		Inputs:
+		-------
+			shape: shape of the states [nf, nq, ns]
+			dtype: [OPTIONAL] floating-point type of the states
 
-	def rotate_coord_sys(self, smom, Uq, n):
+		Outputs:
+		--------
+		    work: dict of helper arrays; scalars are [nf, nq, 1], vectors
+		    	are [nf, nq, ndims], and the eigenvalues, the wave strengths,
+		    	and the dissipation term are [nf, nq, ns]
 		'''
-		This method expresses the momentum vector in the rotated coordinate
-		system, which is aligned with the face normal and tangent.
+		work_key = (tuple(shape), np.dtype(dtype))
+		work = self.workspaces.get(work_key)
+		if work is None:
+			nf, nq, ns = shape
+			ndims = ns - 2
+			work = {}
+			for key in ["n_mag", "rhoL_sqrt", "rhoR_sqrt", "rho_sqrt_sum",
+					"rhoRoe", "HL", "HR", "HRoe", "vel2Roe", "c2", "c",
+					"drho", "dp", "tmp1", "tmp2"]:
+				work[key] = np.empty([nf, nq, 1], dtype=dtype)
+			for key in ["n_hat", "velL", "velR", "velRoe", "dvel",
+					"tmp_vec"]:
+				work[key] = np.empty([nf, nq, ndims], dtype=dtype)
+			for key in ["evals", "alphas", "FRoe"]:
+				work[key] = np.empty([nf, nq, ns], dtype=dtype)
+			self.workspaces[work_key] = work
+
+		return work
+
+	def get_unit_normals(self, normals, work):
+		'''
+		This method computes the magnitudes and the unit vectors of the
+		normals.
 
 		Inputs:
 		-------
-			smom: momentum slice
-			Uq: values of the state variable (typically at the quadrature
-				points) [nf, nq, ns]
-			n: normals (typically at the quadrature points) [nf, nq, ndims]
+			normals: normals (typically at the quadrature points)
+				[nf, nq, ndims]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    Uq: momentum terms modified
+		    work["n_mag"]: normal magnitudes [nf, nq, 1]
+		    work["n_hat"]: unit normals [nf, nq, ndims]
 		'''
-		Uq[:, :, smom] *= n
+		n_mag = work["n_mag"]
+		n_hat = work["n_hat"]
 
-		return Uq
+		np.multiply(normals, normals, out=n_hat)
+		np.sum(n_hat, axis=2, keepdims=True, out=n_mag)
+		np.sqrt(n_mag, out=n_mag)
+		np.divide(normals, n_mag, out=n_hat)
 
-	def undo_rotate_coord_sys(self, smom, Uq, n):
+	def get_rotated_velocity(self, physics, Uq, n_hat, vel, work):
 		'''
-		This method expresses the momentum vector in the standard coordinate
-		system. It "undoes" the rotation above.
+		This method computes the velocity in the rotated coordinate system,
+		which is aligned with the face normal and tangent.
 
 		Inputs:
 		-------
-			smom: momentum slice
-			Uq: values of the state variable (typically at the quadrature
+			physics: physics object
+			Uq: values of the state variables (typically at the quadrature
 				points) [nf, nq, ns]
-			n: normals (typically at the quadrature points) [nf, nq, ndims]
+			n_hat: unit normals (typically at the quadrature points)
+				[nf, nq, ndims]
+			vel: array to store the velocity in [nf, nq, ndims]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    Uq: momentum terms modified
+		    vel: rotated velocity [nf, nq, ndims]
+		'''
+		srho = physics.get_state_slice("Density")
+		smom = physics.get_momentum_slice()
+
+		np.multiply(Uq[:, :, smom], n_hat, out=vel)
+		vel /= Uq[:, :, srho]
+
+	def undo_rotate_coord_sys(self, smom, F, n_hat, work):
 		'''
-		Uq[:, :, smom] /= n
+		This method expresses the momentum components of a flux in the
+		standard coordinate system. It "undoes" the rotation above. F is
+		modified in place.
 
-		return Uq
+		Inputs:
+		-------
+			smom: momentum slice
+			F: flux in the rotated coordinate system (typically at the
+				quadrature points) [nf, nq, ns]
+			n_hat: unit normals (typically at the quadrature points)
+				[nf, nq, ndims]
+			work: helper arrays (see get_workspace)
+		'''
+		F[:, :, smom] /= n_hat
 
-	def roe_average_state(self, physics, srho, velL, velR, UqL, UqR):
+	def roe_average_state(self, physics, UqL, UqR, work):
 		'''
-		This method computes the Roe-averaged variables.
+		This method computes the Roe-averaged variables. The velocities in
+		the rotated coordinate system must have been computed.
 
 		Inputs:
 		-------
 			physics: physics object
-			srho: density slice
-			velL: left velocity (typically evaluated at the quadrature
-				points) [nf, nq, ndims]
-			velR: right velocity (typically evaluated at the quadrature
-				points) [nf, nq, ndims]
 			UqL: left state (typically evaluated at the quadrature
 				points) [nf, nq, ns]
 			UqR: right state (typically evaluated at the quadrature
 				points) [nf, nq, ns]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    rhoRoe: Roe-averaged density [nf, nq, 1]
-		    velRoe: Roe-averaged velocity [nf, nq, ndims]
-		    HRoe: Roe-averaged total enthalpy [nf, nq, 1]
+		    work["rhoRoe"]: Roe-averaged density [nf, nq, 1]
+		    work["velRoe"]: Roe-averaged velocity [nf, nq, ndims]
+		    work["HRoe"]: Roe-averaged total enthalpy [nf, nq, 1]
+		    work["vel2Roe"]: squared magnitude of the Roe-averaged
+		    	velocity [nf, nq, 1]
+		'''
+		srho = physics.get_state_slice("Density")
+		srhoE = physics.get_state_slice("Energy")
+		rhoL_sqrt = work["rhoL_sqrt"]
+		rhoR_sqrt = work["rhoR_sqrt"]
+		rho_sqrt_sum = work["rho_sqrt_sum"]
+		HL = work["HL"]
+		HR = work["HR"]
+		velRoe = work["velRoe"]
+		HRoe = work["HRoe"]
+		tmp_vec = work["tmp_vec"]
+
+		np.sqrt(UqL[:, :, srho], out=rhoL_sqrt)
+		np.sqrt(UqR[:, :, srho], out=rhoR_sqrt)
+		np.add(rhoL_sqrt, rhoR_sqrt, out=rho_sqrt_sum)
+
+		# Total enthalpies; the pressures are shared with the fluxes (see
+		# get_primitive_variables)
+		np.add(UqL[:, :, srhoE], physics.get_primitive_variables(UqL)["p"],
+				out=HL)
+		HL /= UqL[:, :, srho]
+		np.add(UqR[:, :, srhoE], physics.get_primitive_variables(UqR)["p"],
+				out=HR)
+		HR /= UqR[:, :, srho]
+
+		np.multiply(rhoL_sqrt, work["velL"], out=velRoe)
+		np.multiply(rhoR_sqrt, work["velR"], out=tmp_vec)
+		velRoe += tmp_vec
+		velRoe /= rho_sqrt_sum
+
+		HL *= rhoL_sqrt
+		HR *= rhoR_sqrt
+		np.add(HL, HR, out=HRoe)
+		HRoe /= rho_sqrt_sum
+
+		np.multiply(rhoL_sqrt, rhoR_sqrt, out=work["rhoRoe"])
+
+		np.multiply(velRoe, velRoe, out=tmp_vec)
+		np.sum(tmp_vec, axis=2, keepdims=True, out=work["vel2Roe"])
+
+	def get_sound_speed(self, physics, work):
 		'''
-		rhoL_sqrt = np.sqrt(UqL[:, :, srho])
-		rhoR_sqrt = np.sqrt(UqR[:, :, srho])
-		HL = physics.compute_variable("TotalEnthalpy", UqL)
-		HR = physics.compute_variable("TotalEnthalpy", UqR)
+		This method computes the speed of sound from the Roe-averaged state.
 
-		velRoe = (rhoL_sqrt*velL + rhoR_sqrt*velR)/(rhoL_sqrt+rhoR_sqrt)
-		HRoe = (rhoL_sqrt*HL + rhoR_sqrt*HR)/(rhoL_sqrt+rhoR_sqrt)
-		rhoRoe = rhoL_sqrt*rhoR_sqrt
+		Inputs:
+		-------
+			physics: physics object
+			work: helper arrays (see get_workspace)
+
+		Outputs:
+		--------
+		    work["c2"]: speed of sound squared [nf, nq, 1]
+		    work["c"]: speed of sound [nf, nq, 1]
+		'''
+		c2 = work["c2"]
 
-		return rhoRoe, velRoe, HRoe
+		np.multiply(0.5, work["vel2Roe"], out=c2)
+		np.subtract(work["HRoe"], c2, out=c2)
+		c2 *= physics.gamma - 1.
+		if np.any(c2 <= 0.):
+			# Non-physical state
+			raise errors.NotPhysicalError
+		np.sqrt(c2, out=work["c"])
 
-	def get_differences(self, physics, srho, velL, velR, UqL, UqR):
+	def get_differences(self, physics, UqL, UqR, work):
 		'''
 		This method computes velocity, density, and pressure jumps.
 
 		Inputs:
 		-------
 			physics: physics object
-			srho: density slice
-			velL: left velocity (typically evaluated at the quadrature
-				points) [nf, nq, ndims]
-			velR: right velocity (typically evaluated at the quadrature
-				points) [nf, nq, ndims]
 			UqL: left state (typically evaluated at the quadrature
 				points) [nf, nq, ns]
 			UqR: right state (typically evaluated at the quadrature
 				points) [nf, nq, ns]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    drho: density jump [nf, nq, 1]
-		    dvel: velocity jump [nf, nq, ndims]
-		    dp: pressure jump [nf, nq, 1]
+		    work["drho"]: density jump [nf, nq, 1]
+		    work["dvel"]: velocity jump [nf, nq, ndims]
+		    work["dp"]: pressure jump [nf, nq, 1]
 		'''
-		dvel = velR - velL
-		drho = UqR[:, :, srho] - UqL[:, :, srho]
-		dp = physics.compute_variable("Pressure", UqR) - \
-				physics.compute_variable("Pressure", UqL)
+		srho = physics.get_state_slice("Density")
 
-		return drho, dvel, dp
+		np.subtract(work["velR"], work["velL"], out=work["dvel"])
+		np.subtract(UqR[:, :, srho], UqL[:, :, srho], out=work["drho"])
+		np.subtract(physics.get_primitive_variables(UqR)["p"],
+				physics.get_primitive_variables(UqL)["p"], out=work["dp"])
 
-	def get_alphas(self, c, c2, dp, dvel, drho, rhoRoe):
+	def get_alphas(self, work):
 		'''
 		This method computes alpha_i = ith left eigenvector * dU.
 
 		Inputs:
 		-------
-			c: speed of sound [nf, nq, 1]
-			c2: speed of sound squared [nf, nq, 1]
-			dp: pressure jump [nf, nq, 1]
-			dvel: velocity jump [nf, nq, ndims]
-			drho: density jump [nf, nq, 1]
-			rhoRoe: Roe-averaged density [nf, nq, 1]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    alphas: left eigenvectors multipled by dU [nf, nq, ns]
+		    work["alphas"]: left eigenvectors multipled by dU [nf, nq, ns]
 		'''
-		alphas = self.alphas
+		alphas = work["alphas"]
+		c2 = work["c2"]
+		dp = work["dp"]
+		tmp1 = work["tmp1"]
+		tmp2 = work["tmp2"]
+
+		# tmp1 = c*rhoRoe*du, tmp2 = 0.5/c2
+		np.multiply(work["c"], work["rhoRoe"], out=tmp1)
+		tmp1 *= work["dvel"][:, :, 0:1]
+		np.divide(0.5, c2, out=tmp2)
+
+		np.subtract(dp, tmp1, out=alphas[:, :, 0:1])
+		alphas[:, :, 0:1] *= tmp2
+		np.add(dp, tmp1, out=alphas[:, :, -1:])
+		alphas[:, :, -1:] *= tmp2
+		np.divide(dp, c2, out=alphas[:, :, 1:2])
+		np.subtract(work["drho"], alphas[:, :, 1:2], out=alphas[:, :, 1:2])
+
+	def get_eigenvalues(self, work):
+		'''
+		This method computes the eigenvalues.
 
-		alphas[:, :, 0:1] = 0.5/c2*(dp - c*rhoRoe*dvel[:, :, 0:1])
-		alphas[:, :, 1:2] = drho - dp/c2
-		alphas[:, :, -1:] = 0.5/c2*(dp + c*rhoRoe*dvel[:, :, 0:1])
+		Inputs:
+		-------
+			work: helper arrays (see get_workspace)
 
-		return alphas
+		Outputs:
+		--------
+		    work["evals"]: eigenvalues [nf, nq, ns]
+		'''
+		evals = work["evals"]
+		u = work["velRoe"][:, :, 0:1]
+		c = work["c"]
+
+		np.subtract(u, c, out=evals[:, :, 0:1])
+		evals[:, :, 1:-1] = u
+		np.add(u, c, out=evals[:, :, -1:])
 
-	def get_eigenvalues(self, velRoe, c):
+	def get_wave_strengths(self, work):
 		'''
-		This method computes the eigenvalues.
+		This method multiplies the alphas by the magnitudes of the
+		eigenvalues. If ENTROPY_FIX is set, Harten's entropy fix is applied
+		to the magnitudes of the eigenvalues.
 
 		Inputs:
 		-------
-			velRoe: Roe-averaged velocity [nf, nq, ndims]
-			c: speed of sound [nf, nq, 1]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    evals: eigenvalues [nf, nq, ns]
+		    work["alphas"]: |eigenvalues|*alphas [nf, nq, ns]
 		'''
-		evals = self.evals
+		abs_evals = work["FRoe"]
+		np.abs(work["evals"], out=abs_evals)
 
-		evals[:, :, 0:1] = velRoe[:, :, 0:1] - c
-		evals[:, :, 1:2] = velRoe[:, :, 0:1]
-		evals[:, :, -1:] = velRoe[:, :, 0:1] + c
+		if self.ENTROPY_FIX is not None:
+			eps = self.ENTROPY_FIX*work["c"]
+			fix = abs_evals < eps
+			if np.any(fix):
+				eps = np.broadcast_to(eps, abs_evals.shape)[fix]
+				abs_evals[fix] = 0.5*(eps + abs_evals[fix]**2/eps)
 
-		return evals
+		work["alphas"] *= abs_evals
 
-	def get_right_eigenvectors(self, c, evals, velRoe, HRoe):
+	def get_dissipation(self, work):
 		'''
-		This method computes the right eigenvectors.
+		This method computes the dissipation term |A| dU = R |Lambda| L dU
+		in closed form from the wave strengths, i.e. without forming the
+		right eigenvector matrix R.
 
 		Inputs:
 		-------
-			c: speed of sound [nf, nq, 1]
-			evals: eigenvalues [nf, nq, ns]
-			velRoe: Roe-averaged velocity [nf, nq, ndims]
-			HRoe: Roe-averaged total enthalpy [nf, nq, 1]
+			work: helper arrays (see get_workspace)
 
 		Outputs:
 		--------
-		    R: right eigenvectors [nf, nq, ns, ns]
+		    work["FRoe"]: dissipation term in the rotated coordinate system
+		    	[nf, nq, ns]
+		'''
+		FRoe = work["FRoe"]
+		w = work["alphas"]
+		evals = work["evals"]
+		u = work["velRoe"][:, :, 0:1]
+		uc = work["tmp1"]
+		tmp = work["tmp2"]
+		np.multiply(u, work["c"], out=uc)
+
+		# First row of R: [1, 1, 1]
+		np.add(w[:, :, 0:1], w[:, :, 1:2], out=FRoe[:, :, 0:1])
+		FRoe[:, :, 0:1] += w[:, :, 2:3]
+		# Second row of R: [u - c, u, u + c]
+		np.multiply(evals[:, :, 0:1], w[:, :, 0:1], out=FRoe[:, :, 1:2])
+		np.multiply(u, w[:, :, 1:2], out=tmp)
+		FRoe[:, :, 1:2] += tmp
+		np.multiply(evals[:, :, 2:3], w[:, :, 2:3], out=tmp)
+		FRoe[:, :, 1:2] += tmp
+		# Last row of R: [H - u*c, 0.5*u^2, H + u*c]
+		self.add_energy_row(work, FRoe[:, :, -1:], uc, tmp, [])
+
+	def add_energy_row(self, work, F, uc, tmp, tangential):
 		'''
-		R = self.R
-
-		# first row
-		R[:, :, 0, 0:2] = 1.; R[:, :, 0, -1] = 1.
-		# second row
-		R[:, :, 1, 0] = evals[:, :, 0]; R[:, :, 1, 1] = velRoe[:, :, 0]
-		R[:, :, 1, -1] = evals[:, :, -1]
-		# last row
-		R[:, :, -1, 0:1] = HRoe - velRoe[:, :, 0:1]*c;
-		R[:, :, -1, 1:2] = 0.5*np.sum(velRoe*velRoe, axis=2, keepdims=True)
-		R[:, :, -1, -1:] = HRoe + velRoe[:, :, 0:1]*c
-
-		return R
-
-	def compute_flux(self, physics, UqL_std, UqR_std, normals):
-		# Reshape arrays
-		n = UqL_std.shape[0]
-		nq = UqL_std.shape[1]
-		ns = UqL_std.shape[2]
-		ndims = ns - 2
-		self.UqL_stdL = np.zeros_like(UqL_std)
-		self.UqL_stdR = np.zeros_like(UqL_std)
-		self.vel = np.zeros([n, nq, ndims])
-		self.alphas = np.zeros_like(UqL_std)
-		self.evals = np.zeros_like(UqL_std)
-		self.R = np.zeros([n, nq, ns, ns])
+		This method computes the energy component of the dissipation term.
+		The last row of R is [H - u*c, 0.5*|u|^2, ..., H + u*c], where the
+		columns of the tangential waves are the tangential velocities.
 
-		# Unpack
-		srho = physics.get_state_slice("Density")
-		smom = physics.get_momentum_slice()
-		gamma = physics.gamma
+		Inputs:
+		-------
+			work: helper arrays (see get_workspace)
+			F: array to store the energy component in [nf, nq, 1]
+			uc: normal velocity times speed of sound [nf, nq, 1]
+			tmp: helper array [nf, nq, 1]
+			tangential: list of (wave index, velocity index) of the
+				tangential waves
 
-		# Unit normals
-		n_mag = np.linalg.norm(normals, axis=2, keepdims=True)
-		n_hat = normals/n_mag
+		Outputs:
+		--------
+		    F: energy component of the dissipation term [nf, nq, 1]
+		'''
+		w = work["alphas"]
+		HRoe = work["HRoe"]
+		velRoe = work["velRoe"]
+
+		np.subtract(HRoe, uc, out=F)
+		F *= w[:, :, 0:1]
+		np.multiply(0.5, work["vel2Roe"], out=tmp)
+		tmp *= w[:, :, 1:2]
+		F += tmp
+		for i, j in tangential:
+			np.multiply(velRoe[:, :, j:j+1], w[:, :, i:i+1], out=tmp)
+			F += tmp
+		np.add(HRoe, uc, out=tmp)
+		tmp *= w[:, :, -1:]
+		F += tmp
+
+	def compute_flux_compiled(self, physics, UqL, UqR, normals):
+		'''
+		This method computes the numerical flux with the kernel of the
+		Numba backend (see euler_kernels).
+
+		Inputs:
+		-------
+			physics: physics object
+			UqL: left states [nf, nq, ns]
+			UqR: right states [nf, nq, ns]
+			normals: normals [nf, nq, ndims]
 
-		# Copy values from standard coordinate system before rotating
-		UqL = UqL_std.copy()
-		UqR = UqR_std.copy()
+		Outputs:
+		--------
+			F: numerical flux [nf, nq, ns]
+		'''
+		entropy_fix = self.ENTROPY_FIX
+		if entropy_fix is None:
+			entropy_fix = -1.
 
-		# Rotated coordinate system
-		UqL = self.rotate_coord_sys(smom, UqL, n_hat)
-		UqR = self.rotate_coord_sys(smom, UqR, n_hat)
+		F = np.empty_like(UqL)
+		if not euler_kernels.get_roe_flux(UqL, UqR, get_broadcast_normals(
+				UqL, normals), physics.gamma, entropy_fix, F):
+			# Non-physical state
+			raise errors.NotPhysicalError
 
-		# Velocities
-		velL = UqL[:, :, smom]/UqL[:, :, srho]
-		velR = UqR[:, :, smom]/UqR[:, :, srho]
+		return F
 
-		# Roe-averaged state
-		rhoRoe, velRoe, HRoe = self.roe_average_state(physics, srho, velL,
-				velR, UqL, UqR)
+	def compute_flux(self, physics, UqL, UqR, normals):
+		if physics.backend is general.BackendType.Numba:
+			return self.compute_flux_compiled(physics, UqL, UqR, normals)
+
+		work = self.get_workspace(UqL.shape, UqL.dtype)
+		smom = physics.get_momentum_slice()
+
+		# Unit normals
+		self.get_unit_normals(normals, work)
+		n_mag = work["n_mag"]
+		n_hat = work["n_hat"]
+
+		# Velocities in the rotated coordinate system
+		self.get_rotated_velocity(physics, UqL, n_hat, work["velL"], work)
+		self.get_rotated_velocity(physics, UqR, n_hat, work["velR"], work)
+
+		# Roe-averaged state. Density, pressure, and enthalpy do not depend
+		# on the coordinate system, so they are evaluated from the standard
+		# states, whose primitive variables are shared with the fluxes
+		# below (see get_primitive_variables).
+		self.roe_average_state(physics, UqL, UqR, work)
 
 		# Speed of sound from Roe-averaged state
-		c2 = (gamma - 1.)*(HRoe - 0.5*np.sum(velRoe*velRoe, axis=2,
-				keepdims=True))
-		if np.any(c2 <= 0.):
-			# Non-physical state
-			raise errors.NotPhysicalError
-		c = np.sqrt(c2)
+		self.get_sound_speed(physics, work)
 
 		# Jumps
-		drho, dvel, dp = self.get_differences(physics, srho, velL, velR,
-				UqL, UqR)
+		self.get_differences(physics, UqL, UqR, work)
 
 		# alphas (left eigenvectors multiplied by dU)
-		alphas = self.get_alphas(c, c2, dp, dvel, drho, rhoRoe)
+		self.get_alphas(work)
 
 		# Eigenvalues
-		evals = self.get_eigenvalues(velRoe, c)
-		
-		# Entropy fix (currently commented as we have yet to decide
-		# if this is needed long term)
-		# eps = np.zeros_like(evals)
-		# eps[:, :, :] = (1e-2 * c)
-		# fix = np.argwhere(np.logical_and(evals < eps, evals > -eps))
-		# fix_shape = fix[:, 0], fix[:, 1], fix[:, 2]
-		# evals[fix_shape] = 0.5 * (eps[fix_shape] + evals[fix_shape]* \
-		# 	evals[fix_shape] / eps[fix_shape])
-		
-		# Right eigenvector matrix
-		R = self.get_right_eigenvectors(c, evals, velRoe, HRoe)
+		self.get_eigenvalues(work)
+
+		# Multiply alphas by |eigenvalues| (with the optional entropy fix)
+		self.get_wave_strengths(work)
 
 		# Form flux Jacobian matrix multiplied by dU
-		FRoe = np.einsum('ijkl, ijl -> ijk', R, np.abs(evals)*alphas)
+		self.get_dissipation(work)
+		FRoe = work["FRoe"]
 
 		# Undo rotation
-		FRoe = self.undo_rotate_coord_sys(smom, FRoe, n_hat)
+		self.undo_rotate_coord_sys(smom, FRoe, n_hat, work)
 
-		# Left flux
-		FL, _ = physics.get_conv_flux_projected(UqL_std, n_hat)
+		# Left and right fluxes
+		F, _ = physics.get_conv_flux_projected(UqL, n_hat)
+		FR, _ = physics.get_conv_flux_projected(UqR, n_hat)
 
-		# Right flux
-		FR, _ = physics.get_conv_flux_projected(UqR_std, n_hat)
+		# Put together in place
+		F += FR
+		F -= FRoe
+		tmp = work["tmp1"]
+		np.multiply(.5, n_mag, out=tmp)
+		F *= tmp
 
-		return .5*n_mag*(FL + FR - FRoe) # [nf, nq, ns]
+		return F # [nf, nq, ns]
 
 
 class Roe2D(Roe1D):
@@ -1313,62 +1519,92 @@ class Roe2D(Roe1D):
 	In this class, several methods are updated to account for the extra
 	dimension.
 	'''
-	def rotate_coord_sys(self, smom, Uq, n):
-		vel = self.vel
-		vel[:] = Uq[:, :, smom]
-
-		vel[:, :, 0] = np.sum(Uq[:, :, smom]*n, axis=2)
-		vel[:, :, 1] = np.sum(Uq[:, :, smom]*n[:, :, ::-1]*np.array([[-1.,
-				1.]]), axis=2)
-
-		Uq[:, :, smom] = vel
-
-		return Uq
-
-	def undo_rotate_coord_sys(self, smom, Uq, n):
-		vel = self.vel
-		vel[:] = Uq[:, :, smom]
-
-		vel[:, :, 0] = np.sum(Uq[:, :, smom]*n*np.array([[1., -1.]]), axis=2)
-		vel[:, :, 1] = np.sum(Uq[:, :, smom]*n[:, :, ::-1], axis=2)
-
-		Uq[:, :, smom] = vel
-
-		return Uq
-
-	def get_alphas(self, c, c2, dp, dvel, drho, rhoRoe):
-		alphas = self.alphas
-
-		alphas = super().get_alphas(c, c2, dp, dvel, drho, rhoRoe)
-
-		alphas[:, :, 2:3] = rhoRoe*dvel[:, :, -1:]
-
-		return alphas
-
-	def get_eigenvalues(self, velRoe, c):
-		evals = self.evals
-
-		evals = super().get_eigenvalues(velRoe, c)
-
-		evals[:, :, 2:3] = velRoe[:, :, 0:1]
-
-		return evals
-
-	def get_right_eigenvectors(self, c, evals, velRoe, HRoe):
-		R = self.R
-
-		R = super().get_right_eigenvectors(c, evals, velRoe, HRoe)
-
-		i = 2
+	def get_rotated_velocity(self, physics, Uq, n_hat, vel, work):
+		srho = physics.get_state_slice("Density")
+		smom = physics.get_momentum_slice()
+		ru = Uq[:, :, smom][:, :, 0:1]
+		rv = Uq[:, :, smom][:, :, 1:2]
+		nx = n_hat[:, :, 0:1]
+		ny = n_hat[:, :, 1:2]
+		tmp = work["tmp1"]
+
+		# Normal component
+		np.multiply(ru, nx, out=vel[:, :, 0:1])
+		np.multiply(rv, ny, out=tmp)
+		vel[:, :, 0:1] += tmp
+		# Tangential component
+		np.multiply(rv, nx, out=vel[:, :, 1:2])
+		np.multiply(ru, ny, out=tmp)
+		vel[:, :, 1:2] -= tmp
+
+		vel /= Uq[:, :, srho]
+
+	def undo_rotate_coord_sys(self, smom, F, n_hat, work):
+		Fn = work["tmp1"]
+		Ft = work["tmp2"]
+		nx = n_hat[:, :, 0:1]
+		ny = n_hat[:, :, 1:2]
+		Fn[:] = F[:, :, smom][:, :, 0:1]
+		Ft[:] = F[:, :, smom][:, :, 1:2]
+		Fx = F[:, :, smom][:, :, 0:1]
+		Fy = F[:, :, smom][:, :, 1:2]
+
+		# Fx = Fn*nx - Ft*ny, Fy = Fn*ny + Ft*nx
+		np.multiply(Fn, nx, out=Fx)
+		np.multiply(Fn, ny, out=Fy)
+		np.multiply(Ft, ny, out=Fn)
+		Fx -= Fn
+		Ft *= nx
+		Fy += Ft
+
+	def get_alphas(self, work):
+		super().get_alphas(work)
+
+		alphas = work["alphas"]
+		np.multiply(work["rhoRoe"], work["dvel"][:, :, -1:],
+				out=alphas[:, :, 2:3])
+
+	def get_dissipation(self, work):
+		FRoe = work["FRoe"]
+		w = work["alphas"]
+		evals = work["evals"]
+		u = work["velRoe"][:, :, 0:1]
+		v = work["velRoe"][:, :, 1:2]
+		uc = work["tmp1"]
+		tmp = work["tmp2"]
+		np.multiply(u, work["c"], out=uc)
+
+		# First row of R: [1, 1, 0, 1]
+		np.add(w[:, :, 0:1], w[:, :, 1:2], out=FRoe[:, :, 0:1])
+		FRoe[:, :, 0:1] += w[:, :, 3:4]
+		# Second row of R: [u - c, u, 0, u + c]
+		np.multiply(evals[:, :, 0:1], w[:, :, 0:1], out=FRoe[:, :, 1:2])
+		np.multiply(u, w[:, :, 1:2], out=tmp)
+		FRoe[:, :, 1:2] += tmp
+		np.multiply(evals[:, :, 3:4], w[:, :, 3:4], out=tmp)
+		FRoe[:, :, 1:2] += tmp
+		# Third row of R: [v, v, 1, v]
+		np.multiply(v, w[:, :, 0:1], out=FRoe[:, :, 2:3])
+		np.multiply(v, w[:, :, 1:2], out=tmp)
+		FRoe[:, :, 2:3] += tmp
+		FRoe[:, :, 2:3] += w[:, :, 2:3]
+		np.multiply(v, w[:, :, 3:4], out=tmp)
+		FRoe[:, :, 2:3] += tmp
+		# Last row of R: [H - u*c, 0.5*|u|^2, v, H + u*c]
+		self.add_energy_row(work, FRoe[:, :, -1:], uc, tmp, [(2, 1)])
+
+
+class RoeEntropyFix1D(Roe1D):
+	'''
+	1D Roe numerical flux with Harten's entropy fix, which prevents
+	expansion shocks at sonic points. See Roe1D.
+	'''
+	ENTROPY_FIX = 1e-2
 
-		# First row
-		R[:, :, 0, i] = 0.
-		#  Second row
-		R[:, :, 1, i] = 0.
-		#  Last (fourth) row
-		R[:, :, -1, i] = velRoe[:, :, -1]
-		#  Third row
-		R[:, :, i, 0] = velRoe[:, :, -1];  R[:, :, i, 1] = velRoe[:, :, -1]
-		R[:, :, i, -1] = velRoe[:, :, -1]; R[:, :, i, i] = 1.
 
-		return R
\ No newline at end of file
+class RoeEntropyFix2D(Roe2D):
+	'''
+	2D Roe numerical flux with Harten's entropy fix, which prevents
+	expansion shocks at sonic points. See Roe2D.
+	'''
+	ENTROPY_FIX = 1e-2
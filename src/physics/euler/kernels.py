@@ -0,0 +1,328 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/physics/euler/kernels.py
+#
+#       Contains the kernels of the Numba backend (see
+#       general.BackendType) for the Euler equations: the analytical
+#       convective flux and the Lax-Friedrichs and Roe numerical fluxes.
+#       Each kernel is a fused loop over the points that evaluates the
+#       same operations, in the same order, as the NumPy implementation,
+#       so that both backends agree to round-off. The state variables are
+#       ordered as [rho, rho*u, (rho*v), rho*E]. Outputs are passed in as
+#       preallocated arrays.
+#
+# ------------------------------------------------------------------------ #
+import math
+import numpy as np
+
+from external.optional_numba import njit
+
+
+@njit
+def get_conv_flux_interior(Uq, gamma, F, vel2, p):
+	'''
+	This kernel computes the analytical convective flux (see
+	Euler1D/Euler2D.get_conv_flux_interior).
+
+	Inputs:
+	-------
+		Uq: values of the state variables [n, nq, ns]
+		gamma: specific heat ratio
+
+	Outputs:
+	--------
+		F: analytical flux [n, nq, ns, ndims]
+		vel2: squared velocity components [n, nq, ndims]
+		p: pressure [n, nq]
+	'''
+	n, nq, ns = Uq.shape
+	ndims = ns - 2
+	irhoE = ns - 1
+
+	for i in range(n):
+		for j in range(nq):
+			rho = Uq[i, j, 0]
+			rhoE = Uq[i, j, irhoE]
+			mom2 = 0.
+			for d in range(ndims):
+				mom2 += Uq[i, j, 1 + d]*Uq[i, j, 1 + d]
+			pq = (gamma - 1.)*(rhoE - 0.5*mom2/rho)
+			H = rhoE + pq
+			p[i, j] = pq
+
+			u = Uq[i, j, 1]/rho
+			vel2[i, j, 0] = u*u
+			F[i, j, 0, 0] = Uq[i, j, 1]
+			F[i, j, 1, 0] = rho*(u*u) + pq
+			F[i, j, irhoE, 0] = H*u
+			if ndims == 2:
+				v = Uq[i, j, 2]/rho
+				rhouv = rho*u*v
+				vel2[i, j, 1] = v*v
+				F[i, j, 0, 1] = Uq[i, j, 2]
+				F[i, j, 2, 0] = rhouv
+				F[i, j, 1, 1] = rhouv
+				F[i, j, 2, 1] = rho*(v*v) + pq
+				F[i, j, irhoE, 1] = H*v
+
+
+@njit
+def get_projected_flux(Uq, i, j, gamma, n_hat, Fn):
+	'''
+	This kernel computes the analytical convective flux at a point
+	projected in the direction of a unit normal, as well as the maximum
+	wave speed.
+
+	Inputs:
+	-------
+		Uq: values of the state variables [nf, nq, ns]
+		i, j: indices of the point
+		gamma: specific heat ratio
+		n_hat: unit normal [ndims]
+
+	Outputs:
+	--------
+		Fn: projected flux [ns]
+		a: maximum wave speed |u| + c (returned)
+	'''
+	ns = Uq.shape[2]
+	ndims = ns - 2
+	irhoE = ns - 1
+
+	rho = Uq[i, j, 0]
+	rhoE = Uq[i, j, irhoE]
+	mom2 = 0.
+	for d in range(ndims):
+		mom2 += Uq[i, j, 1 + d]*Uq[i, j, 1 + d]
+	pq = (gamma - 1.)*(rhoE - 0.5*mom2/rho)
+	H = rhoE + pq
+
+	u = Uq[i, j, 1]/rho
+	if ndims == 1:
+		Fn[0] = Uq[i, j, 1]*n_hat[0]
+		Fn[1] = (rho*(u*u) + pq)*n_hat[0]
+		Fn[irhoE] = (H*u)*n_hat[0]
+		vel2 = u*u
+	else:
+		v = Uq[i, j, 2]/rho
+		rhouv = rho*u*v
+		Fn[0] = Uq[i, j, 1]*n_hat[0] + Uq[i, j, 2]*n_hat[1]
+		Fn[1] = (rho*(u*u) + pq)*n_hat[0] + rhouv*n_hat[1]
+		Fn[2] = rhouv*n_hat[0] + (rho*(v*v) + pq)*n_hat[1]
+		Fn[irhoE] = (H*u)*n_hat[0] + (H*v)*n_hat[1]
+		vel2 = u*u + v*v
+
+	return math.sqrt(vel2) + math.sqrt(gamma*pq/rho)
+
+
+@njit
+def get_unit_normal(normals, i, j, n_hat):
+	'''
+	This kernel computes the magnitude and the unit vector of a normal.
+
+	Inputs:
+	-------
+		normals: normals [nf, nq, ndims]
+		i, j: indices of the point
+
+	Outputs:
+	--------
+		n_hat: unit normal [ndims]
+		n_mag: magnitude of the normal (returned)
+	'''
+	ndims = normals.shape[2]
+	n_mag = 0.
+	for d in range(ndims):
+		n_mag += normals[i, j, d]*normals[i, j, d]
+	n_mag = math.sqrt(n_mag)
+	for d in range(ndims):
+		n_hat[d] = normals[i, j, d]/n_mag
+
+	return n_mag
+
+
+@njit
+def get_lax_friedrichs_flux(UqL, UqR, normals, gamma, F):
+	'''
+	This kernel computes the local Lax-Friedrichs flux (see
+	LaxFriedrichs1D/LaxFriedrichs2D).
+
+	Inputs:
+	-------
+		UqL: left states [nf, nq, ns]
+		UqR: right states [nf, nq, ns]
+		normals: normals [nf, nq, ndims]
+		gamma: specific heat ratio
+
+	Outputs:
+	--------
+		F: numerical flux [nf, nq, ns]
+	'''
+	nf, nq, ns = UqL.shape
+	ndims = ns - 2
+	n_hat = np.empty(ndims)
+	FnL = np.empty(ns)
+	FnR = np.empty(ns)
+
+	for i in range(nf):
+		for j in range(nq):
+			n_mag = get_unit_normal(normals, i, j, n_hat)
+			aL = get_projected_flux(UqL, i, j, gamma, n_hat, FnL)
+			aR = get_projected_flux(UqR, i, j, gamma, n_hat, FnR)
+			a = aR if aR > aL else aL
+
+			for k in range(ns):
+				F[i, j, k] = 0.5*n_mag*(FnL[k] + FnR[k] - a*(UqR[i, j, k]
+						- UqL[i, j, k]))
+
+
+@njit
+def get_roe_flux(UqL, UqR, normals, gamma, entropy_fix, F):
+	'''
+	This kernel computes the Roe flux (see Roe1D/Roe2D). The dissipation
+	term is evaluated in the coordinate system aligned with the normal.
+
+	Inputs:
+	-------
+		UqL: left states [nf, nq, ns]
+		UqR: right states [nf, nq, ns]
+		normals: normals [nf, nq, ndims]
+		gamma: specific heat ratio
+		entropy_fix: coefficient of Harten's entropy fix; no fix if
+			negative
+
+	Outputs:
+	--------
+		F: numerical flux [nf, nq, ns]
+		physical: False if the Roe-averaged speed of sound is not real
+			(returned)
+	'''
+	nf, nq, ns = UqL.shape
+	ndims = ns - 2
+	irhoE = ns - 1
+	n_hat = np.empty(ndims)
+	FnL = np.empty(ns)
+	FnR = np.empty(ns)
+	velL = np.empty(ndims)
+	velR = np.empty(ndims)
+	velRoe = np.empty(ndims)
+	w = np.empty(ns)
+	evals = np.empty(ns)
+	FRoe = np.empty(ns)
+
+	for i in range(nf):
+		for j in range(nq):
+			n_mag = get_unit_normal(normals, i, j, n_hat)
+
+			# Velocities in the rotated coordinate system
+			rhoL = UqL[i, j, 0]
+			rhoR = UqR[i, j, 0]
+			if ndims == 1:
+				velL[0] = UqL[i, j, 1]*n_hat[0]/rhoL
+				velR[0] = UqR[i, j, 1]*n_hat[0]/rhoR
+			else:
+				velL[0] = (UqL[i, j, 1]*n_hat[0] + UqL[i, j, 2]*n_hat[1]
+						)/rhoL
+				velL[1] = (UqL[i, j, 2]*n_hat[0] - UqL[i, j, 1]*n_hat[1]
+						)/rhoL
+				velR[0] = (UqR[i, j, 1]*n_hat[0] + UqR[i, j, 2]*n_hat[1]
+						)/rhoR
+				velR[1] = (UqR[i, j, 2]*n_hat[0] - UqR[i, j, 1]*n_hat[1]
+						)/rhoR
+
+			# Pressures and total enthalpies
+			mom2L = 0.
+			mom2R = 0.
+			for d in range(ndims):
+				mom2L += UqL[i, j, 1 + d]*UqL[i, j, 1 + d]
+				mom2R += UqR[i, j, 1 + d]*UqR[i, j, 1 + d]
+			pL = (gamma - 1.)*(UqL[i, j, irhoE] - 0.5*mom2L/rhoL)
+			pR = (gamma - 1.)*(UqR[i, j, irhoE] - 0.5*mom2R/rhoR)
+			HL = (UqL[i, j, irhoE] + pL)/rhoL
+			HR = (UqR[i, j, irhoE] + pR)/rhoR
+
+			# Roe-averaged state
+			rhoL_sqrt = math.sqrt(rhoL)
+			rhoR_sqrt = math.sqrt(rhoR)
+			rho_sqrt_sum = rhoL_sqrt + rhoR_sqrt
+			vel2Roe = 0.
+			for d in range(ndims):
+				velRoe[d] = (rhoL_sqrt*velL[d] + rhoR_sqrt*velR[d]
+						)/rho_sqrt_sum
+				vel2Roe += velRoe[d]*velRoe[d]
+			HRoe = (HL*rhoL_sqrt + HR*rhoR_sqrt)/rho_sqrt_sum
+			rhoRoe = rhoL_sqrt*rhoR_sqrt
+			u = velRoe[0]
+
+			# Speed of sound
+			c2 = (HRoe - 0.5*vel2Roe)*(gamma - 1.)
+			if c2 <= 0.:
+				return False
+			c = math.sqrt(c2)
+
+			# alphas (left eigenvectors multiplied by dU)
+			dp = pR - pL
+			tmp1 = c*rhoRoe*(velR[0] - velL[0])
+			tmp2 = 0.5/c2
+			w[0] = (dp - tmp1)*tmp2
+			w[1] = (rhoR - rhoL) - dp/c2
+			if ndims == 2:
+				w[2] = rhoRoe*(velR[1] - velL[1])
+			w[irhoE] = (dp + tmp1)*tmp2
+
+			# Eigenvalues
+			evals[0] = u - c
+			for k in range(1, ns - 1):
+				evals[k] = u
+			evals[irhoE] = u + c
+
+			# Multiply alphas by |eigenvalues| (with the entropy fix)
+			eps = entropy_fix*c
+			for k in range(ns):
+				abs_eval = abs(evals[k])
+				if abs_eval < eps:
+					abs_eval = 0.5*(eps + abs_eval*abs_eval/eps)
+				w[k] *= abs_eval
+
+			# Dissipation term (rows of the right eigenvector matrix)
+			uc = u*c
+			FRoe[0] = w[0] + w[1] + w[irhoE]
+			FRoe[1] = evals[0]*w[0] + u*w[1] + evals[irhoE]*w[irhoE]
+			FRoe[irhoE] = (HRoe - uc)*w[0] + 0.5*vel2Roe*w[1]
+			if ndims == 2:
+				v = velRoe[1]
+				FRoe[2] = v*w[0] + v*w[1] + w[2] + v*w[irhoE]
+				FRoe[irhoE] += v*w[2]
+			FRoe[irhoE] += (HRoe + uc)*w[irhoE]
+
+			# Undo rotation
+			if ndims == 1:
+				FRoe[1] /= n_hat[0]
+			else:
+				Fn = FRoe[1]
+				Ft = FRoe[2]
+				FRoe[1] = Fn*n_hat[0] - Ft*n_hat[1]
+				FRoe[2] = Fn*n_hat[1] + Ft*n_hat[0]
+
+			# Put together
+			get_projected_flux(UqL, i, j, gamma, n_hat, FnL)
+			get_projected_flux(UqR, i, j, gamma, n_hat, FnR)
+			for k in range(ns):
+				F[i, j, k] = (FnL[k] + FnR[k] - FRoe[k])*(0.5*n_mag)
+
+	return True
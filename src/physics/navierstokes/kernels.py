@@ -0,0 +1,67 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/physics/navierstokes/kernels.py
+#
+#       Contains the kernels of the Numba backend (see
+#       general.BackendType) for the transport properties of the
+#       Navier-Stokes equations. See physics/euler/kernels.py.
+#
+# ------------------------------------------------------------------------ #
+from external.optional_numba import njit
+
+
+@njit
+def get_sutherland_transport(Uq, gamma, R, Pr, mu0, s, T0, beta, mu,
+		kappa):
+	'''
+	This kernel computes the viscosity and thermal conductivity using
+	Sutherland's law (see tools.get_sutherland_transport).
+
+	Inputs:
+	-------
+		Uq: values of the state variables [ne, nq, ns]
+		gamma: specific heat ratio
+		R: mass-specific gas constant
+		Pr: Prandtl number
+		mu0: reference viscosity
+		s: Sutherland temperature
+		T0: reference temperature
+		beta: temperature exponent
+
+	Outputs:
+	--------
+		mu: viscosity [ne, nq, 1]
+		kappa: thermal conductivity [ne, nq, 1]
+	'''
+	ne, nq, ns = Uq.shape
+	irhoE = ns - 1
+	cv = 1./(gamma - 1)*R
+
+	for i in range(ne):
+		for j in range(nq):
+			rho = Uq[i, j, 0]
+			mom2 = 0.
+			for d in range(1, irhoE):
+				mom2 += Uq[i, j, d]*Uq[i, j, d]
+			p = (gamma - 1.)*(Uq[i, j, irhoE] - 0.5*mom2/rho)
+			T = p/(rho*R)
+
+			muq = mu0*(T/T0)**beta*((T0 + s)/(T + s))
+			mu[i, j, 0] = muq
+			kappa[i, j, 0] = muq*cv*gamma/Pr
@@ -128,7 +128,6 @@ class NavierStokes1D(NavierStokes, euler.Euler1D):
 
 		# Unpack state coefficients
 		rho  = Uq[:, :, irho]  # [n, nq]
-		rhou = Uq[:, :, irhou] # [n, nq]
 		rhoE = Uq[:, :, irhoE] # [n, nq]
 		mom  = Uq[:, :, smom]  # [n, nq, ndims]
 
@@ -149,8 +148,9 @@ class NavierStokes1D(NavierStokes, euler.Euler1D):
 		# Separate x gradient
 		gUx = gUq[:, :, :, 0] # [ne, nq, ns]
 
-		# Get velocity
-		u = rhou / rho
+		# Get velocity (shared with the convective flux, see
+		# get_primitive_variables)
+		u = self.get_primitive_variables(Uq)["vel"][:, :, 0]
 		
 		# Get E
 		E = rhoE / rho
@@ -221,8 +221,6 @@ class NavierStokes2D(NavierStokes, euler.Euler2D):
 
 		# Unpack state coefficients
 		rho  = Uq[:, :, irho]  # [n, nq]
-		rhou = Uq[:, :, irhou] # [n, nq]
-		rhov = Uq[:, :, irhov] # [n, nq]
 		rhoE = Uq[:, :, irhoE] # [n, nq]
 		mom  = Uq[:, :, smom]  # [n, nq, ndims]
 
@@ -244,9 +242,11 @@ class NavierStokes2D(NavierStokes, euler.Euler2D):
 		gUx = gUq[:, :, :, 0] # [ne, nq, ns]
 		gUy = gUq[:, :, :, 1] # [ne, nq, ns]
 
-		# Get velocity in each dimension
-		u = rhou / rho
-		v = rhov / rho
+		# Get velocity in each dimension (shared with the convective flux,
+		# see get_primitive_variables)
+		vel = self.get_primitive_variables(Uq)["vel"]
+		u = vel[:, :, 0]
+		v = vel[:, :, 1]
 		
 		# Get E
 		E = rhoE / rho
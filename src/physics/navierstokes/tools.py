@@ -22,7 +22,8 @@
 #
 # ------------------------------------------------------------------------ #
 import numpy as np
-from general import TransportType
+from general import BackendType, TransportType
+import physics.navierstokes.kernels as ns_kernels
 
 
 def set_transport(transport_type):
@@ -101,10 +102,18 @@ def get_sutherland_transport(physics, Uq, flag_non_physical=None):
 	T0 = physics.T0
 	beta = physics.beta
 
+	mu0 = 0.1; s = 1.; T0 = 1.; beta = 1.5;
+
+	if physics.backend is BackendType.Numba and not flag_non_physical:
+		mu = np.empty(Uq.shape[:2] + (1,))
+		kappa = np.empty_like(mu)
+		ns_kernels.get_sutherland_transport(Uq, gamma, R, Pr, mu0, s, T0,
+				beta, mu, kappa)
+		return mu, kappa
+
 	T = physics.compute_variable("Temperature",
 			Uq, flag_non_physical=flag_non_physical)
 
-	mu0 = 0.1; s = 1.; T0 = 1.; beta = 1.5;
 	cv = 1./(gamma - 1) * R
 
 	mu = mu0 * (T / T0)**beta * ((T0 + s) / (T + s))
@@ -97,7 +97,7 @@ class ConstAdvScalar(base.PhysicsBase):
 
 		if sname is self.AdditionalVariables["MaxWaveSpeed"].name:
 			# Max wave speed is the advection speed
-			scalar = np.full([Uq.shape[0], 1, 1], self.cspeed)
+			scalar = np.zeros([Uq.shape[0], 1, 1]) + self.cspeed
 		else:
 			raise NotImplementedError
 
@@ -193,7 +193,8 @@ class ConstAdvScalar2D(ConstAdvScalar):
 	def get_conv_flux_interior(self, Uq):
 		c = self.c
 
-		F = np.empty(Uq.shape + (self.NDIMS,)) # [n, nq, ns, ndims]
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+			# [n, nq, ns, ndims]
 		F[:, :, :, 0] = c[0] * Uq
 		F[:, :, :, 1] = c[1] * Uq
 
@@ -260,7 +261,7 @@ class ConstAdvDiffScalar(base.PhysicsBase):
 
 		if sname is self.AdditionalVariables["MaxWaveSpeed"].name:
 			# Max wave speed is the advection speed
-			scalar = np.full([Uq.shape[0], 1, 1], self.cspeed)
+			scalar = np.zeros([Uq.shape[0], 1, 1]) + self.cspeed
 		else:
 			raise NotImplementedError
 
@@ -362,7 +363,8 @@ class ConstAdvDiffScalar2D(ConstAdvDiffScalar):
 	def get_conv_flux_interior(self, Uq):
 		c = self.c
 
-		F = np.empty(Uq.shape + (self.NDIMS,)) # [n, nq, ns, ndims]
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+			# [n, nq, ns, ndims]
 		F[:, :, :, 0] = c[0] * Uq
 		F[:, :, :, 1] = c[1] * Uq
 
@@ -371,7 +373,8 @@ class ConstAdvDiffScalar2D(ConstAdvDiffScalar):
 	def get_diff_flux_interior(self, Uq, gUq):
 		al = self.al
 		
-		F = np.empty(Uq.shape + (self.NDIMS,)) # [n, nq, ns, ndims]
+		F = np.empty(Uq.shape + (self.NDIMS,), dtype=Uq.dtype)
+			# [n, nq, ns, ndims]
 
 		F[:, :, :, 0] = al[0] * gUq[:, :, :, 0]
 		F[:, :, :, 1] = al[1] * gUq[:, :, :, 1]
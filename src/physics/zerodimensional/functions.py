@@ -223,38 +223,46 @@ class Mixing(SourceBase):
 
 	def get_source(self, physics, Uq, x, t):
 		# Unpack T and Y
-		S = np.zeros([Uq.shape[0], Uq.shape[1], physics.NUM_STATE_VARS])
-		# Loop over quadrature points
-		for i in range(Uq.shape[1]):
-			T = Uq[0, i, 0]
-			y = Uq[0, i, 1:]
-
-			tau = physics.tau
-			gas = physics.gas
-			gas.set_unnormalized_mass_fractions(y)
-
-			gas.TPY = T, physics.P, y
-
-			rho = gas.density
-			wdot = gas.net_production_rates
-			h_hat = gas.partial_molar_enthalpies
-			cp = gas.cp_mass
-
-			mw = gas.molecular_weights
+		T = Uq[:, :, 0]
+		y = Uq[:, :, 1:]
+		tau = physics.tau
+		yin = physics.yin[1:]
+		mech = physics.mechanism
+		mw = mech.molecular_weights
 
-			dTdt = (1./(tau*cp)) * np.dot(physics.yin[1:], 
-					(physics.hin/mw - h_hat/mw))
-			dYdt = (1./tau) * (physics.yin[1:] - y)
+		cp_k, h_hat, _ = mech.get_species_thermo(T)
+		cp = np.sum(y*cp_k/mw, axis=-1)
 
-			S[:, i] = np.hstack((dTdt, dYdt))
+		S = np.zeros_like(Uq)
+		S[:, :, 0] = (1./(tau*cp)) * np.sum(yin*(physics.hin - h_hat)/mw,
+				axis=-1)
+		S[:, :, 1:] = (1./tau) * (yin - y)
 
-		return S # [1, nq, ns]
+		return S # [ne, nq, ns]
 
 	def get_jacobian(self, physics, Uq, x, t):
-		
-		jac = get_numerical_jacobian(self, physics, Uq, x, t)
+		# Unpack T and Y
+		T = Uq[:, :, 0]
+		y = Uq[:, :, 1:]
+		tau = physics.tau
+		yin = physics.yin[1:]
+		mech = physics.mechanism
+		mw = mech.molecular_weights
+		nsp = mw.shape[0]
+
+		cp_k, h_hat, dcp_k_dT = mech.get_species_thermo(T)
+		cp = np.sum(y*cp_k/mw, axis=-1)
+		dcp_dT = np.sum(y*dcp_k_dT/mw, axis=-1)
+		dTdt = (1./(tau*cp)) * np.sum(yin*(physics.hin - h_hat)/mw,
+				axis=-1)
+
+		jac = np.zeros([Uq.shape[0], Uq.shape[1], nsp + 1, nsp + 1])
+		jac[:, :, 0, 0] = -np.sum(yin*cp_k/mw, axis=-1)/(tau*cp) - \
+				dTdt*dcp_dT/cp
+		jac[:, :, 0, 1:] = -np.expand_dims(dTdt/cp, axis=-1)*cp_k/mw
+		jac[:, :, 1:, 1:] = -np.eye(nsp)/tau
 
-		return jac # [1, nq, ns, ns]
+		return jac # [ne, nq, ns, ns]
 
 
 class Reacting(SourceBase):
@@ -266,79 +274,55 @@ class Reacting(SourceBase):
 
 	def get_source(self, physics, Uq, x, t):
 		# Unpack T and Y
-		S = np.zeros([Uq.shape[0], Uq.shape[1], physics.NUM_STATE_VARS])
-		for i in range(Uq.shape[1]):
-			T = Uq[0,i,0]
-			y = Uq[0,i,1:]
-
-			tau = physics.tau
-			gas = physics.gas
-			gas.set_unnormalized_mass_fractions(y)
-
-			gas.TPY = T, physics.P, y
-
-			rho = gas.density
-			wdot = gas.net_production_rates
-			h_hat = gas.partial_molar_enthalpies
-			cp = gas.cp_mass
-
-			mw = gas.molecular_weights
+		T = Uq[:, :, 0]
+		y = Uq[:, :, 1:]
+		P = physics.P
+		mech = physics.mechanism
+		mw = mech.molecular_weights
 
-			dTdt = -1.*np.dot(h_hat, wdot) * (1./ (rho*cp))
-			dYdt = wdot * mw / rho
+		rho = mech.get_density(T, P, y)
+		wdot = mech.get_net_production_rates(T, P, y)
+		cp_k, h_hat, _ = mech.get_species_thermo(T)
+		cp = np.sum(y*cp_k/mw, axis=-1)
 
-			S[:, i] = np.hstack((dTdt, dYdt))
+		S = np.zeros_like(Uq)
+		S[:, :, 0] = -1.*np.sum(h_hat*wdot, axis=-1) * (1./(rho*cp))
+		S[:, :, 1:] = wdot * mw / np.expand_dims(rho, axis=-1)
 
-		return S # [1, nq, ns]
+		return S # [ne, nq, ns]
 
 	def get_jacobian(self, physics, Uq, x, t):
-		jac = get_numerical_jacobian(self, physics, Uq, x, t)
+		# Unpack T and Y
+		T = Uq[:, :, 0]
+		y = Uq[:, :, 1:]
+		P = physics.P
+		mech = physics.mechanism
+		mw = mech.molecular_weights
+		nsp = mw.shape[0]
+
+		rho = mech.get_density(T, P, y)
+		mmw = mech.get_mean_molecular_weight(y)
+		wdot, dwdot_dT, dwdot_dY = mech.get_net_production_rates(T, P, y,
+				get_jacobian=True)
+		cp_k, h_hat, dcp_k_dT = mech.get_species_thermo(T)
+		cp = np.sum(y*cp_k/mw, axis=-1)
+		dcp_dT = np.sum(y*dcp_k_dT/mw, axis=-1)
+		dTdt = -1.*np.sum(h_hat*wdot, axis=-1) * (1./(rho*cp))
+
+		# The derivatives of rho are drho/dT = -rho/T and
+		# drho/dY_j = -rho*mmw/mw_j
+		jac = np.zeros([Uq.shape[0], Uq.shape[1], nsp + 1, nsp + 1])
+		jac[:, :, 0, 0] = -np.sum(cp_k*wdot + h_hat*dwdot_dT, axis=-1)/ \
+				(rho*cp) - dTdt*(dcp_dT/cp - 1./T)
+		jac[:, :, 0, 1:] = -np.einsum('ijk, ijkl -> ijl', h_hat,
+				dwdot_dY)/np.expand_dims(rho*cp, axis=-1) - \
+				np.expand_dims(dTdt, axis=-1)*(cp_k/np.expand_dims(cp,
+				axis=-1) - np.expand_dims(mmw, axis=-1))/mw
+		rho = np.expand_dims(rho, axis=-1)
+		jac[:, :, 1:, 0] = mw/rho*(dwdot_dT + wdot/np.expand_dims(T,
+				axis=-1))
+		jac[:, :, 1:, 1:] = np.expand_dims(mw/rho, axis=-1)*(dwdot_dY +
+				np.expand_dims(wdot*np.expand_dims(mmw, axis=-1),
+				axis=-1)/mw)
 
 		return jac # [ne, nq, ns, ns]
-
-
-def get_numerical_jacobian(source, physics, Uq, x, t):
-	'''
-	Calculates the numerical jacobian of a given source term. 
-	Note: Needs vectorizing and testing for dimensional cases.
-
-	Inputs:
-	-------
-		source: source object
-		physics: physics object
-		Uq: solution state at quadrature points [ne, nq, ns]
-		x: coordinates in physical space [nq, ndims]
-		t: time
-
-	Outputs:
-	--------
-		jac: numerical jacobian (dS/dU) [ne, nq, ns, ns]
-	'''
-	nelem = Uq.shape[0]
-	ns = physics.NUM_STATE_VARS
-	eps = 1.e-6 #Note: Can be adjusted depending on the problem
-
-	# Initialize source and perturbed source
-	S = np.zeros([nelem, 1, ns])
-	Sp = np.zeros([nelem, ns, 1, ns])
-
-	jac = np.zeros([Uq.shape[0], Uq.shape[1], ns, ns])
-
-	for ielem in range(nelem):
-		# Get source term in each element
-		S[ielem] = source.get_source(physics, 
-				Uq[ielem].reshape([1, 1, ns]), x, t)
-		# Construct the perturbed sources
-		for i in range(ns):
-			Uq_per = Uq[ielem].copy()
-			Uq_per[0, i] += eps
-			Sp[ielem, i] = source.get_source(physics, 
-					Uq_per.reshape([1, 1, ns]), x, t)
-	# First-order finite difference
-	for ielem in range(nelem):
-		for i in range(ns):
-			for j in range(ns):
-					jac[ielem, 0, i, j] = (Sp[ielem, i, 0, j] - \
-						S[ielem, 0, j]) / (eps)
-
-	return jac.transpose(0, 1, 3, 2)
\ No newline at end of file
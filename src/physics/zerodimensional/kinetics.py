@@ -0,0 +1,581 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/physics/zerodimensional/kinetics.py
+#
+#       Contains a vectorized evaluator of ideal-gas thermodynamics (NASA
+#       7-coefficient polynomials) and mass-action kinetics (elementary,
+#       three-body, and Lindemann/Troe falloff reactions) for multispecies
+#       problems. The mechanism is read from a cantera Solution once;
+#       afterwards, the thermodynamic properties, the net production
+#       rates, and their analytical derivatives are evaluated for all
+#       points at once without cantera. SI units with kmol are used, as in
+#       cantera.
+#
+# ------------------------------------------------------------------------ #
+import numpy as np
+
+from external.optional_cantera import ct
+
+
+# Floor of the reduced pressure and of the Troe center broadening factor
+# before their logarithms are taken (same as in cantera)
+SMALL_NUMBER = 1.e-300
+
+
+class Mechanism(object):
+	'''
+	This class stores a chemical mechanism in arrays so that the
+	thermodynamic properties and the kinetics can be evaluated at many
+	points at once. The state at each point is given by the temperature,
+	the pressure, and the mass fractions, which are not normalized (as
+	with cantera's set_unnormalized_mass_fractions).
+
+	Attributes:
+	-----------
+	species_names: list
+		names of the species
+	molecular_weights: numpy array
+		molecular weights [nsp]
+	R: float
+		universal gas constant
+	P_ref: float
+		reference pressure of the thermodynamic data
+	T_mid: numpy array
+		midpoint temperatures of the NASA polynomials [nsp]
+	thermo_coeffs: numpy array
+		NASA polynomial coefficients below (first nsp columns) and above
+		(last nsp columns) T_mid [7, 2*nsp]
+	nu_reac: numpy array
+		stoichiometric coefficients of the reactants [nr, nsp]
+	nu_prod: numpy array
+		stoichiometric coefficients of the products [nr, nsp]
+	nu: numpy array
+		net stoichiometric coefficients [nr, nsp]
+	reversible: numpy array
+		True for reversible reactions [nr]
+	reac_slots, prod_slots: numpy arrays
+		species of the reactants and products (see get_slots)
+	reac_slots_to_species, prod_slots_to_species: numpy arrays
+		maps from slots to species (see get_slots)
+	A, b, Ea_R: numpy arrays
+		pre-exponential factors, temperature exponents, and activation
+		temperatures of the (high-pressure) rate constants [nr]
+	efficiencies: numpy array
+		third-body efficiencies; zero for reactions without third
+		bodies [nr, nsp]
+	three_body_IDs: numpy array
+		indices of the three-body reactions
+	falloff_IDs: numpy array
+		indices of the falloff reactions
+	A0, b0, Ea0_R: numpy arrays
+		parameters of the low-pressure rate constants of the falloff
+		reactions [nfo]
+	troe_IDs: numpy array
+		indices of the falloff reactions with Troe falloff functions
+		(into falloff_IDs)
+	troe_w, troe_r: numpy arrays
+		weights (1 - a, a) and inverse temperatures (1/T3, 1/T1) of the
+		exponential terms of the Troe functions [ntroe, 2]
+	troe_w2, troe_T2: numpy arrays
+		weights (0 if absent) and temperatures of the exp(-T2/T) terms
+		[ntroe]
+	'''
+	def __init__(self, gas):
+		'''
+		This method reads the mechanism from a cantera Solution.
+
+		Inputs:
+		-------
+			gas: cantera Solution
+
+		Outputs:
+		--------
+			self: mechanism arrays set
+		'''
+		nsp = gas.n_species
+		nr = gas.n_reactions
+		self.species_names = gas.species_names
+		self.molecular_weights = np.array(gas.molecular_weights)
+		self.R = ct.gas_constant
+		self.P_ref = gas.reference_pressure
+
+		# Thermodynamic data; the coefficients of the low and high
+		# temperature ranges are stacked as [7, 2*nsp]
+		self.T_mid = np.zeros(nsp)
+		self.thermo_coeffs = np.zeros([7, 2*nsp])
+		for k in range(nsp):
+			thermo = gas.species(k).thermo
+			if not isinstance(thermo, ct.NasaPoly2):
+				raise NotImplementedError("Only NASA 7-coefficient " +
+						"polynomials are supported")
+			coeffs = thermo.coeffs
+			self.T_mid[k] = coeffs[0]
+			self.thermo_coeffs[:, k] = coeffs[8:15]
+			self.thermo_coeffs[:, nsp + k] = coeffs[1:8]
+
+		# Kinetics data
+		self.nu_reac = np.zeros([nr, nsp])
+		self.nu_prod = np.zeros([nr, nsp])
+		self.reversible = np.zeros(nr, dtype=bool)
+		self.A = np.zeros(nr)
+		self.b = np.zeros(nr)
+		self.Ea_R = np.zeros(nr)
+		self.efficiencies = np.zeros([nr, nsp])
+		three_body_IDs = []
+		falloff_IDs = []
+		low_rates = []
+		troe_IDs = []
+		troe_coeffs = []
+
+		for i in range(nr):
+			reaction = gas.reaction(i)
+			rate = reaction.rate
+			if reaction.orders:
+				raise NotImplementedError("Non-mass-action reaction " +
+						"orders are not supported")
+			for name, nu in reaction.reactants.items():
+				self.nu_reac[i, gas.species_index(name)] = nu
+			for name, nu in reaction.products.items():
+				self.nu_prod[i, gas.species_index(name)] = nu
+			self.reversible[i] = reaction.reversible
+
+			if isinstance(rate, ct.ArrheniusRate):
+				high_rate = rate
+				if reaction.third_body is not None:
+					three_body_IDs.append(i)
+			elif isinstance(rate, (ct.LindemannRate, ct.TroeRate)) and \
+					not rate.chemically_activated:
+				high_rate = rate.high_rate
+				low_rates.append(rate.low_rate)
+				if isinstance(rate, ct.TroeRate):
+					troe_IDs.append(len(falloff_IDs))
+					troe_coeffs.append(rate.falloff_coeffs)
+				falloff_IDs.append(i)
+			else:
+				raise NotImplementedError("Rate type of reaction " +
+						reaction.equation + " is not supported")
+
+			self.A[i], self.b[i], self.Ea_R[i] = self.get_arrhenius_params(
+					high_rate)
+
+			third_body = reaction.third_body
+			if third_body is not None:
+				self.efficiencies[i] = third_body.default_efficiency
+				for name, eff in third_body.efficiencies.items():
+					self.efficiencies[i, gas.species_index(name)] = eff
+
+		self.nu = self.nu_prod - self.nu_reac
+		self.dnu = np.sum(self.nu, axis=1)
+		self.irreversible_IDs = np.where(~self.reversible)[0]
+		self.reac_slots, self.reac_slots_to_species = get_slots(
+				self.nu_reac)
+		self.prod_slots, self.prod_slots_to_species = get_slots(
+				self.nu_prod)
+
+		self.three_body_IDs = np.array(three_body_IDs, dtype=int)
+		self.falloff_IDs = np.array(falloff_IDs, dtype=int)
+		params = np.array([self.get_arrhenius_params(rate) for rate in
+				low_rates]).reshape(-1, 3)
+		self.A0, self.b0, self.Ea0_R = params.T
+
+		# Troe parameters; Fcent is the sum of the terms w*exp(-r*T) and
+		# w2*exp(-T2/T). Terms with T3 or T1 of zero vanish, and T2 is
+		# optional.
+		self.troe_IDs = np.array(troe_IDs, dtype=int)
+		ntroe = len(troe_coeffs)
+		self.troe_w = np.zeros([ntroe, 2])
+		self.troe_r = np.zeros([ntroe, 2])
+		self.troe_w2 = np.zeros(ntroe)
+		self.troe_T2 = np.zeros(ntroe)
+		for i, coeffs in enumerate(troe_coeffs):
+			a = coeffs[0]
+			for j, (w, T) in enumerate([(1. - a, coeffs[1]),
+					(a, coeffs[2])]):
+				if abs(T) > SMALL_NUMBER:
+					self.troe_w[i, j] = w
+					self.troe_r[i, j] = 1./T
+			if len(coeffs) > 3:
+				self.troe_w2[i] = 1.
+				self.troe_T2[i] = coeffs[3]
+
+	def get_arrhenius_params(self, rate):
+		'''
+		This method returns the parameters of a cantera Arrhenius rate.
+
+		Inputs:
+		-------
+			rate: cantera ArrheniusRate
+
+		Outputs:
+		--------
+			A: pre-exponential factor
+			b: temperature exponent
+			Ea_R: activation temperature
+		'''
+		return (rate.pre_exponential_factor, rate.temperature_exponent,
+				rate.activation_energy/self.R)
+
+	def get_nondim_species_thermo(self, T):
+		'''
+		This method evaluates the nondimensional thermodynamic properties
+		of the species.
+
+		Inputs:
+		-------
+			T: temperature [...]
+
+		Outputs:
+		--------
+			cp_R: molar specific heats divided by R [..., nsp]
+			h_RT: molar enthalpies divided by RT [..., nsp]
+			s_R: molar entropies divided by R [..., nsp]
+			dcp_R_dT: temperature derivatives of cp_R [..., nsp]
+		'''
+		shape = np.shape(T)
+		T = np.reshape(T, [-1, 1])
+		nsp = self.T_mid.shape[0]
+
+		# Monomials multiplying the NASA coefficients of cp_R, h_RT, s_R,
+		# and dcp_R_dT
+		powers = T**np.arange(5)
+		basis = np.zeros([T.shape[0], 4, 7])
+		basis[:, 0, :5] = powers
+		basis[:, 1, :5] = powers/np.arange(1., 6.)
+		basis[:, 1, 5] = 1./T[:, 0]
+		basis[:, 2, 0] = np.log(T[:, 0])
+		basis[:, 2, 1:5] = powers[:, 1:]/np.arange(1., 5.)
+		basis[:, 2, 6] = 1.
+		basis[:, 3, 1:5] = powers[:, :4]*np.arange(1., 5.)
+
+		props = basis @ self.thermo_coeffs
+		props = np.where(np.expand_dims(T <= self.T_mid, axis=1),
+				props[:, :, :nsp], props[:, :, nsp:])
+		props = props.reshape(shape + (4, nsp))
+
+		return tuple(props[..., i, :] for i in range(4))
+
+	def get_species_thermo(self, T):
+		'''
+		This method evaluates the molar specific heats and enthalpies of
+		the species.
+
+		Inputs:
+		-------
+			T: temperature [...]
+
+		Outputs:
+		--------
+			cp: molar specific heats [..., nsp]
+			h: molar enthalpies [..., nsp]
+			dcp_dT: temperature derivatives of cp [..., nsp]
+		'''
+		cp_R, h_RT, _, dcp_R_dT = self.get_nondim_species_thermo(T)
+		R = self.R
+
+		return R*cp_R, R*np.expand_dims(T, axis=-1)*h_RT, R*dcp_R_dT
+
+	def get_mean_molecular_weight(self, Y):
+		'''
+		This method computes the mean molecular weight.
+
+		Inputs:
+		-------
+			Y: mass fractions [..., nsp]
+
+		Outputs:
+		--------
+			mmw: mean molecular weight [...]
+		'''
+		return 1./(Y @ (1./self.molecular_weights))
+
+	def get_density(self, T, P, Y):
+		'''
+		This method computes the density of the ideal gas mixture.
+
+		Inputs:
+		-------
+			T: temperature [...]
+			P: pressure (scalar or [...])
+			Y: mass fractions [..., nsp]
+
+		Outputs:
+		--------
+			rho: density [...]
+		'''
+		return P*self.get_mean_molecular_weight(Y)/(self.R*T)
+
+	def get_cp_mass(self, T, Y):
+		'''
+		This method computes the specific heat at constant pressure per
+		unit mass of the mixture.
+
+		Inputs:
+		-------
+			T: temperature [...]
+			Y: mass fractions [..., nsp]
+
+		Outputs:
+		--------
+			cp_mass: specific heat [...]
+		'''
+		cp, _, _ = self.get_species_thermo(T)
+
+		return np.sum(Y*cp/self.molecular_weights, axis=-1)
+
+	def get_rate_constants(self, T, M):
+		'''
+		This method computes the forward rate constants, including the
+		third-body concentrations of three-body reactions and the falloff
+		functions of falloff reactions, as well as their derivatives.
+
+		Inputs:
+		-------
+			T: temperature [np]
+			M: third-body concentrations [np, nr]
+
+		Outputs:
+		--------
+			kf: forward rate constants [np, nr]
+			dlnkf_dT: temperature derivatives of log(kf) at constant
+				concentrations [np, nr]
+			dkf_dM: derivatives of kf with respect to M [np, nr]
+		'''
+		T = T[:, np.newaxis]
+		lnT = np.log(T)
+		inv_T = 1./T
+		ln10 = np.log(10.)
+
+		# (High-pressure) Arrhenius rate constants
+		kf = self.A*np.exp(self.b*lnT - self.Ea_R*inv_T)
+		dlnkf_dT = (self.b + self.Ea_R*inv_T)*inv_T
+		dkf_dM = np.zeros_like(kf)
+
+		# Three-body reactions
+		i = self.three_body_IDs
+		dkf_dM[:, i] = kf[:, i]
+		kf[:, i] *= M[:, i]
+
+		# Falloff reactions
+		i = self.falloff_IDs
+		if i.size == 0:
+			return kf, dlnkf_dT, dkf_dM
+
+		k_inf = kf[:, i]
+		dlnk_inf_dT = dlnkf_dT[:, i]
+		k0 = self.A0*np.exp(self.b0*lnT - self.Ea0_R*inv_T)
+		dlnPr_dT = (self.b0 + self.Ea0_R*inv_T)*inv_T - dlnk_inf_dT
+		Pr = k0*M[:, i]/k_inf
+
+		# Troe falloff functions (F = 1 for Lindemann)
+		logF = np.zeros_like(Pr)
+		dlogF_dlogPr = np.zeros_like(Pr)
+		dlogF_dT = np.zeros_like(Pr)
+		j = self.troe_IDs
+		if j.size > 0:
+			terms = self.troe_w*np.exp(-np.expand_dims(T, axis=-1)*
+					self.troe_r)
+			term2 = self.troe_w2*np.exp(-self.troe_T2*inv_T)
+			Fcent = np.sum(terms, axis=-1) + term2
+			dFcent_dT = -np.sum(self.troe_r*terms, axis=-1) + \
+					self.troe_T2*inv_T**2*term2
+			logFcent = np.log10(np.maximum(Fcent, SMALL_NUMBER))
+			dlogFcent_dT = dFcent_dT/(Fcent*ln10)
+
+			c = -0.4 - 0.67*logFcent
+			n = 0.75 - 1.27*logFcent
+			d = 0.14
+			x = np.log10(np.maximum(Pr[:, j], SMALL_NUMBER)) + c
+			denom = n - d*x
+			f1 = x/denom
+			tmp = 1. + f1*f1
+			dlogF_df1 = -2.*logFcent*f1/tmp**2
+			df1_dlogFcent = (-0.67*denom - x*(-1.27 + 0.67*d))/denom**2
+
+			logF[:, j] = logFcent/tmp
+			dlogF_dlogPr[:, j] = dlogF_df1*n/denom**2
+			dlogF_dT[:, j] = (1./tmp + dlogF_df1*df1_dlogFcent
+					)*dlogFcent_dT + dlogF_dlogPr[:, j]*dlnPr_dT[:, j]/ln10
+		F = 10.**logF
+
+		kf[:, i] = k_inf*Pr/(1. + Pr)*F
+		dlnkf_dT[:, i] = dlnk_inf_dT + dlnPr_dT/(1. + Pr) + ln10*dlogF_dT
+		dkf_dM[:, i] = k0*F/(1. + Pr)*(1./(1. + Pr) + dlogF_dlogPr)
+
+		return kf, dlnkf_dT, dkf_dM
+
+	def get_rates_of_progress(self, T, C, get_jacobian=False):
+		'''
+		This method computes the net rates of progress of the reactions.
+
+		Inputs:
+		-------
+			T: temperature [np]
+			C: molar concentrations [np, nsp]
+			get_jacobian: if True, the derivatives are also returned
+
+		Outputs:
+		--------
+			q: net rates of progress [np, nr]
+			dq_dT: temperature derivatives of q at constant
+				concentrations [np, nr] (if get_jacobian)
+			dq_dC: derivatives of q with respect to the concentrations
+				[np, nr, nsp] (if get_jacobian)
+		'''
+		# Inverse equilibrium constants from the Gibbs energies
+		_, h_RT, s_R, _ = self.get_nondim_species_thermo(T)
+		ln_inv_Kc = (h_RT - s_R) @ self.nu.T - np.outer(np.log(
+				self.P_ref/(self.R*T)), self.dnu)
+		ln_inv_Kc[:, self.irreversible_IDs] = -np.inf
+		inv_Kc = np.exp(ln_inv_Kc)
+
+		# Rate constants
+		M = C @ self.efficiencies.T
+		kf, dlnkf_dT, dkf_dM = self.get_rate_constants(T, M)
+		kr = kf*inv_Kc
+
+		# Law of mass action; the padded slots point to a unit
+		# concentration
+		C = np.hstack([C, np.ones([C.shape[0], 1])])
+		factors_f = C[:, self.reac_slots]
+		factors_r = C[:, self.prod_slots]
+		prod_f = np.prod(factors_f, axis=-1)
+		prod_r = np.prod(factors_r, axis=-1)
+		q = kf*prod_f - kr*prod_r
+
+		if not get_jacobian:
+			return q
+
+		dlninv_Kc_dT = (self.dnu - h_RT @ self.nu.T)/T[:, np.newaxis]
+		dq_dT = kf*dlnkf_dT*prod_f - kr*(dlnkf_dT + dlninv_Kc_dT)*prod_r
+
+		dfwd_dslots = np.expand_dims(kf, axis=-1)*get_exclusive_products(
+				factors_f)
+		drev_dslots = np.expand_dims(kr, axis=-1)*get_exclusive_products(
+				factors_r)
+		dq_dC = (np.expand_dims(dfwd_dslots, axis=2) @
+				self.reac_slots_to_species - np.expand_dims(drev_dslots,
+				axis=2) @ self.prod_slots_to_species)[:, :, 0] + \
+				np.expand_dims(dkf_dM*(prod_f - inv_Kc*prod_r), axis=-1)* \
+				self.efficiencies
+
+		return q, dq_dT, dq_dC
+
+	def get_net_production_rates(self, T, P, Y, get_jacobian=False):
+		'''
+		This method computes the net molar production rates of the
+		species.
+
+		Inputs:
+		-------
+			T: temperature [...]
+			P: pressure (scalar or [...])
+			Y: mass fractions [..., nsp]
+			get_jacobian: if True, the derivatives are also returned
+
+		Outputs:
+		--------
+			wdot: net production rates [..., nsp]
+			dwdot_dT: temperature derivatives of wdot at constant
+				pressure and mass fractions [..., nsp] (if get_jacobian)
+			dwdot_dY: derivatives of wdot with respect to the mass
+				fractions at constant temperature and pressure
+				[..., nsp, nsp] (if get_jacobian)
+		'''
+		shape = np.shape(T)
+		W = self.molecular_weights
+		nsp = W.shape[0]
+		T = np.reshape(T, -1)
+		P = np.reshape(np.broadcast_to(P, shape), -1)
+		Y = np.reshape(Y, [-1, nsp])
+
+		mmw = self.get_mean_molecular_weight(Y)
+		rho = P*mmw/(self.R*T)
+		C = rho[:, np.newaxis]*Y/W
+
+		if not get_jacobian:
+			q = self.get_rates_of_progress(T, C)
+			return (q @ self.nu).reshape(shape + (nsp,))
+
+		q, dq_dT, dq_dC = self.get_rates_of_progress(T, C, True)
+		wdot = q @ self.nu
+		dwdot_dC = self.nu.T @ dq_dC
+
+		# Chain rule with dC_m/dT = -C_m/T and
+		# dC_m/dY_j = rho/W_m*delta_mj - C_m*mmw/W_j
+		dwdot_dC_C = (dwdot_dC @ C[:, :, np.newaxis])[:, :, 0]
+		dwdot_dT = dq_dT @ self.nu - dwdot_dC_C/T[:, np.newaxis]
+		dwdot_dY = (dwdot_dC*rho[:, np.newaxis, np.newaxis] -
+				(dwdot_dC_C*mmw[:, np.newaxis])[:, :, np.newaxis])/W
+
+		return wdot.reshape(shape + (nsp,)), dwdot_dT.reshape(shape +
+				(nsp,)), dwdot_dY.reshape(shape + (nsp, nsp))
+
+
+def get_slots(nu):
+	'''
+	This function converts integer stoichiometric coefficients into lists
+	of species (slots) so that the products of the law of mass action
+	can be gathered, e.g. 2 OH + M is stored as [OH, OH, pad]. Padded
+	slots point to the species index nsp.
+
+	Inputs:
+	-------
+		nu: stoichiometric coefficients [nr, nsp]
+
+	Outputs:
+	--------
+		slots: species indices of the slots [nr, nslots]
+		slots_to_species: maps from slots to species [nr, nslots, nsp]
+	'''
+	nr, nsp = nu.shape
+	if np.any(nu != np.round(nu)):
+		raise NotImplementedError("Non-integer stoichiometric " +
+				"coefficients are not supported")
+	nu = nu.astype(int)
+	nslots = np.amax(np.sum(nu, axis=1))
+
+	slots = np.full([nr, nslots], nsp)
+	slots_to_species = np.zeros([nr, nslots, nsp])
+	for i in range(nr):
+		species = np.repeat(np.arange(nsp), nu[i])
+		slots[i, :species.size] = species
+		slots_to_species[i, np.arange(species.size), species] = 1.
+
+	return slots, slots_to_species
+
+
+def get_exclusive_products(factors):
+	'''
+	This function computes, for each entry along the last axis, the
+	product of all other entries. Unlike dividing the full product by
+	the entry, this also works for zero entries.
+
+	Inputs:
+	-------
+		factors: factors [..., n]
+
+	Outputs:
+	--------
+		products: products of the other factors [..., n]
+	'''
+	left = np.ones_like(factors)
+	right = np.ones_like(factors)
+	left[..., 1:] = np.cumprod(factors[..., :-1], axis=-1)
+	right[..., :-1] = np.cumprod(factors[..., :0:-1], axis=-1)[..., ::-1]
+
+	return left*right
@@ -40,6 +40,7 @@ from physics.scalar.functions import FcnType as scalar_fcn_type
 from physics.scalar.functions import SourceType as scalar_source_type
 
 import physics.zerodimensional.functions as zerod_fcns
+import physics.zerodimensional.kinetics as zerod_kinetics
 from physics.zerodimensional.functions import FcnType as zerod_fcn_type
 from physics.zerodimensional.functions import SourceType as zerod_source_type
 
@@ -270,6 +271,8 @@ class MultispeciesPSR(ZeroDimensional):
 		# Save object to physics class before calculating inflow props
 		gas = ct.Solution('h2o2.yaml')
 		self.gas = gas
+		# Arrays of the mechanism for the vectorized source terms
+		self.mechanism = zerod_kinetics.Mechanism(gas)
 
 		# Note: This is hardcoded for the PSR model problem of Wu, 2019
 		gas.TPX = Tu, P, "H2:{},O2:{},N2:{},H:{}".format(phi, 
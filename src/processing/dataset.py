@@ -0,0 +1,268 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/processing/dataset.py
+#
+#       Contains a lazy reader for the collection of data files written by
+#       a simulation.
+#
+#       Example:
+#
+#           import processing.dataset as dataset
+#           data = dataset.open("Data")
+#           U = data[-1]                  # final state coefficients
+#           U_sub = data[::10, elem_IDs]  # every 10th snapshot, subset
+#           for it in range(len(data)):
+#               rho = data.compute_variable("Density", it, elem_IDs)
+#
+# ------------------------------------------------------------------------ #
+import glob
+import numpy as np
+import os
+import re
+
+import errors
+
+import numerics.helpers.helpers as helpers
+
+import processing.readwritedatafiles as readwritedatafiles
+
+
+def open(prefix, solver=None):
+	'''
+	This function opens the data files with the given prefix, i.e.
+	<prefix>_<n>.ckpt/.pkl and <prefix>_final.ckpt/.pkl.
+
+	Inputs:
+	-------
+	    prefix: data file prefix (str)
+	    solver: solver object or pickle file name providing the mesh,
+	    	physics, and basis; if None, <prefix>_setup.pkl is used if it
+	    	exists, otherwise the first pickle data file
+
+	Outputs:
+	--------
+	    dataset: Dataset object
+	'''
+	return Dataset(prefix, solver)
+
+
+def get_data_file_names(prefix):
+	'''
+	This function finds the data files with the given prefix, sorted by
+	write index (the final solution is last).
+
+	Inputs:
+	-------
+	    prefix: data file prefix (str)
+
+	Outputs:
+	--------
+	    fnames: list of file names
+	'''
+	pattern = re.compile(re.escape(os.path.basename(prefix)) +
+			r"_(\d+|final)\.(ckpt|pkl)$")
+
+	keys = {}
+	for fname in glob.glob(glob.escape(prefix) + "_*"):
+		match = pattern.match(os.path.basename(fname))
+		if match is None:
+			continue
+		label = match.group(1)
+		key = np.inf if label == "final" else int(label)
+		if key in keys:
+			raise errors.FileReadError("Multiple data files for " +
+					f"{prefix}_{label}")
+		keys[key] = fname
+
+	return [keys[key] for key in sorted(keys)]
+
+
+class Dataset(object):
+	'''
+	This class provides lazy access to the data files of a simulation.
+	Only the state coefficients are read per snapshot; checkpoint files are
+	memory-mapped, so only the requested elements are loaded. The mesh,
+	physics, and basis are taken from a single solver object shared by all
+	snapshots.
+
+	Attributes:
+	-----------
+	prefix: str
+		data file prefix
+	fnames: list
+		data file names, sorted by write index
+	solver: solver object
+		solver shared by all snapshots
+	mesh: mesh object
+		shared mesh
+	physics: physics object
+		shared physics
+	basis: basis object
+		shared solution basis
+	times: numpy array
+		solution time of each snapshot (read on first access)
+
+	Methods:
+	--------
+	get_state_coeffs
+		reads the state coefficients of one snapshot
+	get_solver
+		returns the shared solver with the state of one snapshot
+	compute_variable
+		evaluates a variable of one snapshot
+	'''
+	def __init__(self, prefix, solver=None):
+		self.prefix = prefix
+		self.fnames = get_data_file_names(prefix)
+		if len(self.fnames) == 0:
+			raise errors.FileReadError(f"No data files found for {prefix}")
+
+		# Shared solver
+		if solver is None:
+			setup_fname = readwritedatafiles.get_setup_file_name(prefix)
+			if os.path.exists(setup_fname):
+				solver = setup_fname
+			else:
+				pickle_fnames = [fname for fname in self.fnames if
+						not readwritedatafiles.is_checkpoint_file(fname)]
+				if len(pickle_fnames) == 0:
+					raise errors.FileReadError("No solver found for " +
+							f"{prefix}; pass a solver object or pickle file")
+				solver = pickle_fnames[0]
+		if isinstance(solver, str):
+			solver = readwritedatafiles.read_data_file(solver)
+		self.solver = solver
+		self.mesh = solver.mesh
+		self.physics = solver.physics
+		self.basis = solver.basis
+
+		self.times_cache = None
+
+	def __len__(self):
+		return len(self.fnames)
+
+	def __getitem__(self, key):
+		'''
+		This method reads state coefficients. The key is a snapshot index
+		or slice, optionally followed by element IDs (int, slice, or
+		array).
+
+		Outputs:
+		--------
+			U: state coefficients [ne, nb, ns] for a single snapshot or
+				[nt, ne, nb, ns] for a slice of snapshots
+		'''
+		if isinstance(key, tuple):
+			itime, elem_IDs = key
+		else:
+			itime, elem_IDs = key, None
+
+		if isinstance(itime, slice):
+			return np.stack([self.get_state_coeffs(it, elem_IDs) for it in
+					range(*itime.indices(len(self)))])
+		else:
+			return self.get_state_coeffs(itime, elem_IDs)
+
+	@property
+	def times(self):
+		if self.times_cache is None:
+			self.times_cache = np.array([self.read(it).time for it in
+					range(len(self))])
+		return self.times_cache
+
+	def read(self, itime):
+		'''
+		This method reads a data file. Checkpoint files are memory-mapped.
+
+		Inputs:
+		-------
+			itime: snapshot index
+
+		Outputs:
+		--------
+			data: Checkpoint object or solver object
+		'''
+		return readwritedatafiles.read_data_file(self.fnames[itime],
+				mmap=True)
+
+	def get_state_coeffs(self, itime, elem_IDs=None):
+		'''
+		This method reads the state coefficients of one snapshot.
+
+		Inputs:
+		-------
+			itime: snapshot index
+			elem_IDs: element IDs to read (int, slice, or array); if None,
+				all elements are read
+
+		Outputs:
+		--------
+			U: state coefficients [ne, nb, ns]
+		'''
+		U = self.read(itime).state_coeffs
+		if elem_IDs is None:
+			return np.array(U)
+		elif np.isscalar(elem_IDs):
+			return np.array(U[elem_IDs:elem_IDs+1])
+		else:
+			return np.array(U[elem_IDs])
+
+	def get_solver(self, itime):
+		'''
+		This method sets the state and time of the shared solver to those
+		of one snapshot, e.g. to use the functions in processing/plot.py.
+
+		Inputs:
+		-------
+			itime: snapshot index
+
+		Outputs:
+		--------
+			solver: shared solver object (modified)
+		'''
+		data = self.read(itime)
+		self.solver.state_coeffs = np.array(data.state_coeffs)
+		self.solver.time = data.time
+
+		return self.solver
+
+	def compute_variable(self, var_name, itime, elem_IDs=None,
+			basis_val=None):
+		'''
+		This method evaluates a variable of one snapshot.
+
+		Inputs:
+		-------
+			var_name: name of variable to compute
+			itime: snapshot index
+			elem_IDs: element IDs (see get_state_coeffs)
+			basis_val: basis values at the evaluation points [nq, nb]; if
+				None, the element quadrature points of the shared solver
+				are used
+
+		Outputs:
+		--------
+			varq: values of the given variable [ne, nq, 1]
+		'''
+		if basis_val is None:
+			basis_val = self.solver.elem_helpers.basis_val
+
+		U = self.get_state_coeffs(itime, elem_IDs)
+		Uq = helpers.evaluate_state(U, basis_val)
+
+		return self.physics.compute_variable(var_name, Uq)
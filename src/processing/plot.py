@@ -11,6 +11,7 @@ import matplotlib.tri as tri
 import numpy as np
 
 import meshing.meshbase as mesh_defs
+import meshing.pointlocation as point_location
 import meshing.tools as mesh_tools
 
 import numerics.helpers.helpers as helpers
@@ -358,13 +359,49 @@ def interpolate_2D_soln_to_points(physics, x, var, xpoints):
 	return var_points
 
 
+def get_numerical_solution_at_points(physics, solver, xpoints, var_name,
+		locator=None):
+	'''
+	This function evaluates the numerical solution exactly at an arbitrary
+	set of points by locating the element that contains each point and
+	evaluating the basis there.
+
+	Inputs:
+	-------
+	    physics: physics object
+	    solver: solver object
+	    xpoints: coordinates to evaluate variable at [num_pts, ndims]
+	    var_name: name of variable to get
+	    locator: point locator (see meshing/pointlocation.py); if None,
+	    	one is created (pass one in to reuse it across calls)
+
+	Outputs:
+	--------
+		var_points: values of variable at xpoints; NaN for points outside
+			the mesh [num_pts, 1]
+	'''
+	if locator is None:
+		locator = point_location.PointLocator(solver.mesh)
+	elem_IDs, xref = locator.locate(xpoints)
+
+	Uq = helpers.evaluate_state_at_points(solver.state_coeffs,
+			solver.basis, elem_IDs, xref)
+	var_points = np.full([Uq.shape[0], 1], np.nan)
+	found = elem_IDs >= 0
+	if np.any(found):
+		var_points[found] = physics.compute_variable(var_name,
+				Uq[np.newaxis, found])[0]
+
+	return var_points
+
+
 def plot_line_probe(mesh, physics, solver, var_name, xy1, xy2, num_pts=101,
 		plot_numerical=True, plot_exact=False, plot_IC=False,
 		create_new_figure=True, ylabel=None, vs_x=True, fmt="k-",
-		legend_label=None, **kwargs):
+		legend_label=None, locator=None, **kwargs):
 	'''
 	This function evaluates a given variable only a specified line segment
-	and creates a 1D plot. 2D only.
+	and creates a 1D plot.
 
 	Inputs:
 	-------
@@ -372,8 +409,8 @@ def plot_line_probe(mesh, physics, solver, var_name, xy1, xy2, num_pts=101,
 	    physics: physics object
 	    solver: solver object
 	    var_name: name of variable
-	    xy1: xy-coordinate of 1st endpoint of line segment
-	    xy2: xy-coordinate of 2nd endpoint of line segment
+	    xy1: coordinates of 1st endpoint of line segment
+	    xy2: coordinates of 2nd endpoint of line segment
 	    num_pts: number of points along line segment
 	    plot_numerical: plot numerical solution
 	    plot_exact: plot exact solution
@@ -384,12 +421,12 @@ def plot_line_probe(mesh, physics, solver, var_name, xy1, xy2, num_pts=101,
 	    	variable vs. y
 		fmt: format string for plotting, e.g. "bo" for blue circles
 	    legend_label: legend label
+	    locator: point locator for the numerical solution (see
+	    	get_numerical_solution_at_points); pass one in to reuse it
+	    	across probes
 	    kwargs: keyword arguments (see below)
 	'''
 	''' Compatibility checks '''
-	if mesh.ndims != 2:
-		raise ValueError
-
 	plot_sum = plot_numerical + plot_exact + plot_IC
 	if plot_sum >= 2:
 		raise ValueError("Can only plot one solution at a time")
@@ -397,19 +434,12 @@ def plot_line_probe(mesh, physics, solver, var_name, xy1, xy2, num_pts=101,
 		raise ValueError("Need to plot a solution")
 
 	''' Construct points on line segment '''
-	x1 = xy1[0]; y1 = xy1[1]
-	x2 = xy2[0]; y2 = xy2[1]
-	xline = np.linspace(x1, x2, num_pts)
-	yline = np.linspace(y1, y2, num_pts)
-
-	''' Interpolation '''
-	x = get_sample_points(mesh, solver, physics, solver.basis, True)
-	xyline = np.array([xline, yline]).transpose()
+	xyline = np.linspace(np.atleast_1d(xy1), np.atleast_1d(xy2), num_pts)
 
+	''' Evaluation '''
 	if plot_numerical:
-		var = get_numerical_solution(physics, solver.state_coeffs, x,
-				solver.basis, var_name)
-		var_plot = interpolate_2D_soln_to_points(physics, x, var, xyline)
+		var_plot = get_numerical_solution_at_points(physics, solver, xyline,
+				var_name, locator)
 		default_label = "Numerical"
 	elif plot_exact:
 		var_plot = get_analytical_solution(physics, physics.exact_soln,
@@ -430,10 +460,10 @@ def plot_line_probe(mesh, physics, solver, var_name, xy1, xy2, num_pts=101,
 
 	if vs_x:
 		xlabel = "x"
-		line = xline
+		line = xyline[:, 0]
 	else:
 		xlabel = "y"
-		line = yline
+		line = xyline[:, 1]
 
 	plot_1D(physics, line, var_plot, ylabel, fmt, legend_label)
 
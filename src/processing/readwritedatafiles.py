@@ -19,37 +19,506 @@
 #
 #       Contains functions for reading and writing data files.
 #
+#       Two formats are supported:
+#           - Pickle (legacy): the entire solver object is pickled.
+#           - Checkpoint: a small JSON header followed by raw
+#             little-endian arrays. Only the state coefficients, time,
+#             stepper state, and a description of the mesh and basis
+#             are stored. Layout:
+#
+#                 magic (8 bytes) | version (uint32) | reserved (uint32)
+#                 | header size in bytes (uint64) | JSON header
+#                 | zero padding | array data
+#
+#             Each array is aligned to ALIGNMENT bytes; its dtype, shape,
+#             and absolute offset are recorded in the header so that it
+#             can be memory-mapped.
+#
+#       Data files can optionally be compressed (gzip for pickle files,
+#       zlib per array for checkpoint files) and written on a background
+#       thread (see AsyncDataFileWriter).
+#
 # ------------------------------------------------------------------------ #
+import gzip
+import hashlib
+import json
+import numpy as np
 import pickle
+import queue
+import struct
+import threading
+import types
+import zlib
+
+import errors
+import meshing.tools as mesh_tools
+from general import DataFileFormatType
+
+import numerics.basis.tools as basis_tools
+
+
+MAGIC = b"QUAILCKP"
+CHECKPOINT_VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct("<8sIIQ")
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def get_data_file_name(solver, iwrite):
+	'''
+	This function gets the name of a data file.
+
+	Inputs:
+	-------
+	    solver: solver object
+	    iwrite: integer to label data file (negative for the final
+	    	solution)
+
+	Outputs:
+	--------
+	    fname: file name (str)
+	    file_format: data file format (DataFileFormatType enum member)
+	'''
+	file_format = DataFileFormatType[solver.params.get("DataFileFormat",
+			"Pickle")]
+
+	prefix = solver.params["Prefix"]
+	if iwrite >= 0:
+		fname = prefix + "_" + str(iwrite)
+	else:
+		fname = prefix + "_final"
+
+	if file_format is DataFileFormatType.Pickle:
+		fname += ".pkl"
+	elif file_format is DataFileFormatType.Checkpoint:
+		fname += ".ckpt"
+	else:
+		raise NotImplementedError
+
+	return fname, file_format
+
+
+def get_data_file_snapshot(solver, iwrite):
+	'''
+	This function takes a snapshot of the data to be written. The
+	snapshot does not reference any solver data, so it can be written
+	while the solver continues to advance.
+
+	Inputs:
+	-------
+	    solver: solver object
+	    iwrite: integer to label data file
+
+	Outputs:
+	--------
+	    snapshot: tuple of file name, file format, and contents; the
+	    	contents are the pickled solver (bytes) for the pickle format
+	    	and a (header, arrays) tuple for the checkpoint format
+	'''
+	fname, file_format = get_data_file_name(solver, iwrite)
+
+	if file_format is DataFileFormatType.Pickle:
+		# Remove un-pickle-able functions, objects, etc...
+		solver.physics.gas = None
+		contents = pickle.dumps(solver, pickle.HIGHEST_PROTOCOL)
+	else:
+		contents = (get_checkpoint_header(solver),
+				get_checkpoint_arrays(solver))
+
+	return fname, file_format, contents
+
+
+def write_snapshot(snapshot, compress=False):
+	'''
+	This function writes a snapshot to a data file.
+
+	Inputs:
+	-------
+	    snapshot: see get_data_file_snapshot
+	    compress: if True, the data file is compressed
+	'''
+	fname, file_format, contents = snapshot
+
+	if file_format is DataFileFormatType.Pickle:
+		write_pickle_file(fname, contents, compress)
+	else:
+		header, arrays = contents
+		write_checkpoint_file(fname, header, arrays, compress)
+
 
 def write_data_file(solver, iwrite):
 	'''
-	This function writes a data file (pickle format).
+	This function writes a data file in the format specified by the
+	"DataFileFormat" parameter. If the elements were reordered (see
+	meshing.tools.reorder_elements), the data keeps the new numbering of
+	the mesh written with it; see meshing.tools.restore_element_ordering
+	to map it to the original numbering.
 
 	Inputs:
 	-------
 	    solver: solver object
 	    iwrite: integer to label data file
 	'''
-	
+	write_snapshot(get_data_file_snapshot(solver, iwrite),
+			solver.params.get("CompressDataFiles", False))
+
+
+def get_setup_file_name(prefix):
+	'''
+	This function gets the name of the setup file written alongside
+	checkpoint files.
+
+	Inputs:
+	-------
+	    prefix: data file prefix (str)
+
+	Outputs:
+	--------
+	    fname: file name (str)
+	'''
+	return prefix + "_setup.pkl"
+
+
+def write_setup_file(solver, compress=False):
+	'''
+	This function writes the full solver object (pickle format) once per
+	simulation. Checkpoint files only contain the state, so the setup file
+	provides the mesh, physics, and basis needed to post-process them
+	(see processing/dataset.py).
+
+	Inputs:
+	-------
+	    solver: solver object
+	    compress: if True, the file is gzip-compressed
+	'''
 	# Remove un-pickle-able functions, objects, etc...
 	solver.physics.gas = None
+	write_pickle_file(get_setup_file_name(solver.params["Prefix"]),
+			pickle.dumps(solver, pickle.HIGHEST_PROTOCOL), compress)
 
-	# Get file name
-	prefix = solver.params["Prefix"]
-	if iwrite >= 0:
-		fname = prefix + "_" + str(iwrite) + ".pkl"
+
+def write_pickle_file(fname, contents, compress=False):
+	'''
+	This function writes a data file (pickle format).
+
+	Inputs:
+	-------
+	    fname: file name (str)
+	    contents: pickled solver object (bytes)
+	    compress: if True, the file is gzip-compressed
+	'''
+	if compress:
+		with gzip.open(fname, 'wb') as fo:
+			fo.write(contents)
+	else:
+		with open(fname, 'wb') as fo:
+			fo.write(contents)
+
+
+class DataFileWriter(object):
+	'''
+	This class writes data files synchronously. For the checkpoint format,
+	a setup file with the full solver object is also written once (see
+	write_setup_file).
+
+	Attributes:
+	-----------
+	compress: bool
+		if True, data files are compressed
+	setup_written: bool
+		if True, the setup file has already been written
+
+	Methods:
+	--------
+	write
+		writes a data file for the current solver state
+	submit
+		writes a snapshot
+	flush
+		waits until all data files have been written
+	close
+		flushes and releases any resources
+	'''
+	def __init__(self, compress=False):
+		self.compress = compress
+		self.setup_written = False
+
+	def write(self, solver, iwrite):
+		'''
+		This method writes a data file for the current solver state.
+
+		Inputs:
+		-------
+			solver: solver object
+			iwrite: integer to label data file
+		'''
+		snapshot = get_data_file_snapshot(solver, iwrite)
+		if not self.setup_written and \
+				snapshot[1] is DataFileFormatType.Checkpoint:
+			write_setup_file(solver, self.compress)
+			self.setup_written = True
+		self.submit(snapshot)
+
+	def submit(self, snapshot):
+		write_snapshot(snapshot, self.compress)
+
+	def flush(self):
+		pass
+
+	def close(self):
+		self.flush()
+
+
+class AsyncDataFileWriter(DataFileWriter):
+	'''
+	This class writes data files on a background thread so that the time
+	loop does not wait for compression and disk I/O. A snapshot of the
+	data is taken on the calling thread and placed in a bounded queue;
+	once the queue is full, write blocks until the oldest snapshot has
+	been written (back-pressure), which bounds the extra memory.
+
+	Additional attributes:
+	----------------------
+	queue: Queue
+		snapshots waiting to be written
+	thread: Thread
+		writer thread
+	error: Exception
+		first exception raised by the writer thread (re-raised on the
+		calling thread)
+	'''
+	def __init__(self, compress=False, max_queue_size=2):
+		super().__init__(compress)
+		self.queue = queue.Queue(maxsize=max(max_queue_size, 1))
+		self.error = None
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def run(self):
+		'''
+		This method is the main loop of the writer thread. A None snapshot
+		stops the thread.
+		'''
+		while True:
+			snapshot = self.queue.get()
+			try:
+				if snapshot is None:
+					return
+				if self.error is None:
+					write_snapshot(snapshot, self.compress)
+			except Exception as error:
+				self.error = error
+			finally:
+				self.queue.task_done()
+
+	def check_error(self):
+		'''
+		This method re-raises an exception from the writer thread.
+		'''
+		if self.error is not None:
+			error, self.error = self.error, None
+			raise error
+
+	def submit(self, snapshot):
+		self.check_error()
+		self.queue.put(snapshot)
+
+	def flush(self):
+		self.queue.join()
+		self.check_error()
+
+	def close(self):
+		if self.thread.is_alive():
+			self.queue.put(None)
+			self.thread.join()
+		self.check_error()
+
+
+def get_data_file_writer(params):
+	'''
+	This function creates a data file writer based on the output
+	parameters.
+
+	Inputs:
+	-------
+	    params: solver parameters
+
+	Outputs:
+	--------
+	    writer: DataFileWriter or AsyncDataFileWriter object
+	'''
+	compress = params.get("CompressDataFiles", False)
+	if params.get("AsyncWrite", False):
+		return AsyncDataFileWriter(compress,
+				params.get("AsyncWriteQueueSize", 2))
+	else:
+		return DataFileWriter(compress)
+
+
+def get_mesh_fingerprint(mesh, elem_to_node_IDs=None):
+	'''
+	This function computes a hash of the mesh node coordinates and
+	element-to-node connectivity. It is used to make sure that a
+	checkpoint is applied to the mesh it was written from.
+
+	Inputs:
+	-------
+	    mesh: mesh object
+	    elem_to_node_IDs: element-to-node connectivity to use instead of
+	    	that of the mesh (e.g. in another element numbering)
+
+	Outputs:
+	--------
+	    fingerprint: SHA-1 hex digest (str)
+	'''
+	if elem_to_node_IDs is None:
+		elem_to_node_IDs = mesh.elem_to_node_IDs
+
+	sha = hashlib.sha1()
+	sha.update(np.ascontiguousarray(mesh.node_coords, dtype="<f8").tobytes())
+	sha.update(np.ascontiguousarray(elem_to_node_IDs,
+			dtype="<i8").tobytes())
+
+	return sha.hexdigest()
+
+
+def get_checkpoint_header(solver):
+	'''
+	This function collects the scalar information stored in a checkpoint.
+
+	Inputs:
+	-------
+	    solver: solver object
+
+	Outputs:
+	--------
+	    header: JSON-serializable dictionary (without array entries)
+	'''
+	mesh = solver.mesh
+	physics = solver.physics
+	stepper = solver.stepper
+
+	header = {
+		"format" : "quail-checkpoint",
+		"version" : CHECKPOINT_VERSION,
+		"time" : float(solver.time),
+		"itime" : int(solver.itime),
+		"solver" : {
+			"type" : type(solver).__name__,
+			"order" : int(solver.order),
+			"basis" : solver.basis.BASIS_TYPE.name,
+		},
+		"physics" : {
+			"type" : physics.PHYSICS_TYPE.name,
+			"ndims" : int(physics.NDIMS),
+			"num_state_vars" : int(physics.NUM_STATE_VARS),
+		},
+		"stepper" : {
+			"type" : stepper.STEPPER_TYPE.name,
+			"dt" : float(stepper.dt),
+			"num_time_steps" : int(stepper.num_time_steps),
+		},
+		"mesh" : {
+			"ndims" : int(mesh.ndims),
+			"num_elems" : int(mesh.num_elems),
+			"num_nodes" : int(mesh.num_nodes),
+			"gbasis" : mesh.gbasis.BASIS_TYPE.name,
+			"gorder" : int(mesh.gorder),
+			"fingerprint" : get_mesh_fingerprint(mesh),
+		},
+	}
+
+	return header
+
+
+def get_checkpoint_arrays(solver):
+	'''
+	This function collects the arrays stored in a checkpoint. They are
+	copied and converted to little-endian.
+
+	Inputs:
+	-------
+	    solver: solver object
+
+	Outputs:
+	--------
+	    arrays: dictionary of arrays
+	'''
+	arrays = {"state_coeffs" : solver.state_coeffs}
+	elem_new_to_old_IDs = getattr(solver.mesh, "elem_new_to_old_IDs", None)
+	if elem_new_to_old_IDs is not None:
+		arrays["elem_new_to_old_IDs"] = elem_new_to_old_IDs
+
+	return {name : np.array(arr, dtype=arr.dtype.newbyteorder("<"),
+			order='C') for name, arr in arrays.items()}
+
+
+def write_checkpoint_file(fname, header, arrays, compress=False):
+	'''
+	This function writes a data file (checkpoint format).
+
+	Inputs:
+	-------
+	    fname: file name (str)
+	    header: see get_checkpoint_header
+	    arrays: see get_checkpoint_arrays
+	    compress: if True, each array is zlib-compressed (compressed
+	    	arrays cannot be memory-mapped)
+	'''
+	header = dict(header)
+	if compress:
+		data = {name : zlib.compress(arr.tobytes())
+				for name, arr in arrays.items()}
 	else:
-		fname = prefix + "_final" + ".pkl"
+		data = {name : arr.tobytes() for name, arr in arrays.items()}
+
+	# The array offsets depend on the header size and vice versa, so
+	# iterate until they are consistent
+	header["arrays"] = {name : {"dtype" : arr.dtype.str,
+			"shape" : list(arr.shape), "offset" : 0,
+			"nbytes" : len(data[name]),
+			"compression" : "zlib" if compress else None}
+			for name, arr in arrays.items()}
+	while True:
+		header_bytes = json.dumps(header).encode("utf-8")
+		offset = get_aligned_offset(PREAMBLE.size + len(header_bytes))
+		changed = False
+		for name in arrays:
+			entry = header["arrays"][name]
+			if entry["offset"] != offset:
+				entry["offset"] = offset
+				changed = True
+			offset = get_aligned_offset(offset + entry["nbytes"])
+		if not changed:
+			break
 
 	with open(fname, 'wb') as fo:
-		# Save solver
-		pickle.dump(solver, fo, pickle.HIGHEST_PROTOCOL)
+		fo.write(PREAMBLE.pack(MAGIC, CHECKPOINT_VERSION, 0,
+				len(header_bytes)))
+		fo.write(header_bytes)
+		for name in arrays:
+			fo.write(b"\0" * (header["arrays"][name]["offset"] - fo.tell()))
+			fo.write(data[name])
+
+
+def get_aligned_offset(offset):
+	'''
+	This function rounds an offset up to the next multiple of ALIGNMENT.
+
+	Inputs:
+	-------
+	    offset: offset in bytes
+
+	Outputs:
+	--------
+	    offset: aligned offset in bytes
+	'''
+	return -(-offset // ALIGNMENT) * ALIGNMENT
 
 
-def read_data_file(fname):
+def is_checkpoint_file(fname):
 	'''
-	This function reads a data file (pickle format).
+	This function checks whether a file is in checkpoint format.
 
 	Inputs:
 	-------
@@ -57,10 +526,229 @@ def read_data_file(fname):
 
 	Outputs:
 	--------
-	    solver: solver object
+	    is_checkpoint: True if the file starts with the checkpoint magic
+	    	bytes
+	'''
+	with open(fname, 'rb') as fo:
+		return fo.read(len(MAGIC)) == MAGIC
+
+
+def is_gzip_file(fname):
+	'''
+	This function checks whether a file is gzip-compressed.
+
+	Inputs:
+	-------
+	    fname: file name (str)
+
+	Outputs:
+	--------
+	    is_gzip: True if the file starts with the gzip magic bytes
+	'''
+	with open(fname, 'rb') as fo:
+		return fo.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def read_checkpoint_header(fname):
+	'''
+	This function reads the JSON header of a checkpoint file.
+
+	Inputs:
+	-------
+	    fname: file name (str)
+
+	Outputs:
+	--------
+	    header: dictionary
 	'''
-	# Open and get solver
 	with open(fname, 'rb') as fo:
-		solver = pickle.load(fo)
+		preamble = fo.read(PREAMBLE.size)
+		if len(preamble) < PREAMBLE.size:
+			raise errors.FileReadError(f"{fname} is not a checkpoint file")
+		magic, version, _, header_size = PREAMBLE.unpack(preamble)
+		if magic != MAGIC:
+			raise errors.FileReadError(f"{fname} is not a checkpoint file")
+		if version > CHECKPOINT_VERSION:
+			raise errors.FileReadError(f"{fname} has checkpoint version "
+					f"{version}; only up to {CHECKPOINT_VERSION} is supported")
+		header = json.loads(fo.read(header_size).decode("utf-8"))
+
+	return header
+
+
+def read_checkpoint_array(fname, entry, mmap=False):
+	'''
+	This function reads one array from a checkpoint file.
+
+	Inputs:
+	-------
+	    fname: file name (str)
+	    entry: array entry of the header (dtype, shape, offset)
+	    mmap: if True, the array is memory-mapped (read-only); ignored
+	    	for compressed arrays
+
+	Outputs:
+	--------
+	    arr: array in native byte order (a read-only memmap if mmap is
+	    	True)
+	'''
+	dtype = np.dtype(entry["dtype"])
+	shape = tuple(entry["shape"])
+	if entry.get("compression") == "zlib":
+		with open(fname, 'rb') as fo:
+			fo.seek(entry["offset"])
+			data = bytearray(zlib.decompress(fo.read(entry["nbytes"])))
+		arr = np.frombuffer(data, dtype=dtype)
+		return arr.astype(dtype.newbyteorder("="), copy=False).reshape(
+				shape)
+	elif entry.get("compression") is not None:
+		raise errors.FileReadError(f"{fname} uses unknown compression "
+				f"{entry['compression']}")
+
+	if mmap:
+		return np.memmap(fname, dtype=dtype, mode='r',
+				offset=entry["offset"], shape=shape)
+
+	count = int(np.prod(shape))
+	with open(fname, 'rb') as fo:
+		fo.seek(entry["offset"])
+		arr = np.fromfile(fo, dtype=dtype, count=count)
+	if arr.size != count:
+		raise errors.FileReadError(f"{fname} is truncated")
+
+	return arr.astype(dtype.newbyteorder("="), copy=False).reshape(shape)
+
+
+class Checkpoint(object):
+	'''
+	This class holds the contents of a checkpoint file. It exposes the
+	same attributes as a solver object that are needed to restart a
+	simulation (state_coeffs, time, itime, order, basis, and
+	stepper.num_time_steps).
+
+	Attributes:
+	-----------
+	header: dict
+		JSON header of the checkpoint
+	state_coeffs: numpy array
+		solution coefficients (shape: [num_elems, nb, ns])
+	time: float
+		solution time
+	itime: int
+		time iteration
+	order: int
+		solution polynomial order
+	basis: Basis class
+		solution basis
+	stepper: SimpleNamespace
+		time stepper state (type, dt, num_time_steps)
+	elem_new_to_old_IDs: numpy array
+		element permutation of a reordered mesh (None if not reordered)
+	'''
+	def __init__(self, fname, mmap=False):
+		header = read_checkpoint_header(fname)
+		self.header = header
+		self.time = header["time"]
+		self.itime = header["itime"]
+		self.order = header["solver"]["order"]
+		self.basis = basis_tools.set_basis(self.order,
+				header["solver"]["basis"])
+		self.stepper = types.SimpleNamespace(**header["stepper"])
+
+		arrays = {name : read_checkpoint_array(fname, entry, mmap)
+				for name, entry in header["arrays"].items()}
+		self.state_coeffs = arrays["state_coeffs"]
+		self.elem_new_to_old_IDs = arrays.get("elem_new_to_old_IDs")
+
+	def check_mesh_compatibility(self, mesh):
+		'''
+		This method makes sure that the checkpoint was written on the given
+		mesh, possibly with a different element ordering (see
+		meshing.tools.reorder_elements).
+
+		Inputs:
+		-------
+			mesh: mesh object
+
+		Outputs:
+		--------
+			errors.IncompatibleError is raised if the element count or
+			the mesh itself differs
+		'''
+		mesh_info = self.header["mesh"]
+		if mesh_info["num_elems"] != mesh.num_elems:
+			raise errors.IncompatibleError("Checkpoint has "
+					f"{mesh_info['num_elems']} elements but the mesh has "
+					f"{mesh.num_elems}")
+
+		# Connectivity of the mesh in the element numbering of the
+		# checkpoint
+		elem_to_node_IDs = mesh_tools.restore_element_ordering(mesh,
+				mesh.elem_to_node_IDs)
+		if self.elem_new_to_old_IDs is not None:
+			elem_to_node_IDs = elem_to_node_IDs[self.elem_new_to_old_IDs]
+
+		if mesh_info["fingerprint"] != get_mesh_fingerprint(mesh,
+				elem_to_node_IDs):
+			raise errors.IncompatibleError("Mesh differs from the one "
+					"the checkpoint was written on")
+
+	def map_to_mesh(self, mesh):
+		'''
+		This method checks the mesh (see check_mesh_compatibility) and
+		permutes the state coefficients from the element numbering of the
+		checkpoint to that of the given mesh.
+
+		Inputs:
+		-------
+			mesh: mesh object
+
+		Outputs:
+		--------
+			self.state_coeffs: state coefficients in the element
+				numbering of mesh [num_elems, nb, ns] (modified)
+		'''
+		self.check_mesh_compatibility(mesh)
+
+		# Original element numbering
+		U = self.state_coeffs
+		if self.elem_new_to_old_IDs is not None:
+			U_orig = np.empty_like(U)
+			U_orig[self.elem_new_to_old_IDs] = U
+			U = U_orig
+		# Element numbering of the mesh
+		if mesh.elem_new_to_old_IDs is not None:
+			U = U[mesh.elem_new_to_old_IDs]
+
+		self.state_coeffs = U
+		self.elem_new_to_old_IDs = mesh.elem_new_to_old_IDs
+
+
+def read_data_file(fname, mmap=False):
+	'''
+	This function reads a data file. The format is detected from the file
+	contents.
+
+	Inputs:
+	-------
+	    fname: file name (str)
+	    mmap: if True, arrays in checkpoint files are memory-mapped
+	    	(read-only); ignored for pickle files
+
+	Outputs:
+	--------
+	    solver: solver object (pickle format) or Checkpoint object
+	    	(checkpoint format)
+	'''
+	if is_checkpoint_file(fname):
+		return Checkpoint(fname, mmap)
+
+	# Open and get solver
+	if is_gzip_file(fname):
+		with gzip.open(fname, 'rb') as fo:
+			solver = pickle.load(fo)
+	else:
+		with open(fname, 'rb') as fo:
+			solver = pickle.load(fo)
 
 	return solver
@@ -0,0 +1,469 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/processing/sweep.py
+#
+#       Contains a runner for parameter sweeps and convergence studies.
+#
+#       Each case is the base input deck with some parameters overwritten
+#       in memory. Cases are run by a pool of processes; cases with the
+#       same mesh parameters are run by the same process so that the mesh
+#       and the solver helpers are created only once. Error norms, wall
+#       times, and convergence rates are collected into one table.
+#
+#       Example:
+#
+#           import processing.sweep as sweep
+#           results = sweep.run_sweep(deck, {
+#                   "Numerics.SolutionOrder" : [1, 2, 3],
+#                   ("Mesh.NumElemsX", "Mesh.NumElemsY") :
+#                   [(4, 4), (8, 8), (16, 16)]},
+#                   num_processes=4, error_variable="Scalar")
+#           sweep.print_results(results)
+#
+#       From the command line, the same sweep is run with
+#
+#           quail input_deck.py --sweep sweep_file.py
+#
+#       where sweep_file.py defines a dict named Sweep with the keys
+#       "Parameters", "NumProcesses", "ErrorVariable", and "ResultsFile".
+#
+# ------------------------------------------------------------------------ #
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import copy
+import csv
+import importlib.machinery
+import importlib.util
+import io
+import itertools
+import multiprocessing as mp
+import numpy as np
+import os
+import time
+import types
+
+import processing.post as post
+
+
+# Sections of an input deck
+DECK_SECTIONS = ["Restart", "TimeStepping", "Numerics", "Mesh", "Physics",
+		"InitialCondition", "ExactSolution", "BoundaryConditions",
+		"SourceTerms", "Ensemble", "Output"]
+# Keys of the Sweep dict of a sweep file and the corresponding arguments
+# of run_sweep
+SWEEP_FILE_KEYS = {"Parameters" : "parameters",
+		"NumProcesses" : "num_processes",
+		"ErrorVariable" : "error_variable",
+		"ResultsFile" : "results_file"}
+
+# Driver function and meshes of the process running the cases (set in
+# run_sweep and inherited by the worker processes)
+_driver = None
+_mesh_cache = {}
+
+
+def load_driver():
+	'''
+	This function loads the driver function of the quail script.
+
+	Outputs:
+	--------
+		driver: driver function (see quail)
+	'''
+	path = os.path.join(os.path.dirname(os.path.dirname(
+			os.path.abspath(__file__))), "quail")
+	loader = importlib.machinery.SourceFileLoader("quail_driver", path)
+	module = importlib.util.module_from_spec(
+			importlib.util.spec_from_loader(loader.name, loader))
+	loader.exec_module(module)
+
+	return module.driver
+
+
+def get_cases(parameters):
+	'''
+	This function creates the cases of a parameter grid, i.e. all
+	combinations of the parameter values.
+
+	Inputs:
+	-------
+		parameters: dict whose keys are parameter paths of the form
+			"Section.Key" (e.g. "Numerics.SolutionOrder"; nested dicts are
+			accessed with more dots, e.g. "BoundaryConditions.x1.BCType")
+			and values are lists of values. A key can also be a tuple of
+			paths whose values are varied together, in which case each
+			value is a tuple.
+
+	Outputs:
+	--------
+		cases: list of dicts whose keys are parameter paths and values are
+			the values of each case
+	'''
+	cases = []
+	for values in itertools.product(*parameters.values()):
+		case = {}
+		for key, value in zip(parameters.keys(), values):
+			if isinstance(key, tuple):
+				if len(value) != len(key):
+					raise ValueError(f"Need one value for each of {key}")
+				case.update(zip(key, value))
+			else:
+				case[key] = value
+		cases.append(case)
+
+	return cases
+
+
+def get_refinement_paths(parameters):
+	'''
+	This function determines which parameters refine the mesh, i.e. the
+	mesh parameters and all parameters varied together with them (e.g. the
+	time step size).
+
+	Inputs:
+	-------
+		parameters: parameter grid (see get_cases)
+
+	Outputs:
+	--------
+		paths: set of parameter paths
+	'''
+	paths = set()
+	for key in parameters:
+		key = key if isinstance(key, tuple) else (key,)
+		if any(path.startswith("Mesh.") for path in key):
+			paths.update(key)
+
+	return paths
+
+
+def get_case_deck(deck, case):
+	'''
+	This function creates the input deck of a case. The base deck is not
+	modified.
+
+	Inputs:
+	-------
+		deck: base input deck (module or dict of sections)
+		case: dict whose keys are parameter paths and values are the values
+			to overwrite
+
+	Outputs:
+	--------
+		case_deck: input deck of the case
+	'''
+	if isinstance(deck, dict):
+		sections = copy.deepcopy(deck)
+	else:
+		sections = {name: copy.deepcopy(getattr(deck, name)) for name in
+				DECK_SECTIONS if hasattr(deck, name)}
+
+	for path, value in case.items():
+		keys = path.split(".")
+		if keys[0] not in DECK_SECTIONS:
+			raise KeyError(f"Unknown input deck section in {path}")
+		params = sections.setdefault(keys[0], {})
+		for key in keys[1:-1]:
+			params = params.setdefault(key, {})
+		params[keys[-1]] = value
+
+	return types.SimpleNamespace(**sections)
+
+
+def run_case(deck, case_ID, case, error_variable=None):
+	'''
+	This function runs a single case.
+
+	Inputs:
+	-------
+		deck: base input deck (dict of sections)
+		case_ID: case index
+		case: parameters of the case (see get_cases)
+		error_variable: name of the variable whose error is computed; if
+			None, no error is computed
+
+	Outputs:
+	--------
+		result: dict with the case parameters, the number of elements
+			("NumElems"), the number of dimensions ("NumDims"), the
+			solution order ("Order"), the number of time steps
+			("NumTimeSteps"), the error ("Error"), the wall time in seconds
+			("WallTime"), and the exception message if the case failed
+			("Failure")
+	'''
+	case_deck = get_case_deck(deck, case)
+	# Write the data files of each case separately
+	output_params = vars(case_deck).setdefault("Output", {})
+	output_params["Prefix"] = output_params.get("Prefix", "Data") + \
+			f"_case{case_ID}"
+
+	result = {"Case" : case_ID, **case, "NumElems" : np.nan,
+			"NumDims" : np.nan, "Order" : np.nan, "NumTimeSteps" : np.nan,
+			"Error" : np.nan, "WallTime" : np.nan, "Failure" : ""}
+
+	try:
+		t0 = time.perf_counter()
+		with contextlib.redirect_stdout(io.StringIO()):
+			solver, physics, mesh = _driver(case_deck, _mesh_cache)
+		result["WallTime"] = time.perf_counter() - t0
+
+		if mesh.base_mesh is not None:
+			result["NumElems"] = mesh.base_mesh.num_elems
+		else:
+			result["NumElems"] = mesh.num_elems
+		result["NumDims"] = mesh.ndims
+		result["Order"] = solver.order
+		result["NumTimeSteps"] = solver.stepper.num_time_steps
+		if error_variable is not None and physics.exact_soln is not None:
+			result["Error"], _ = post.get_error(mesh, physics, solver,
+					error_variable, print_error=False)
+	except Exception as e:
+		result["Failure"] = f"{type(e).__name__}: {e}"
+
+	return result
+
+
+def run_cases(deck, case_IDs, cases, error_variable=None):
+	'''
+	This function runs a group of cases one after the other.
+
+	Inputs:
+	-------
+		deck: base input deck (dict of sections)
+		case_IDs: case indices
+		cases: parameters of each case
+		error_variable: see run_case
+
+	Outputs:
+	--------
+		results: list of results (see run_case)
+	'''
+	return [run_case(deck, case_ID, case, error_variable) for case_ID, case
+			in zip(case_IDs, cases)]
+
+
+def get_case_groups(cases, num_processes):
+	'''
+	This function groups the cases so that cases with the same mesh
+	parameters are run by the same process. If there are fewer groups than
+	processes, groups are split.
+
+	Inputs:
+	-------
+		cases: parameters of each case
+		num_processes: number of processes
+
+	Outputs:
+	--------
+		groups: list of lists of case indices
+	'''
+	groups = {}
+	for case_ID, case in enumerate(cases):
+		key = repr(sorted((path, value) for path, value in case.items()
+				if path.startswith("Mesh.") or path.startswith("Ensemble.")))
+		groups.setdefault(key, []).append(case_ID)
+	groups = list(groups.values())
+
+	num_splits = max(1, num_processes // len(groups))
+	return [[int(case_ID) for case_ID in case_IDs] for group in groups
+			for case_IDs in np.array_split(group, min(num_splits,
+			len(group)))]
+
+
+def get_convergence_rates(results, refinement_paths):
+	'''
+	This function computes the convergence rates of the error between
+	successive mesh refinements. Cases whose parameters differ only in the
+	refinement parameters are compared with each other; the mesh size is
+	taken as NumElems^(-1/NumDims).
+
+	Inputs:
+	-------
+		results: list of results (see run_case)
+		refinement_paths: paths of the parameters that refine the mesh (see
+			get_refinement_paths)
+
+	Outputs:
+	--------
+		results: "Rate" added to each result (NaN for the coarsest mesh)
+			(modified)
+	'''
+	ignored = set(refinement_paths) | {"Case", "NumElems", "NumDims",
+			"Order", "NumTimeSteps", "Error", "WallTime", "Failure", "Rate"}
+
+	series = {}
+	for result in results:
+		result["Rate"] = np.nan
+		key = repr(sorted((k, v) for k, v in result.items() if k not in
+				ignored))
+		series.setdefault(key, []).append(result)
+
+	for results_series in series.values():
+		results_series = sorted([result for result in results_series if
+				np.isfinite(result["Error"]) and result["Error"] > 0.],
+				key=lambda result: result["NumElems"])
+		for coarse, fine in zip(results_series[:-1], results_series[1:]):
+			if fine["NumElems"] == coarse["NumElems"]:
+				continue
+			h_ratio = (coarse["NumElems"]/fine["NumElems"])**(
+					-1./fine["NumDims"])
+			fine["Rate"] = np.log(coarse["Error"]/fine["Error"])/np.log(
+					h_ratio)
+
+	return results
+
+
+def run_sweep(deck, parameters, num_processes=1, error_variable=None,
+		results_file=None, driver=None):
+	'''
+	This function runs a parameter sweep.
+
+	Inputs:
+	-------
+		deck: base input deck (module or dict of sections)
+		parameters: parameter grid (see get_cases)
+		num_processes: number of cases run at the same time
+		error_variable: name of the variable whose error is computed (an
+			exact solution is required); if None, no error is computed
+		results_file: if not None, the results are written to this CSV
+			file
+		driver: driver function; if None, the one in the quail script is
+			used
+
+	Outputs:
+	--------
+		results: list of results, one per case, with convergence rates
+			(see run_case and get_convergence_rates)
+	'''
+	global _driver
+	_driver = load_driver() if driver is None else driver
+
+	if not isinstance(deck, dict):
+		deck = {name: copy.deepcopy(getattr(deck, name)) for name in
+				DECK_SECTIONS if hasattr(deck, name)}
+	cases = get_cases(parameters)
+
+	if num_processes <= 1:
+		results = [run_case(deck, case_ID, case, error_variable) for
+				case_ID, case in enumerate(cases)]
+	else:
+		# The driver is inherited by the worker processes
+		if "fork" not in mp.get_all_start_methods():
+			raise RuntimeError("Running cases in parallel requires the " +
+					"fork start method")
+		groups = get_case_groups(cases, num_processes)
+		with ProcessPoolExecutor(max_workers=num_processes,
+				mp_context=mp.get_context("fork")) as executor:
+			futures = [executor.submit(run_cases, deck, case_IDs,
+					[cases[case_ID] for case_ID in case_IDs],
+					error_variable) for case_IDs in groups]
+			results = [result for future in futures for result in
+					future.result()]
+		results.sort(key=lambda result: result["Case"])
+
+	get_convergence_rates(results, get_refinement_paths(parameters))
+
+	if results_file is not None:
+		write_results(results, results_file)
+
+	return results
+
+
+def read_sweep_file(sweep_file):
+	'''
+	This function reads a sweep file, i.e. a Python file that defines a
+	dict named Sweep (see SWEEP_FILE_KEYS).
+
+	Inputs:
+	-------
+		sweep_file: name of sweep file
+
+	Outputs:
+	--------
+		sweep_params: dict of arguments of run_sweep
+	'''
+	loader = importlib.machinery.SourceFileLoader("quail_sweep", sweep_file)
+	module = importlib.util.module_from_spec(
+			importlib.util.spec_from_loader(loader.name, loader))
+	loader.exec_module(module)
+
+	sweep_params = {}
+	for key, value in module.Sweep.items():
+		if key not in SWEEP_FILE_KEYS:
+			raise KeyError(f"Unknown sweep parameter {key}")
+		sweep_params[SWEEP_FILE_KEYS[key]] = value
+
+	return sweep_params
+
+
+def get_columns(results):
+	'''
+	This function returns the column names of the results table.
+	'''
+	columns = []
+	for result in results:
+		columns += [key for key in result if key not in columns]
+
+	return columns
+
+
+def write_results(results, fname):
+	'''
+	This function writes the results table to a CSV file.
+
+	Inputs:
+	-------
+		results: list of results (see run_sweep)
+		fname: file name
+	'''
+	with open(fname, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=get_columns(results))
+		writer.writeheader()
+		writer.writerows(results)
+
+
+def print_results(results):
+	'''
+	This function prints the results table.
+
+	Inputs:
+	-------
+		results: list of results (see run_sweep)
+	'''
+	columns = [column for column in get_columns(results) if column !=
+			"Failure"]
+
+	def fmt(value):
+		if isinstance(value, float):
+			return f"{value:.4e}"
+		return str(value)
+
+	rows = [[fmt(result.get(column, "")) for column in columns] for result
+			in results]
+	widths = [max([len(column)] + [len(row[i]) for row in rows]) for i,
+			column in enumerate(columns)]
+
+	print("  ".join(column.rjust(width) for column, width in zip(columns,
+			widths)))
+	for row in rows:
+		print("  ".join(value.rjust(width) for value, width in zip(row,
+				widths)))
+
+	for result in results:
+		if result["Failure"]:
+			print(f"Case {result['Case']} failed: {result['Failure']}")
@@ -25,7 +25,7 @@ from scipy.linalg import solve_sylvester
 
 import errors
 
-from general import ModalOrNodal, StepperType, ShapeType
+from general import ModalOrNodal, PrecisionType, StepperType, ShapeType
 
 import meshing.meshbase as mesh_defs
 import meshing.tools as mesh_tools
@@ -488,6 +488,11 @@ class ADERDG(base.SolverBase):
 				basis.MODAL_OR_NODAL != ModalOrNodal.Nodal:
 			raise errors.IncompatibleError
 
+		# Single and mixed precision are only implemented for the DG
+		# solver
+		if self.precision is not PrecisionType.Double:
+			raise errors.IncompatibleError
+
 		if params["CFL"] != None:
 			print("Error Message")
 			print("-------------------------------------------------------")
@@ -515,6 +520,11 @@ class ADERDG(base.SolverBase):
 		self.bface_helpers.compute_helpers(mesh, physics, basis,
 				order)
 
+		# Helpers of the diffusive flux, which only depend on the mesh and
+		# the order
+		if physics.diff_flux_fcn:
+			physics.diff_flux_fcn.precompute_helpers(self)
+
 		# Calculate ADER specific space-time helpers
 		self.elem_helpers_st = ElemHelpersADER()
 		self.elem_helpers_st.compute_helpers(mesh, physics, basis_st,
@@ -691,14 +701,15 @@ class ADERDG(base.SolverBase):
 			physics.diff_flux_fcn.compute_iface_helpers(self)
 		
 		if fluxes:
-			# Compute numerical flux
-			Fq = physics.get_conv_flux_numerical(UqL, UqR, normals_int_faces)
-					# [nf, nq_st, ns]
-
-			# Compute diffusion flux
-			Fq_diff, FL, FR = physics.get_diff_flux_numerical(UqL, UqR,
-					gUqL, gUqR, normals_int_faces) # [nf, nq, ns], 
-					# [nf, nq, ns, ndims], [nf, nq, ns, ndims]
+			with self.profiler.phase("NumericalFlux"):
+				# Compute numerical flux
+				Fq = physics.get_conv_flux_numerical(UqL, UqR,
+						normals_int_faces) # [nf, nq_st, ns]
+
+				# Compute diffusion flux
+				Fq_diff, FL, FR = physics.get_diff_flux_numerical(UqL, UqR,
+						gUqL, gUqR, normals_int_faces) # [nf, nq, ns],
+						# [nf, nq, ns, ndims], [nf, nq, ns, ndims]
 			Fq -= Fq_diff
 
 			FL_phys = self.ref_to_phys_grad(ijacL_elems_st, FL)
@@ -816,10 +827,11 @@ class ADERDG(base.SolverBase):
 				x_ = x[:, i].reshape([nbf, 1, ndims])
 				normals_ = normals[:, i].reshape([nbf, 1, ndims])
 
-				Fq_hold, FqB_hold = BC.get_boundary_flux(physics,
-						UqI[:, i, :].reshape([nbf, 1, ns]),
-						normals_, x_, t_, gUq=gUq[:, i, :, :].reshape(
-						[nbf, 1, ns, ndims]))
+				with self.profiler.phase("NumericalFlux"):
+					Fq_hold, FqB_hold = BC.get_boundary_flux(physics,
+							UqI[:, i, :].reshape([nbf, 1, ns]),
+							normals_, x_, t_, gUq=gUq[:, i, :,
+							:].reshape([nbf, 1, ns, ndims]))
 
 				if not physics.diff_flux_fcn:
 					FqB_hold = np.zeros([nbf, ns, ndims])
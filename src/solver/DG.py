@@ -25,6 +25,7 @@ import numpy as np
 import time
 
 import errors
+from general import PrecisionType
 
 import meshing.meshbase as mesh_defs
 import meshing.tools as mesh_tools
@@ -81,6 +82,12 @@ class ElemHelpers(object):
 		stores the volume of each element
 	normals_elems: numpy array
 		stores the normals of each face of each element
+	length_scales_elems: numpy array
+		stores the length scale of each element in each coordinate
+		direction (used by the artificial viscosity)
+	av_elems: numpy array
+		stores the maximum artificial viscosity of each element at the
+		last residual evaluation (used by the CFL-based time step)
 	domain_vol: float
 		stores the total volume of the domain
 
@@ -97,6 +104,10 @@ class ElemHelpers(object):
 		at the quadrature points
 	compute_helpers
 		call the functions to precompute the necessary helper data
+	tile
+		repeat the helper data for a replicated mesh
+	set_dtype
+		convert the floating-point helper data to a given type
 	'''
 	def __init__(self):
 		self.quad_pts = np.zeros(0)
@@ -114,6 +125,8 @@ class ElemHelpers(object):
 		self.iMM_elems = np.zeros(0)
 		self.vol_elems = np.zeros(0)
 		self.normals_elems = np.zeros(0)
+		self.length_scales_elems = np.zeros(0)
+		self.av_elems = np.zeros(0)
 		self.domain_vol = 0.
 		self.need_phys_grad = True
 
@@ -168,6 +181,8 @@ class ElemHelpers(object):
 				element [num_elems, nq, 1]
 			self.x_elems: precomputed coordinates of the quadrature points
 				in physical space [num_elems, nq, ndims]
+			self.length_scales_elems: precomputed length scale of each
+				element in each direction [num_elems, ndims]
 		'''
 		ndims = mesh.ndims
 		num_elems = mesh.num_elems
@@ -220,6 +235,14 @@ class ElemHelpers(object):
 		# Volumes
 		self.vol_elems, self.domain_vol = mesh_tools.element_volumes(mesh)
 
+		# Length scales in each direction, from the projections of the
+		# faces (see Hartmann and Leicht, "Higher order and adaptive DG
+		# methods for compressible flows", p. 92, 2013)
+		s = 2.*self.vol_elems[:, np.newaxis]/np.einsum('jx, ifjk -> ik',
+				self.face_quad_wts, np.abs(self.normals_elems))
+		self.length_scales_elems = s*((self.vol_elems/np.prod(s,
+				axis=1))**(1./3.))[:, np.newaxis]
+
 
 	def alloc_other_arrays(self, physics, basis, order):
 		'''
@@ -242,6 +265,7 @@ class ElemHelpers(object):
 		self.Uq = np.zeros([nelem, nq, ns])
 		self.Fq = np.zeros([nelem, nq, ns, ndims])
 		self.Sq = np.zeros([nelem, nq, ns])
+		self.av_elems = np.zeros(nelem)
 
 	def compute_helpers(self, mesh, physics, basis, order):
 		'''
@@ -265,6 +289,49 @@ class ElemHelpers(object):
 		self.iMM_elems = basis_tools.get_inv_mass_matrices(mesh,
 				basis, order)
 
+	def tile(self, num_copies, num_elems):
+		'''
+		Repeats the helper data for a mesh made of copies of the mesh the
+		helpers were computed on (see meshing.tools.replicate_mesh)
+
+		Inputs:
+		-------
+			num_copies: number of copies
+			num_elems: number of elements of the original mesh
+		'''
+		for name in ["jac_elems", "ijac_elems", "djac_elems", "x_elems",
+				"basis_phys_grad_elems", "normals_elems", "vol_elems",
+				"length_scales_elems", "Uq", "Fq", "Sq", "iMM_elems",
+				"av_elems"]:
+			arr = getattr(self, name)
+			if arr.ndim > 0 and arr.shape[0] == num_elems:
+				setattr(self, name, np.concatenate([arr]*num_copies))
+		self.domain_vol *= num_copies
+
+	def set_dtype(self, dtype, exclude=[]):
+		'''
+		Converts the double-precision helper arrays (and lists of arrays,
+		e.g. for each boundary group) to a given floating-point type.
+		Integer arrays (e.g. element IDs) are left unchanged.
+
+		Inputs:
+		-------
+			dtype: floating-point type
+			exclude: [OPTIONAL] names of attributes that are not converted
+		'''
+		def convert(arr):
+			if isinstance(arr, np.ndarray) and arr.dtype == np.float64:
+				return arr.astype(dtype)
+			return arr
+
+		for name, value in vars(self).items():
+			if name in exclude:
+				continue
+			if isinstance(value, list):
+				setattr(self, name, [convert(arr) for arr in value])
+			else:
+				setattr(self, name, convert(value))
+
 
 class InteriorFaceHelpers(ElemHelpers):
 	'''
@@ -317,6 +384,13 @@ class InteriorFaceHelpers(ElemHelpers):
 	ijacR_elems: numpy array
 		stores the evaluated inverse of the geometric Jacobian for each
 		right element
+	ip_eta: float
+		interior penalty constant of the diffusive flux (None if not
+		computed; see physics.base.functions.SIP.precompute_helpers)
+	hL: numpy array
+		volume to face length ratio for each left element
+	hR: numpy array
+		volume to face length ratio for each right element
 
 
 	Methods:
@@ -332,6 +406,8 @@ class InteriorFaceHelpers(ElemHelpers):
 		at the quadrature points
 	compute_helpers
 		call the functions to precompute the necessary helper data
+	tile
+		repeat the helper data for a replicated mesh
 	'''
 	def __init__(self):
 		self.quad_pts = np.zeros(0)
@@ -350,6 +426,9 @@ class InteriorFaceHelpers(ElemHelpers):
 		self.faceR_IDs = np.empty(0, dtype=int)
 		self.ijacL_elems = np.zeros(0)
 		self.ijacR_elems = np.zeros(0)
+		self.ip_eta = None
+		self.hL = np.zeros(0)
+		self.hR = np.zeros(0)
 
 	def get_gaussian_quadrature(self, mesh, physics, basis, order):
 		'''
@@ -544,6 +623,28 @@ class InteriorFaceHelpers(ElemHelpers):
 		self.alloc_other_arrays(physics, basis, order)
 		self.store_neighbor_info(mesh)
 
+	def tile(self, num_copies, num_elems):
+		'''
+		Repeats the helper data for a mesh made of copies of the mesh the
+		helpers were computed on (see meshing.tools.replicate_mesh)
+
+		Inputs:
+		-------
+			num_copies: number of copies
+			num_elems: number of elements of the original mesh
+		'''
+		for name in ["normals_int_faces", "ijacL_elems", "ijacR_elems",
+				"face_lengths", "faceL_IDs", "faceR_IDs"]:
+			setattr(self, name, np.concatenate([getattr(self, name)]*
+					num_copies))
+
+		# Element IDs of copy i are offset by i*num_elems
+		offsets = num_elems*np.arange(num_copies)
+		self.elemL_IDs = (offsets[:, np.newaxis] +
+				self.elemL_IDs).reshape(-1)
+		self.elemR_IDs = (offsets[:, np.newaxis] +
+				self.elemR_IDs).reshape(-1)
+
 
 class BoundaryFaceHelpers(InteriorFaceHelpers):
 	'''
@@ -588,6 +689,11 @@ class BoundaryFaceHelpers(InteriorFaceHelpers):
 	face_IDs: list of numpy arrays 
 		list containing arrays of face IDs of boundary
 		face neighbors for each boundary group
+	ip_eta: float
+		interior penalty constant of the diffusive flux (None if not
+		computed; see physics.base.functions.SIP.precompute_helpers)
+	h_bgroups: list of numpy arrays
+		volume to face length ratio for each boundary face
 
 	Methods:
 	--------
@@ -599,6 +705,8 @@ class BoundaryFaceHelpers(InteriorFaceHelpers):
 		at the quadrature points
 	compute_helpers
 		call the functions to precompute the necessary helper data
+	tile
+		repeat the helper data for a replicated mesh
 	'''
 	def __init__(self):
 		self.quad_pts = np.zeros(0)
@@ -614,6 +722,8 @@ class BoundaryFaceHelpers(InteriorFaceHelpers):
 		self.Fq = np.zeros(0)
 		self.elem_IDs = []
 		self.face_IDs = []
+		self.ip_eta = None
+		self.h_bgroups = []
 
 	def get_basis_and_geom_data(self, mesh, basis, order):
 		'''
@@ -766,6 +876,26 @@ class BoundaryFaceHelpers(InteriorFaceHelpers):
 		self.alloc_other_arrays(physics, basis, order)
 		self.store_neighbor_info(mesh)
 
+	def tile(self, num_copies, num_elems):
+		'''
+		Repeats the helper data for a mesh made of copies of the mesh the
+		helpers were computed on (see meshing.tools.replicate_mesh)
+
+		Inputs:
+		-------
+			num_copies: number of copies
+			num_elems: number of elements of the original mesh
+		'''
+		for name in ["normals_bgroups", "x_bgroups", "ijac_bgroups",
+				"face_lengths_bgroups", "face_IDs"]:
+			setattr(self, name, [np.concatenate([arr]*num_copies) for arr
+					in getattr(self, name)])
+
+		# Element IDs of copy i are offset by i*num_elems
+		offsets = num_elems*np.arange(num_copies)
+		self.elem_IDs = [(offsets[:, np.newaxis] + elem_IDs).reshape(-1)
+				for elem_IDs in self.elem_IDs]
+
 
 class DG(base.SolverBase):
 	'''
@@ -810,6 +940,23 @@ class DG(base.SolverBase):
 		physics = self.physics
 		basis = self.basis
 
+		# Reuse the helpers of a previous solver with the same
+		# discretization on this mesh (e.g. in a parameter sweep)
+		helpers_cache = getattr(mesh, "helpers_cache", None)
+		key = (type(physics).__name__, self.order, basis.BASIS_TYPE,
+				self.params["ElementQuadrature"],
+				self.params["FaceQuadrature"], self.params["NodeType"],
+				self.params["ColocatedPoints"], self.precision)
+		if helpers_cache is not None and key in helpers_cache:
+			self.elem_helpers, self.int_face_helpers, \
+					self.bface_helpers = helpers_cache[key]
+			return
+
+		# For a replicated mesh, the helpers of one copy are computed and
+		# then repeated
+		if mesh.base_mesh is not None:
+			mesh = mesh.base_mesh
+
 		self.elem_helpers = ElemHelpers()
 		self.elem_helpers.compute_helpers(mesh, physics, basis,
 				self.order)
@@ -820,6 +967,32 @@ class DG(base.SolverBase):
 		self.bface_helpers.compute_helpers(mesh, physics, basis,
 				self.order)
 
+		if mesh is not self.mesh:
+			num_copies = self.mesh.num_copies
+			self.elem_helpers.tile(num_copies, mesh.num_elems)
+			self.int_face_helpers.tile(num_copies, mesh.num_elems)
+			self.bface_helpers.tile(num_copies, mesh.num_elems)
+
+		# Helpers of the diffusive flux, which only depend on the mesh and
+		# the order
+		if physics.diff_flux_fcn:
+			physics.diff_flux_fcn.precompute_helpers(self)
+
+		# The helpers are computed in double precision and then converted;
+		# with mixed precision, the inverse mass matrices are kept in
+		# double precision for the time step updates
+		if self.dtype != np.float64:
+			exclude = []
+			if self.precision is PrecisionType.Mixed:
+				exclude = ["iMM_elems"]
+			self.elem_helpers.set_dtype(self.dtype, exclude)
+			self.int_face_helpers.set_dtype(self.dtype)
+			self.bface_helpers.set_dtype(self.dtype)
+
+		if helpers_cache is not None:
+			helpers_cache[key] = (self.elem_helpers, self.int_face_helpers,
+					self.bface_helpers)
+
 	def get_element_residual(self, Uc, res_elem):
 		# Unpack
 		physics = self.physics
@@ -834,6 +1007,8 @@ class DG(base.SolverBase):
 		x_elems = elem_helpers.x_elems
 		nq = quad_wts.shape[0]
 		fluxes = self.params["ConvFluxSwitch"]
+		diff_fluxes = self.params["DiffFluxSwitch"]
+		diffusion = physics.diff_flux_fcn and diff_fluxes
 		sources = self.params["SourceSwitch"]
 
 		# Interpolate state at quad points
@@ -847,11 +1022,16 @@ class DG(base.SolverBase):
 			# Get min and max of state variables for reporting
 			self.get_min_max_state(Uq)
 
-		if fluxes:
-			# Evaluate the inviscid flux integral
-			Fq = physics.get_conv_flux_interior(Uq)[0] # [ne, nq, ns, ndims]
+		if fluxes or diffusion:
+			if fluxes:
+				# Evaluate the inviscid flux integral
+				Fq = physics.get_conv_flux_interior(Uq)[0]
+						# [ne, nq, ns, ndims]
+			else:
+				Fq = np.zeros(Uq.shape + (ndims,), dtype=Uq.dtype)
+						# [ne, nq, ns, ndims]
 
-			if physics.diff_flux_fcn:
+			if diffusion:
 				# Evaluate the diffusion flux
 				Fq -= physics.get_diff_flux_interior(Uq, gUq) 
 					# [ne, nq, ns, ndims]
@@ -871,10 +1051,11 @@ class DG(base.SolverBase):
 					elem_helpers, Sq) # [ne, nb, ns]
 
 		# Add artificial viscosity term
-		if self.params["ArtificialViscosity"]:
+		if self.params["ArtificialViscosity"] and diff_fluxes:
 			av_param = self.params["AVParameter"]
 			res_elem -= solver_tools.calculate_artificial_viscosity_integral(
-					physics, elem_helpers, Uc, av_param, self.order)
+					physics, elem_helpers, Uc, av_param, self.order, Uq=Uq,
+					grad_Uq=gUq, av_elems=elem_helpers.av_elems)
 
 		return res_elem # [ne, nb, ns]
 
@@ -883,6 +1064,7 @@ class DG(base.SolverBase):
 		mesh = self.mesh
 		physics = self.physics
 		fluxes = self.params["ConvFluxSwitch"]
+		diffusion = physics.diff_flux_fcn and self.params["DiffFluxSwitch"]
 
 		int_face_helpers = self.int_face_helpers
 		elem_helpers = self.elem_helpers
@@ -920,44 +1102,54 @@ class DG(base.SolverBase):
 		gUqR = self.ref_to_phys_grad(ijacR_elems, gUqR_ref)
 
 		# Allocate resL and resR (needed for operator splitting)
-		nifL = self.int_face_helpers.elemL_IDs.shape[0]
-		nifR = self.int_face_helpers.elemR_IDs.shape[0]
-		resL = np.zeros([nifL, nq, ns])
-		resR = np.zeros([nifR, nq, ns])
-		resL_diff = np.zeros([nifL, nq, ns])
-		resR_diff = np.zeros([nifR, nq, ns])
+		nb = UcL.shape[1]
+		nifL = UcL.shape[0]
+		nifR = UcR.shape[0]
+		resL = np.zeros([nifL, nb, ns], dtype=UcL.dtype)
+		resR = np.zeros([nifR, nb, ns], dtype=UcR.dtype)
+		resL_diff = np.zeros([nifL, nb, ns], dtype=UcL.dtype)
+		resR_diff = np.zeros([nifR, nb, ns], dtype=UcR.dtype)
 
 		if physics.diff_flux_fcn:
 			# Calculate diffusion flux helpers
 			physics.diff_flux_fcn.compute_iface_helpers(self)
 
-		if fluxes:
-			# Compute numerical flux
-			Fq = physics.get_conv_flux_numerical(UqL, UqR, normals_int_faces)
-					# [nf, nq, ns]
-
-			# Compute diffusion flux
-			Fq_diff, FL, FR = physics.get_diff_flux_numerical(UqL, UqR,
-					gUqL, gUqR, normals_int_faces) # [nf, nq, ns], 
-					# [nf, nq, ns, ndims], [nf, nq, ns, ndims]
-			Fq -= Fq_diff
-
-			FL_phys = self.ref_to_phys_grad(ijacL_elems, FL)
-			FR_phys = self.ref_to_phys_grad(ijacR_elems, FR)
+		if fluxes or diffusion:
+			if fluxes:
+				# Compute numerical flux
+				with self.profiler.phase("NumericalFlux"):
+					Fq = physics.get_conv_flux_numerical(UqL, UqR,
+							normals_int_faces) # [nf, nq, ns]
+			else:
+				Fq = np.zeros_like(UqL) # [nf, nq, ns]
+
+			if diffusion:
+				# Compute diffusion flux
+				with self.profiler.phase("NumericalFlux"):
+					Fq_diff, FL, FR = physics.get_diff_flux_numerical(UqL,
+							UqR, gUqL, gUqR, normals_int_faces)
+							# [nf, nq, ns], [nf, nq, ns, ndims],
+							# [nf, nq, ns, ndims]
+				Fq -= Fq_diff
+
+				FL_phys = self.ref_to_phys_grad(ijacL_elems, FL)
+				FR_phys = self.ref_to_phys_grad(ijacR_elems, FR)
+
+				# Compute additional boundary flux integrals for diffusion
+				# terms
+				resL_diff = self.calculate_boundary_flux_integral_sum(
+						faces_to_basis_ref_gradL[faceL_IDs], quad_wts,
+						FL_phys)
+
+				resR_diff = self.calculate_boundary_flux_integral_sum(
+						faces_to_basis_ref_gradR[faceR_IDs], quad_wts, 
+						FR_phys)
 
 			# Compute contribution to left and right element residuals
 			resL = solver_tools.calculate_boundary_flux_integral(
 					faces_to_basisL[faceL_IDs], quad_wts, Fq)
 			resR = solver_tools.calculate_boundary_flux_integral(
 					faces_to_basisR[faceR_IDs], quad_wts, Fq)
-
-			# Compute additional boundary flux integrals for diffusion terms
-			resL_diff = self.calculate_boundary_flux_integral_sum(
-					faces_to_basis_ref_gradL[faceL_IDs], quad_wts, FL_phys)
-
-			resR_diff = self.calculate_boundary_flux_integral_sum(
-					faces_to_basis_ref_gradR[faceR_IDs], quad_wts, 
-					FR_phys)
 			
 		return resL, resR, resL_diff, resR_diff # [nif, nb, ns]
 
@@ -970,6 +1162,7 @@ class DG(base.SolverBase):
 		bface_helpers = self.bface_helpers
 		elem_helpers = self.elem_helpers
 		fluxes = self.params["ConvFluxSwitch"]
+		diffusion = physics.diff_flux_fcn and self.params["DiffFluxSwitch"]
 
 		quad_wts = bface_helpers.quad_wts
 		normals_bgroups = bface_helpers.normals_bgroups
@@ -1002,16 +1195,20 @@ class DG(base.SolverBase):
 		if physics.diff_flux_fcn:
 			physics.diff_flux_fcn.compute_bface_helpers(self, bgroup_num)
 		
-		if fluxes:
+		if fluxes or diffusion:
 			# Compute boundary flux
-			Fq, FqB = BC.get_boundary_flux(physics, UqI, normals, x, self.time, gUq=gUq)
-			FqB_phys = self.ref_to_phys_grad(ijac, FqB)
+			with self.profiler.phase("NumericalFlux"):
+				Fq, FqB = BC.get_boundary_flux(physics, UqI, normals, x,
+						self.time, gUq=gUq, conv_flux=fluxes,
+						diff_flux=diffusion)
 
 			# Compute contribution to adjacent element residual
 			resB = solver_tools.calculate_boundary_flux_integral(
 					basis_val, quad_wts, Fq)
 
-			resB -= self.calculate_boundary_flux_integral_sum(
-				basis_ref_grad, quad_wts, FqB_phys)
+			if diffusion:
+				FqB_phys = self.ref_to_phys_grad(ijac, FqB)
+				resB -= self.calculate_boundary_flux_integral_sum(
+					basis_ref_grad, quad_wts, FqB_phys)
 
 		return resB
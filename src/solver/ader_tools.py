@@ -635,6 +635,7 @@ def predictor_elem_explicit(solver, dt, W, U_pred):
 		if np.amax(np.abs(err)) < threshold:
 			U_pred = U_pred_new
 			print("Predictor iterations: ", i)
+			solver.profiler.add_count("ADERPredictorIterations", i + 1)
 			break
 
 		U_pred = np.copy(U_pred_new)
@@ -776,6 +777,7 @@ def predictor_elem_implicit(solver, dt, W, U_pred):
 
 		if (np.amax(np.abs(err)) < threshold):
 			print("Predictor iterations: ", i)
+			solver.profiler.add_count("ADERPredictorIterations", i + 1)
 			U_pred = np.copy(U_pred_new)
 			break
 
@@ -21,6 +21,7 @@
 #
 # ------------------------------------------------------------------------ #
 from abc import ABC, abstractmethod
+import contextlib
 import importlib
 import numpy as np
 import time
@@ -28,7 +29,7 @@ import time
 import errors
 
 from general import ModalOrNodal, NodeType, ShapeType, QuadratureType, \
-		StepperType, LimiterType, BasisType
+		StepperType, LimiterType, BasisType, PrecisionType
 
 import meshing.meshbase as mesh_defs
 import meshing.tools as mesh_tools
@@ -46,6 +47,9 @@ import numerics.quadrature.segment as segment
 import processing.post as post_defs
 import processing.readwritedatafiles as readwritedatafiles
 
+import solver.parallel as solver_parallel
+import solver.profiler as solver_profiler
+import solver.threaded as solver_threaded
 import solver.tools as solver_tools
 
 
@@ -71,6 +75,11 @@ class SolverBase(ABC):
 		order of solution approximation
 	state_coeffs: numpy array
 		coefficients of polynomial approximation of global solution
+	precision: PrecisionType
+		floating-point precision of the solver
+	dtype: numpy dtype
+		floating-point type of the precomputed helpers and the residual
+		evaluation (float32 unless the precision is double)
 	limiter: object
 		contains all the information and methods for the limiter class
 	verbose: bool
@@ -79,6 +88,18 @@ class SolverBase(ABC):
 		minimum values of state variables
 	max_state: numpy array
 		maximum values of state variables
+	ensemble: Ensemble object
+		per-member data when several cases are advanced at once (see
+		solver.ensemble); None otherwise
+	profiler: Profiler object
+		times the phases of the solve (see solver.profiler)
+	av_elems: numpy array
+		maximum artificial viscosity of each element at the last residual
+		evaluation that is not at a perturbed state (see DG.ElemHelpers
+		and perturbed_residuals); None until it is available
+	perturbed: bool
+		True while the residual is evaluated at perturbed states (see
+		perturbed_residuals)
 
 	Abstract Methods:
 	-----------------
@@ -130,10 +151,20 @@ class SolverBase(ABC):
 		self.order = params["SolutionOrder"]
 		basis_type  = params["SolutionBasis"]
 		self.basis = basis_tools.set_basis(self.order, basis_type)
+		# Floating-point precision
+		self.precision = PrecisionType[params["Precision"]]
+		if self.precision is PrecisionType.Double:
+			self.dtype = np.float64
+		else:
+			self.dtype = np.float32
+		if self.precision is PrecisionType.Mixed:
+			state_dtype = np.float64
+		else:
+			state_dtype = self.dtype
 		# State polynomial coefficients (what we're solving for)
 		self.state_coeffs = np.zeros([mesh.num_elems,
 				self.basis.get_num_basis_coeff(self.order),
-				physics.NUM_STATE_VARS])
+				physics.NUM_STATE_VARS], dtype=state_dtype)
 
 		# Node type
 		node_type = params["NodeType"]
@@ -167,6 +198,9 @@ class SolverBase(ABC):
 				limiter.tvb_param = tvb_param
 				self.limiters.append(limiter)
 
+		# Backend of the pointwise physics kernels
+		physics.set_backend(params["Backend"])
+
 		# Console output
 		self.verbose = params["Verbose"]
 		self.progress_bar = params["ProgressBar"]
@@ -188,6 +222,16 @@ class SolverBase(ABC):
 		# Counter to compare ODE evaluations in ADERDG and Splitting methods
 		self.count_evaluations = 0
 
+		# Worker processes for parallel residual evaluation (started in
+		# solve)
+		self.parallel_residual = None
+		self.threaded_kernels = None
+		self.ensemble = None
+		self.av_elems = None
+		self.perturbed = False
+		# Replaced at the start of solve if params["Profile"] is True
+		self.profiler = solver_profiler.NULL_PROFILER
+
 		# Compatibility checks
 		self.check_compatibility()
 
@@ -250,6 +294,17 @@ class SolverBase(ABC):
 				  StepperType[stepper_type] == StepperType.Simpler ) :
 			raise errors.IncompatibleError
 
+		# The IMEX steppers split the residual with ConvFluxSwitch,
+		# DiffFluxSwitch, and SourceSwitch, which are not seen by worker
+		# processes
+		if StepperType[stepper_type] in [StepperType.ARK2,
+				StepperType.BDF2]:
+			if not (source_switch and convflux_switch and
+					params["DiffFluxSwitch"]):
+				raise errors.IncompatibleError
+			if params["NumProcesses"] > 1:
+				raise errors.IncompatibleError
+
 		# Currently, positivity-preserving limiter not compatible with
 		# modal triangular basis
 		if LimiterType.PositivityPreserving.name in params["ApplyLimiters"] \
@@ -258,6 +313,21 @@ class SolverBase(ABC):
 			if basis.BASIS_TYPE == BasisType.HierarchicH1Tri:
 				raise errors.IncompatibleError
 
+		# The worker processes share double-precision arrays (single and
+		# mixed precision are also only implemented for the DG solver; see
+		# ADERDG.check_compatibility)
+		if self.precision is not PrecisionType.Double:
+			if params["NumProcesses"] > 1:
+				raise errors.IncompatibleError
+			# The finite difference linearizations of the implicit, IMEX,
+			# and steady-state steppers (including the p-multigrid
+			# preconditioner) perturb the state by sqrt(eps) of float64,
+			# which is below the resolution of float32
+			if StepperType[stepper_type] in [StepperType.NewtonKrylov,
+					StepperType.ARK2, StepperType.ESDIRK2, StepperType.BDF2,
+					StepperType.PMultigrid]:
+				raise errors.IncompatibleError
+
 	@abstractmethod
 	def precompute_matrix_helpers(self):
 		'''
@@ -448,15 +518,28 @@ class SolverBase(ABC):
 		physics = self.physics
 		stepper = self.stepper
 
-		# Initialize residual to zero
-		if stepper.balance_const is None:
-			res[:] = 0.
-		else:
-			res[:] = stepper.balance_const
-
-		self.get_boundary_face_residuals(U, res)
-		self.get_element_residuals(U, res)
-		self.get_interior_face_residuals(U, res)
+		with self.profiler.phase("Residual"):
+			# Evaluate with worker processes if requested
+			if self.parallel_residual is not None:
+				return self.parallel_residual.get_residual(self, U, res)
+
+			# With mixed precision, the residual is evaluated in single
+			# precision
+			if U.dtype != self.dtype:
+				U = U.astype(self.dtype)
+
+			# Initialize residual to zero
+			if stepper.balance_const is None:
+				res[:] = 0.
+			else:
+				res[:] = stepper.balance_const
+
+			# The primitive variables of each state array are shared by
+			# the flux and wave speed evaluations
+			with physics.cache_primitive_variables():
+				self.get_boundary_face_residuals(U, res)
+				self.get_element_residuals(U, res)
+				self.get_interior_face_residuals(U, res)
 
 		return res
 
@@ -473,8 +556,33 @@ class SolverBase(ABC):
 		--------
 			res: calculated residual array
 		'''
-
-		res = self.get_element_residual(U, res)
+		with self.profiler.phase("ElementResidual"):
+			if self.threaded_kernels is not None:
+				res = self.threaded_kernels.get_element_residual(self, U,
+						res)
+			else:
+				res = self.get_element_residual(U, res)
+
+		# The artificial viscosity of this evaluation is reused by the
+		# CFL-based time step
+		if self.params["ArtificialViscosity"] and \
+				self.params["DiffFluxSwitch"] and not self.perturbed:
+			self.av_elems = self.elem_helpers.av_elems.copy()
+
+	@contextlib.contextmanager
+	def perturbed_residuals(self):
+		'''
+		This method returns a context manager inside which the residual is
+		evaluated at perturbed states, e.g. for the finite difference
+		linearizations of the implicit steppers. Quantities of these
+		evaluations are not recorded for reuse (see av_elems).
+		'''
+		perturbed = self.perturbed
+		self.perturbed = True
+		try:
+			yield
+		finally:
+			self.perturbed = perturbed
 
 	def get_interior_face_residuals(self, U, res):
 		'''
@@ -502,19 +610,34 @@ class SolverBase(ABC):
 		UL = U[elemL_IDs]
 		UR = U[elemR_IDs]
 
-		# Calculate face residuals for left and right elements
-		RL, RR, RL_diff, RR_diff = self.get_interior_face_residual(faceL_IDs, faceR_IDs, UL,
-				UR)
-
-		# Add this residual back to the global. The np.add.at function is
-		# used to correctly handle duplicate element IDs.
-		np.add.at(res, elemL_IDs, -RL)
-		np.add.at(res, elemR_IDs,  RR)
-
-		# Add the additional diffusion portion of the residual to the
-		# correct left/right states.
-		np.add.at(res, elemL_IDs,  RL_diff)
-		np.add.at(res, elemR_IDs,  RR_diff)
+		# Per-member physical parameters of the faces (ensemble mode)
+		if self.ensemble is not None:
+			self.ensemble.set_member_params(self.physics,
+					self.ensemble.param_arrays_int_faces)
+
+		with self.profiler.phase("InteriorFaceResidual"):
+			# Calculate face residuals for left and right elements
+			if self.threaded_kernels is not None:
+				RL, RR, RL_diff, RR_diff = \
+						self.threaded_kernels.get_interior_face_residual(
+						self, UL, UR)
+			else:
+				RL, RR, RL_diff, RR_diff = self.get_interior_face_residual(
+						faceL_IDs, faceR_IDs, UL, UR)
+
+			# Add this residual back to the global. The np.add.at function
+			# is used to correctly handle duplicate element IDs.
+			np.add.at(res, elemL_IDs, -RL)
+			np.add.at(res, elemR_IDs,  RR)
+
+			# Add the additional diffusion portion of the residual to the
+			# correct left/right states.
+			np.add.at(res, elemL_IDs,  RL_diff)
+			np.add.at(res, elemR_IDs,  RR_diff)
+
+		if self.ensemble is not None:
+			self.ensemble.set_member_params(self.physics,
+					self.ensemble.param_arrays_elems)
 
 	def get_boundary_face_residuals(self, U, res):
 		'''
@@ -537,17 +660,29 @@ class SolverBase(ABC):
 		elem_IDs = bface_helpers.elem_IDs
 		face_IDs = bface_helpers.face_IDs
 
-		# Loop through boundary groups
-		for bgroup in mesh.boundary_groups.values():
+		with self.profiler.phase("BoundaryFaceResidual"):
+			# Loop through boundary groups
+			for bgroup in mesh.boundary_groups.values():
+
+				bgroup_elem_IDs = elem_IDs[bgroup.number]
+				bgroup_face_IDs = face_IDs[bgroup.number]
 
-			bgroup_elem_IDs = elem_IDs[bgroup.number]
-			bgroup_face_IDs = face_IDs[bgroup.number]
+				# Per-member physical parameters of the faces (ensemble
+				# mode)
+				if self.ensemble is not None:
+					self.ensemble.set_member_params(physics,
+							self.ensemble.param_arrays_bgroups[
+							bgroup.name])
 
-			resB = self.get_boundary_face_residual(bgroup,
-					bgroup_face_IDs, U[bgroup_elem_IDs],
-					res[bgroup_elem_IDs])
+				resB = self.get_boundary_face_residual(bgroup,
+						bgroup_face_IDs, U[bgroup_elem_IDs],
+						res[bgroup_elem_IDs])
 
-			np.add.at(res, bgroup_elem_IDs, -resB)
+				np.add.at(res, bgroup_elem_IDs, -resB)
+
+		if self.ensemble is not None:
+			self.ensemble.set_member_params(physics,
+					self.ensemble.param_arrays_elems)
 
 	def apply_limiter(self, U):
 		'''
@@ -561,9 +696,10 @@ class SolverBase(ABC):
 		--------
 			U: limited solution array
 		'''
-		for limiter in self.limiters:
-			if limiter is not None:
-				limiter.limit_solution(self, U)
+		with self.profiler.phase("Limiter"):
+			for limiter in self.limiters:
+				if limiter is not None:
+					limiter.limit_solution(self, U)
 
 	def get_min_max_state(self, Uq):
 		'''
@@ -600,7 +736,12 @@ class SolverBase(ABC):
 		'''
 		# Progress bar output
 		if self.progress_bar:
-			solver_tools.update_progress(t / self.stepper.tfinal)
+			if self.stepper.tfinal is None:
+				# Steady state: fraction of the maximum number of iterations
+				solver_tools.update_progress((itime + 1) /
+						self.stepper.num_time_steps)
+			else:
+				solver_tools.update_progress(t / self.stepper.tfinal)
 
 		# Basic info: time, residual. If using a progress bar, only the last
 		# iteration is output.
@@ -639,52 +780,109 @@ class SolverBase(ABC):
 			write_interval = np.NAN
 		write_final_solution = self.params["WriteFinalSolution"]
 		write_initial_solution = self.params["WriteInitialSolution"]
+		data_file_writer = readwritedatafiles.get_data_file_writer(
+				self.params)
 
 		if write_initial_solution:
-			readwritedatafiles.write_data_file(self, 0)
-
-		t0 = time.time()
-
-		print("\n\nUNSTEADY SOLVE:")
-		print("--------------------------------------------------------" + \
-				"-----------------------")
-
-		# Custom user function initial iteration
-		self.custom_user_function(self)
-
-		while self.itime < stepper.num_time_steps:
-			# Reset min and max state
-			self.max_state[:] = -np.inf
-			self.min_state[:] = np.inf
-
-			# Get time step size
-			stepper.dt = stepper.get_time_step(stepper, self)
+			data_file_writer.write(self, 0)
 
-			# Integrate in time
-			res = stepper.take_time_step(self)
-
-			# Increment time
-			t += stepper.dt
-			self.time = t
-
-			# Custom user function definition
-			self.custom_user_function(self)
-
-			# Print info
-			self.print_info(physics, res, self.itime, t, stepper.dt)
-
-			# Write data file
-			if (self.itime + 1) % write_interval == 0:
-				readwritedatafiles.write_data_file(self,
-						(self.itime + 1) // write_interval)
-
-			self.itime += 1
+		try:
+			# Start worker processes for parallel residual evaluation
+			self.parallel_residual = \
+					solver_parallel.start_parallel_residual(self)
+			# Start thread pool for chunked residual evaluation
+			self.threaded_kernels = \
+					solver_threaded.start_threaded_kernels(self)
+
+			# Time the phases of the solve if requested
+			self.profiler = profiler = solver_profiler.get_profiler(
+					self.params)
+			profiler.start()
+
+			t0 = time.time()
+
+			if stepper.STEPPER_TYPE in [StepperType.NewtonKrylov,
+					StepperType.PMultigrid]:
+				print("\n\nSTEADY SOLVE:")
+			else:
+				print("\n\nUNSTEADY SOLVE:")
+			print("----------------------------------------------------" + \
+					"---------------------------")
+
+			# Custom user function initial iteration
+			with profiler.phase("CustomUserFunction"):
+				self.custom_user_function(self)
+
+			while self.itime < stepper.num_time_steps:
+				# Reset min and max state
+				self.max_state[:] = -np.inf
+				self.min_state[:] = np.inf
+
+				# Get time step size
+				with profiler.phase("GetTimeStep"):
+					stepper.dt = stepper.get_time_step(stepper, self)
+
+				# Integrate in time
+				with profiler.phase("TimeStep"):
+					res = stepper.take_time_step(self)
+
+				# Increment time
+				t += stepper.dt
+				self.time = t
+
+				# Custom user function definition
+				with profiler.phase("CustomUserFunction"):
+					self.custom_user_function(self)
+
+				with profiler.phase("Output"):
+					# Print info
+					self.print_info(physics, res, self.itime, t, stepper.dt)
+
+					# Write data file
+					if (self.itime + 1) % write_interval == 0:
+						data_file_writer.write(self,
+								(self.itime + 1) // write_interval)
+
+				profiler.end_step(self.itime, t, stepper.dt)
+				self.itime += 1
+
+				# Stop once a steady state is reached
+				if stepper.converged:
+					break
+
+			t1 = time.time()
+		except BaseException:
+			# Stop the writer thread before propagating the error. An
+			# error of the writer itself must not replace the original
+			# one.
+			try:
+				data_file_writer.close()
+			except Exception as e:
+				print("Data file writer failed: %r" % (e))
+			raise
+		finally:
+			# Release the worker processes, shared memory, and thread pool,
+			# also if a time step raised
+			if self.parallel_residual is not None:
+				self.parallel_residual.close()
+				self.parallel_residual = None
+			if self.threaded_kernels is not None:
+				self.threaded_kernels.close()
+				self.threaded_kernels = None
 
-		t1 = time.time()
 		print("\nWall clock time = %g seconds" % (t1 - t0))
 		print("--------------------------------------------------------" + \
 				"-----------------------")
 		self.wall_clock_time = t1 - t0
 
-		if write_final_solution:
-			readwritedatafiles.write_data_file(self, -1)
+		with profiler.phase("Output"):
+			if write_final_solution:
+				data_file_writer.write(self, -1)
+
+			# Wait for pending data files
+			data_file_writer.close()
+
+		profiler.stop()
+		if self.params["Profile"]:
+			profiler.print_summary()
+			profiler.write(self.params["Prefix"])
@@ -0,0 +1,352 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/ensemble.py
+#
+#       Contains the ensemble mode, in which many independent cases
+#       (members) that share the mesh and numerics are advanced in a
+#       single solve.
+#
+#       The members are stacked along the element axis: the solver runs on
+#       a mesh made of one copy of the mesh per member (see
+#       meshing.tools.replicate_mesh), so the state coefficients of member
+#       i are state_coeffs[i*ne:(i+1)*ne]. The helpers are computed for one
+#       copy and repeated. Physical parameters that differ between members
+#       are stored in the physics object as arrays (see MemberArray) with
+#       one value per element, interior face, or boundary face, depending
+#       on what is being evaluated.
+#
+# ------------------------------------------------------------------------ #
+import copy
+import numpy as np
+
+import errors
+
+
+def get_member_params(params, num_members):
+	'''
+	This function splits a dict of per-member parameter lists into one
+	dict per member.
+
+	Inputs:
+	-------
+		params: dict whose values are lists of length num_members
+		num_members: number of members
+
+	Outputs:
+	--------
+		member_params: list of dicts [num_members]
+	'''
+	for key, values in params.items():
+		if len(values) != num_members:
+			raise ValueError(f"Ensemble parameter {key} needs " +
+					f"{num_members} values")
+
+	return [{key: values[i] for key, values in params.items()} for i in
+			range(num_members)]
+
+
+class MemberArray(np.ndarray):
+	'''
+	This class stores a per-member physical parameter for each element or
+	face [n]. In arithmetic with an array whose leading axis is the
+	element or face axis (e.g. [n, nq] or [n, nq, ns]), it broadcasts
+	along that leading axis, like a scalar parameter would.
+	'''
+	def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+		# Number of dimensions of the other operands
+		ndim = max([np.ndim(x) for x in inputs if not isinstance(x,
+				MemberArray)] + [1])
+
+		args = [x.view(np.ndarray).reshape((-1,) + (1,)*(ndim - 1)) if
+				isinstance(x, MemberArray) else x for x in inputs]
+		if "out" in kwargs:
+			kwargs["out"] = tuple(x.view(np.ndarray) if isinstance(x,
+					MemberArray) else x for x in kwargs["out"])
+		result = getattr(ufunc, method)(*args, **kwargs)
+
+		if ndim == 1 and isinstance(result, np.ndarray):
+			# Result is still one value per element or face
+			return result.view(MemberArray)
+		return result
+
+
+class MemberFunction(object):
+	'''
+	This class evaluates a function (e.g. the initial condition) member by
+	member, each with its own function object and physical parameters.
+
+	Attributes:
+	-----------
+	fcns: list
+		function object of each member [num_members]
+	member_physics: list
+		physics object of each member [num_members]
+	'''
+	def __init__(self, fcns, member_physics):
+		self.fcns = fcns
+		self.member_physics = member_physics
+
+	def get_state(self, physics, x, t):
+		'''
+		This method evaluates the state.
+
+		Inputs:
+		-------
+			physics: physics object (unused; each member's own is used)
+			x: coordinates in physical space, elements of all members
+				stacked [num_elems, nq, ndims]
+			t: time
+
+		Outputs:
+		--------
+			Uq: state [num_elems, nq, ns]
+		'''
+		xs = np.split(x, len(self.fcns))
+		return np.concatenate([fcn.get_state(member_physics, x_member, t)
+				for fcn, member_physics, x_member in zip(self.fcns,
+				self.member_physics, xs)])
+
+
+class Ensemble(object):
+	'''
+	This class stores the information needed to advance an ensemble of
+	independent cases in one solve.
+
+	Attributes:
+	-----------
+	num_members: int
+		number of members
+	base_mesh: mesh object
+		mesh of a single member
+	member_physics: list
+		physics object of each member, with its own physical parameters,
+		initial condition, and exact solution [num_members]
+	param_values: dict
+		values of each physics attribute that differs between members;
+		keys are attribute names, values are arrays [num_members]
+	varies_IC: bool
+		if True, then the initial condition differs between members
+		(through its own parameters or the physical parameters)
+	member_IDs_elems: numpy array
+		member of each element [num_elems]
+	member_IDs_int_faces: numpy array
+		member of each interior face [num_interior_faces]
+	member_IDs_bgroups: dict
+		member of each boundary face of each boundary group; keys are
+		boundary names
+	param_arrays_elems: dict
+		per-member parameters of each element (see get_param_arrays)
+	param_arrays_int_faces: dict
+		per-member parameters of each interior face
+	param_arrays_bgroups: dict
+		per-member parameters of each boundary face of each boundary
+		group; keys are boundary names
+
+	Methods:
+	--------
+	get_param_arrays
+		gathers the per-member physical parameters of a set of elements
+		or faces
+	set_member_params
+		sets the per-member physical parameters of the elements or faces
+		about to be evaluated
+	get_member_state_coeffs
+		returns the state coefficients with a leading member axis
+	get_member_solver
+		returns a solver object for a single member
+	'''
+	def __init__(self, solver, physics_params, member_physics_params=None,
+			IC_params=None, member_IC_params=None, exact_params=None,
+			member_exact_params=None):
+		'''
+		Inputs:
+		-------
+			solver: solver object on a replicated mesh
+			physics_params: physical parameters passed to
+				physics.set_physical_params
+			member_physics_params: per-member physical parameters (dict of
+				lists)
+			IC_params: initial condition parameters, including "Function"
+			member_IC_params: per-member initial condition parameters (dict
+				of lists)
+			exact_params: exact solution parameters, including "Function"
+			member_exact_params: per-member exact solution parameters (dict
+				of lists)
+		'''
+		mesh = solver.mesh
+		physics = solver.physics
+		if mesh.base_mesh is None:
+			raise errors.IncompatibleError("The ensemble mode requires a " +
+					"replicated mesh")
+
+		self.num_members = num_members = mesh.num_copies
+		self.base_mesh = base_mesh = mesh.base_mesh
+
+		# Member of each element and face
+		members = np.arange(num_members)
+		self.member_IDs_elems = np.repeat(members, base_mesh.num_elems)
+		self.member_IDs_int_faces = np.repeat(members,
+				base_mesh.num_interior_faces)
+		self.member_IDs_bgroups = {bname: np.repeat(members,
+				bgroup.num_boundary_faces) for bname, bgroup in
+				base_mesh.boundary_groups.items()}
+
+		# Physics of each member
+		member_physics_params = get_member_params(
+				member_physics_params or {}, num_members)
+		member_IC_params = get_member_params(member_IC_params or {},
+				num_members)
+		member_exact_params = get_member_params(member_exact_params or {},
+				num_members)
+		self.member_physics = []
+		for i in range(num_members):
+			member_physics = copy.copy(physics)
+			member_physics.set_physical_params(**{**physics_params,
+					**member_physics_params[i]})
+			if member_IC_params[i]:
+				params = {**IC_params, **member_IC_params[i]}
+				member_physics.set_IC(IC_type=params.pop("Function"),
+						**params)
+			if member_exact_params[i]:
+				params = {**exact_params, **member_exact_params[i]}
+				member_physics.set_exact(exact_type=params.pop("Function"),
+						**params)
+			self.member_physics.append(member_physics)
+
+		# Physical parameters that differ between members
+		self.param_values = {}
+		for name, value in vars(physics).items():
+			values = [getattr(member_physics, name) for member_physics in
+					self.member_physics]
+			if name in ["IC", "exact_soln"] or all(v is value or
+					np.array_equal(v, value) for v in values):
+				continue
+			if not all(np.isscalar(v) for v in values):
+				raise errors.IncompatibleError("Per-member physical " +
+						f"parameters must be scalars ({name})")
+			self.param_values[name] = np.array(values, dtype=float)
+
+		if self.param_values and (solver.params.get("NumThreads", 1) > 1
+				or solver.params.get("NumProcesses", 1) > 1):
+			raise errors.IncompatibleError("Per-member physical " +
+					"parameters are not supported with NumThreads or " +
+					"NumProcesses greater than 1")
+
+		# Evaluate the initial condition and exact solution member by
+		# member, each with its own physical parameters
+		self.varies_IC = bool(self.param_values) or any(member_IC_params)
+		if self.varies_IC and physics.IC is not None:
+			physics.IC = MemberFunction([member_physics.IC for
+					member_physics in self.member_physics],
+					self.member_physics)
+		if (self.param_values or any(member_exact_params)) and \
+				physics.exact_soln is not None:
+			physics.exact_soln = MemberFunction([member_physics.exact_soln
+					for member_physics in self.member_physics],
+					self.member_physics)
+
+		# Per-member parameters of each element and face
+		self.param_arrays_elems = self.get_param_arrays(
+				self.member_IDs_elems)
+		self.param_arrays_int_faces = self.get_param_arrays(
+				self.member_IDs_int_faces)
+		self.param_arrays_bgroups = {bname: self.get_param_arrays(
+				member_IDs) for bname, member_IDs in
+				self.member_IDs_bgroups.items()}
+
+		# Elements are the default
+		self.set_member_params(physics, self.param_arrays_elems)
+
+	def __len__(self):
+		return self.num_members
+
+	def get_param_arrays(self, member_IDs):
+		'''
+		This method gathers the per-member physical parameters of a set of
+		elements or faces.
+
+		Inputs:
+		-------
+			member_IDs: member of each element or face [n]
+
+		Outputs:
+		--------
+			param_arrays: dict whose keys are attribute names and values are
+				MemberArray objects [n]
+		'''
+		return {name: values[member_IDs].view(MemberArray) for name, values
+				in self.param_values.items()}
+
+	def set_member_params(self, physics, param_arrays):
+		'''
+		This method sets the per-member physical parameters for the
+		elements or faces about to be evaluated.
+
+		Inputs:
+		-------
+			physics: physics object
+			param_arrays: see get_param_arrays (e.g.
+				self.param_arrays_int_faces)
+
+		Outputs:
+		--------
+			physics: per-member attributes set (modified)
+		'''
+		for name, arr in param_arrays.items():
+			setattr(physics, name, arr)
+
+	def get_member_state_coeffs(self, solver):
+		'''
+		This method returns the state coefficients with a leading member
+		axis.
+
+		Inputs:
+		-------
+			solver: solver object
+
+		Outputs:
+		--------
+			U: view of solver.state_coeffs [num_members, ne, nb, ns]
+		'''
+		U = solver.state_coeffs
+		return U.reshape((self.num_members, -1) + U.shape[1:])
+
+	def get_member_solver(self, solver, member_ID):
+		'''
+		This method creates a solver object for a single member, e.g. to
+		use the functions in processing/plot.py and processing/post.py.
+
+		Inputs:
+		-------
+			solver: solver object
+			member_ID: member index
+
+		Outputs:
+		--------
+			member_solver: solver object on the mesh of one member, whose
+				state coefficients are a copy of the member's
+		'''
+		member_solver = copy.copy(solver)
+		member_solver.mesh = self.base_mesh
+		member_solver.physics = self.member_physics[member_ID]
+		member_solver.ensemble = None
+		member_solver.state_coeffs = \
+				self.get_member_state_coeffs(solver)[member_ID].copy()
+		member_solver.precompute_matrix_helpers()
+
+		return member_solver
@@ -0,0 +1,417 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/jacobian.py
+#
+#       Contains functions for the Jacobian of the DG residual with respect
+#       to the state coefficients, dR/dU.
+#
+#       The residual of an element depends only on its own state and the
+#       states of its face neighbors, so dR/dU is block sparse with
+#       [nb*ns, nb*ns] blocks. The element volume, interior face, and
+#       boundary face terms are approximated with finite differences of
+#       solver.get_residual (see general.JacobianType). The elements are
+#       colored such that one residual evaluation per color and per state
+#       coefficient gives all columns of that coefficient in every element
+#       of the color. The source terms are differentiated pointwise with
+#       their own Jacobians instead (see SourceBase.get_jacobian); those
+#       without an analytical or complex-step Jacobian use the same finite
+#       difference type as the residual.
+#
+# ------------------------------------------------------------------------ #
+import numpy as np
+from scipy import sparse
+
+from general import JacobianType
+
+from physics.base.data import SourceBase
+import solver.tools as solver_tools
+
+
+def get_elem_adjacency(mesh):
+	'''
+	This function creates the element adjacency matrix, in which elements
+	that share an interior face are connected.
+
+	Inputs:
+	-------
+		mesh: mesh object
+
+	Outputs:
+	--------
+		adjacency: sparse matrix [num_elems, num_elems]
+	'''
+	elemL_IDs = np.array([face.elemL_ID for face in mesh.interior_faces],
+			dtype=int)
+	elemR_IDs = np.array([face.elemR_ID for face in mesh.interior_faces],
+			dtype=int)
+	num_elems = mesh.num_elems
+
+	adjacency = sparse.coo_matrix((np.ones(2*elemL_IDs.shape[0]),
+			(np.concatenate([elemL_IDs, elemR_IDs]),
+			np.concatenate([elemR_IDs, elemL_IDs]))),
+			shape=(num_elems, num_elems)).tocsr()
+	adjacency.data[:] = 1.
+
+	return adjacency
+
+
+def color_elements(adjacency, distance=1):
+	'''
+	This function colors the elements greedily such that elements within
+	the given distance in the adjacency graph have different colors.
+
+	Inputs:
+	-------
+		adjacency: element adjacency matrix (see get_elem_adjacency)
+		distance: minimum graph distance (plus one) between elements of the
+			same color; 1 for neighbors, 2 for neighbors of neighbors
+
+	Outputs:
+	--------
+		colors: color of each element [num_elems]
+	'''
+	graph = adjacency.copy()
+	for i in range(distance - 1):
+		graph = graph + graph @ adjacency
+	graph = graph.tocsr()
+
+	num_elems = adjacency.shape[0]
+	colors = np.full(num_elems, -1, dtype=int)
+	for elem_ID in range(num_elems):
+		neighbor_colors = colors[graph.indices[graph.indptr[elem_ID]:
+				graph.indptr[elem_ID + 1]]]
+		color = 0
+		while np.any(neighbor_colors == color):
+			color += 1
+		colors[elem_ID] = color
+
+	return colors
+
+
+def get_perturbation_size(U):
+	'''
+	This function returns the finite difference perturbation of each
+	state coefficient.
+
+	Inputs:
+	-------
+		U: solution array [num_elems, nb, ns]
+
+	Outputs:
+	--------
+		eps: perturbation sizes [num_elems, nb, ns]
+	'''
+	return np.sqrt(np.finfo(float).eps)*(1. + np.abs(U))
+
+
+def get_mass_matrix_blocks(solver):
+	'''
+	This function returns the element mass matrices with the ordering of
+	the Jacobian blocks, i.e. the state coefficients of an element are
+	ordered as U[elem_ID].reshape(-1).
+
+	Inputs:
+	-------
+		solver: solver object
+
+	Outputs:
+	--------
+		mass_blocks: mass matrix blocks [num_elems, nb*ns, nb*ns]
+	'''
+	mass_elems = np.linalg.inv(solver.elem_helpers.iMM_elems)
+	num_elems, nb, _ = mass_elems.shape
+	ns = solver.physics.NUM_STATE_VARS
+
+	return np.einsum('eij, st -> eisjt', mass_elems, np.eye(ns)).reshape(
+			num_elems, nb*ns, nb*ns)
+
+
+def get_source_jacobian_blocks(solver, U,
+		jacobian_type=JacobianType.ForwardDifference):
+	'''
+	This function computes the Jacobian of the source term integral of
+	each element from the pointwise source term Jacobians (see
+	SourceBase.get_jacobian). Source terms without an analytical or
+	complex-step Jacobian are differentiated with the given finite
+	difference type.
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		jacobian_type: finite difference type (member of JacobianType
+			enum)
+
+	Outputs:
+	--------
+		source_blocks: source term Jacobian blocks [num_elems, nb*ns,
+			nb*ns]; None if there are no source terms
+
+	Notes:
+	------
+		ADERDG integrates the source terms over the space-time predictor,
+		which is not accounted for here, so None is returned.
+	'''
+	physics = solver.physics
+	elem_helpers = solver.elem_helpers
+	if not physics.source_terms or not solver.params["SourceSwitch"] \
+			or hasattr(solver, "ader_helpers"):
+		return None
+
+	num_elems, nb, ns = U.shape
+	Uq = np.einsum('jn, inl -> ijl', elem_helpers.basis_val, U)
+	x_elems = elem_helpers.x_elems
+	Sjac = np.zeros([num_elems, Uq.shape[1], ns, ns])
+	for source in physics.source_terms:
+		if jacobian_type == JacobianType.CentralDifference and \
+				not source.COMPLEX_SAFE and \
+				type(source).get_jacobian is SourceBase.get_jacobian:
+			Sjac += source.get_central_difference_jacobian(physics, Uq,
+					x_elems, solver.time)
+		else:
+			Sjac += source.get_jacobian(physics, Uq, x_elems, solver.time)
+
+	dRdU = solver_tools.calculate_dRdU(elem_helpers, Sjac)
+			# [ne, nb, nb, ns, ns]
+
+	return dRdU.transpose(0, 1, 3, 2, 4).reshape(num_elems, nb*ns, nb*ns)
+
+
+def compute_jacobian_columns(solver, U, res, colors, get_rows,
+		jacobian_type=JacobianType.ForwardDifference):
+	'''
+	This function evaluates the columns of the Jacobian with one residual
+	evaluation (two for central differences) per color and per state
+	coefficient.
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		res: residual at U [num_elems, nb, ns] (not used for central
+			differences)
+		colors: color of each element (see color_elements)
+		get_rows: function that takes the elements of a color and returns
+			the (row element, column element) pairs to keep
+		jacobian_type: finite difference type (member of JacobianType
+			enum)
+
+	Outputs:
+	--------
+		row_elem_IDs: row element of each block [num_blocks]
+		col_elem_IDs: column element of each block [num_blocks]
+		blocks: Jacobian blocks [num_blocks, nb*ns, nb*ns]
+	'''
+	num_elems, nb, ns = U.shape
+	n = nb*ns
+	eps = get_perturbation_size(U).reshape(num_elems, n)
+	central = jacobian_type == JacobianType.CentralDifference
+
+	Up = U.copy()
+	Up_flat = Up.reshape(num_elems, n)
+	U_flat = U.reshape(num_elems, n)
+	res_p = np.zeros_like(U)
+	res_m = np.zeros_like(U)
+
+	row_elem_IDs = []
+	col_elem_IDs = []
+	blocks = []
+	for color in range(np.max(colors) + 1):
+		elem_IDs = np.where(colors == color)[0]
+		rows, cols = get_rows(elem_IDs)
+		color_blocks = np.zeros([rows.shape[0], n, n])
+		for k in range(n):
+			Up_flat[elem_IDs, k] = U_flat[elem_IDs, k] + eps[elem_IDs, k]
+			with solver.perturbed_residuals():
+				res_p = solver.get_residual(Up, res_p)
+			if central:
+				Up_flat[elem_IDs, k] = U_flat[elem_IDs, k] - \
+						eps[elem_IDs, k]
+				with solver.perturbed_residuals():
+					res_m = solver.get_residual(Up, res_m)
+				dres = (res_p - res_m).reshape(num_elems, n)/2.
+			else:
+				dres = (res_p - res).reshape(num_elems, n)
+			Up_flat[elem_IDs, k] = U_flat[elem_IDs, k]
+
+			color_blocks[:, :, k] = dres[rows]/eps[cols, k:k+1]
+
+		row_elem_IDs.append(rows)
+		col_elem_IDs.append(cols)
+		blocks.append(color_blocks)
+
+	return np.concatenate(row_elem_IDs), np.concatenate(col_elem_IDs), \
+			np.concatenate(blocks)
+
+
+def compute_jacobian_blocks(solver, U, res, colors, get_rows,
+		jacobian_type):
+	'''
+	This function evaluates the Jacobian blocks, with pointwise source
+	term Jacobians where available (see get_source_jacobian_blocks) and
+	finite differences of the residual otherwise.
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		res: residual at U [num_elems, nb, ns]; if None, it is evaluated
+		colors: color of each element (see color_elements)
+		get_rows: see compute_jacobian_columns
+		jacobian_type: finite difference type (member of JacobianType
+			enum)
+
+	Outputs:
+	--------
+		row_elem_IDs: row element of each block [num_blocks]
+		col_elem_IDs: column element of each block [num_blocks]
+		blocks: Jacobian blocks [num_blocks, nb*ns, nb*ns]
+	'''
+	# The source term switch of worker processes cannot be changed from
+	# here, so pointwise source term Jacobians are only used in serial
+	source_blocks = None
+	if solver.parallel_residual is None:
+		source_blocks = get_source_jacobian_blocks(solver, U,
+				jacobian_type)
+
+	params = solver.params
+	source_switch = params["SourceSwitch"]
+	if source_blocks is not None:
+		# Finite differences of the residual without source terms
+		params["SourceSwitch"] = False
+		res = None
+	try:
+		if res is None and jacobian_type != JacobianType.CentralDifference:
+			res = solver.get_residual(U, np.zeros_like(U)).copy()
+		rows, cols, blocks = compute_jacobian_columns(solver, U, res,
+				colors, get_rows, jacobian_type)
+	finally:
+		params["SourceSwitch"] = source_switch
+
+	if source_blocks is not None:
+		diag = rows == cols
+		blocks[diag] += source_blocks[rows[diag]]
+
+	return rows, cols, blocks
+
+
+def compute_block_diagonal(solver, U, res=None,
+		jacobian_type=JacobianType.ForwardDifference):
+	'''
+	This function computes the diagonal blocks of the Jacobian, i.e. the
+	derivatives of the residual of each element with respect to its own
+	state coefficients.
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		res: [OPTIONAL] residual at U [num_elems, nb, ns]
+		jacobian_type: [OPTIONAL] finite difference type (member of
+			JacobianType enum)
+
+	Outputs:
+	--------
+		jac_diag: diagonal blocks [num_elems, nb*ns, nb*ns]
+	'''
+	adjacency = get_elem_adjacency(solver.mesh)
+	colors = color_elements(adjacency, distance=1)
+
+	rows, cols, blocks = compute_jacobian_blocks(solver, U, res, colors,
+			lambda elem_IDs: (elem_IDs, elem_IDs), jacobian_type)
+
+	jac_diag = np.empty_like(blocks)
+	jac_diag[rows] = blocks
+
+	return jac_diag
+
+
+def compute_jacobian(solver, U, res=None,
+		jacobian_type=JacobianType.ForwardDifference):
+	'''
+	This function computes the Jacobian of the residual.
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		res: [OPTIONAL] residual at U [num_elems, nb, ns]
+		jacobian_type: [OPTIONAL] finite difference type (member of
+			JacobianType enum)
+
+	Outputs:
+	--------
+		jac: Jacobian in block sparse row format with [nb*ns, nb*ns] blocks
+			[num_elems*nb*ns, num_elems*nb*ns]
+	'''
+	num_elems, nb, ns = U.shape
+	n = nb*ns
+
+	adjacency = get_elem_adjacency(solver.mesh)
+	# Perturbing an element changes the residual of its neighbors, so
+	# elements of the same color must not share a neighbor
+	colors = color_elements(adjacency, distance=2)
+	stencil = (adjacency + sparse.identity(num_elems, format="csr")).tocsc()
+
+	def get_rows(elem_IDs):
+		# The element itself and its neighbors
+		cols = np.repeat(elem_IDs, np.diff(stencil.indptr)[elem_IDs])
+		rows = np.concatenate([stencil.indices[stencil.indptr[elem_ID]:
+				stencil.indptr[elem_ID + 1]] for elem_ID in elem_IDs])
+		return rows, cols
+
+	rows, cols, blocks = compute_jacobian_blocks(solver, U, res, colors,
+			get_rows, jacobian_type)
+
+	# Sort blocks by row, then column
+	order = np.lexsort((cols, rows))
+	indptr = np.concatenate([[0], np.cumsum(np.bincount(rows,
+			minlength=num_elems))])
+
+	return sparse.bsr_matrix((blocks[order], cols[order], indptr),
+			shape=(num_elems*n, num_elems*n))
+
+
+def compute_spatial_operator(solver, U, res=None,
+		jacobian_type=JacobianType.ForwardDifference):
+	'''
+	This function computes the Jacobian of the semi-discrete system
+	dU/dt = M^{-1} R(U), e.g. for linear stability analysis (its
+	eigenvalues times the time step must lie in the stability region of
+	the time stepping scheme).
+
+	Inputs:
+	-------
+		solver: solver object
+		U: solution array [num_elems, nb, ns]
+		res: [OPTIONAL] residual at U [num_elems, nb, ns]
+		jacobian_type: [OPTIONAL] finite difference type (member of
+			JacobianType enum)
+
+	Outputs:
+	--------
+		op: M^{-1} dR/dU in block sparse row format
+			[num_elems*nb*ns, num_elems*nb*ns]
+	'''
+	jac = compute_jacobian(solver, U, res, jacobian_type)
+	inv_mass_blocks = np.linalg.inv(get_mass_matrix_blocks(solver))
+	num_elems = inv_mass_blocks.shape[0]
+	inv_mass = sparse.bsr_matrix((inv_mass_blocks, np.arange(num_elems),
+			np.arange(num_elems + 1)), shape=jac.shape)
+
+	return (inv_mass @ jac).tobsr(blocksize=jac.blocksize)
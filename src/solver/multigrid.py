@@ -0,0 +1,421 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/multigrid.py
+#
+#       Contains the p-multigrid hierarchy.
+#
+#       The levels are DG solvers of decreasing solution order on the same
+#       mesh. Since the approximation spaces are nested, a coarse state is
+#       represented exactly on a finer level (prolongation P), residuals
+#       (weak forms) are restricted with P^T, and states are restricted
+#       with the L2 projection on the reference element. The hierarchy is
+#       used for nonlinear full approximation scheme (FAS) cycles (see
+#       stepper.PMultigrid) and for linear cycles that precondition the
+#       GMRES solves of the implicit steppers (see
+#       general.PreconditionerType).
+#
+# ------------------------------------------------------------------------ #
+import copy
+import numpy as np
+
+import errors
+from general import JacobianType, MultigridSmootherType
+
+import numerics.timestepping.tools as stepper_tools
+
+import solver.jacobian as solver_jacobian
+
+
+# Stage coefficients of the multistage smoother
+RK_SMOOTHER_COEFFS = [1./4., 1./3., 1./2., 1.]
+
+
+def get_level_solver(solver, order):
+	'''
+	This function creates a solver of the given order on the same mesh.
+	The parameters and the source terms are shared with the given solver,
+	so that switches set at runtime (e.g. by the IMEX steppers) apply to
+	all levels.
+
+	Inputs:
+	-------
+		solver: solver object
+		order: solution order of the level
+
+	Outputs:
+	--------
+		level_solver: solver object of the level
+	'''
+	params = dict(solver.params, SolutionOrder=order, TimeStepper="FE",
+			ApplyLimiters=[], RestartFile=None)
+
+	# The numerical flux functions store arrays sized for the quadrature
+	physics = copy.copy(solver.physics)
+	physics.conv_flux_fcn = copy.copy(physics.conv_flux_fcn)
+	if physics.diff_flux_fcn:
+		physics.diff_flux_fcn = copy.copy(physics.diff_flux_fcn)
+
+	level_solver = type(solver)(params, physics, solver.mesh)
+	level_solver.params = solver.params
+
+	return level_solver
+
+
+def get_transfer_operators(basis_fine, order_fine, basis_coarse, mesh):
+	'''
+	This function computes the operators between two nested bases on the
+	reference element.
+
+	Inputs:
+	-------
+		basis_fine: basis object of the fine level
+		order_fine: solution order of the fine level
+		basis_coarse: basis object of the coarse level
+		mesh: mesh object
+
+	Outputs:
+	--------
+		prolongation: coefficients of the coarse basis functions in the
+			fine basis [nb_fine, nb_coarse]
+		restriction: L2 projection of the fine basis onto the coarse basis
+			[nb_coarse, nb_fine]
+	'''
+	quad_order = basis_fine.get_quadrature_order(mesh, 2*order_fine)
+	quad_pts, quad_wts = basis_fine.get_quadrature_data(quad_order)
+	phi_fine = basis_fine.get_values(quad_pts) # [nq, nb_fine]
+	phi_coarse = basis_coarse.get_values(quad_pts) # [nq, nb_coarse]
+
+	MM_fine = np.einsum('q, qi, qj -> ij', quad_wts[:, 0], phi_fine,
+			phi_fine)
+	MM_coarse = np.einsum('q, qi, qj -> ij', quad_wts[:, 0], phi_coarse,
+			phi_coarse)
+	MM_mixed = np.einsum('q, qi, qj -> ij', quad_wts[:, 0], phi_fine,
+			phi_coarse) # [nb_fine, nb_coarse]
+
+	prolongation = np.linalg.solve(MM_fine, MM_mixed)
+	restriction = np.linalg.solve(MM_coarse, MM_mixed.T)
+
+	return prolongation, restriction
+
+
+def get_residual(solver, U, res):
+	'''
+	This function evaluates the residual of a level (default for
+	PMultigrid.get_residual).
+	'''
+	return solver.get_residual(U, res)
+
+
+class PMultigrid(object):
+	'''
+	This class holds the levels of the p-multigrid hierarchy.
+
+	Attributes:
+	-----------
+	solvers: list
+		solver of each level, from the given solver (finest) to the
+		coarsest
+	prolongations: list
+		prolongation operator from level k + 1 to level k
+		[nb_k, nb_{k+1}]
+	restrictions: list
+		state restriction operator from level k to level k + 1
+		[nb_{k+1}, nb_k]
+	mass_elems: list
+		mass matrix blocks of each level (see
+		solver_jacobian.get_mass_matrix_blocks)
+	states: list
+		states of each level about which the linear cycles are linearized
+	residuals: list
+		residuals at states
+	jac_diags: list
+		diagonal Jacobian blocks of each level [num_elems, nb*ns, nb*ns]
+	get_residual: function
+		evaluates the residual of a level in the linear cycles; takes the
+		level solver, the state, and the residual array
+	'''
+	def __init__(self, solver, min_order=0):
+		if hasattr(solver, "ader_helpers") or solver.ensemble is not None:
+			raise errors.IncompatibleError("p-multigrid is only " +
+					"supported with the DG solver")
+
+		orders = range(solver.order - 1, min(min_order, solver.order) - 1,
+				-1)
+		self.solvers = [solver] + [get_level_solver(solver, order) for
+				order in orders]
+
+		self.prolongations = []
+		self.restrictions = []
+		for fine, coarse in zip(self.solvers[:-1], self.solvers[1:]):
+			prolongation, restriction = get_transfer_operators(fine.basis,
+					fine.order, coarse.basis, solver.mesh)
+			self.prolongations.append(prolongation)
+			self.restrictions.append(restriction)
+
+		self.mass_elems = [solver_jacobian.get_mass_matrix_blocks(
+				level_solver) for level_solver in self.solvers]
+		self.states = None
+		self.residuals = None
+		self.jac_diags = [None]*len(self.solvers)
+		self.get_residual = get_residual
+
+	@property
+	def num_levels(self):
+		return len(self.solvers)
+
+	def restrict_state(self, k, U):
+		'''
+		This method restricts a state from level k to level k + 1.
+		'''
+		return np.einsum('ij, ejs -> eis', self.restrictions[k], U)
+
+	def restrict_residual(self, k, res):
+		'''
+		This method restricts a residual from level k to level k + 1.
+		'''
+		return np.einsum('ji, ejs -> eis', self.prolongations[k], res)
+
+	def prolongate(self, k, U):
+		'''
+		This method prolongates a state or correction from level k + 1 to
+		level k.
+		'''
+		return np.einsum('ij, ejs -> eis', self.prolongations[k], U)
+
+	def get_block_inverses(self, k, dt):
+		'''
+		This method computes the inverses of the diagonal blocks of
+		M/dt - dR/dU on level k.
+
+		Inputs:
+		-------
+			k: level
+			dt: time step (scalar or [num_elems])
+
+		Outputs:
+		--------
+			inv_blocks: inverse blocks [num_elems, nb*ns, nb*ns]
+		'''
+		mass_dt = self.mass_elems[k]/np.reshape(dt, (-1, 1, 1))
+
+		return np.linalg.inv(mass_dt - self.jac_diags[k])
+
+	def update_jacobians(self, U, jacobian_type=
+			JacobianType.ForwardDifference, jac_diag=None):
+		'''
+		This method restricts the state to all levels and computes the
+		diagonal Jacobian blocks about which the linear cycles are
+		linearized. The residuals are evaluated with solver.get_residual,
+		so the caller selects the residual terms (see
+		IMEXStepperBase.set_residual_terms).
+
+		Inputs:
+		-------
+			U: state of the finest level [num_elems, nb, ns]
+			jacobian_type: [OPTIONAL] finite difference type (member of
+				JacobianType enum)
+			jac_diag: [OPTIONAL] diagonal Jacobian blocks of the finest
+				level, if already computed
+
+		Outputs:
+		--------
+			self.states, self.residuals, self.jac_diags: (modified)
+		'''
+		self.states = [U.copy()]
+		for k in range(self.num_levels - 1):
+			self.states.append(self.restrict_state(k, self.states[k]))
+
+		self.residuals = []
+		for k, level_solver in enumerate(self.solvers):
+			U_k = self.states[k]
+			res = level_solver.get_residual(U_k, np.zeros_like(U_k)).copy()
+			self.residuals.append(res)
+			if k == 0 and jac_diag is not None:
+				self.jac_diags[k] = jac_diag
+			else:
+				self.jac_diags[k] = solver_jacobian.compute_block_diagonal(
+						level_solver, U_k, res, jacobian_type)
+
+	def apply_linear(self, b, dt, num_sweeps, inv_blocks=None):
+		'''
+		This method applies one linear V-cycle to (M/dt - dR/dU) x = b on
+		the finest level, with block-Jacobi smoothing. The Jacobian-vector
+		products are finite differences of self.get_residual about
+		self.states (see update_jacobians).
+
+		Inputs:
+		-------
+			b: right-hand side [num_elems, nb, ns]
+			dt: time step of the finest level (scalar or [num_elems])
+			num_sweeps: number of pre- and post-smoothing sweeps
+			inv_blocks: [OPTIONAL] inverse diagonal blocks of each level
+				(see get_block_inverses); computed if not given
+
+		Outputs:
+		--------
+			x: approximate solution [num_elems, nb, ns]
+		'''
+		if inv_blocks is None:
+			inv_blocks = [self.get_block_inverses(k, dt) for k in
+					range(self.num_levels)]
+
+		def matvec(k, x):
+			U = self.states[k]
+			num_elems, n, _ = self.mass_elems[k].shape
+			x_norm = np.linalg.norm(x)
+			if x_norm == 0.:
+				return np.zeros_like(x)
+			eps = np.sqrt(np.finfo(float).eps*(1. + np.linalg.norm(U)))/ \
+					x_norm
+			with self.solvers[k].perturbed_residuals():
+				res_p = self.get_residual(self.solvers[k], U + eps*x,
+						np.zeros_like(U))
+			mass_dt = self.mass_elems[k]/np.reshape(dt, (-1, 1, 1))
+			return np.einsum('eij, ej -> ei', mass_dt, x.reshape(num_elems,
+					n)).reshape(x.shape) - (res_p - self.residuals[k])/eps
+
+		def smooth(k, x, b, num_sweeps):
+			num_elems, n, _ = inv_blocks[k].shape
+			for i in range(num_sweeps):
+				r = b - matvec(k, x)
+				x += np.einsum('eij, ej -> ei', inv_blocks[k],
+						r.reshape(num_elems, n)).reshape(x.shape)
+			return x
+
+		def cycle(k, b):
+			x = np.zeros_like(b)
+			if k == self.num_levels - 1:
+				# Coarsest level
+				return smooth(k, x, b, 2*num_sweeps)
+			x = smooth(k, x, b, num_sweeps)
+			b_c = self.restrict_residual(k, b - matvec(k, x))
+			x += self.prolongate(k, cycle(k + 1, b_c))
+			return smooth(k, x, b, num_sweeps)
+
+		return cycle(0, b)
+
+	def smooth(self, k, U, forcing, cfl, smoother, num_sweeps,
+			jacobian_type, update_jacobian):
+		'''
+		This method smooths R_k(U) + forcing = 0 on level k with local
+		pseudo-time steps.
+
+		Inputs:
+		-------
+			k: level
+			U: state of the level [num_elems, nb, ns]
+			forcing: FAS forcing term (None on the finest level)
+				[num_elems, nb, ns]
+			cfl: CFL number, scaled with 1/(2p + 1) on each level
+			smoother: smoother type (member of MultigridSmootherType enum)
+			num_sweeps: number of sweeps
+			jacobian_type: finite difference type (member of JacobianType
+				enum)
+			update_jacobian: if True, the diagonal Jacobian blocks of the
+				level are recomputed
+
+		Outputs:
+		--------
+			U: smoothed state (modified)
+		'''
+		level_solver = self.solvers[k]
+		elem_helpers = level_solver.elem_helpers
+		num_elems, n, _ = self.mass_elems[k].shape
+
+		# The stable time step of DG scales with 1/(2p + 1)
+		cfl_k = cfl/(2.*level_solver.order + 1.)
+
+		res = np.zeros_like(U)
+		def get_defect(U):
+			res[:] = level_solver.get_residual(U, res)
+			if forcing is not None:
+				res[:] += forcing
+			return res
+
+		for i in range(num_sweeps):
+			dt_elems = stepper_tools.get_elem_time_steps(level_solver, U,
+					cfl_k)
+			if smoother == MultigridSmootherType.RK:
+				U0 = U.copy()
+				for coeff in RK_SMOOTHER_COEFFS:
+					U[:] = U0 + np.einsum('ijk, ikl -> ijl',
+							elem_helpers.iMM_elems, get_defect(U))* \
+							coeff*dt_elems[:, np.newaxis, np.newaxis]
+			elif smoother == MultigridSmootherType.BlockJacobi:
+				res = get_defect(U)
+				if update_jacobian or self.jac_diags[k] is None:
+					self.jac_diags[k] = \
+							solver_jacobian.compute_block_diagonal(
+							level_solver, U, res - (0. if forcing is None
+							else forcing), jacobian_type)
+					update_jacobian = False
+				U += np.einsum('eij, ej -> ei', self.get_block_inverses(k,
+						dt_elems), res.reshape(num_elems, n)).reshape(
+						U.shape)
+			else:
+				raise NotImplementedError("Smoother not supported")
+
+		return U
+
+	def fas_cycle(self, U, cfl, smoother, num_sweeps,
+			jacobian_type=JacobianType.ForwardDifference,
+			update_jacobians=False):
+		'''
+		This method applies one full approximation scheme (FAS) V-cycle
+		to R(U) = 0 on the finest level.
+
+		Inputs:
+		-------
+			U: state of the finest level [num_elems, nb, ns]
+			cfl: CFL number, scaled with 1/(2p + 1) on each level
+			smoother: smoother type (member of MultigridSmootherType enum)
+			num_sweeps: number of pre- and post-smoothing sweeps
+			jacobian_type: [OPTIONAL] finite difference type (member of
+				JacobianType enum)
+			update_jacobians: [OPTIONAL] if True, the diagonal Jacobian
+				blocks are recomputed (block-Jacobi smoother only)
+
+		Outputs:
+		--------
+			U: state of the finest level (modified)
+		'''
+		def cycle(k, U, forcing):
+			if k == self.num_levels - 1:
+				# Coarsest level
+				return self.smooth(k, U, forcing, cfl, smoother,
+						2*num_sweeps, jacobian_type, update_jacobians)
+			U = self.smooth(k, U, forcing, cfl, smoother, num_sweeps,
+					jacobian_type, update_jacobians)
+
+			# Coarse level problem R_c(U_c) + forcing_c = 0, with the
+			# forcing chosen such that the restricted state solves it
+			# if the fine level problem is solved
+			res = self.solvers[k].get_residual(U, np.zeros_like(U))
+			if forcing is not None:
+				res += forcing
+			U_c0 = self.restrict_state(k, U)
+			forcing_c = self.restrict_residual(k, res) - \
+					self.solvers[k + 1].get_residual(U_c0,
+					np.zeros_like(U_c0))
+			U_c = cycle(k + 1, U_c0.copy(), forcing_c)
+			U += self.prolongate(k, U_c - U_c0)
+
+			return self.smooth(k, U, forcing, cfl, smoother, num_sweeps,
+					jacobian_type, update_jacobians)
+
+		return cycle(0, U, None)
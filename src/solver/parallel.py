@@ -0,0 +1,334 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/parallel.py
+#
+#       Contains the shared-memory multi-process residual evaluation.
+#
+#       The mesh is partitioned into one subdomain per worker process (see
+#       meshing.tools.partition_elements). Each worker builds a copy of the
+#       solver on its submesh (owned elements plus one layer of halo
+#       elements) and evaluates the residual of its owned elements. The
+#       state and residual arrays live in shared memory: the solver's state
+#       coefficients and the stepper's residual array are views of the
+#       shared blocks while the workers run. Each call to get_residual
+#       (i.e. each stage of the time stepper) is one round of two
+#       barriers:
+#
+#           main: [copy U] -> barrier -> barrier -> [copy res]
+#           workers:          barrier -> compute -> barrier
+#
+#       U and res are only copied if they are not the shared arrays (e.g.
+#       the intermediate stages of RK4).
+#
+# ------------------------------------------------------------------------ #
+import copy
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import threading
+import traceback
+import weakref
+
+import errors
+from general import StepperType
+
+import meshing.tools as mesh_tools
+
+
+# Commands sent to the workers
+RUN = 1.
+STOP = 0.
+
+
+def start_parallel_residual(solver):
+	'''
+	This function starts the worker processes if the "NumProcesses"
+	parameter is greater than one.
+
+	Inputs:
+	-------
+		solver: solver object
+
+	Outputs:
+	--------
+		parallel_residual: ParallelResidual object (None if the residual is
+			evaluated serially)
+	'''
+	num_procs = solver.params.get("NumProcesses", 1)
+	if num_procs <= 1:
+		return None
+
+	return ParallelResidual(solver, num_procs)
+
+
+def get_subdomain_solver(solver, submesh):
+	'''
+	This function creates a copy of the solver on a submesh. Only the data
+	needed to evaluate the residual is recomputed.
+
+	Inputs:
+	-------
+		solver: solver object
+		submesh: mesh object of the partition
+
+	Outputs:
+	--------
+		subsolver: solver object on the submesh
+	'''
+	physics = solver.physics
+
+	subsolver = copy.copy(solver)
+	subsolver.mesh = submesh
+	subsolver.parallel_residual = None
+	subsolver.threaded_kernels = None
+	subsolver.stepper = copy.copy(solver.stepper)
+	subsolver.stepper.balance_const = None
+	subsolver.precompute_matrix_helpers()
+
+	physics.conv_flux_fcn.alloc_helpers(
+			np.zeros([submesh.num_interior_faces,
+			subsolver.int_face_helpers.quad_wts.shape[0],
+			physics.NUM_STATE_VARS]))
+	if physics.diff_flux_fcn:
+		physics.diff_flux_fcn.alloc_helpers(
+				np.zeros([submesh.num_interior_faces,
+				subsolver.int_face_helpers.quad_wts.shape[0],
+				physics.NUM_STATE_VARS]))
+
+	return subsolver
+
+
+def run_worker(solver, submesh, local_to_global_elem_IDs, num_owned,
+		shm_names, shape, ctrl, barrier):
+	'''
+	This function is the main loop of a worker process.
+
+	Inputs:
+	-------
+		solver: solver object (copy inherited from the main process)
+		submesh: mesh object of the partition
+		local_to_global_elem_IDs: maps submesh to mesh element IDs
+		num_owned: number of owned elements (first in the submesh)
+		shm_names: names of the shared memory blocks of U and res
+		shape: shape of U and res
+		ctrl: shared array containing [command, time]
+		barrier: barrier shared with the main process and other workers
+	'''
+	try:
+		shm_U = shared_memory.SharedMemory(name=shm_names[0])
+		shm_res = shared_memory.SharedMemory(name=shm_names[1])
+		U = np.ndarray(shape, dtype=float, buffer=shm_U.buf)
+		res = np.ndarray(shape, dtype=float, buffer=shm_res.buf)
+
+		subsolver = get_subdomain_solver(solver, submesh)
+		owned_elem_IDs = local_to_global_elem_IDs[:num_owned]
+		res_local = np.zeros((local_to_global_elem_IDs.shape[0],) +
+				shape[1:])
+	except Exception:
+		traceback.print_exc()
+		barrier.abort()
+		return
+
+	while True:
+		try:
+			barrier.wait()
+		except threading.BrokenBarrierError:
+			break
+		if ctrl[0] == STOP:
+			break
+		try:
+			subsolver.time = ctrl[1]
+			U_local = U[local_to_global_elem_IDs]
+			res_local = subsolver.get_residual(U_local, res_local)
+			res[owned_elem_IDs] = res_local[:num_owned]
+			barrier.wait()
+		except threading.BrokenBarrierError:
+			break
+		except Exception:
+			traceback.print_exc()
+			barrier.abort()
+			break
+
+	del U, res
+	shm_U.close()
+	shm_res.close()
+
+
+def stop_workers(processes, ctrl, barrier, shms):
+	'''
+	This function stops the worker processes and releases the shared
+	memory. It is also called when the ParallelResidual object is garbage
+	collected or at interpreter exit.
+
+	Inputs:
+	-------
+		processes: worker processes
+		ctrl: shared array containing [command, time]
+		barrier: barrier shared with the workers
+		shms: shared memory blocks
+	'''
+	ctrl[0] = STOP
+	try:
+		barrier.wait(timeout=10.)
+	except threading.BrokenBarrierError:
+		pass
+	for process in processes:
+		process.join(timeout=10.)
+		if process.is_alive():
+			process.terminate()
+	for shm in shms:
+		try:
+			shm.close()
+		except BufferError:
+			# Arrays still reference the block (e.g. at interpreter exit)
+			pass
+		shm.unlink()
+
+
+class ParallelResidual(object):
+	'''
+	This class evaluates the residual with multiple worker processes,
+	each owning a partition of the mesh.
+
+	Attributes:
+	-----------
+	num_procs: int
+		number of worker processes
+	part_IDs: numpy array
+		partition ID of each element [num_elems]
+	U: numpy array
+		state coefficients in shared memory [num_elems, nb, ns]; the
+		solver's state_coeffs while the workers run
+	res: numpy array
+		residual in shared memory [num_elems, nb, ns]; the stepper's
+		residual array while the workers run
+	solver_ref: weakref
+		reference to the solver whose arrays are replaced by U and res
+	ctrl: multiprocessing array
+		[command, time] shared with the workers
+	barrier: multiprocessing barrier
+		synchronizes the main process and the workers
+	processes: list
+		worker processes
+
+	Methods:
+	--------
+	get_residual
+		evaluates the residual
+	close
+		stops the workers
+	'''
+	def __init__(self, solver, num_procs):
+		if solver.stepper.STEPPER_TYPE == StepperType.ADER:
+			raise errors.IncompatibleError("Parallel residual evaluation " +
+					"is only available for the DG solver")
+		if "fork" not in mp.get_all_start_methods():
+			raise errors.IncompatibleError("Parallel residual evaluation " +
+					"requires the fork start method")
+		ctx = mp.get_context("fork")
+
+		mesh = solver.mesh
+		shape = solver.state_coeffs.shape
+		nbytes = solver.state_coeffs.nbytes
+
+		self.num_procs = num_procs
+		self.part_IDs = mesh_tools.partition_elements(mesh, num_procs)
+
+		# Shared arrays
+		shm_U = shared_memory.SharedMemory(create=True, size=nbytes)
+		shm_res = shared_memory.SharedMemory(create=True, size=nbytes)
+		self.U = np.ndarray(shape, dtype=float, buffer=shm_U.buf)
+		self.res = np.ndarray(shape, dtype=float, buffer=shm_res.buf)
+		self.ctrl = ctx.RawArray('d', 2)
+		self.barrier = ctx.Barrier(num_procs + 1)
+
+		# Start workers
+		self.processes = []
+		for part_ID in range(num_procs):
+			owned_elem_IDs = np.where(self.part_IDs == part_ID)[0]
+			submesh, local_to_global_elem_IDs = \
+					mesh_tools.get_partition_submesh(mesh, owned_elem_IDs)
+			process = ctx.Process(target=run_worker, args=(solver, submesh,
+					local_to_global_elem_IDs, owned_elem_IDs.shape[0],
+					(shm_U.name, shm_res.name), shape, self.ctrl,
+					self.barrier), daemon=True)
+			process.start()
+			self.processes.append(process)
+
+		self.finalizer = weakref.finalize(self, stop_workers,
+				self.processes, self.ctrl, self.barrier, [shm_U, shm_res])
+
+		# The state and the residual of the stepper are evaluated in place
+		# in shared memory
+		self.U[:] = solver.state_coeffs
+		self.res[:] = solver.stepper.res
+		solver.state_coeffs = self.U
+		solver.stepper.res = self.res
+		self.solver_ref = weakref.ref(solver)
+
+	def __reduce__(self):
+		# Processes and shared memory cannot be pickled (e.g. when the
+		# solver is written to a data file)
+		return (type(None), ())
+
+	def get_residual(self, solver, U, res):
+		'''
+		This method evaluates the residual (see SolverBase.get_residual).
+
+		Inputs:
+		-------
+			solver: solver object
+			U: solution array
+
+		Outputs:
+		--------
+			res: residual array
+		'''
+		if U is not self.U:
+			self.U[:] = U
+		self.ctrl[0] = RUN
+		self.ctrl[1] = solver.time
+		try:
+			# Start and wait for the workers
+			self.barrier.wait()
+			self.barrier.wait()
+		except threading.BrokenBarrierError:
+			raise RuntimeError("Parallel residual evaluation failed " +
+					"(see worker traceback)")
+
+		if res is not self.res:
+			res[:] = self.res
+		if solver.stepper.balance_const is not None:
+			res += solver.stepper.balance_const
+
+		return res
+
+	def close(self):
+		'''
+		This method stops the workers and releases the shared memory. The
+		solver's state and the stepper's residual are copied out of it.
+		'''
+		solver = self.solver_ref()
+		if solver is not None:
+			if solver.state_coeffs is self.U:
+				solver.state_coeffs = self.U.copy()
+			if solver.stepper.res is self.res:
+				solver.stepper.res = self.res.copy()
+		self.U = None
+		self.res = None
+		self.finalizer()
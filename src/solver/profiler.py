@@ -0,0 +1,299 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/profiler.py
+#
+#       Contains the profiler that times the phases of SolverBase.solve.
+#
+#       Each phase is timed with time.perf_counter around the code that it
+#       covers; phases are nested (e.g. the residual evaluation contains
+#       the element and face residuals), so the time of a phase includes
+#       the time of the phases below it. Phases that run inside threaded
+#       chunks (see solver.threaded) are timed as part of the enclosing
+#       phase. The profiler records the total time and number of calls of
+#       each phase, counters (e.g. ADER predictor iterations), and one
+#       sample of the time spent in each phase per time step. If profiling
+#       is off, NULL_PROFILER is used, whose timers do nothing.
+#
+# ------------------------------------------------------------------------ #
+import csv
+import json
+import time
+
+
+# Phases in report order, with their nesting depth
+PHASES = [
+	("GetTimeStep", 0),
+		# Computation of the time step size
+	("TimeStep", 0),
+		# stepper.take_time_step
+	("Residual", 1),
+		# Residual evaluation (including worker processes)
+	("BoundaryFaceResidual", 2),
+	("ElementResidual", 2),
+	("InteriorFaceResidual", 2),
+	("NumericalFlux", 3),
+		# Numerical fluxes and boundary fluxes at the faces
+	("ADERPredictor", 1),
+		# Space-time predictor of the ADER-DG stepper
+	("MassMatrix", 1),
+		# Multiplication with the inverse mass matrix
+	("Limiter", 1),
+	("CustomUserFunction", 0),
+	("Output", 0),
+		# Console output and data files
+]
+
+
+class Timer(object):
+	'''
+	This class is a context manager that adds the time spent in its block
+	to a phase of a profiler.
+	'''
+	__slots__ = ["profiler", "name", "t0"]
+
+	def __init__(self, profiler, name):
+		self.profiler = profiler
+		self.name = name
+
+	def __enter__(self):
+		self.t0 = time.perf_counter()
+
+	def __exit__(self, *args):
+		profiler = self.profiler
+		profiler.times[self.name] = profiler.times.get(self.name, 0.) + \
+				time.perf_counter() - self.t0
+		profiler.calls[self.name] = profiler.calls.get(self.name, 0) + 1
+
+
+class NullTimer(object):
+	'''
+	This class is a context manager that does nothing.
+	'''
+	__slots__ = []
+
+	def __enter__(self):
+		pass
+
+	def __exit__(self, *args):
+		pass
+
+
+class NullProfiler(object):
+	'''
+	This class is used when profiling is off. It has the same methods as
+	Profiler, which do nothing.
+	'''
+	timer = NullTimer()
+
+	def phase(self, name):
+		return self.timer
+
+	def add_count(self, name, num=1):
+		pass
+
+	def start(self):
+		pass
+
+	def end_step(self, itime, t, dt):
+		pass
+
+	def stop(self):
+		pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler(object):
+	'''
+	This class times the phases of a solve.
+
+	Attributes:
+	-----------
+	times: dict
+		total time spent in each phase [s]
+	calls: dict
+		number of calls of each phase
+	counters: dict
+		counters (e.g. ADERPredictorIterations)
+	samples: list
+		one dict per time step with the step number, time, time step size,
+		wall time of the step, and time spent in each phase and counter
+		increments during the step
+	wall_time: float
+		wall time of the solve [s]
+	'''
+	def __init__(self):
+		self.times = {}
+		self.calls = {}
+		self.counters = {}
+		self.samples = []
+		self.wall_time = 0.
+		self.t0 = None
+		self.step_t0 = None
+		self.step_times = {}
+		self.step_counters = {}
+
+	def phase(self, name):
+		'''
+		This method returns a context manager that times a phase.
+
+		Inputs:
+		-------
+			name: name of the phase (see PHASES)
+
+		Outputs:
+		--------
+			timer: context manager
+		'''
+		return Timer(self, name)
+
+	def add_count(self, name, num=1):
+		'''
+		This method increments a counter.
+
+		Inputs:
+		-------
+			name: name of the counter
+			num: [OPTIONAL] increment
+		'''
+		self.counters[name] = self.counters.get(name, 0) + num
+
+	def start(self):
+		'''
+		This method starts the wall clock of the solve and of the first
+		time step.
+		'''
+		self.t0 = self.step_t0 = time.perf_counter()
+
+	def end_step(self, itime, t, dt):
+		'''
+		This method records the sample of a time step.
+
+		Inputs:
+		-------
+			itime: time step index
+			t: time at the end of the step
+			dt: time step size
+		'''
+		t1 = time.perf_counter()
+		sample = {"Step": itime + 1, "Time": t, "TimeStepSize": dt,
+				"WallTime": t1 - self.step_t0}
+		for name, value in self.times.items():
+			sample[name] = value - self.step_times.get(name, 0.)
+		for name, value in self.counters.items():
+			sample[name] = value - self.step_counters.get(name, 0)
+		self.samples.append(sample)
+
+		self.step_t0 = t1
+		self.step_times = dict(self.times)
+		self.step_counters = dict(self.counters)
+
+	def stop(self):
+		'''
+		This method stops the wall clock of the solve.
+		'''
+		self.wall_time = time.perf_counter() - self.t0
+
+	def get_summary(self):
+		'''
+		This method returns the total time, number of calls, and fraction
+		of the wall time of each phase that was called.
+
+		Outputs:
+		--------
+			summary: dict of phase name -> dict with Time, Calls, and
+				Fraction
+		'''
+		names = [name for name, depth in PHASES]
+		names += [name for name in self.times if name not in names]
+
+		summary = {}
+		for name in names:
+			if name not in self.times:
+				continue
+			summary[name] = {"Time": self.times[name],
+					"Calls": self.calls[name],
+					"Fraction": self.times[name]/self.wall_time if
+					self.wall_time > 0. else 0.}
+
+		return summary
+
+	def print_summary(self):
+		'''
+		This method prints the summary to the console. Nested phases are
+		indented.
+		'''
+		depths = dict(PHASES)
+		print("\nPROFILE:")
+		print("--------------------------------------------------------" + \
+				"-----------------------")
+		print("%-30s %12s %10s %14s %8s" % ("Phase", "Time [s]", "Calls",
+				"Per call [s]", "Percent"))
+		for name, entry in self.get_summary().items():
+			print("%-30s %12.4e %10d %14.4e %7.1f%%" % (
+					"  "*depths.get(name, 0) + name, entry["Time"],
+					entry["Calls"], entry["Time"]/entry["Calls"],
+					100.*entry["Fraction"]))
+		for name, value in self.counters.items():
+			print("%-30s %12s %10d" % (name, "", value))
+		print("%-30s %12.4e" % ("Total", self.wall_time))
+		print("--------------------------------------------------------" + \
+				"-----------------------")
+
+	def write(self, prefix):
+		'''
+		This method writes the report to <prefix>_profile.json (summary,
+		counters, and samples) and the samples to <prefix>_profile.csv.
+
+		Inputs:
+		-------
+			prefix: prefix of the file names
+		'''
+		with open(prefix + "_profile.json", "w") as f:
+			json.dump({"WallTime": self.wall_time,
+					"NumTimeSteps": len(self.samples),
+					"Phases": self.get_summary(),
+					"Counters": self.counters,
+					"Samples": self.samples}, f, indent=1)
+
+		columns = ["Step", "Time", "TimeStepSize", "WallTime"] + \
+				list(self.get_summary()) + list(self.counters)
+		with open(prefix + "_profile.csv", "w", newline="") as f:
+			writer = csv.DictWriter(f, fieldnames=columns, restval=0)
+			writer.writeheader()
+			writer.writerows(self.samples)
+
+
+def get_profiler(params):
+	'''
+	This function returns the profiler of a solve.
+
+	Inputs:
+	-------
+		params: dictionary of parameters
+
+	Outputs:
+	--------
+		profiler: Profiler if params["Profile"] is True; NULL_PROFILER
+			otherwise
+	'''
+	if params.get("Profile", False):
+		return Profiler()
+	else:
+		return NULL_PROFILER
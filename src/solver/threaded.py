@@ -0,0 +1,349 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : src/solver/threaded.py
+#
+#       Contains the thread-pool backend for the element residual, the
+#       interior face residual, and the inverse mass matrix
+#       multiplication.
+#
+#       Elements and interior faces are split into chunks that are
+#       processed by a pool of threads. Each chunk has its own views of
+#       the precomputed helpers and its own copies of the numerical flux
+#       functions (which store intermediate arrays), so the unmodified DG
+#       kernels can run concurrently. The speedup relies on NumPy
+#       releasing the GIL inside large einsum/matmul calls. Chunking also
+#       caps the size of the temporary arrays at the quadrature points.
+#
+# ------------------------------------------------------------------------ #
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import numpy as np
+
+import errors
+from general import StepperType
+
+import solver.profiler as solver_profiler
+
+
+# Per-element attributes of ElemHelpers
+ELEM_HELPER_ARRAYS = ["basis_phys_grad_elems", "jac_elems", "ijac_elems",
+		"djac_elems", "x_elems", "Uq", "Fq", "Sq", "iMM_elems", "vol_elems",
+		"normals_elems", "length_scales_elems", "av_elems"]
+# Per-face attributes of InteriorFaceHelpers
+INT_FACE_HELPER_ARRAYS = ["elemL_IDs", "elemR_IDs", "faceL_IDs",
+		"faceR_IDs", "normals_int_faces", "ijacL_elems", "ijacR_elems",
+		"hL", "hR"]
+
+
+def start_threaded_kernels(solver):
+	'''
+	This function starts the thread pool if the "NumThreads" parameter is
+	greater than one.
+
+	Inputs:
+	-------
+		solver: solver object
+
+	Outputs:
+	--------
+		threaded_kernels: ThreadedKernels object (None if the kernels are
+			evaluated serially)
+	'''
+	num_threads = solver.params.get("NumThreads", 1)
+	if num_threads <= 1:
+		return None
+
+	return ThreadedKernels(solver, num_threads,
+			solver.params["ThreadChunkSize"])
+
+
+def get_chunks(num_items, chunk_size):
+	'''
+	This function splits a range of items into contiguous chunks.
+
+	Inputs:
+	-------
+		num_items: number of items
+		chunk_size: maximum number of items per chunk
+
+	Outputs:
+	--------
+		chunks: list of slices
+	'''
+	return [slice(start, min(start + chunk_size, num_items)) for start in
+			range(0, num_items, chunk_size)]
+
+
+def slice_helpers(helpers, attributes, chunk):
+	'''
+	This function creates a shallow copy of a helpers object in which the
+	given array attributes are replaced by views of a chunk.
+
+	Inputs:
+	-------
+		helpers: ElemHelpers or InteriorFaceHelpers object
+		attributes: names of the attributes indexed by element/face
+		chunk: slice of elements/faces
+
+	Outputs:
+	--------
+		chunk_helpers: helpers object of the chunk
+	'''
+	chunk_helpers = copy.copy(helpers)
+	for attribute in attributes:
+		arr = getattr(helpers, attribute, None)
+		if isinstance(arr, np.ndarray) and arr.ndim > 0 and \
+				arr.shape[0] > 0:
+			setattr(chunk_helpers, attribute, arr[chunk])
+
+	return chunk_helpers
+
+
+def copy_physics(physics, num_faces, nq):
+	'''
+	This function creates a shallow copy of the physics object with its
+	own numerical flux functions, whose helper arrays are sized for the
+	given number of faces.
+
+	Inputs:
+	-------
+		physics: physics object
+		num_faces: number of faces in the chunk
+		nq: number of face quadrature points
+
+	Outputs:
+	--------
+		chunk_physics: physics object of the chunk
+	'''
+	chunk_physics = copy.copy(physics)
+	Uq = np.zeros([num_faces, nq, physics.NUM_STATE_VARS])
+
+	chunk_physics.conv_flux_fcn = copy.copy(physics.conv_flux_fcn)
+	chunk_physics.conv_flux_fcn.alloc_helpers(Uq)
+	if physics.diff_flux_fcn:
+		chunk_physics.diff_flux_fcn = copy.copy(physics.diff_flux_fcn)
+		chunk_physics.diff_flux_fcn.alloc_helpers(Uq)
+
+	return chunk_physics
+
+
+class ThreadedKernels(object):
+	'''
+	This class evaluates the element residual, the interior face
+	residual, and the inverse mass matrix multiplication with a pool of
+	threads, one chunk of elements/faces at a time.
+
+	Attributes:
+	-----------
+	num_threads: int
+		number of threads
+	chunk_size: int
+		maximum number of elements/faces per chunk
+	executor: ThreadPoolExecutor object
+		thread pool
+	elem_chunks: list
+		slices of elements
+	face_chunks: list
+		slices of interior faces
+	elem_chunk_helpers: list
+		ElemHelpers objects of the element chunks
+	elem_chunk_physics: list
+		physics objects of the element chunks
+	face_chunk_helpers: list
+		InteriorFaceHelpers objects of the face chunks
+	face_chunk_physics: list
+		physics objects of the face chunks
+
+	Methods:
+	--------
+	get_element_residual
+		evaluates the element residual
+	get_interior_face_residual
+		evaluates the interior face residual
+	mult_inv_mass_matrix
+		multiplies the residual by the inverse mass matrix
+	close
+		shuts down the thread pool
+	'''
+	def __init__(self, solver, num_threads, chunk_size):
+		if solver.stepper.STEPPER_TYPE == StepperType.ADER:
+			raise errors.IncompatibleError("Threaded residual evaluation " +
+					"is only available for the DG solver")
+		if chunk_size < 1:
+			raise ValueError("ThreadChunkSize must be positive")
+
+		mesh = solver.mesh
+		physics = solver.physics
+		elem_helpers = solver.elem_helpers
+		int_face_helpers = solver.int_face_helpers
+		nq = int_face_helpers.quad_wts.shape[0]
+
+		self.num_threads = num_threads
+		self.chunk_size = chunk_size
+		self.executor = ThreadPoolExecutor(max_workers=num_threads)
+
+		# Element chunks
+		self.elem_chunks = get_chunks(mesh.num_elems, chunk_size)
+		self.elem_chunk_helpers = [slice_helpers(elem_helpers,
+				ELEM_HELPER_ARRAYS, chunk) for chunk in self.elem_chunks]
+		self.elem_chunk_physics = [copy.copy(physics) for chunk in
+				self.elem_chunks]
+
+		# Interior face chunks
+		self.face_chunks = get_chunks(mesh.num_interior_faces, chunk_size)
+		self.face_chunk_helpers = [slice_helpers(int_face_helpers,
+				INT_FACE_HELPER_ARRAYS, chunk) for chunk in
+				self.face_chunks]
+		self.face_chunk_physics = [copy_physics(physics,
+				chunk.stop - chunk.start, nq) for chunk in self.face_chunks]
+
+	def __reduce__(self):
+		# The thread pool cannot be pickled (e.g. when the solver is
+		# written to a data file)
+		return (type(None), ())
+
+	def get_chunk_solver(self, solver, chunk_helpers, chunk_physics,
+			helpers_name):
+		'''
+		This method creates a shallow copy of the solver that uses the
+		helpers and physics of a chunk.
+
+		Inputs:
+		-------
+			solver: solver object
+			chunk_helpers: helpers object of the chunk
+			chunk_physics: physics object of the chunk
+			helpers_name: name of the solver attribute to replace with
+				chunk_helpers
+
+		Outputs:
+		--------
+			chunk_solver: solver object of the chunk
+		'''
+		chunk_solver = copy.copy(solver)
+		chunk_solver.physics = chunk_physics
+		# Chunks are timed as part of the enclosing phase
+		chunk_solver.profiler = solver_profiler.NULL_PROFILER
+		setattr(chunk_solver, helpers_name, chunk_helpers)
+
+		return chunk_solver
+
+	def get_element_residual(self, solver, U, res):
+		'''
+		This method evaluates the element residual (see
+		DG.get_element_residual).
+
+		Inputs:
+		-------
+			solver: solver object
+			U: solution array [num_elems, nb, ns]
+			res: residual array [num_elems, nb, ns]
+
+		Outputs:
+		--------
+			res: residual array (element contributions added)
+				[num_elems, nb, ns]
+		'''
+		chunk_solvers = [self.get_chunk_solver(solver, chunk_helpers,
+				chunk_physics, "elem_helpers") for chunk_helpers,
+				chunk_physics in zip(self.elem_chunk_helpers,
+				self.elem_chunk_physics)]
+
+		# Chunks write to disjoint slices of res
+		def run(chunk_solver, chunk):
+			with chunk_solver.physics.cache_primitive_variables():
+				chunk_solver.get_element_residual(U[chunk], res[chunk])
+		list(self.executor.map(run, chunk_solvers, self.elem_chunks))
+
+		if solver.verbose:
+			# Gather min and max of state variables
+			for chunk_solver in chunk_solvers:
+				solver.min_state = np.minimum(solver.min_state,
+						chunk_solver.min_state)
+				solver.max_state = np.maximum(solver.max_state,
+						chunk_solver.max_state)
+
+		return res
+
+	def get_interior_face_residual(self, solver, UL, UR):
+		'''
+		This method evaluates the interior face residual of all interior
+		faces (see DG.get_interior_face_residual).
+
+		Inputs:
+		-------
+			solver: solver object
+			UL: solution array of left elements [num_interior_faces, nb, ns]
+			UR: solution array of right elements [num_interior_faces, nb, ns]
+
+		Outputs:
+		--------
+			RL: residual of left elements [num_interior_faces, nb, ns]
+			RR: residual of right elements [num_interior_faces, nb, ns]
+			RL_diff: diffusion residual of left elements
+				[num_interior_faces, nb, ns]
+			RR_diff: diffusion residual of right elements
+				[num_interior_faces, nb, ns]
+		'''
+		def run(chunk_helpers, chunk_physics, chunk):
+			chunk_solver = self.get_chunk_solver(solver, chunk_helpers,
+					chunk_physics, "int_face_helpers")
+			with chunk_physics.cache_primitive_variables():
+				return chunk_solver.get_interior_face_residual(
+						chunk_helpers.faceL_IDs, chunk_helpers.faceR_IDs,
+						UL[chunk], UR[chunk])
+		results = list(self.executor.map(run, self.face_chunk_helpers,
+				self.face_chunk_physics, self.face_chunks))
+
+		# Assemble in face order so that the result is identical to the
+		# serial evaluation. Contributions that are not computed (e.g.
+		# diffusion terms without a diffusive flux) are scalar zeros.
+		return tuple(np.concatenate(arrs) if np.ndim(arrs[0]) > 0 else
+				arrs[0] for arrs in zip(*results))
+
+	def mult_inv_mass_matrix(self, solver, dt, res):
+		'''
+		This method multiplies the residual by the inverse mass matrix
+		(see solver.tools.mult_inv_mass_matrix).
+
+		Inputs:
+		-------
+			solver: solver object
+			dt: time step
+			res: residual array [num_elems, nb, ns]
+
+		Outputs:
+		--------
+			dU: dt times the inverse mass matrix times the residual
+				[num_elems, nb, ns]
+		'''
+		iMM_elems = solver.elem_helpers.iMM_elems
+		dU = np.empty_like(res)
+
+		def run(chunk):
+			dU[chunk] = dt*np.einsum('ijk, ikl -> ijl', iMM_elems[chunk],
+					res[chunk])
+		list(self.executor.map(run, self.elem_chunks))
+
+		return dU
+
+	def close(self):
+		'''
+		This method shuts down the thread pool.
+		'''
+		self.executor.shutdown(wait=True)
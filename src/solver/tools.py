@@ -156,38 +156,28 @@ def calculate_source_term_integral(elem_helpers, Sq):
 
 	return res_elem # [ne, nb, ns]
 
-def calculate_artificial_viscosity_integral(physics, elem_helpers, Uc, av_param, p):
+def calculate_artificial_viscosity(physics, elem_helpers, Uq, grad_Uq,
+		av_param, p):
 	'''
-	Calculates the artificial viscosity volume integral, given in:
+	Calculates the artificial viscosity at the quadrature points, given in:
 		Hartmann, R. and Leicht, T, "Higher order and adaptive DG methods for
 		compressible flows", p. 92, 2013.
+	The shock sensor is shared by the residual and the CFL-based time step.
 
 	Inputs:
 	-------
 		physics: physics object
 		elem_helpers: helpers defined in ElemHelpers
-		Uc: state coefficients of each element
+		Uq: state evaluated at the quadrature points [ne, nq, ns]
+		grad_Uq: gradient of the state evaluated at the quadrature points
+			[ne, nq, ns, ndims]
 		av_param: artificial viscosity parameter
 		p: solution basis order
 
 	Outputs:
 	--------
-		res_elem: artificial viscosity residual array for all elements
-		[ne, nb, ns]
+		epsilon: artificial viscosity in each direction [ne, nq, ndims]
 	'''
-	# Unpack
-	quad_wts = elem_helpers.quad_wts # [nq, 1]
-	basis_phys_grad_elems = elem_helpers.basis_phys_grad_elems
-			# [ne, nq, nb, dim]
-	basis_val = elem_helpers.basis_val # [nq, nb]
-	djac_elems = elem_helpers.djac_elems # [ne, nq, 1]
-	vol_elems = elem_helpers.vol_elems # [ne]
-	ndims = basis_phys_grad_elems.shape[3]
-
-	# Evaluate solution at quadrature points
-	Uq = helpers.evaluate_state(Uc, basis_val)
-	# Evaluate solution gradient at quadrature points
-	grad_Uq = np.einsum('ijnl, ink -> ijkl', basis_phys_grad_elems, Uc)
 	# Compute pressure
 	pressure = physics.compute_additional_variable("Pressure", Uq,
 			flag_non_physical=False)[:, :, 0]
@@ -207,31 +197,65 @@ def calculate_artificial_viscosity_integral(physics, elem_helpers, Uc, av_param,
 		# Calculate smoothness switch
 		f =  norm_grad_U0 / (U0 + 1e-12)
 
-	# Compute s_k
-	s = np.zeros((Uc.shape[0], ndims))
-	# Loop over dimensions
-	for k in range(ndims):
-		# Loop over number of faces per element
-		for i in range(elem_helpers.normals_elems.shape[1]):
-			# Integrate normals
-			s[:, k] += np.einsum('jx, ij -> i', elem_helpers.face_quad_wts,
-					np.abs(elem_helpers.normals_elems[:, i, :, k]))
-		s[:, k] = 2 * vol_elems / s[:, k]
-	# Compute h_k (the length scale in the kth direction)
-	h = np.empty_like(s)
-	# Loop over dimensions
-	for k in range(ndims):
-		h[:, k] = s[:, k] * (vol_elems / np.prod(s, axis=1))**(1/3)
-	# Scale with polynomial order
-	h_tilde = h / (p + 1)
+	# Scale the length scales with polynomial order
+	h_tilde = elem_helpers.length_scales_elems / (p + 1)
 	# Compute dissipation scaling
-	epsilon = av_param *  np.einsum('ij, il -> ijl', f, h_tilde**3)
-	# Calculate integral, with state coeffs factored out
-	integral = np.einsum('ijm, ijpm, ijnm, jx, ijx -> ipn', epsilon,
-				basis_phys_grad_elems, basis_phys_grad_elems, quad_wts,
-				djac_elems)
+	epsilon = av_param * np.einsum('ij, il -> ijl', f, h_tilde**3)
+
+	return epsilon # [ne, nq, ndims]
+
+
+def calculate_artificial_viscosity_integral(physics, elem_helpers, Uc,
+		av_param, p, Uq=None, grad_Uq=None, av_elems=None):
+	'''
+	Calculates the artificial viscosity volume integral (see
+	calculate_artificial_viscosity).
+
+	Inputs:
+	-------
+		physics: physics object
+		elem_helpers: helpers defined in ElemHelpers
+		Uc: state coefficients of each element
+		av_param: artificial viscosity parameter
+		p: solution basis order
+		Uq: [OPTIONAL] state evaluated at the quadrature points
+			[ne, nq, ns]; computed if not given
+		grad_Uq: [OPTIONAL] gradient of the state evaluated at the
+			quadrature points [ne, nq, ns, ndims]; computed if not given
+		av_elems: [OPTIONAL] if given, the maximum artificial viscosity of
+			each element is stored in it [ne]
+
+	Outputs:
+	--------
+		res_elem: artificial viscosity residual array for all elements
+		[ne, nb, ns]
+		av_elems: maximum artificial viscosity of each element [ne]
+			(modified, if given)
+	'''
+	# Unpack
+	quad_wts = elem_helpers.quad_wts # [nq, 1]
+	basis_phys_grad_elems = elem_helpers.basis_phys_grad_elems
+			# [ne, nq, nb, dim]
+	djac_elems = elem_helpers.djac_elems # [ne, nq, 1]
+
+	# Evaluate solution at quadrature points
+	if Uq is None:
+		Uq = helpers.evaluate_state(Uc, elem_helpers.basis_val)
+	# Evaluate solution gradient at quadrature points
+	if grad_Uq is None:
+		grad_Uq = np.einsum('ijnl, ink -> ijkl', basis_phys_grad_elems, Uc)
+
+	epsilon = calculate_artificial_viscosity(physics, elem_helpers, Uq,
+			grad_Uq, av_param, p) # [ne, nq, ndims]
+	if av_elems is not None:
+		av_elems[:] = np.max(epsilon.reshape(epsilon.shape[0], -1),
+				axis=1)
+
+	# Artificial viscous flux multiplied by the quadrature weights
+	Fq = np.einsum('ijl, ijkl -> ijkl', epsilon*quad_wts*djac_elems,
+			grad_Uq) # [ne, nq, ns, ndims]
 	# Calculate residual
-	res_elem = np.einsum('ipn, ipk -> ink', integral, Uc)
+	res_elem = np.einsum('ijnl, ijkl -> ink', basis_phys_grad_elems, Fq)
 
 	return res_elem # [ne, nb, ns]
 
@@ -275,10 +299,15 @@ def mult_inv_mass_matrix(mesh, solver, dt, res):
 	Outputs:
 		U: solution array
 	'''
-	physics = solver.physics
-	iMM_elems = solver.elem_helpers.iMM_elems
+	with solver.profiler.phase("MassMatrix"):
+		if getattr(solver, "threaded_kernels", None) is not None:
+			return solver.threaded_kernels.mult_inv_mass_matrix(solver, dt,
+					res)
+
+		physics = solver.physics
+		iMM_elems = solver.elem_helpers.iMM_elems
 
-	return dt*np.einsum('ijk, ikl -> ijl', iMM_elems, res)
+		return dt*np.einsum('ijk, ikl -> ijl', iMM_elems, res)
 
 
 def L2_projection(mesh, iMM, basis, quad_pts, quad_wts, f, U):
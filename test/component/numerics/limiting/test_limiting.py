@@ -18,12 +18,12 @@ rtol = 1e-15
 atol = 1e-15
 
 
-def create_solver_object():
+def create_solver_object(num_elems=1):
 	'''
 	This function creates a solver object that stores the positivity-
 	preserving limiter object needed for the tests here.
 	'''
-	mesh = mesh_common.mesh_1D(num_elems=1, xmin=0., xmax=1.)
+	mesh = mesh_common.mesh_1D(num_elems=num_elems, xmin=0., xmax=1.)
 
 	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2")
 
@@ -146,3 +146,118 @@ def test_positivity_preserving_limiter_solution_positive_pressure():
 	assert(np.amin(p_elem_faces) >= pos_tol - atol)
 	# np.testing.assert_allclose(np.amin(p_elem_faces), pos_tol, rtol, 
 	# 		atol)
+
+
+def test_positivity_preserving_limiter_troubled_elems():
+	'''
+	This test ensures that the troubled-cell detector flags the elements
+	with negative density or pressure, and that limiting only the flagged
+	elements is identical to limiting all elements.
+	'''
+	solver = create_solver_object(num_elems=6)
+	limiter = solver.limiters[0]
+	Uc = solver.state_coeffs
+
+	# Negative density in element 1 and negative pressure in element 4
+	srho = solver.physics.get_state_slice("Density")
+	srhoE = solver.physics.get_state_slice("Energy")
+	Uc[1, 1:2, srho] = -0.1
+	Uc[4, 1:2, srhoE] = -0.25
+
+	np.testing.assert_array_equal(limiter.get_troubled_elems(solver, Uc),
+			[1, 4])
+
+	# Limit all elements
+	elem_IDs = np.arange(Uc.shape[0])
+	Uc_all = limiter.limit_elems(solver, Uc.copy(), elem_IDs)
+
+	# Limit flagged elements
+	solver.apply_limiter(Uc)
+
+	np.testing.assert_array_equal(Uc, Uc_all)
+
+
+def create_weno2D_solver_object(basis, order=1):
+	'''
+	This function creates a solver object on a 2D quadrilateral or
+	triangular mesh that stores the WENO2D limiter object needed for the
+	tests here.
+	'''
+	mesh = mesh_common.mesh_2D(num_elems_x=10, num_elems_y=8, xmin=-5.,
+			xmax=5., ymin=-4., ymax=4.)
+	if basis == "LagrangeTri":
+		mesh = mesh_common.split_quadrils_into_tris(mesh)
+		quadrature = "Dunavant"
+	else:
+		quadrature = "GaussLegendre"
+
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=order, SolutionBasis=basis,
+			ElementQuadrature=quadrature, FaceQuadrature="GaussLegendre",
+			ApplyLimiters=["WENO2D"], ShockIndicator="MinMod",
+			TVBParameter=0.)
+
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_physical_params()
+	physics.set_IC(IC_type="Uniform", state=np.array([1., 0.1, 0.2, 2.5]))
+
+	return DG.DG(params, physics, mesh)
+
+
+@pytest.mark.parametrize('basis', ["LagrangeQuad", "LagrangeTri"])
+@pytest.mark.parametrize('order', [1, 2, 3])
+def test_weno2D_limiter_uniform_solution_unchanged(basis, order):
+	'''
+	This test ensures that the WENO2D limiter does not flag or modify a
+	uniform solution.
+	'''
+	solver = create_weno2D_solver_object(basis, order)
+	limiter = solver.limiters[0]
+	Uc = solver.state_coeffs
+	Uc_ref = Uc.copy()
+
+	assert limiter.get_troubled_elems(solver, Uc).shape[0] == 0
+	Uc_lim = limiter.limit_elems(solver, Uc.copy(),
+			np.arange(Uc.shape[0]))
+
+	np.testing.assert_allclose(Uc_lim, Uc_ref, rtol, 1e-14)
+
+
+@pytest.mark.parametrize('basis', ["LagrangeQuad", "LagrangeTri"])
+def test_weno2D_limiter_discontinuity(basis):
+	'''
+	This test ensures that the WENO2D limiter flags the elements cut by
+	an oblique discontinuity, preserves the element averages, and removes
+	the overshoots and undershoots of the projected solution.
+	'''
+	solver = create_weno2D_solver_object(basis)
+	limiter = solver.limiters[0]
+	elem_helpers = solver.elem_helpers
+
+	# L2 projection of a discontinuous state
+	x = elem_helpers.x_elems
+	right = x[:, :, 0] > 0.3*x[:, :, 1] + 0.7
+	rho = np.where(right, 1., 0.125)
+	p = np.where(right, 1., 0.1)
+	Uq = np.zeros(x.shape[:2] + (4,))
+	Uq[:, :, 0] = rho
+	Uq[:, :, 1] = 0.2*rho
+	Uq[:, :, 3] = p/0.4 + 0.02*rho
+	wts = elem_helpers.quad_wts[:, 0]*elem_helpers.djac_elems[:, :, 0]
+	Uc = np.einsum('ijk, qk, iq, iql -> ijl', elem_helpers.iMM_elems,
+			elem_helpers.basis_val, wts, Uq)
+
+	elem_IDs = limiter.get_troubled_elems(solver, Uc)
+	cut_elems = np.where(np.any(right, axis=1) & ~np.all(right,
+			axis=1))[0]
+	assert np.all(np.isin(cut_elems, elem_IDs))
+
+	U_bar = np.einsum('ij, ijk -> ik', limiter.mean_wts_elems, Uc)
+	solver.apply_limiter(Uc)
+	np.testing.assert_allclose(np.einsum('ij, ijk -> ik',
+			limiter.mean_wts_elems, Uc), U_bar, rtol, 1e-13)
+
+	rho_lim = np.einsum('qj, ij -> iq', elem_helpers.basis_val, Uc[:, :, 0])
+	assert np.amin(rho_lim) > 0.125 - 1e-2
+	assert np.amax(rho_lim) < 1. + 5e-2
@@ -9,6 +9,7 @@ import meshing.common as mesh_common
 from general import StepperType
 import general
 
+import meshing.tools as mesh_tools
 import physics.scalar.scalar as scalar
 import solver.DG as DG
 
@@ -69,6 +70,30 @@ def test_set_stepper_RK4():
 	assert stepper == expected
 
 
+def test_set_stepper_NewtonKrylov():
+	'''
+	Checks setter function for stepper NewtonKrylov
+	'''
+	time_scheme = "NewtonKrylov"
+	params = {'TimeStepper' : time_scheme}
+	stepper = stepper_tools.set_stepper(params, None)
+	expected = stepper_defs.NewtonKrylov(None)
+	assert stepper == expected
+
+
+@pytest.mark.parametrize('time_scheme', ["ARK2", "ESDIRK2", "BDF2",
+		"PMultigrid"])
+def test_set_stepper_implicit(time_scheme):
+	'''
+	Checks setter function for the implicit, IMEX, and p-multigrid
+	steppers
+	'''
+	params = {'TimeStepper' : time_scheme}
+	stepper = stepper_tools.set_stepper(params, None)
+	expected = getattr(stepper_defs, time_scheme)(None)
+	assert stepper == expected
+
+
 def test_set_stepper_LSRK4():
 	'''
 	Checks setter function for stepper LSRK4
@@ -238,3 +263,107 @@ def test_check_addition_of_explicit_and_implicit_sources():
 	assert(solver.physics.source_terms[0].source_treatment == 'Explicit')
 	assert(solver.physics.source_terms[1].source_treatment == 'Implicit')
 	assert(solver.physics.source_terms[2].source_treatment == 'Implicit')
+
+
+@pytest.mark.parametrize('preconditioner', ["BlockJacobi", "ILU",
+		"PMultigrid", None])
+def test_newton_krylov_reaches_steady_state(preconditioner):
+	'''
+	This test solves the steady advection equation with a sink term,
+	U' = -U on [0, 1] with U(0) = 1, with the NewtonKrylov stepper and
+	compares the result to the exact solution exp(-x)
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=8, xmin=0., xmax=1.)
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, TimeStepper="NewtonKrylov", FinalTime=None,
+			NumTimeSteps=50, CFL=10., SteadyTolerance=1e-12,
+			Preconditioner=preconditioner, ApplyLimiters=[],
+			WriteFinalSolution=False)
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params(ConstVelocity=1.)
+	physics.set_IC(IC_type="Uniform", state=np.array([1.]))
+	physics.set_source(source_type="SimpleSource", nu=-1.)
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	physics.set_BC("x1", "StateAll", "Uniform", state=np.array([1.]))
+	physics.set_BC("x2", "Extrapolate")
+
+	solver = DG.DG(params, physics, mesh)
+	solver.solve()
+
+	assert solver.stepper.converged
+	assert solver.stepper.res_norm <= 1e-12*solver.stepper.res_norm0
+	# Solution at the quadrature points
+	Uq = np.einsum('jn, inl -> ijl', solver.elem_helpers.basis_val,
+			solver.state_coeffs)
+	np.testing.assert_allclose(Uq, np.exp(-solver.elem_helpers.x_elems),
+			rtol=0., atol=1e-4)
+
+
+def create_adv_diff_solver(time_scheme, dt):
+	'''
+	This function creates a DG solver for 1D advection-diffusion of a
+	Gaussian on a periodic mesh.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=16, xmin=-3., xmax=3.)
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2")
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, TimeStepper=time_scheme, FinalTime=0.5,
+			TimeStepSize=dt, NumTimeSteps=None, NewtonTolerance=1e-10,
+			LinearSolverTolerance=1e-8, ApplyLimiters=[],
+			WriteFinalSolution=False)
+
+	physics = scalar.ConstAdvDiffScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(ConstVelocity=1., DiffCoefficient=0.05)
+	physics.set_IC(IC_type="DiffGaussian", xo=0.)
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_imex_split_residual_sums_to_residual():
+	'''
+	Makes sure that the explicit (convection) and implicit (diffusion)
+	parts of the residual add up to the full residual and that the
+	switches are restored
+	'''
+	solver = create_adv_diff_solver("ARK2", 0.01)
+	stepper = solver.stepper
+	U = solver.state_coeffs
+
+	res = solver.get_residual(U, np.zeros_like(U)).copy()
+	res_E = stepper.get_split_residual(solver, U, np.zeros_like(U), False)
+	res_I = stepper.get_split_residual(solver, U, np.zeros_like(U), True)
+
+	assert np.max(np.abs(res_E)) > 0. and np.max(np.abs(res_I)) > 0.
+	np.testing.assert_allclose(res_E + res_I, res, rtol=1e-13,
+			atol=1e-13)
+	assert solver.params["ConvFluxSwitch"]
+	assert solver.params["DiffFluxSwitch"]
+
+
+@pytest.mark.parametrize('time_scheme', ["ARK2", "ESDIRK2", "BDF2"])
+def test_implicit_steppers_are_second_order(time_scheme):
+	'''
+	This test solves 1D advection-diffusion with decreasing time steps
+	and makes sure that the error with respect to a converged RK4
+	solution decreases at second order
+	'''
+	solver = create_adv_diff_solver("RK4", 5e-4)
+	solver.solve()
+	U_ref = solver.state_coeffs
+
+	errors = []
+	for dt in [0.01, 0.005, 0.0025]:
+		solver = create_adv_diff_solver(time_scheme, dt)
+		solver.solve()
+		errors.append(np.max(np.abs(solver.state_coeffs - U_ref)))
+
+	rates = np.log2(np.array(errors[:-1])/errors[1:])
+	np.testing.assert_array_less(1.8, rates)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import physics.euler.euler as euler
+from physics.base.data import SourceBase
+
+rtol = 1e-13
+atol = 1e-13
+
+
+class QuadraticSource(SourceBase):
+	'''
+	Nonlinear source term without an analytical Jacobian,
+	S_i = U_i*U_{ns-1-i} + U_i.
+	'''
+	def get_source(self, physics, Uq, x, t):
+		return Uq*Uq[:, :, ::-1] + Uq
+
+
+def create_states(ns=3):
+	'''
+	This function returns random states [ne, nq, ns].
+	'''
+	np.random.seed(0)
+	return np.random.uniform(0.5, 2., [4, 5, ns])
+
+
+def get_quadratic_jacobian(Uq):
+	'''
+	This function returns the exact Jacobian of QuadraticSource.
+	'''
+	ns = Uq.shape[-1]
+	jac = np.zeros(Uq.shape + (ns,))
+	for i in range(ns):
+		jac[:, :, i, i] += Uq[:, :, ns-1-i] + 1.
+		jac[:, :, i, ns-1-i] += Uq[:, :, i]
+	return jac
+
+
+@pytest.mark.parametrize('complex_safe', [False, True])
+def test_default_source_jacobian(complex_safe):
+	'''
+	Make sure that the default source term Jacobian uses the complex step
+	(exact to round-off) for complex-safe sources and forward differences
+	otherwise.
+	'''
+	source = QuadraticSource()
+	source.COMPLEX_SAFE = complex_safe
+	Uq = create_states()
+
+	jac = source.get_jacobian(None, Uq, None, 0.)
+	expected = get_quadratic_jacobian(Uq)
+
+	if complex_safe:
+		np.testing.assert_allclose(jac, expected, rtol, atol)
+	else:
+		np.testing.assert_allclose(jac, expected, rtol=0., atol=1e-6)
+
+
+def test_numerical_jacobians_match_analytical():
+	'''
+	Make sure that the complex-step and forward difference Jacobians of
+	the stiff friction source term agree with its analytical Jacobian.
+	'''
+	physics = euler.Euler1D()
+	physics.set_physical_params()
+	physics.set_source("StiffFriction", nu=-3.)
+	source = physics.source_terms[0]
+	Uq = create_states()
+	Uq[:, :, 2] += 5.
+
+	expected = source.get_jacobian(physics, Uq, None, 0.)
+	jac = source.get_complex_step_jacobian(physics, Uq, None, 0.)
+	np.testing.assert_allclose(jac, expected, rtol, atol)
+
+	jac = source.get_forward_difference_jacobian(physics, Uq, None, 0.)
+	np.testing.assert_allclose(jac, expected, rtol=0., atol=1e-6)
+
+	jac = source.get_central_difference_jacobian(physics, Uq, None, 0.)
+	np.testing.assert_allclose(jac, expected, rtol=0., atol=1e-6)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+from general import BackendType
+import physics.chemistry.chemistry as chemistry
+
+rtol = 1e-14
+atol = 1e-14
+
+
+@pytest.mark.parametrize('b', [0., 0.1])
+def test_arrhenius_source_backends(b):
+	'''
+	This tests that the Arrhenius source term of the Numba backend agrees
+	with the NumPy backend. Without numba, the kernel runs as a plain
+	Python loop.
+	'''
+	physics = chemistry.Chemistry1D()
+	physics.set_physical_params(GasConstant=1., SpecificHeatRatio=1.2,
+			HeatRelease=50.)
+	physics.set_source("Arrhenius", A=230.75, b=b, Tign=50.)
+	source = physics.source_terms[0]
+
+	np.random.seed(0)
+	rho = np.random.uniform(0.5, 2., [3, 2])
+	u = np.random.uniform(-1., 1., [3, 2])
+	Y = np.random.uniform(0., 1., [3, 2])
+	P = np.random.uniform(10., 50., [3, 2])
+	Uq = np.zeros([3, 2, physics.NUM_STATE_VARS])
+	Uq[:, :, 0] = rho
+	Uq[:, :, 1] = rho*u
+	Uq[:, :, 2] = P/(physics.gamma - 1.) + 0.5*rho*u*u + \
+			physics.qo*rho*Y
+	Uq[:, :, 3] = rho*Y
+
+	x = np.zeros([3, 2, 1])
+	S = source.get_source(physics, Uq, x, 0.)
+	physics.backend = BackendType.Numba
+	S_numba = source.get_source(physics, Uq, x, 0.)
+
+	np.testing.assert_allclose(S_numba, S, rtol, atol)
+	assert np.all(S[:, :, -1] < 0.)
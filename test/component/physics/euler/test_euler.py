@@ -199,3 +199,67 @@ def test_conv_eigenvectors_multiplied_is_identity():
 	expected[:, :] = np.identity(left_eigen.shape[-1])
 
 	np.testing.assert_allclose(ldotr, expected, rtol, atol)
+
+
+def test_conv_eigenvectors_2D_diagonalize_flux_jacobian():
+	'''
+	This tests the convective eigenvectors of the 2D Euler equations in a
+	given direction and ensures that they are inverses of each other and
+	diagonalize the flux Jacobian projected in that direction
+	'''
+	physics = euler.Euler2D()
+	physics.set_physical_params()
+	U_bar = np.array([[[1.1, 0.7, -1.3, 3.]]])
+	n_hat = np.array([[[0.6, 0.8]]])
+
+	right_eigen, left_eigen = physics.get_conv_eigenvectors(U_bar, n_hat)
+	ldotr = np.einsum('elij,eljk->elik', left_eigen, right_eigen)
+	np.testing.assert_allclose(ldotr[0, 0], np.identity(4), rtol,
+			1e-14)
+
+	# Projected flux Jacobian by finite differences
+	def get_projected_flux(U):
+		F, _ = physics.get_conv_flux_interior(U.reshape(1, 1, 4))
+		return np.einsum('ijkl, l -> k', F, n_hat[0, 0])
+	h = 1e-6
+	A = np.zeros([4, 4])
+	for j in range(4):
+		dU = np.zeros(4)
+		dU[j] = h
+		A[:, j] = (get_projected_flux(U_bar[0, 0] + dU) -
+				get_projected_flux(U_bar[0, 0] - dU))/(2.*h)
+	Lambda = left_eigen[0, 0] @ A @ right_eigen[0, 0]
+
+	rho, rhou, rhov, rhoE = U_bar[0, 0]
+	un = (rhou*n_hat[0, 0, 0] + rhov*n_hat[0, 0, 1])/rho
+	p = 0.4*(rhoE - 0.5*(rhou**2 + rhov**2)/rho)
+	a = np.sqrt(1.4*p/rho)
+	np.testing.assert_allclose(Lambda, np.diag([un - a, un, un, un + a]),
+			rtol, 1e-7)
+
+
+def test_primitive_variable_cache():
+	'''
+	This tests that the cached primitive variables are reused within a
+	caching scope and match the uncached ones.
+	'''
+	physics = euler.Euler2D()
+	physics.set_physical_params()
+
+	np.random.seed(0)
+	Uq = np.random.rand(3, 4, physics.NUM_STATE_VARS)
+	Uq[:, :, 0] += 1.
+	Uq[:, :, 3] += 10.
+
+	prims_ref = physics.get_primitive_variables(Uq)
+	assert physics.primitive_cache is None
+
+	with physics.cache_primitive_variables():
+		prims = physics.get_primitive_variables(Uq)
+		assert physics.get_primitive_variables(Uq) is prims
+		# A different array with the same values is a cache miss
+		assert physics.get_primitive_variables(Uq.copy()) is not prims
+	assert physics.primitive_cache is None
+
+	for key in prims_ref:
+		np.testing.assert_allclose(prims[key], prims_ref[key], rtol, atol)
@@ -11,7 +11,7 @@ atol = 1e-15
 
 @pytest.mark.parametrize('conv_num_flux_type', [
 	# Basis class
-	"Roe", "LaxFriedrichs"
+	"Roe", "RoeEntropyFix", "LaxFriedrichs"
 ])
 def test_numerical_flux_1D_consistency(conv_num_flux_type):
 	'''
@@ -54,7 +54,7 @@ def test_numerical_flux_1D_consistency(conv_num_flux_type):
 
 @pytest.mark.parametrize('conv_num_flux_type', [
 	# Basis class
-	"Roe", "LaxFriedrichs"
+	"Roe", "RoeEntropyFix", "LaxFriedrichs"
 ])
 def test_numerical_flux_1D_conservation(conv_num_flux_type):
 	'''
@@ -109,7 +109,7 @@ def test_numerical_flux_1D_conservation(conv_num_flux_type):
 
 @pytest.mark.parametrize('conv_num_flux_type', [
 	# Basis class
-	"Roe", "LaxFriedrichs"
+	"Roe", "RoeEntropyFix", "LaxFriedrichs"
 ])
 def test_numerical_flux_2D_consistency(conv_num_flux_type):
 	'''
@@ -155,7 +155,7 @@ def test_numerical_flux_2D_consistency(conv_num_flux_type):
 
 @pytest.mark.parametrize('conv_num_flux_type', [
 	# Basis class
-	"Roe", "LaxFriedrichs"
+	"Roe", "RoeEntropyFix", "LaxFriedrichs"
 ])
 def test_numerical_flux_2D_conservation(conv_num_flux_type):
 	'''
@@ -211,3 +211,52 @@ def test_numerical_flux_2D_conservation(conv_num_flux_type):
 			-normals)
 
 	np.testing.assert_allclose(Fnum, -F_expected, rtol, atol)
+
+
+@pytest.mark.parametrize('conv_num_flux_type', [
+	"Roe", "RoeEntropyFix"
+])
+def test_roe_flux_2D_supersonic_upwind(conv_num_flux_type):
+	'''
+	This test ensures that the 2D Roe flux reduces to the upwind flux
+	F(uL) dot n if the flow is supersonic in the direction of the normal,
+	for arrays of different shapes evaluated with the same flux object.
+	'''
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux(conv_num_flux_type)
+	physics.set_physical_params()
+
+	np.random.seed(0)
+	nf = 4
+	nq = 3
+	gamma = physics.gamma
+	irho, irhou, irhov, irhoE = physics.get_state_indices()
+
+	# Normals
+	theta = np.random.rand(nf, nq)*2.*np.pi
+	normals = np.zeros([nf, nq, 2])
+	normals[:, :, 0] = 0.5*np.cos(theta)
+	normals[:, :, 1] = 0.5*np.sin(theta)
+
+	# States with a normal velocity larger than the speed of sound
+	def get_state(rho, P):
+		c = np.sqrt(gamma*P/rho)
+		u = 3.*c*np.cos(theta) - 0.5*c*np.sin(theta)
+		v = 3.*c*np.sin(theta) + 0.5*c*np.cos(theta)
+		Uq = np.zeros([nf, nq, physics.NUM_STATE_VARS])
+		Uq[:, :, irho] = rho
+		Uq[:, :, irhou] = rho*u
+		Uq[:, :, irhov] = rho*v
+		Uq[:, :, irhoE] = P/(gamma - 1.) + 0.5*rho*(u*u + v*v)
+		return Uq
+
+	UqL = get_state(1.1, 1.)
+	UqR = get_state(0.9, 1.2)
+
+	# Physical flux of the upwind (left) state
+	F_expected, _ = physics.get_conv_flux_projected(UqL, normals)
+
+	for s in [slice(0, 1), slice(0, nf), slice(1, 3)]:
+		Fnum = physics.conv_flux_fcn.compute_flux(physics, UqL[s],
+				UqR[s], normals[s])
+		np.testing.assert_allclose(Fnum, F_expected[s], 1e-13, 1e-13)
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import errors
+from external.optional_numba import NUMBA_AVAILABLE
+from general import BackendType
+import physics.euler.euler as euler
+
+rtol = 1e-14
+atol = 1e-14
+
+
+def get_states(physics, rho, vel, P):
+	'''
+	This function returns the states of given primitive variables.
+	'''
+	ndims = physics.NDIMS
+	Uq = np.zeros(rho.shape + (physics.NUM_STATE_VARS,))
+	Uq[:, :, 0] = rho
+	Uq[:, :, 1:1+ndims] = rho[:, :, np.newaxis]*vel
+	Uq[:, :, -1] = P/(physics.gamma - 1.) + 0.5*rho*np.sum(vel*vel, axis=2)
+
+	return Uq
+
+
+def get_random_states(physics, shape):
+	'''
+	This function returns random physical states.
+	'''
+	rho = np.random.uniform(0.5, 2., shape)
+	vel = np.random.uniform(-2., 2., shape + (physics.NDIMS,))
+	P = np.random.uniform(0.5, 2., shape)
+
+	return get_states(physics, rho, vel, P)
+
+
+def compare_backends(physics, fcn):
+	'''
+	This function evaluates fcn with the NumPy and Numba backends. Without
+	numba, the kernels run as plain Python loops, which still checks
+	that they agree with the NumPy implementation.
+	'''
+	physics.backend = BackendType.NumPy
+	out_numpy = fcn()
+	physics.backend = BackendType.Numba
+	out_numba = fcn()
+	physics.backend = BackendType.NumPy
+
+	return out_numpy, out_numba
+
+
+@pytest.mark.parametrize('physics_type', [euler.Euler1D, euler.Euler2D])
+def test_conv_flux_interior_backends(physics_type):
+	'''
+	This tests that the analytical flux (and the extra variables) of the
+	Numba backend agree with the NumPy backend.
+	'''
+	physics = physics_type()
+	physics.set_physical_params()
+	np.random.seed(0)
+	Uq = get_random_states(physics, (4, 3))
+
+	(F, vars), (F_numba, vars_numba) = compare_backends(physics,
+			lambda: physics.get_conv_flux_interior(Uq))
+
+	np.testing.assert_allclose(F_numba, F, rtol, atol)
+	assert len(vars_numba) == len(vars)
+	for var_numba, var in zip(vars_numba, vars):
+		np.testing.assert_allclose(var_numba, var, rtol, atol)
+
+
+@pytest.mark.parametrize('physics_type', [euler.Euler1D, euler.Euler2D])
+@pytest.mark.parametrize('conv_num_flux_type', [
+	"LaxFriedrichs", "Roe", "RoeEntropyFix"
+])
+def test_numerical_flux_backends(physics_type, conv_num_flux_type):
+	'''
+	This tests that the numerical fluxes of the Numba backend agree with
+	the NumPy backend, including near-sonic states for the entropy fix.
+	'''
+	physics = physics_type()
+	physics.set_conv_num_flux(conv_num_flux_type)
+	physics.set_physical_params()
+	np.random.seed(1)
+	UqL = get_random_states(physics, (5, 2))
+	UqR = get_random_states(physics, (5, 2))
+	normals = np.random.uniform(-1., 1., (5, 2, physics.NDIMS))
+
+	# Sonic states with a normal in the x-direction at the first face,
+	# where the entropy fix applies
+	shape = (1, 2)
+	vel = np.zeros(shape + (physics.NDIMS,))
+	vel[:, :, 0] = np.sqrt(physics.gamma)
+	normals[0] = 0.
+	normals[0, :, 0] = 0.5
+	UqL[:1] = get_states(physics, np.full(shape, 1.), vel,
+			np.full(shape, 1.))
+	UqR[:1] = get_states(physics, np.full(shape, 1.2), 0.99*vel,
+			np.full(shape, 1.2))
+
+	F, F_numba = compare_backends(physics,
+			lambda: physics.conv_flux_fcn.compute_flux(physics, UqL, UqR,
+			normals))
+
+	np.testing.assert_allclose(F_numba, F, rtol, atol)
+
+
+def test_roe_flux_non_physical_backends():
+	'''
+	This tests that both backends of the Roe flux flag a non-physical
+	Roe-averaged state.
+	'''
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_physical_params()
+	np.random.seed(2)
+	UqL = get_random_states(physics, (2, 2))
+	UqR = UqL.copy()
+	UqL[:, :, -1] = 0.
+	UqR[:, :, -1] = 0.
+	normals = np.ones([2, 2, 2])
+
+	for backend in BackendType:
+		physics.backend = backend
+		with pytest.raises(errors.NotPhysicalError):
+			physics.conv_flux_fcn.compute_flux(physics, UqL, UqR, normals)
+
+
+def test_set_backend():
+	'''
+	This tests the selection of the backend.
+	'''
+	physics = euler.Euler1D()
+	assert physics.backend is BackendType.NumPy
+
+	if NUMBA_AVAILABLE:
+		physics.set_backend("Numba")
+		assert physics.backend is BackendType.Numba
+	else:
+		with pytest.raises(errors.IncompatibleError):
+			physics.set_backend("Numba")
+		assert physics.backend is BackendType.NumPy
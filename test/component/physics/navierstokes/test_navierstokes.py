@@ -3,8 +3,12 @@ import pytest
 import sys
 sys.path.append('../src')
 
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
 import physics.navierstokes.navierstokes as navierstokes
 import physics.navierstokes.tools as ns_tools
+import solver.DG as DG
 
 rtol = 1e-15
 atol = 1e-15
@@ -150,3 +154,69 @@ def test_diffusion_flux_2D_zero_velocity():
 
 	F = physics.get_diff_flux_interior(Uq, gUq)
 	np.testing.assert_allclose(F, Fref, kappa*rtol, kappa*atol)
+
+
+def test_sutherland_transport_backends():
+	'''
+	This tests that Sutherland's law of the Numba backend agrees with the
+	NumPy backend. Without numba, the kernel runs as a plain Python loop.
+	'''
+	physics = navierstokes.NavierStokes2D()
+	physics.set_physical_params()
+	physics.get_transport = ns_tools.set_transport("Sutherland")
+
+	np.random.seed(0)
+	Uq = np.zeros([3, 2, physics.NUM_STATE_VARS])
+	Uq[:, :, 0] = np.random.uniform(0.5, 2., Uq.shape[:2])
+	Uq[:, :, 1:3] = np.random.uniform(-1., 1., Uq.shape[:2] + (2,))
+	Uq[:, :, 3] = np.random.uniform(1e5, 2e5, Uq.shape[:2])
+
+	mu, kappa = physics.get_transport(physics, Uq)
+	physics.backend = general.BackendType.Numba
+	mu_numba, kappa_numba = physics.get_transport(physics, Uq)
+
+	np.testing.assert_allclose(mu_numba, mu, 1e-14, 1e-14)
+	np.testing.assert_allclose(kappa_numba, kappa, 1e-14, 1e-14)
+
+
+def test_sip_helpers_precomputed():
+	'''
+	This tests that the SIP penalty term and volume to face length ratios
+	are computed once with the face helpers and reused by the residual.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=3, num_elems_y=2, xmin=-5., xmax=5., ymin=-5.,
+			ymax=5.))
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+			y1="y1", y2="y2")
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeTri",
+			ElementQuadrature="Dunavant", FaceQuadrature="GaussLegendre",
+			ApplyLimiters=[])
+
+	physics = navierstokes.NavierStokes2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+	physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_IC(IC_type="IsentropicVortex")
+	solver = DG.DG(params, physics, mesh)
+
+	int_face_helpers = solver.int_face_helpers
+	hL = int_face_helpers.hL
+	hR = int_face_helpers.hR
+	vol_elems = solver.elem_helpers.vol_elems
+	face_lengths = int_face_helpers.face_lengths
+
+	assert int_face_helpers.ip_eta == 12.*3
+	np.testing.assert_allclose(hL, vol_elems[int_face_helpers.elemL_IDs] /
+			face_lengths[:, -1], rtol, atol)
+	np.testing.assert_allclose(hR, vol_elems[int_face_helpers.elemR_IDs] /
+			face_lengths[:, -1], rtol, atol)
+
+	U = solver.state_coeffs
+	solver.get_residual(U, np.zeros_like(U))
+
+	assert int_face_helpers.hL is hL
+	assert physics.diff_flux_fcn.hL is hL
+	assert physics.diff_flux_fcn.hR is hR
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+ct = pytest.importorskip("cantera")
+
+import physics.zerodimensional.functions as zerod_fcns
+import physics.zerodimensional.kinetics as kinetics
+import physics.zerodimensional.zerodimensional as zerodimensional
+
+rtol = 1e-12
+atol = 1e-14
+
+
+def create_states(n=12, P=80.*ct.one_atm):
+	'''
+	This function returns random states of the H2/O2 mechanism that cover
+	both temperature ranges of the NASA polynomials.
+	'''
+	np.random.seed(0)
+	T = np.random.uniform(600., 2800., n)
+	Y = np.random.uniform(0., 1., [n, 10])
+	Y /= np.sum(Y, axis=-1, keepdims=True)
+	# A species that is absent
+	Y[0, 3] = 0.
+	Y[0] /= np.sum(Y[0])
+
+	return T, P, Y
+
+
+@pytest.mark.parametrize('P', [0.01*ct.one_atm, 80.*ct.one_atm])
+def test_mechanism_matches_cantera(P):
+	'''
+	Make sure that the thermodynamic properties and the net production
+	rates agree with cantera. The low pressure is in the falloff regime
+	of the Troe reaction.
+	'''
+	gas = ct.Solution('h2o2.yaml')
+	mech = kinetics.Mechanism(gas)
+	T, P, Y = create_states(P=P)
+
+	_, h, _ = mech.get_species_thermo(T)
+	cp_mass = mech.get_cp_mass(T, Y)
+	rho = mech.get_density(T, P, Y)
+	wdot = mech.get_net_production_rates(T, P, Y)
+
+	for i in range(T.shape[0]):
+		gas.TPY = T[i], P, Y[i]
+		np.testing.assert_allclose(h[i], gas.partial_molar_enthalpies,
+				rtol, atol)
+		np.testing.assert_allclose(cp_mass[i], gas.cp_mass, rtol, atol)
+		np.testing.assert_allclose(rho[i], gas.density, rtol, atol)
+		ref = gas.net_production_rates
+		np.testing.assert_allclose(wdot[i], ref, rtol=0.,
+				atol=1e-12*np.amax(np.abs(ref)))
+
+
+def test_production_rates_jacobian():
+	'''
+	Make sure that the analytical derivatives of the net production rates
+	agree with finite differences.
+	'''
+	mech = kinetics.Mechanism(ct.Solution('h2o2.yaml'))
+	T, P, Y = create_states()
+	_, dwdot_dT, dwdot_dY = mech.get_net_production_rates(T, P, Y,
+			get_jacobian=True)
+
+	eps = 1.e-6
+	dT = eps*T
+	wdotp = mech.get_net_production_rates(T + dT, P, Y)
+	wdotm = mech.get_net_production_rates(T - dT, P, Y)
+	expected = (wdotp - wdotm)/(2.*dT[:, np.newaxis])
+	np.testing.assert_allclose(dwdot_dT, expected, rtol=0.,
+			atol=1e-7*np.amax(np.abs(expected)))
+
+	eps = 1.e-7
+	expected = np.zeros_like(dwdot_dY)
+	for j in range(Y.shape[-1]):
+		Yp = Y.copy()
+		Ym = Y.copy()
+		Yp[:, j] += eps
+		Ym[:, j] -= eps
+		expected[:, :, j] = (mech.get_net_production_rates(T, P, Yp) -
+				mech.get_net_production_rates(T, P, Ym))/(2.*eps)
+	np.testing.assert_allclose(dwdot_dY, expected, rtol=0.,
+			atol=1e-7*np.amax(np.abs(expected)))
+
+
+@pytest.mark.parametrize('source_type', ["Mixing", "Reacting"])
+def test_psr_source_jacobian(source_type):
+	'''
+	Make sure that the analytical Jacobians of the multispecies PSR
+	source terms agree with finite differences at all points.
+	'''
+	physics = zerodimensional.MultispeciesPSR()
+	physics.set_physical_params()
+	source = getattr(zerod_fcns, source_type)()
+
+	T, P, Y = create_states()
+	Uq = np.hstack([T[:, np.newaxis], Y]).reshape([2, 6, 11])
+	jac = source.get_jacobian(physics, Uq, None, 0.)
+
+	expected = np.zeros_like(jac)
+	for j in range(Uq.shape[-1]):
+		eps = 1.e-6*Uq[:, :, j] if j == 0 else 1.e-7*np.ones(Uq.shape[:2])
+		Up = Uq.copy()
+		Um = Uq.copy()
+		Up[:, :, j] += eps
+		Um[:, :, j] -= eps
+		expected[:, :, :, j] = (source.get_source(physics, Up, None, 0.) -
+				source.get_source(physics, Um, None, 0.))/ \
+				(2.*eps[:, :, np.newaxis])
+	np.testing.assert_allclose(jac, expected, rtol=0.,
+			atol=1e-7*np.amax(np.abs(expected)))
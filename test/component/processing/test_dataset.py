@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import numerics.helpers.helpers as helpers
+import physics.scalar.scalar as scalar
+import processing.dataset as dataset
+import processing.readwritedatafiles as readwritedatafiles
+import solver.DG as DG
+
+rtol = 1e-15
+atol = 1e-15
+
+def write_snapshots(prefix, data_file_format, num_snapshots=5):
+	'''
+	This function writes a collection of data files for a 1D scalar
+	problem, changing the state and time between snapshots. It returns
+	the expected states and times.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=6, xmin=0., xmax=1.)
+
+	params = dict(general.set_solver_params(SolutionOrder=2,
+			FinalTime=1.0, NumTimeSteps=10, ApplyLimiters=[]))
+	params["Prefix"] = prefix
+	params["DataFileFormat"] = data_file_format
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params()
+	physics.set_IC(IC_type="Sine")
+
+	solver = DG.DG(params, physics, mesh)
+
+	writer = readwritedatafiles.get_data_file_writer(params)
+	U_expected = []
+	times = []
+	for iwrite in range(num_snapshots):
+		solver.time = 0.1*iwrite
+		U_expected.append(solver.state_coeffs.copy())
+		times.append(solver.time)
+		iwrite = iwrite if iwrite < num_snapshots - 1 else -1
+		writer.write(solver, iwrite)
+		solver.state_coeffs *= 2.
+	writer.close()
+
+	return np.array(U_expected), np.array(times)
+
+
+@pytest.mark.parametrize('data_file_format', ["Checkpoint", "Pickle"])
+def test_dataset_slicing(tmp_path, data_file_format):
+	'''
+	Make sure that snapshots are found in order and can be sliced by time
+	index and element subset.
+	'''
+	prefix = str(tmp_path / "Data")
+	U_expected, times = write_snapshots(prefix, data_file_format)
+
+	data = dataset.open(prefix)
+
+	assert len(data) == U_expected.shape[0]
+	np.testing.assert_allclose(data.times, times, rtol, atol)
+	np.testing.assert_allclose(data[-1], U_expected[-1], rtol, atol)
+	elem_IDs = np.array([4, 1])
+	np.testing.assert_allclose(data[1::2, elem_IDs],
+			U_expected[1::2][:, elem_IDs], rtol, atol)
+	np.testing.assert_allclose(data[2, 3], U_expected[2, 3:4], rtol, atol)
+
+
+def test_dataset_shares_solver(tmp_path):
+	'''
+	Make sure that all snapshots share a single mesh and that variables
+	are evaluated at the element quadrature points.
+	'''
+	prefix = str(tmp_path / "Data")
+	U_expected, _ = write_snapshots(prefix, "Checkpoint")
+
+	data = dataset.open(prefix)
+	mesh = data.get_solver(0).mesh
+	assert data.get_solver(3).mesh is mesh
+	np.testing.assert_allclose(data.solver.state_coeffs, U_expected[3],
+			rtol, atol)
+
+	basis_val = data.solver.elem_helpers.basis_val
+	var = data.compute_variable("Scalar", 2, elem_IDs=[0, 5])
+	np.testing.assert_allclose(var, helpers.evaluate_state(
+			U_expected[2][[0, 5]], basis_val), rtol, atol)
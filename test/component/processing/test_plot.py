@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import meshing.pointlocation as point_location
+import physics.scalar.scalar as scalar
+import processing.plot as plot
+import solver.DG as DG
+
+
+def create_solver():
+	'''
+	This function creates a DG solver for 1D scalar advection with a sine
+	wave initial condition.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=6, xmin=-1., xmax=1.)
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, FinalTime=1.0, NumTimeSteps=10,
+			ApplyLimiters=[])
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params(ConstVelocity=1.)
+	physics.set_IC(IC_type="Sine", omega=np.pi)
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_line_probe_reuses_locator(monkeypatch):
+	'''
+	Make sure that a point locator passed to plot_line_probe is reused
+	instead of building a new one for each probe.
+	'''
+	solver = create_solver()
+	locator = point_location.PointLocator(solver.mesh)
+	located = []
+	locate = locator.locate
+	def locate_and_count(xpoints):
+		located.append(xpoints.shape[0])
+		return locate(xpoints)
+	locator.locate = locate_and_count
+
+	def create_locator(mesh):
+		raise AssertionError("A new point locator was created")
+	monkeypatch.setattr(point_location, "PointLocator", create_locator)
+
+	for xy2 in [0., 0.5]:
+		plot.plot_line_probe(solver.mesh, solver.physics, solver, "Scalar",
+				-1., xy2, num_pts=11, locator=locator, ignore_legend=True)
+	plot.plt.close("all")
+
+	assert located == [11, 11]
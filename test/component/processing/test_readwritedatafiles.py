@@ -0,0 +1,249 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import errors
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.scalar.scalar as scalar
+import processing.readwritedatafiles as readwritedatafiles
+import processing.sweep as sweep
+import solver.DG as DG
+
+rtol = 1e-15
+atol = 1e-15
+
+def create_solver_object(prefix, data_file_format, num_elems=4,
+		periodic=False):
+	'''
+	This function creates a solver object for a 1D scalar problem that
+	writes data files with the given prefix and format. The mesh is
+	periodic if the solver is used to solve.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=num_elems, xmin=0., xmax=1.)
+	if periodic:
+		mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2")
+
+	params = dict(general.set_solver_params(SolutionOrder=2,
+			FinalTime=1.0, NumTimeSteps=10, ApplyLimiters=[]))
+	params["Prefix"] = prefix
+	params["DataFileFormat"] = data_file_format
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params()
+	physics.set_IC(IC_type="Sine")
+
+	solver = DG.DG(params, physics, mesh)
+	solver.time = 0.25
+	solver.itime = 3
+	solver.stepper.num_time_steps = 10
+
+	return solver
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_checkpoint_round_trip(tmp_path, mmap):
+	'''
+	Make sure that a checkpoint file stores the state, time, basis, and
+	stepper state, and that it can be memory-mapped.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Checkpoint")
+	readwritedatafiles.write_data_file(solver, 1)
+
+	fname = str(tmp_path / "Data_1.ckpt")
+	checkpoint = readwritedatafiles.read_data_file(fname, mmap=mmap)
+
+	assert isinstance(checkpoint, readwritedatafiles.Checkpoint)
+	assert isinstance(checkpoint.state_coeffs, np.memmap) == mmap
+	np.testing.assert_allclose(checkpoint.state_coeffs,
+			solver.state_coeffs, rtol, atol)
+	assert checkpoint.time == solver.time
+	assert checkpoint.itime == solver.itime
+	assert checkpoint.order == solver.order
+	assert checkpoint.basis.BASIS_TYPE == solver.basis.BASIS_TYPE
+	assert checkpoint.stepper.num_time_steps == 10
+	# Array data must be aligned for memory mapping
+	assert (checkpoint.header["arrays"]["state_coeffs"]["offset"] %
+			readwritedatafiles.ALIGNMENT == 0)
+	checkpoint.check_mesh_compatibility(solver.mesh)
+
+
+def test_read_data_file_reads_legacy_pickle(tmp_path):
+	'''
+	Make sure that pickle data files can still be read.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Pickle")
+	readwritedatafiles.write_data_file(solver, -1)
+
+	solver_old = readwritedatafiles.read_data_file(
+			str(tmp_path / "Data_final.pkl"))
+
+	assert not isinstance(solver_old, readwritedatafiles.Checkpoint)
+	np.testing.assert_allclose(solver_old.state_coeffs,
+			solver.state_coeffs, rtol, atol)
+
+
+def test_checkpoint_rejects_incompatible_mesh(tmp_path):
+	'''
+	Make sure that a checkpoint cannot be applied to a mesh with a
+	different number of elements.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Checkpoint")
+	readwritedatafiles.write_data_file(solver, -1)
+	checkpoint = readwritedatafiles.read_data_file(
+			str(tmp_path / "Data_final.ckpt"))
+
+	mesh = mesh_common.mesh_1D(num_elems=5, xmin=0., xmax=1.)
+	with pytest.raises(errors.IncompatibleError):
+		checkpoint.check_mesh_compatibility(mesh)
+
+
+def create_restart_deck(prefix, ordering, final_time, num_time_steps,
+		restart_file=None):
+	'''
+	This function creates the input deck of a 2D scalar advection problem
+	on a mesh with the given element ordering that writes a final
+	checkpoint file.
+	'''
+	deck = {
+		"TimeStepping" : {"FinalTime" : final_time,
+				"NumTimeSteps" : num_time_steps, "TimeStepper" : "RK4"},
+		"Numerics" : {"SolutionOrder" : 2,
+				"SolutionBasis" : "LagrangeQuad"},
+		"Mesh" : {"ElementShape" : "Quadrilateral", "NumElemsX" : 6,
+				"NumElemsY" : 5, "xmin" : -5., "xmax" : 5., "ymin" : -5.,
+				"ymax" : 5., "PeriodicBoundariesX" : ["x1", "x2"],
+				"PeriodicBoundariesY" : ["y1", "y2"],
+				"ElementOrdering" : ordering},
+		"Physics" : {"Type" : "ConstAdvScalar",
+				"ConvFluxNumerical" : "LaxFriedrichs"},
+		"InitialCondition" : {"Function" : "Gaussian", "x0" : [1., 0.]},
+		"Restart" : {"File" : restart_file, "StartFromFileTime" : False},
+		"Output" : {"Prefix" : prefix, "DataFileFormat" : "Checkpoint",
+				"AutoPostProcess" : False, "Verbose" : False},
+	}
+
+	return sweep.get_case_deck(deck, {})
+
+
+@pytest.mark.parametrize('ordering_old, ordering', [
+	(None, "Hilbert"), ("ReverseCuthillMcKee", None),
+	("ReverseCuthillMcKee", "Morton"),
+])
+def test_restart_across_element_orderings(tmp_path, ordering_old,
+		ordering):
+	'''
+	Make sure that restarting from a checkpoint written on a mesh with
+	another element ordering gives the same solution as an uninterrupted
+	run.
+	'''
+	driver = sweep.load_driver()
+	prefix = str(tmp_path / "Data")
+	driver(create_restart_deck(prefix, ordering_old, 0.1, 2))
+	# The problem is autonomous, so the restart can start from t = 0
+	solver, _, _ = driver(create_restart_deck(prefix, ordering, 0.1, 2,
+			restart_file=prefix + "_final.ckpt"))
+	solver_ref, _, _ = driver(create_restart_deck(prefix, ordering, 0.2,
+			4))
+
+	np.testing.assert_allclose(solver.state_coeffs,
+			solver_ref.state_coeffs, rtol=1e-13, atol=1e-13)
+
+
+def test_checkpoint_rejects_different_mesh(tmp_path):
+	'''
+	Make sure that a checkpoint cannot be applied to a different mesh
+	with the same number of elements.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Checkpoint")
+	readwritedatafiles.write_data_file(solver, -1)
+	checkpoint = readwritedatafiles.read_data_file(
+			str(tmp_path / "Data_final.ckpt"))
+
+	mesh = mesh_common.mesh_1D(num_elems=4, xmin=0., xmax=2.)
+	with pytest.raises(errors.IncompatibleError):
+		checkpoint.check_mesh_compatibility(mesh)
+
+
+@pytest.mark.parametrize('data_file_format, ext', [
+	("Pickle", ".pkl"), ("Checkpoint", ".ckpt"),
+])
+def test_compressed_data_file_round_trip(tmp_path, data_file_format, ext):
+	'''
+	Make sure that compressed data files are read back correctly.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), data_file_format)
+	solver.params["CompressDataFiles"] = True
+	readwritedatafiles.write_data_file(solver, -1)
+
+	fname = str(tmp_path / ("Data_final" + ext))
+	solver_old = readwritedatafiles.read_data_file(fname, mmap=True)
+
+	np.testing.assert_allclose(solver_old.state_coeffs,
+			solver.state_coeffs, rtol, atol)
+	# The state must be writeable so that it can be used for a restart
+	solver_old.state_coeffs[0] += 1.
+
+
+def test_async_writer_snapshots_state(tmp_path):
+	'''
+	Make sure that the asynchronous writer stores the state at the time
+	of the write call, even if the solver keeps modifying it, and that
+	all files are written after closing.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Checkpoint")
+	writer = readwritedatafiles.AsyncDataFileWriter(max_queue_size=1)
+	U_expected = []
+	for iwrite in range(4):
+		U_expected.append(solver.state_coeffs.copy())
+		writer.write(solver, iwrite)
+		solver.state_coeffs += 1.
+	writer.close()
+
+	for iwrite in range(4):
+		checkpoint = readwritedatafiles.read_data_file(
+				str(tmp_path / f"Data_{iwrite}.ckpt"))
+		np.testing.assert_allclose(checkpoint.state_coeffs,
+				U_expected[iwrite], rtol, atol)
+
+
+def test_async_writer_raises_writer_errors(tmp_path):
+	'''
+	Make sure that errors in the writer thread are raised on the calling
+	thread.
+	'''
+	solver = create_solver_object(str(tmp_path / "Data"), "Checkpoint")
+	writer = readwritedatafiles.AsyncDataFileWriter()
+	writer.write(solver, 0)
+	solver.params["Prefix"] = str(tmp_path / "missing" / "Data")
+	writer.write(solver, 1)
+	with pytest.raises(FileNotFoundError):
+		writer.close()
+
+
+def stop_after_first_write(solver):
+	'''
+	This custom user function raises an error once the first data file of
+	the solve has been queued.
+	'''
+	if solver.itime == 4:
+		raise RuntimeError("stop")
+
+
+def test_solve_error_not_replaced_by_writer_error(tmp_path):
+	'''
+	Make sure that an error in the time loop is propagated even if the
+	asynchronous writer has also failed.
+	'''
+	solver = create_solver_object(str(tmp_path / "missing" / "Data"),
+			"Pickle", periodic=True)
+	solver.params.update(AsyncWrite=True, WriteInterval=1,
+			WriteInitialSolution=False)
+	# The data files cannot be written
+	solver.custom_user_function = stop_after_first_write
+
+	with pytest.raises(RuntimeError, match="stop"):
+		solver.solve()
@@ -0,0 +1,95 @@
+import numpy as np
+import os
+import pytest
+import sys
+sys.path.append('../src')
+
+import processing.sweep as sweep
+
+
+def create_deck():
+	'''
+	This function creates the input deck of a 1D scalar advection problem
+	with a sine wave initial condition and periodic boundaries.
+	'''
+	return {
+		"TimeStepping" : {"FinalTime" : 0.5, "CFL" : 0.05,
+				"TimeStepper" : "RK4"},
+		"Numerics" : {"SolutionOrder" : 1, "SolutionBasis" : "LagrangeSeg"},
+		"Mesh" : {"NumElemsX" : 4, "xmin" : -1., "xmax" : 1.,
+				"PeriodicBoundariesX" : ["x1", "x2"]},
+		"Physics" : {"Type" : "ConstAdvScalar", "ConstVelocity" : 1.},
+		"InitialCondition" : {"Function" : "Sine", "omega" : 2.*np.pi},
+		"ExactSolution" : {"Function" : "Sine", "omega" : 2.*np.pi},
+		"Output" : {"WriteFinalSolution" : False, "AutoPostProcess" : False},
+	}
+
+
+def test_get_cases_combines_parameters():
+	'''
+	Make sure that all combinations of the parameters are created and that
+	parameters in a tuple are varied together.
+	'''
+	cases = sweep.get_cases({"Numerics.SolutionOrder" : [1, 2],
+			("Mesh.NumElemsX", "TimeStepping.TimeStepSize") : [(4, 0.1),
+			(8, 0.05)]})
+
+	assert cases == [
+		{"Numerics.SolutionOrder" : 1, "Mesh.NumElemsX" : 4,
+				"TimeStepping.TimeStepSize" : 0.1},
+		{"Numerics.SolutionOrder" : 1, "Mesh.NumElemsX" : 8,
+				"TimeStepping.TimeStepSize" : 0.05},
+		{"Numerics.SolutionOrder" : 2, "Mesh.NumElemsX" : 4,
+				"TimeStepping.TimeStepSize" : 0.1},
+		{"Numerics.SolutionOrder" : 2, "Mesh.NumElemsX" : 8,
+				"TimeStepping.TimeStepSize" : 0.05},
+	]
+
+
+def test_get_case_deck_does_not_modify_base_deck():
+	'''
+	Make sure that overrides, including nested ones, are applied to a copy
+	of the base deck.
+	'''
+	deck = create_deck()
+	case_deck = sweep.get_case_deck(deck, {"Numerics.SolutionOrder" : 3,
+			"BoundaryConditions.x1.BCType" : "StateAll"})
+
+	assert case_deck.Numerics["SolutionOrder"] == 3
+	assert case_deck.BoundaryConditions == {"x1" : {"BCType" : "StateAll"}}
+	assert deck["Numerics"]["SolutionOrder"] == 1
+	assert "BoundaryConditions" not in deck
+
+
+def test_get_convergence_rates_compares_refinements():
+	'''
+	Make sure that convergence rates are computed between refinements of
+	the same order only.
+	'''
+	results = [{"Case" : i, "Numerics.SolutionOrder" : p,
+			"Mesh.NumElemsX" : n, "NumElems" : n, "NumDims" : 1,
+			"Error" : float(n)**-(p + 1)} for i, (p, n) in
+			enumerate([(1, 4), (1, 8), (2, 4), (2, 8), (2, 16)])]
+
+	sweep.get_convergence_rates(results, {"Mesh.NumElemsX"})
+
+	np.testing.assert_allclose([result["Rate"] for result in results],
+			[np.nan, 2., np.nan, 3., 3.])
+
+
+def test_run_sweep_gives_expected_convergence(tmp_path):
+	'''
+	Make sure that a serial sweep runs every case and that the error
+	converges at the expected rate.
+	'''
+	results_file = os.path.join(tmp_path, "results.csv")
+	results = sweep.run_sweep(create_deck(), {
+			"Numerics.SolutionOrder" : [1, 2],
+			"Mesh.NumElemsX" : [8, 16]}, error_variable="Scalar",
+			results_file=results_file)
+
+	assert [result["Failure"] for result in results] == [""]*4
+	assert [result["NumElems"] for result in results] == [8, 16, 8, 16]
+	assert results[1]["Rate"] == pytest.approx(2., abs=0.3)
+	assert results[3]["Rate"] == pytest.approx(3., abs=0.3)
+	assert os.path.exists(results_file)
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import numerics.helpers.helpers as helpers
+import numerics.timestepping.tools as stepper_tools
+import physics.euler.euler as euler
+import solver.DG as DG
+import solver.threaded as solver_threaded
+import solver.tools as solver_tools
+
+rtol = 1e-14
+atol = 1e-14
+
+
+def create_solver(av_param=30., order=2, av_time_step_limit=True):
+	'''
+	This function creates a DG solver with artificial viscosity for a 2D
+	Euler problem on a rectangular mesh with rectangular elements.
+	'''
+	mesh = mesh_common.mesh_2D(num_elems_x=5, num_elems_y=4, xmin=-5.,
+			xmax=5., ymin=-1., ymax=1.)
+
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=order, SolutionBasis="LagrangeQuad",
+			ApplyLimiters=[], ArtificialViscosity=True,
+			AVParameter=av_param, FinalTime=1., CFL=0.1,
+			AVTimeStepLimit=av_time_step_limit)
+
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_physical_params(GasConstant=1.)
+	physics.set_IC(IC_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_length_scales_rectangular_elements():
+	'''
+	Make sure that the length scales of rectangular elements are their
+	side lengths.
+	'''
+	solver = create_solver()
+	length_scales = solver.elem_helpers.length_scales_elems
+
+	expected = np.zeros_like(length_scales)
+	expected[:, 0] = 2.
+	expected[:, 1] = 0.5
+	np.testing.assert_allclose(length_scales, expected, rtol, atol)
+
+
+def test_artificial_viscosity_integral():
+	'''
+	Make sure that the artificial viscosity integral matches the direct
+	evaluation of the weak form of the artificial viscous term.
+	'''
+	solver = create_solver()
+	elem_helpers = solver.elem_helpers
+	physics = solver.physics
+	Uc = solver.state_coeffs
+	p = solver.order
+
+	res = solver_tools.calculate_artificial_viscosity_integral(physics,
+			elem_helpers, Uc, 30., p)
+
+	# Direct evaluation
+	grad_phi = elem_helpers.basis_phys_grad_elems
+	Uq = helpers.evaluate_state(Uc, elem_helpers.basis_val)
+	grad_Uq = np.einsum('ijnl, ink -> ijkl', grad_phi, Uc)
+	epsilon = solver_tools.calculate_artificial_viscosity(physics,
+			elem_helpers, Uq, grad_Uq, 30., p)
+	integral = np.einsum('ijm, ijpm, ijnm, jx, ijx -> ipn', epsilon,
+			grad_phi, grad_phi, elem_helpers.quad_wts,
+			elem_helpers.djac_elems)
+	expected = np.einsum('ipn, ipk -> ink', integral, Uc)
+
+	np.testing.assert_allclose(res, expected, rtol=0.,
+			atol=1e-12*np.amax(np.abs(expected)))
+
+
+def test_artificial_viscosity_time_step():
+	'''
+	Make sure that the CFL-based time step accounts for the diffusive
+	limit of the artificial viscosity only if AVTimeStepLimit is True.
+	'''
+	dt = []
+	for av_param, av_time_step_limit in [(0., True), (1.e3, True),
+			(1.e3, False)]:
+		solver = create_solver(av_param,
+				av_time_step_limit=av_time_step_limit)
+		stepper = solver.stepper
+		dt.append(stepper_tools.get_dt_from_cfl(stepper, solver))
+
+	# Only the convective limit without artificial viscosity
+	Uq = helpers.evaluate_state(solver.state_coeffs,
+			solver.elem_helpers.basis_val)
+	a = solver.physics.compute_variable("MaxWaveSpeed", Uq)
+	vol_elems = solver.elem_helpers.vol_elems
+	np.testing.assert_allclose(dt[0], np.min(0.1*vol_elems**0.5/a), rtol,
+			0.)
+	assert dt[1] < dt[0]
+	np.testing.assert_allclose(dt[2], dt[0], rtol, 0.)
+
+
+@pytest.mark.parametrize('num_threads', [1, 2])
+def test_time_step_reuses_residual_shock_sensor(monkeypatch, num_threads):
+	'''
+	Make sure that after a residual evaluation, the CFL-based time step
+	reuses the artificial viscosity of that evaluation instead of
+	evaluating the shock sensor again.
+	'''
+	solver = create_solver(av_param=1.e3)
+	stepper = solver.stepper
+	dt_expected = stepper_tools.get_dt_from_cfl(stepper, solver)
+
+	solver.params["NumThreads"] = num_threads
+	solver.params["ThreadChunkSize"] = 7
+	solver.threaded_kernels = solver_threaded.start_threaded_kernels(
+			solver)
+	U = solver.state_coeffs
+	solver.get_element_residuals(U, np.zeros_like(U))
+	if solver.threaded_kernels is not None:
+		solver.threaded_kernels.close()
+
+	def calculate_artificial_viscosity(*args, **kwargs):
+		raise AssertionError("The shock sensor was evaluated again")
+	monkeypatch.setattr(solver_tools, "calculate_artificial_viscosity",
+			calculate_artificial_viscosity)
+	dt = stepper_tools.get_dt_from_cfl(stepper, solver)
+
+	np.testing.assert_allclose(dt, dt_expected, rtol, 0.)
+
+
+def test_perturbed_residual_does_not_update_shock_sensor():
+	'''
+	Make sure that the artificial viscosity reused by the CFL-based time
+	step is not taken from residual evaluations at perturbed states.
+	'''
+	solver = create_solver(av_param=1.e3)
+	U = solver.state_coeffs
+	solver.get_element_residuals(U, np.zeros_like(U))
+	av_elems = solver.av_elems.copy()
+
+	with solver.perturbed_residuals():
+		solver.get_element_residuals(2.*U, np.zeros_like(U))
+	np.testing.assert_array_equal(solver.av_elems, av_elems)
+	assert not solver.perturbed
+
+	solver.get_element_residuals(2.*U, np.zeros_like(U))
+	assert np.any(solver.av_elems != av_elems)
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.euler.euler as euler
+import processing.sweep as sweep
+import solver.DG as DG
+import solver.ensemble as solver_ensemble
+
+
+def create_solver(mesh):
+	'''
+	This function creates a DG solver for a 2D Euler problem (isentropic
+	vortex) with state boundary conditions on all four boundaries.
+	'''
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeQuad", FinalTime=1.0,
+			NumTimeSteps=10, ApplyLimiters=[])
+
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_physical_params(GasConstant=1.)
+	physics.set_IC(IC_type="IsentropicVortex")
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	for bname in physics.BCs:
+		physics.set_BC(bname=bname, BC_type="StateAll",
+				fcn_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+def create_mesh():
+	return mesh_common.mesh_2D(num_elems_x=3, num_elems_y=2, xmin=-5.,
+			xmax=5., ymin=-5., ymax=5.)
+
+
+def create_sod_deck(ensemble=None, limiters=None, **physics_params):
+	'''
+	This function creates the input deck of a 1D Sod problem, optionally
+	run as an ensemble and with limiters.
+	'''
+	deck = {
+		"TimeStepping" : {"FinalTime" : 0.2, "NumTimeSteps" : 10,
+				"TimeStepper" : "SSPRK3"},
+		"Numerics" : {"SolutionOrder" : 1, "SolutionBasis" : "LagrangeSeg",
+				"ApplyLimiters" : limiters or [],
+				"ShockIndicator" : "MinMod"},
+		"Mesh" : {"NumElemsX" : 16, "xmin" : -5., "xmax" : 5.},
+		"Physics" : {"Type" : "Euler", "ConvFluxNumerical" : "Roe",
+				"GasConstant" : 1., **physics_params},
+		"InitialCondition" : {"Function" : "RiemannProblem", "rhoL" : 1.,
+				"uL" : 0., "pL" : 1., "rhoR" : 0.125, "uR" : 0., "pR" : 0.1,
+				"xd" : 0.},
+		"BoundaryConditions" : {"x1" : {"BCType" : "SlipWall"},
+				"x2" : {"BCType" : "SlipWall"}},
+		"Output" : {"WriteFinalSolution" : False, "AutoPostProcess" : False,
+				"Verbose" : False},
+	}
+	if ensemble is not None:
+		deck["Ensemble"] = ensemble
+
+	return sweep.get_case_deck(deck, {})
+
+
+def test_tiled_helpers_match_replicated_mesh():
+	'''
+	Make sure that the helpers repeated from a single copy of the mesh are
+	the same as the ones computed on the full replicated mesh.
+	'''
+	mesh = mesh_tools.replicate_mesh(create_mesh(), 3)
+	solver = create_solver(mesh)
+
+	# Compute the helpers directly on the replicated mesh
+	mesh.base_mesh = None
+	solver_full = create_solver(mesh)
+
+	for name in ["jac_elems", "djac_elems", "x_elems", "iMM_elems",
+			"vol_elems"]:
+		np.testing.assert_allclose(getattr(solver.elem_helpers, name),
+				getattr(solver_full.elem_helpers, name))
+	for name in ["elemL_IDs", "elemR_IDs", "faceL_IDs", "faceR_IDs",
+			"normals_int_faces"]:
+		np.testing.assert_allclose(getattr(solver.int_face_helpers, name),
+				getattr(solver_full.int_face_helpers, name))
+	for i in range(len(solver.bface_helpers.x_bgroups)):
+		np.testing.assert_array_equal(solver.bface_helpers.elem_IDs[i],
+				solver_full.bface_helpers.elem_IDs[i])
+		np.testing.assert_allclose(solver.bface_helpers.x_bgroups[i],
+				solver_full.bface_helpers.x_bgroups[i])
+
+
+def test_ensemble_residual_matches_members():
+	'''
+	Make sure that the residual of an ensemble with a different specific
+	heat ratio for each member matches the residual of each member solved
+	on its own.
+	'''
+	num_members = 3
+	mesh = mesh_tools.replicate_mesh(create_mesh(), num_members)
+	solver = create_solver(mesh)
+	solver.ensemble = solver_ensemble.Ensemble(solver,
+			physics_params=dict(GasConstant=1.),
+			member_physics_params=dict(SpecificHeatRatio=[1.3, 1.4, 1.6]))
+
+	U = solver.state_coeffs
+	res = solver.get_residual(U, np.zeros_like(U))
+	res_members = res.reshape((num_members, -1) + res.shape[1:])
+
+	for i in range(num_members):
+		member_solver = solver.ensemble.get_member_solver(solver, i)
+		assert member_solver.physics.gamma == [1.3, 1.4, 1.6][i]
+		U_member = member_solver.state_coeffs
+		res_member = member_solver.get_residual(U_member,
+				np.zeros_like(U_member))
+		np.testing.assert_allclose(res_members[i], res_member, rtol=1e-14,
+				atol=1e-14)
+
+
+def test_get_member_params_checks_length():
+	'''
+	Make sure that each per-member parameter needs one value per member.
+	'''
+	with pytest.raises(ValueError):
+		solver_ensemble.get_member_params({"SpecificHeatRatio": [1.3, 1.4]},
+				3)
+
+
+@pytest.mark.parametrize('limiters', [None, ["WENO"],
+		["PositivityPreserving"], ["PositivityPreserving", "WENO"]])
+def test_ensemble_physics_solve_matches_members(limiters):
+	'''
+	Make sure that when only the physical parameters differ between
+	members, the initial condition of each member is evaluated with its
+	own physics and each member of the solve (including the limiters)
+	matches a separate run.
+	'''
+	gammas = [1.3, 1.4, 1.6]
+	driver = sweep.load_driver()
+	solver, _, _ = driver(create_sod_deck(ensemble={
+			"NumMembers" : len(gammas),
+			"Physics" : {"SpecificHeatRatio" : gammas}},
+			limiters=limiters))
+	U = solver.ensemble.get_member_state_coeffs(solver)
+
+	for i, gamma in enumerate(gammas):
+		solver_member, _, _ = driver(create_sod_deck(limiters=limiters,
+				SpecificHeatRatio=gamma))
+		np.testing.assert_allclose(U[i], solver_member.state_coeffs,
+				rtol=1e-13, atol=1e-13)
@@ -0,0 +1,193 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.scalar.scalar as scalar
+import solver.DG as DG
+import solver.jacobian as solver_jacobian
+import solver.tools as solver_tools
+from general import JacobianType
+from physics.base.data import SourceBase
+
+from test_threaded import create_solver
+
+
+def create_scalar_solver(nu=None):
+	'''
+	This function creates a DG solver for 1D scalar advection with upwind
+	fluxes on a periodic mesh, optionally with a source term nu*U.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=6, xmin=-1., xmax=1.)
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2")
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, FinalTime=1.0, NumTimeSteps=10,
+			ApplyLimiters=[])
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params(ConstVelocity=1.)
+	physics.set_IC(IC_type="Sine", omega=np.pi)
+	if nu is not None:
+		physics.set_source(source_type="SimpleSource", nu=nu)
+
+	return DG.DG(params, physics, mesh)
+
+
+def get_dense_jacobian(solver, U):
+	'''
+	This function computes the Jacobian with one residual evaluation per
+	state coefficient.
+	'''
+	res = solver.get_residual(U, np.zeros_like(U)).reshape(-1).copy()
+	eps = solver_jacobian.get_perturbation_size(U).reshape(-1)
+
+	jac = np.zeros([U.size, U.size])
+	for j in range(U.size):
+		Up = U.copy().reshape(-1)
+		Up[j] += eps[j]
+		res_p = solver.get_residual(Up.reshape(U.shape), np.zeros_like(U))
+		jac[:, j] = (res_p.reshape(-1) - res)/eps[j]
+
+	return jac
+
+
+def test_color_elements_separates_neighbors_of_neighbors():
+	'''
+	Make sure that elements that share a neighbor have different colors.
+	'''
+	solver = create_solver()
+	adjacency = solver_jacobian.get_elem_adjacency(solver.mesh)
+	colors = solver_jacobian.color_elements(adjacency, distance=2)
+
+	for elem_ID in range(solver.mesh.num_elems):
+		neighbors = adjacency[elem_ID].indices
+		stencil = np.concatenate([[elem_ID], neighbors])
+		assert np.unique(colors[stencil]).shape[0] == stencil.shape[0]
+
+
+def test_colored_jacobian_matches_dense():
+	'''
+	Make sure that the colored finite difference Jacobian and its diagonal
+	blocks are identical to the column-by-column finite difference
+	Jacobian.
+	'''
+	solver = create_solver()
+	U = solver.state_coeffs
+	n = U.shape[1]*U.shape[2]
+
+	jac_dense = get_dense_jacobian(solver, U)
+	jac = solver_jacobian.compute_jacobian(solver, U)
+	jac_diag = solver_jacobian.compute_block_diagonal(solver, U)
+
+	assert jac.blocksize == (n, n)
+	np.testing.assert_allclose(jac.toarray(), jac_dense, rtol=1e-12,
+			atol=1e-10)
+	for elem_ID in range(U.shape[0]):
+		np.testing.assert_allclose(jac_diag[elem_ID], jac_dense[
+				elem_ID*n:(elem_ID + 1)*n, elem_ID*n:(elem_ID + 1)*n],
+				rtol=1e-12, atol=1e-10)
+
+
+def test_central_difference_jacobian_matches_forward_difference():
+	'''
+	Make sure that the central and forward difference Jacobians agree to
+	within the truncation error of the forward differences.
+	'''
+	solver = create_solver()
+	U = solver.state_coeffs
+
+	jac = solver_jacobian.compute_jacobian(solver, U)
+	jac_central = solver_jacobian.compute_jacobian(solver, U,
+			jacobian_type=JacobianType.CentralDifference)
+
+	np.testing.assert_allclose(jac_central.toarray(), jac.toarray(),
+			rtol=0., atol=1e-6*np.max(np.abs(jac.toarray())))
+
+
+def test_analytic_source_jacobian_matches_finite_differences():
+	'''
+	Make sure that the Jacobian with analytic source term blocks matches
+	the finite difference Jacobian of the full residual.
+	'''
+	solver = create_scalar_solver(nu=-2.)
+	U = solver.state_coeffs
+	n = U.shape[1]*U.shape[2]
+
+	source_blocks = solver_jacobian.get_source_jacobian_blocks(solver, U)
+	assert source_blocks.shape == (U.shape[0], n, n)
+
+	jac_dense = get_dense_jacobian(solver, U)
+	jac = solver_jacobian.compute_jacobian(solver, U)
+	np.testing.assert_allclose(jac.toarray(), jac_dense, rtol=1e-6,
+			atol=1e-8)
+	assert solver.params["SourceSwitch"]
+
+
+class QuadraticSource(SourceBase):
+	'''
+	Source term S = U^2 without an analytical Jacobian.
+	'''
+	def get_source(self, physics, Uq, x, t):
+		return Uq**2
+
+
+@pytest.mark.parametrize('jacobian_type, method', [
+	(JacobianType.ForwardDifference, "get_forward_difference_jacobian"),
+	(JacobianType.CentralDifference, "get_central_difference_jacobian"),
+])
+def test_source_jacobian_follows_jacobian_type(monkeypatch, jacobian_type,
+		method):
+	'''
+	Make sure that source terms without an analytical Jacobian are
+	differentiated with the finite difference type of the residual
+	Jacobian.
+	'''
+	solver = create_scalar_solver()
+	solver.physics.source_terms.append(QuadraticSource())
+	U = solver.state_coeffs
+	num_elems, nb, ns = U.shape
+
+	calls = []
+	for name in ["get_forward_difference_jacobian",
+			"get_central_difference_jacobian"]:
+		def record(self, *args, name=name, fcn=getattr(SourceBase, name)):
+			calls.append(name)
+			return fcn(self, *args)
+		monkeypatch.setattr(SourceBase, name, record)
+
+	source_blocks = solver_jacobian.get_source_jacobian_blocks(solver, U,
+			jacobian_type)
+	assert calls == [method]
+
+	elem_helpers = solver.elem_helpers
+	Uq = np.einsum('jn, inl -> ijl', elem_helpers.basis_val, U)
+	Sjac = 2.*Uq[..., np.newaxis]
+	expected = solver_tools.calculate_dRdU(elem_helpers, Sjac).transpose(
+			0, 1, 3, 2, 4).reshape(num_elems, nb*ns, nb*ns)
+	np.testing.assert_allclose(source_blocks, expected, rtol=0.,
+			atol=1e-7*np.max(np.abs(expected)))
+
+
+def test_spatial_operator_of_upwind_advection_is_stable():
+	'''
+	Make sure that the eigenvalues of the semi-discrete operator of
+	periodic upwind advection lie in the left half plane and that a decay
+	source term shifts them by nu.
+	'''
+	solver = create_scalar_solver()
+	U = solver.state_coeffs
+	eigs = np.linalg.eigvals(solver_jacobian.compute_spatial_operator(
+			solver, U).toarray())
+	assert np.max(eigs.real) <= 1e-6
+
+	solver = create_scalar_solver(nu=-2.)
+	eigs_source = np.linalg.eigvals(solver_jacobian.compute_spatial_operator(
+			solver, U).toarray())
+	np.testing.assert_allclose(np.sort(eigs_source.real),
+			np.sort(eigs.real) - 2., atol=1e-5)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import physics.scalar.scalar as scalar
+import solver.DG as DG
+import solver.multigrid as solver_multigrid
+
+from test_jacobian import create_scalar_solver
+
+
+def create_steady_solver(time_scheme, **kwargs):
+	'''
+	This function creates a DG solver for the steady advection equation
+	with a sink term, U' = -U on [0, 1] with U(0) = 1, whose exact
+	solution is exp(-x).
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=8, xmin=0., xmax=1.)
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=3, TimeStepper=time_scheme, FinalTime=None,
+			NumTimeSteps=100, SteadyTolerance=1e-10, ApplyLimiters=[],
+			WriteFinalSolution=False, **kwargs)
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params(ConstVelocity=1.)
+	physics.set_IC(IC_type="Uniform", state=np.array([1.]))
+	physics.set_source(source_type="SimpleSource", nu=-1.)
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	physics.set_BC("x1", "StateAll", "Uniform", state=np.array([1.]))
+	physics.set_BC("x2", "Extrapolate")
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_transfer_operators_are_exact_for_coarse_polynomials():
+	'''
+	Make sure that a prolongated state has the same values as the coarse
+	state and that restricting it recovers the coarse state.
+	'''
+	solver = create_scalar_solver()
+	multigrid = solver_multigrid.PMultigrid(solver)
+	assert [level.order for level in multigrid.solvers] == [2, 1, 0]
+
+	for k in range(multigrid.num_levels - 1):
+		fine = multigrid.solvers[k]
+		coarse = multigrid.solvers[k + 1]
+		U_c = np.random.rand(*coarse.state_coeffs.shape)
+		U_f = multigrid.prolongate(k, U_c)
+
+		# Values at the quadrature points of the fine level
+		quad_pts = fine.elem_helpers.quad_pts
+		np.testing.assert_allclose(
+				np.einsum('qi, eis -> eqs', fine.basis.get_values(quad_pts),
+				U_f), np.einsum('qi, eis -> eqs',
+				coarse.basis.get_values(quad_pts), U_c), rtol=1e-13,
+				atol=1e-13)
+		np.testing.assert_allclose(multigrid.restrict_state(k, U_f), U_c,
+				rtol=1e-13, atol=1e-13)
+
+
+@pytest.mark.parametrize('smoother, cfl', [("RK", 1.), ("BlockJacobi", 10.)])
+def test_pmultigrid_reaches_steady_state(smoother, cfl):
+	'''
+	This test solves a steady problem with the PMultigrid stepper,
+	compares the result to the exact solution exp(-x), and makes sure
+	that the coarse levels accelerate the convergence.
+	'''
+	num_iterations = []
+	for min_order in [0, 3]:
+		solver = create_steady_solver("PMultigrid", CFL=cfl,
+				MultigridSmoother=smoother, MultigridMinOrder=min_order)
+		solver.solve()
+
+		assert solver.stepper.converged
+		# Solution at the quadrature points
+		Uq = np.einsum('jn, inl -> ijl', solver.elem_helpers.basis_val,
+				solver.state_coeffs)
+		np.testing.assert_allclose(Uq,
+				np.exp(-solver.elem_helpers.x_elems), rtol=0., atol=1e-6)
+		num_iterations.append(solver.stepper.num_iterations)
+
+	assert num_iterations[0] < num_iterations[1]
+
+
+def test_pmultigrid_preconditioner_reduces_linear_iterations():
+	'''
+	Make sure that the p-multigrid preconditioner gives the same steady
+	state as block-Jacobi with fewer GMRES iterations.
+	'''
+	solvers = []
+	for preconditioner in ["BlockJacobi", "PMultigrid"]:
+		solver = create_steady_solver("NewtonKrylov", CFL=1000.,
+				Preconditioner=preconditioner)
+		solver.solve()
+		assert solver.stepper.converged
+		solvers.append(solver)
+
+	np.testing.assert_allclose(solvers[1].state_coeffs,
+			solvers[0].state_coeffs, rtol=1e-8, atol=1e-8)
+	assert solvers[1].stepper.num_linear_iterations < \
+			solvers[0].stepper.num_linear_iterations
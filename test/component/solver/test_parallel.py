@@ -0,0 +1,125 @@
+import multiprocessing as mp
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.navierstokes.navierstokes as navierstokes
+import physics.navierstokes.tools as ns_tools
+import solver.DG as DG
+import solver.parallel as solver_parallel
+
+pytestmark = pytest.mark.skipif("fork" not in mp.get_all_start_methods(),
+		reason="requires the fork start method")
+
+
+def create_solver(num_procs=1, periodic=True, time_stepper="RK4"):
+	'''
+	This function creates a DG solver for a 2D Navier-Stokes problem on a
+	triangular mesh, with the Roe convective flux and the SIP diffusive
+	flux. The mesh is either doubly periodic or has state boundary
+	conditions on all four boundaries.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=4, num_elems_y=3, xmin=-5., xmax=5., ymin=-5.,
+			ymax=5.))
+	if periodic:
+		mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+				y1="y1", y2="y2")
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeTri",
+			ElementQuadrature="Dunavant", FaceQuadrature="GaussLegendre",
+			FinalTime=0.1, NumTimeSteps=4, ApplyLimiters=[],
+			NumProcesses=num_procs, WriteFinalSolution=False,
+			TimeStepper=time_stepper)
+
+	physics = navierstokes.NavierStokes2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+	physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_IC(IC_type="IsentropicVortex")
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	for bname in physics.BCs:
+		physics.set_BC(bname=bname, BC_type="StateAll",
+				fcn_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+@pytest.mark.parametrize('periodic', [True, False])
+@pytest.mark.parametrize('num_procs', [2, 3])
+def test_parallel_residual_matches_serial(num_procs, periodic):
+	'''
+	Make sure that the residual evaluated by the worker processes agrees
+	with the serial one.
+	'''
+	solver = create_solver(periodic=periodic)
+	U = solver.state_coeffs
+	res_serial = solver.get_residual(U, np.zeros_like(U))
+
+	solver.params["NumProcesses"] = num_procs
+	solver.parallel_residual = solver_parallel.start_parallel_residual(
+			solver)
+	try:
+		res = solver.get_residual(U, np.zeros_like(U))
+	finally:
+		solver.parallel_residual.close()
+
+	np.testing.assert_allclose(res, res_serial, rtol=1e-13,
+			atol=1e-13*np.amax(np.abs(res_serial)))
+
+
+def test_parallel_time_step_in_shared_memory():
+	'''
+	Make sure that the state and the residual are evaluated in place in
+	shared memory, and that the time steps agree with the serial ones.
+	'''
+	solver_serial = create_solver(time_stepper="LSRK4")
+	solver = create_solver(num_procs=2, time_stepper="LSRK4")
+
+	solver.parallel_residual = solver_parallel.start_parallel_residual(
+			solver)
+	try:
+		assert solver.state_coeffs is solver.parallel_residual.U
+		assert solver.stepper.res is solver.parallel_residual.res
+		for s in [solver_serial, solver]:
+			s.stepper.dt = 0.01
+			for i in range(2):
+				s.stepper.take_time_step(s)
+	finally:
+		solver.parallel_residual.close()
+
+	# The state is copied out of shared memory when the workers stop
+	U = solver.state_coeffs
+	assert U.base is None
+	U_serial = solver_serial.state_coeffs
+	np.testing.assert_allclose(U, U_serial, rtol=1e-13,
+			atol=1e-13*np.amax(np.abs(U_serial)))
+
+
+def test_solve_releases_workers_on_error():
+	'''
+	Make sure that the worker processes and shared memory are released
+	when a time step raises.
+	'''
+	solver = create_solver(num_procs=2)
+	workers = []
+
+	def custom_user_function(solver):
+		if solver.itime == 2:
+			workers.append(solver.parallel_residual)
+			raise RuntimeError("stop")
+	solver.custom_user_function = custom_user_function
+
+	with pytest.raises(RuntimeError, match="stop"):
+		solver.solve()
+
+	assert solver.parallel_residual is None
+	assert workers[0].U is None
+	assert not any(process.is_alive() for process in workers[0].processes)
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import errors
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.navierstokes.navierstokes as navierstokes
+import physics.navierstokes.tools as ns_tools
+import processing.sweep as sweep
+import solver.DG as DG
+import solver.tools as solver_tools
+
+
+def create_solver(precision):
+	'''
+	This function creates a DG solver with the given precision for a 2D
+	Navier-Stokes problem on a doubly periodic triangular mesh, with the
+	Roe convective flux and the SIP diffusive flux.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=4, num_elems_y=3, xmin=-5., xmax=5., ymin=-5.,
+			ymax=5.))
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+			y1="y1", y2="y2")
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeTri",
+			ElementQuadrature="Dunavant", FaceQuadrature="GaussLegendre",
+			FinalTime=1.0, NumTimeSteps=10, ApplyLimiters=[],
+			Precision=precision)
+
+	physics = navierstokes.NavierStokes2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+	physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_IC(IC_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+@pytest.mark.parametrize('precision, state_dtype, res_dtype, iMM_dtype', [
+	("Double", np.float64, np.float64, np.float64),
+	("Single", np.float32, np.float32, np.float32),
+	("Mixed", np.float64, np.float64, np.float64),
+])
+def test_precision_dtypes(precision, state_dtype, res_dtype, iMM_dtype):
+	'''
+	Make sure that the state, the helpers, and the residual are stored in
+	the floating-point types of the given precision.
+	'''
+	solver = create_solver(precision)
+	U = solver.state_coeffs
+	res = solver.get_residual(U, np.zeros_like(U))
+	dU = solver_tools.mult_inv_mass_matrix(solver.mesh, solver, 0.1, res)
+
+	assert U.dtype == state_dtype
+	assert res.dtype == res_dtype
+	assert dU.dtype == res_dtype
+	assert solver.elem_helpers.iMM_elems.dtype == iMM_dtype
+	assert solver.elem_helpers.basis_val.dtype == solver.dtype
+	assert solver.int_face_helpers.faces_to_basisL.dtype == solver.dtype
+	# Integer helpers are not converted
+	assert solver.int_face_helpers.elemL_IDs.dtype.kind == 'i'
+
+
+@pytest.mark.parametrize('precision', ["Single", "Mixed"])
+def test_precision_matches_double(precision):
+	'''
+	Make sure that the residual and the state after a few time steps agree
+	with those in double precision to single-precision accuracy.
+	'''
+	solvers = [create_solver("Double"), create_solver(precision)]
+	res = []
+	for solver in solvers:
+		U = solver.state_coeffs
+		res.append(solver.get_residual(U, np.zeros_like(U)))
+		solver.stepper.dt = 0.01
+		for i in range(5):
+			solver.stepper.take_time_step(solver)
+
+	res_double, res_single = res
+	U_double = solvers[0].state_coeffs
+	U_single = solvers[1].state_coeffs
+
+	np.testing.assert_allclose(res_single, res_double, rtol=0.,
+			atol=1e-5*np.amax(np.abs(res_double)))
+	np.testing.assert_allclose(U_single, U_double, rtol=0.,
+			atol=1e-6*np.amax(np.abs(U_double)))
+
+
+def create_deck(precision, solver="DG"):
+	'''
+	This function creates the input deck of a 1D scalar advection problem
+	with the given precision and solver.
+	'''
+	deck = {
+		"TimeStepping" : {"FinalTime" : 0.1, "NumTimeSteps" : 4,
+				"TimeStepper" : "ADER" if solver == "ADERDG" else "RK4"},
+		"Numerics" : {"SolutionOrder" : 2, "SolutionBasis" : "LagrangeSeg",
+				"Solver" : solver, "Precision" : precision},
+		"Mesh" : {"NumElemsX" : 8, "xmin" : -1., "xmax" : 1.,
+				"PeriodicBoundariesX" : ["x1", "x2"]},
+		"Physics" : {"Type" : "ConstAdvScalar", "ConstVelocity" : 1.},
+		"InitialCondition" : {"Function" : "Sine", "omega" : np.pi},
+		"Output" : {"WriteFinalSolution" : False, "AutoPostProcess" : False,
+				"Verbose" : False},
+	}
+
+	return sweep.get_case_deck(deck, {})
+
+
+@pytest.mark.parametrize('precision', ["Single", "Mixed"])
+def test_precision_driver(precision):
+	'''
+	Make sure that a simulation with single or mixed precision runs
+	through the driver and agrees with double precision.
+	'''
+	driver = sweep.load_driver()
+	solver_double, _, _ = driver(create_deck("Double"))
+	solver, _, _ = driver(create_deck(precision))
+
+	U_double = solver_double.state_coeffs
+	np.testing.assert_allclose(solver.state_coeffs, U_double, rtol=0.,
+			atol=1e-5*np.amax(np.abs(U_double)))
+
+
+def test_precision_incompatible_with_ader():
+	'''
+	Make sure that single precision is rejected for the ADER-DG solver.
+	'''
+	driver = sweep.load_driver()
+
+	with pytest.raises(errors.IncompatibleError):
+		driver(create_deck("Single", solver="ADERDG"))
+
+
+@pytest.mark.parametrize('stepper', ["NewtonKrylov", "ARK2", "ESDIRK2",
+		"BDF2", "PMultigrid"])
+@pytest.mark.parametrize('precision', ["Single", "Mixed"])
+def test_precision_incompatible_with_implicit_steppers(precision, stepper):
+	'''
+	Make sure that single and mixed precision are rejected for the
+	steppers with finite difference linearizations.
+	'''
+	driver = sweep.load_driver()
+	deck = create_deck(precision)
+	deck.TimeStepping["TimeStepper"] = stepper
+
+	with pytest.raises(errors.IncompatibleError):
+		driver(deck)
@@ -0,0 +1,83 @@
+import csv
+import json
+import numpy as np
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import physics.scalar.scalar as scalar
+import solver.DG as DG
+import solver.profiler as solver_profiler
+
+
+def create_solver(prefix, **kwargs):
+	'''
+	This function creates a DG solver for 1D scalar advection with a
+	boundary condition on each side.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=8, xmin=-1., xmax=1.)
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, FinalTime=0.1, NumTimeSteps=5, ApplyLimiters=[],
+			Prefix=prefix, WriteFinalSolution=False, **kwargs)
+
+	physics = scalar.ConstAdvScalar1D()
+	physics.set_conv_num_flux("LaxFriedrichs")
+	physics.set_physical_params(ConstVelocity=1.)
+	physics.set_IC(IC_type="Sine", omega=np.pi)
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	for bname in physics.BCs:
+		physics.set_BC(bname=bname, BC_type="StateAll", fcn_type="Sine",
+				omega=np.pi)
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_profiler_writes_report(tmp_path):
+	'''
+	Make sure that the report contains the phases of an RK4 solve, one
+	sample per time step, and consistent totals.
+	'''
+	prefix = str(tmp_path / "Data")
+	solver = create_solver(prefix, Profile=True)
+	solver.solve()
+
+	with open(prefix + "_profile.json") as f:
+		report = json.load(f)
+	phases = report["Phases"]
+	for name in ["GetTimeStep", "TimeStep", "Residual",
+			"BoundaryFaceResidual", "ElementResidual",
+			"InteriorFaceResidual", "NumericalFlux", "MassMatrix",
+			"Limiter", "CustomUserFunction", "Output"]:
+		assert phases[name]["Time"] > 0.
+	# Four residual evaluations per RK4 step
+	assert phases["Residual"]["Calls"] == 4*5
+	assert phases["TimeStep"]["Time"] >= phases["Residual"]["Time"]
+	assert phases["TimeStep"]["Time"] <= report["WallTime"]
+
+	samples = report["Samples"]
+	assert [sample["Step"] for sample in samples] == [1, 2, 3, 4, 5]
+	np.testing.assert_allclose([sample["TimeStepSize"] for sample in
+			samples], 0.02)
+	np.testing.assert_allclose(sum(sample["TimeStep"] for sample in
+			samples), phases["TimeStep"]["Time"])
+
+	with open(prefix + "_profile.csv", newline="") as f:
+		rows = list(csv.DictReader(f))
+	assert len(rows) == 5
+	np.testing.assert_allclose([float(row["Residual"]) for row in rows],
+			[sample["Residual"] for sample in samples])
+
+
+def test_profiling_is_off_by_default(tmp_path):
+	'''
+	Make sure that no report is written unless profiling is requested.
+	'''
+	prefix = str(tmp_path / "Data")
+	solver = create_solver(prefix)
+	solver.solve()
+
+	assert solver.profiler is solver_profiler.NULL_PROFILER
+	assert list(tmp_path.iterdir()) == []
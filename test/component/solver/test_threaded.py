@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.navierstokes.navierstokes as navierstokes
+import physics.navierstokes.tools as ns_tools
+import solver.DG as DG
+import solver.threaded as solver_threaded
+import solver.tools as solver_tools
+
+
+def create_solver(artificial_viscosity=False):
+	'''
+	This function creates a DG solver for a 2D Navier-Stokes problem on a
+	doubly periodic triangular mesh, with the Roe convective flux and the
+	SIP diffusive flux, and optionally artificial viscosity.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=4, num_elems_y=3, xmin=-5., xmax=5., ymin=-5.,
+			ymax=5.))
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+			y1="y1", y2="y2")
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeTri",
+			ElementQuadrature="Dunavant", FaceQuadrature="GaussLegendre",
+			FinalTime=1.0, NumTimeSteps=10, ApplyLimiters=[],
+			ArtificialViscosity=artificial_viscosity)
+
+	physics = navierstokes.NavierStokes2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+	physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_IC(IC_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+def test_get_chunks_covers_range():
+	'''
+	Make sure that the chunks are contiguous and cover all items.
+	'''
+	chunks = solver_threaded.get_chunks(11, 4)
+
+	assert [(chunk.start, chunk.stop) for chunk in chunks] == \
+			[(0, 4), (4, 8), (8, 11)]
+
+
+@pytest.mark.parametrize('artificial_viscosity', [False, True])
+@pytest.mark.parametrize('chunk_size', [1, 5, 1000])
+def test_threaded_kernels_match_serial(chunk_size, artificial_viscosity):
+	'''
+	Make sure that the chunked, threaded residual and inverse mass matrix
+	multiplication are identical to the serial ones.
+	'''
+	solver = create_solver(artificial_viscosity)
+	U = solver.state_coeffs
+	res_serial = solver.get_residual(U, np.zeros_like(U))
+	dU_serial = solver_tools.mult_inv_mass_matrix(solver.mesh, solver,
+			0.1, res_serial)
+
+	solver.params["NumThreads"] = 3
+	solver.params["ThreadChunkSize"] = chunk_size
+	solver.threaded_kernels = solver_threaded.start_threaded_kernels(
+			solver)
+	res = solver.get_residual(U, np.zeros_like(U))
+	dU = solver_tools.mult_inv_mass_matrix(solver.mesh, solver, 0.1, res)
+	solver.threaded_kernels.close()
+
+	np.testing.assert_array_equal(res, res_serial)
+	np.testing.assert_array_equal(dU, dU_serial)
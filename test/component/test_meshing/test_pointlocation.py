@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import sys
+sys.path.append('../src')
+
+import meshing.common as mesh_common
+import meshing.pointlocation as point_location
+import meshing.tools as mesh_tools
+
+rtol = 1e-12
+atol = 1e-12
+
+def get_random_points(mesh, num_pts):
+	'''
+	This function samples random points inside random elements. It returns
+	the element IDs, reference coordinates, and physical coordinates.
+	'''
+	rng = np.random.default_rng(0)
+	elem_IDs = rng.integers(0, mesh.num_elems, num_pts)
+	xref = rng.random([num_pts, mesh.ndims])
+	if mesh.gbasis.SHAPE_TYPE.name == "Triangle":
+		# Reflect into the reference triangle
+		outside = np.sum(xref, axis=1) > 1.
+		xref[outside] = 1. - xref[outside]
+	else:
+		xref = 2.*xref - 1.
+	xphys = np.array([mesh_tools.ref_to_phys(mesh, elem_ID, x[np.newaxis])[0]
+			for elem_ID, x in zip(elem_IDs, xref)])
+
+	return elem_IDs, xref, xphys
+
+
+@pytest.mark.parametrize('split_into_tris', [False, True])
+def test_locate_recovers_elements_and_ref_coords(split_into_tris):
+	'''
+	Make sure that points inside the mesh are found in the correct element
+	with the correct reference coordinates.
+	'''
+	mesh = mesh_common.mesh_2D(num_elems_x=5, num_elems_y=3, xmin=0.,
+			xmax=2., ymin=-1., ymax=0.5)
+	if split_into_tris:
+		mesh = mesh_common.split_quadrils_into_tris(mesh)
+	elem_IDs, xref, xphys = get_random_points(mesh, 200)
+
+	locator = point_location.PointLocator(mesh)
+	elem_IDs_found, xref_found = locator.locate(xphys)
+
+	np.testing.assert_array_equal(elem_IDs_found, elem_IDs)
+	np.testing.assert_allclose(xref_found, xref, rtol, atol)
+
+
+def test_locate_flags_points_outside_mesh():
+	'''
+	Make sure that points outside the mesh are flagged and that points on
+	the boundary are found.
+	'''
+	mesh = mesh_common.mesh_1D(num_elems=4, xmin=0., xmax=1.)
+	locator = point_location.PointLocator(mesh)
+	elem_IDs, xref = locator.locate(np.array([[-0.1], [0.], [0.3], [1.],
+			[1.5]]))
+
+	np.testing.assert_array_equal(elem_IDs, [-1, 0, 1, 3, -1])
+	np.testing.assert_allclose(xref[1:4, 0], [-1., -0.6, 1.], rtol, atol)
+	assert np.all(np.isnan(xref[[0, 4]]))
@@ -4,8 +4,13 @@ import pytest
 import sys
 sys.path.append('../src')
 
+import general
+import meshing.common as mesh_common
 import meshing.gmsh as mesh_gmsh
 import meshing.tools as mesh_tools
+import physics.navierstokes.navierstokes as navierstokes
+import physics.navierstokes.tools as ns_tools
+import solver.DG as DG
 
 rtol = 1e-15
 atol = 1e-15
@@ -68,3 +73,186 @@ def test_periodic_translational_for_2x2_triangles():
 			np.ones(3))
 	np.testing.assert_array_equal(mesh.elements[1].face_to_neighbors,
 			np.zeros(3))
+
+@pytest.mark.parametrize('ordering', [
+	"ReverseCuthillMcKee", "Morton", "Hilbert",
+])
+def test_reorder_elements_preserves_connectivity(ordering):
+	'''
+	Make sure that reordering the elements of a structured mesh is a valid
+	permutation that preserves element nodes and face connectivity.
+	'''
+	# Create mesh
+	mesh = mesh_common.mesh_2D(num_elems_x=6, num_elems_y=5)
+	elem_to_node_IDs = mesh.elem_to_node_IDs.copy()
+	adjacency = {(IF.elemL_ID, IF.faceL_ID, IF.elemR_ID, IF.faceR_ID)
+			for IF in mesh.interior_faces}
+	# Reorder
+	mesh_tools.reorder_elements(mesh, ordering)
+	new_to_old = mesh.elem_new_to_old_IDs
+
+	# Must be a permutation
+	np.testing.assert_array_equal(np.sort(new_to_old),
+			np.arange(mesh.num_elems))
+	# Element nodes must be carried along
+	np.testing.assert_array_equal(mesh.elem_to_node_IDs,
+			elem_to_node_IDs[new_to_old])
+	# Face connectivity must be unchanged in the original numbering
+	new_adjacency = {(new_to_old[IF.elemL_ID], IF.faceL_ID,
+			new_to_old[IF.elemR_ID], IF.faceR_ID)
+			for IF in mesh.interior_faces}
+	assert(new_adjacency == adjacency)
+	# Interior faces should be sorted by left element
+	elemL_IDs = [IF.elemL_ID for IF in mesh.interior_faces]
+	assert(np.all(np.diff(elemL_IDs) >= 0))
+
+def test_restore_element_ordering_inverts_reordering():
+	'''
+	Make sure that per-element data can be mapped back to the original
+	element numbering.
+	'''
+	# Create mesh and tag each element with its original ID
+	mesh = mesh_common.mesh_2D(num_elems_x=4, num_elems_y=4)
+	mesh_tools.reorder_elements(mesh, "ReverseCuthillMcKee")
+	data = mesh.elem_new_to_old_IDs.astype(float)[:, np.newaxis]
+	# Restoring should give the identity
+	restored = mesh_tools.restore_element_ordering(mesh, data)
+	np.testing.assert_array_equal(restored[:, 0], np.arange(mesh.num_elems))
+
+def get_navierstokes_solution(ordering, periodic):
+	'''
+	This function evaluates the residual and takes a few time steps of a
+	2D Navier-Stokes problem on a triangular mesh, whose faces have
+	different lengths, with the Roe convective flux and the SIP diffusive
+	flux. The mesh is either doubly periodic or has state boundary
+	conditions on all four boundaries. The results are returned in the
+	original element numbering.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=4, num_elems_y=3, xmin=-5., xmax=5., ymin=-5.,
+			ymax=5.))
+	if periodic:
+		mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+				y1="y1", y2="y2")
+	if ordering is not None:
+		mesh_tools.reorder_elements(mesh, ordering)
+
+	# Copy the defaults so that other tests are not affected
+	params = general.set_solver_params(dict(general.set_solver_params()),
+			SolutionOrder=2, SolutionBasis="LagrangeTri",
+			ElementQuadrature="Dunavant", FaceQuadrature="GaussLegendre",
+			ApplyLimiters=[])
+
+	physics = navierstokes.NavierStokes2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_diff_num_flux("SIP")
+	physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+	physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_IC(IC_type="IsentropicVortex")
+	physics.BCs = dict.fromkeys(mesh.boundary_groups.keys())
+	for bname in physics.BCs:
+		physics.set_BC(bname=bname, BC_type="StateAll",
+				fcn_type="IsentropicVortex")
+	solver = DG.DG(params, physics, mesh)
+
+	U = solver.state_coeffs
+	res = solver.get_residual(U, np.zeros_like(U)).copy()
+	solver.stepper.dt = 0.01
+	for i in range(3):
+		solver.stepper.take_time_step(solver)
+
+	if ordering is None:
+		return res, solver.state_coeffs
+	return (mesh_tools.restore_element_ordering(mesh, res),
+			mesh_tools.restore_element_ordering(mesh, solver.state_coeffs))
+
+@pytest.mark.parametrize('periodic', [True, False])
+@pytest.mark.parametrize('ordering', ["ReverseCuthillMcKee", "Hilbert"])
+def test_reorder_elements_preserves_navierstokes_solution(ordering,
+		periodic):
+	'''
+	Make sure that reordering the elements changes neither the residual
+	nor the solution of a Navier-Stokes problem once they are mapped back
+	to the original numbering.
+	'''
+	res_expected, U_expected = get_navierstokes_solution(None, periodic)
+	res, U = get_navierstokes_solution(ordering, periodic)
+
+	np.testing.assert_allclose(res, res_expected, rtol=0.,
+			atol=1e-13*np.amax(np.abs(res_expected)))
+	np.testing.assert_allclose(U, U_expected, rtol=0.,
+			atol=1e-13*np.amax(np.abs(U_expected)))
+
+def test_phys_to_ref_inverts_ref_to_phys():
+	'''
+	Make sure that phys_to_ref inverts ref_to_phys for points in
+	triangles.
+	'''
+	mesh = mesh_common.split_quadrils_into_tris(mesh_common.mesh_2D(
+			num_elems_x=2, num_elems_y=1))
+	xref = np.array([[0.2, 0.3], [0.5, 0.1], [0., 1.]])
+	elem_IDs = np.array([0, 1, 3])
+	xphys = np.vstack([mesh_tools.ref_to_phys(mesh, elem_ID,
+			x[np.newaxis]) for elem_ID, x in zip(elem_IDs, xref)])
+
+	xref_inv, converged = mesh_tools.phys_to_ref(mesh, elem_IDs, xphys)
+
+	assert np.all(converged)
+	np.testing.assert_allclose(xref_inv, xref, 1e-14, 1e-14)
+
+def test_partition_elements_gives_balanced_partitions():
+	'''
+	Make sure that every element is assigned to exactly one partition and
+	that the partitions have nearly equal sizes.
+	'''
+	mesh = mesh_common.mesh_2D(num_elems_x=7, num_elems_y=5)
+	part_IDs = mesh_tools.partition_elements(mesh, 4)
+
+	assert(part_IDs.shape[0] == mesh.num_elems)
+	counts = np.bincount(part_IDs)
+	assert(counts.shape[0] == 4)
+	assert(np.amax(counts) - np.amin(counts) <= 1)
+
+def test_get_partition_submesh_contains_owned_and_halo_elements():
+	'''
+	Make sure that the submesh of a partition lists the owned elements
+	first, followed by their neighbors, and keeps exactly the faces of the
+	owned elements.
+	'''
+	mesh = mesh_common.mesh_2D(num_elems_x=4, num_elems_y=3)
+	part_IDs = mesh_tools.partition_elements(mesh, 3)
+	owned_elem_IDs = np.where(part_IDs == 0)[0]
+	num_owned = owned_elem_IDs.shape[0]
+
+	submesh, local_to_global = mesh_tools.get_partition_submesh(mesh,
+			owned_elem_IDs)
+
+	# Owned elements come first
+	np.testing.assert_array_equal(local_to_global[:num_owned],
+			owned_elem_IDs)
+	np.testing.assert_array_equal(submesh.elem_to_node_IDs,
+			mesh.elem_to_node_IDs[local_to_global])
+	# Halo elements are exactly the non-owned neighbors
+	neighbors = set()
+	for IF in mesh.interior_faces:
+		if IF.elemL_ID in owned_elem_IDs:
+			neighbors.add(IF.elemR_ID)
+		if IF.elemR_ID in owned_elem_IDs:
+			neighbors.add(IF.elemL_ID)
+	assert(set(local_to_global[num_owned:]) ==
+			neighbors - set(owned_elem_IDs))
+	# Every face of an owned element is kept
+	for elem_ID in range(num_owned):
+		neighbor_IDs = submesh.elements[elem_ID].face_to_neighbors
+		global_neighbor_IDs = mesh.elements[
+				local_to_global[elem_ID]].face_to_neighbors
+		for local_ID, global_ID in zip(neighbor_IDs, global_neighbor_IDs):
+			if global_ID == -1:
+				assert(local_ID == -1)
+			else:
+				assert(local_to_global[local_ID] == global_ID)
+	num_bfaces = sum(bgroup.num_boundary_faces for bgroup in
+			submesh.boundary_groups.values())
+	assert(num_bfaces == sum(np.sum(
+			mesh.elements[elem_ID].face_to_neighbors == -1)
+			for elem_ID in owned_elem_IDs))
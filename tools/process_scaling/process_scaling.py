@@ -0,0 +1,114 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : tools/process_scaling/process_scaling.py
+#
+#       Measures the strong scaling of the multi-process residual
+#       evaluation (Numerics "NumProcesses") for 2D Euler and
+#       Navier-Stokes problems.
+#
+# ------------------------------------------------------------------------ #
+import sys; sys.path.append('../../src')
+import numpy as np
+import os
+import time
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.euler.euler as euler
+import physics.navierstokes.navierstokes as navierstokes
+import physics.navierstokes.tools as ns_tools
+import solver.DG as DG
+import solver.parallel as solver_parallel
+import solver.tools as solver_tools
+
+
+'''
+Parameters
+'''
+order = 3 # polynomial order
+num_elems_1D = [32, 64] # number of elements in each direction
+num_procs = [1, 2, 4, 8, 16] # process counts
+physics_types = ["Euler", "NavierStokes"]
+num_repeats = 5 # residual evaluations per measurement
+
+
+'''
+Pre-processing
+'''
+def create_solver(physics_type, num_elems):
+	mesh = mesh_common.mesh_2D(num_elems_x=num_elems, num_elems_y=num_elems,
+			xmin=-5., xmax=5., ymin=-5., ymax=5.)
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+			y1="y1", y2="y2")
+	params = dict(general.set_solver_params(SolutionOrder=order,
+			SolutionBasis="LagrangeQuad", FinalTime=1.0, NumTimeSteps=1,
+			ApplyLimiters=[]))
+
+	if physics_type == "Euler":
+		physics = euler.Euler2D()
+		physics.set_physical_params(GasConstant=1.)
+	else:
+		physics = navierstokes.NavierStokes2D()
+		physics.set_diff_num_flux("SIP")
+		physics.set_physical_params(GasConstant=1., Viscosity=0.1)
+		physics.get_transport = ns_tools.set_transport("Constant")
+	physics.set_conv_num_flux("Roe")
+	physics.set_IC(IC_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+def time_residual(solver):
+	# The state and the stepper's residual array are in shared memory when
+	# the workers run, as in SolverBase.solve
+	U = solver.state_coeffs
+	res = solver.stepper.res
+	# Warm up
+	solver.get_residual(U, res)
+
+	t0 = time.perf_counter()
+	for i in range(num_repeats):
+		res = solver.get_residual(U, res)
+		solver_tools.mult_inv_mass_matrix(solver.mesh, solver, 1., res)
+	return (time.perf_counter() - t0)/num_repeats
+
+
+'''
+Run
+'''
+print("Available cores: %d" % (len(os.sched_getaffinity(0))))
+print("%12s %10s %10s %12s %10s" % ("physics", "elements", "processes",
+		"time [s]", "speedup"))
+for physics_type in physics_types:
+	for num_elems in num_elems_1D:
+		solver = create_solver(physics_type, num_elems)
+		for n in num_procs:
+			solver.params["NumProcesses"] = n
+			solver.parallel_residual = \
+					solver_parallel.start_parallel_residual(solver)
+			try:
+				t = time_residual(solver)
+			finally:
+				if solver.parallel_residual is not None:
+					solver.parallel_residual.close()
+					solver.parallel_residual = None
+			if n == num_procs[0]:
+				t_ref = t
+			print("%12s %10d %10d %12.4e %10.2f" % (physics_type,
+					solver.mesh.num_elems, n, t, t_ref/t))
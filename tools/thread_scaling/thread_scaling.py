@@ -0,0 +1,98 @@
+# ------------------------------------------------------------------------ #
+#
+#       quail: A lightweight discontinuous Galerkin code for
+#              teaching and prototyping
+#		<https://github.com/IhmeGroup/quail>
+#       
+#		Copyright (C) 2020-2021
+#
+#       This program is distributed under the terms of the GNU
+#		General Public License v3.0. You should have received a copy
+#       of the GNU General Public License along with this program.  
+#		If not, see <https://www.gnu.org/licenses/>.
+#
+# ------------------------------------------------------------------------ #
+
+# ------------------------------------------------------------------------ #
+#
+#       File : tools/thread_scaling/thread_scaling.py
+#
+#       Measures the strong scaling of the threaded residual evaluation
+#       (Numerics "NumThreads") for a 2D Euler problem.
+#
+# ------------------------------------------------------------------------ #
+import sys; sys.path.append('../../src')
+import numpy as np
+import time
+
+import general
+import meshing.common as mesh_common
+import meshing.tools as mesh_tools
+import physics.euler.euler as euler
+import solver.DG as DG
+import solver.threaded as solver_threaded
+import solver.tools as solver_tools
+
+
+'''
+Parameters
+'''
+order = 3 # polynomial order
+num_elems_1D = [16, 32, 64] # number of elements in each direction
+num_threads = [1, 2, 4, 8] # thread counts
+chunk_size = 256 # elements/faces per chunk
+num_repeats = 5 # residual evaluations per measurement
+
+
+'''
+Pre-processing
+'''
+def create_solver(num_elems):
+	mesh = mesh_common.mesh_2D(num_elems_x=num_elems, num_elems_y=num_elems,
+			xmin=-5., xmax=5., ymin=-5., ymax=5.)
+	mesh_tools.make_periodic_translational(mesh, x1="x1", x2="x2",
+			y1="y1", y2="y2")
+	params = dict(general.set_solver_params(SolutionOrder=order,
+			SolutionBasis="LagrangeQuad", FinalTime=1.0, NumTimeSteps=1,
+			ApplyLimiters=[]))
+
+	physics = euler.Euler2D()
+	physics.set_conv_num_flux("Roe")
+	physics.set_physical_params(GasConstant=1.)
+	physics.set_IC(IC_type="IsentropicVortex")
+
+	return DG.DG(params, physics, mesh)
+
+
+def time_residual(solver):
+	U = solver.state_coeffs
+	res = np.zeros_like(U)
+	# Warm up
+	solver.get_residual(U, res)
+
+	t0 = time.perf_counter()
+	for i in range(num_repeats):
+		res = solver.get_residual(U, res)
+		solver_tools.mult_inv_mass_matrix(solver.mesh, solver, 1., res)
+	return (time.perf_counter() - t0)/num_repeats
+
+
+'''
+Run
+'''
+print("%10s %10s %12s %10s" % ("elements", "threads", "time [s]",
+		"speedup"))
+for num_elems in num_elems_1D:
+	solver = create_solver(num_elems)
+	solver.params["ThreadChunkSize"] = chunk_size
+	for n in num_threads:
+		solver.params["NumThreads"] = n
+		solver.threaded_kernels = solver_threaded.start_threaded_kernels(
+				solver)
+		t = time_residual(solver)
+		if solver.threaded_kernels is not None:
+			solver.threaded_kernels.close()
+		if n == num_threads[0]:
+			t_ref = t
+		print("%10d %10d %12.4e %10.2f" % (solver.mesh.num_elems, n, t,
+				t_ref/t))